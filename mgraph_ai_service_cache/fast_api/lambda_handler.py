@@ -1,3 +1,4 @@
+import logging
 import os
 
 if os.getenv('AWS_REGION'):  # only execute if we are not running inside an AWS Lambda function
@@ -15,16 +16,18 @@ if os.getenv('AWS_REGION'):  # only execute if we are not running inside an AWS
 
     clear_osbot_modules()
 
-error   = None          # pin these variables
-handler = None
-app     = None
+error         = None    # pin these variables
+handler       = None
+app           = None
+cache_service = None
 try:
     from mgraph_ai_service_cache.fast_api.Cache_Service__Fast_API import Cache_Service__Fast_API
 
     with Cache_Service__Fast_API() as _:
         _.setup()
-        handler = _.handler()
-        app     = _.app()
+        handler       = _.handler()
+        app           = _.app()
+        cache_service = _.cache_service
 except Exception as exc:
     if os.getenv("AWS_LAMBDA_FUNCTION_NAME") is None:       # raise exception when not running inside a lambda function
         raise RuntimeError(error)
@@ -34,4 +37,19 @@ except Exception as exc:
 def run(event, context=None):
     if error:
         return error
-    return handler(event, context)
+    try:
+        if is_scheduled_event(event):                       # i.e. an EventBridge schedule (the background TTL sweeper doesn't run while Lambda is frozen)
+            return cache_service.sweep_expired()
+        return handler(event, context)
+    finally:
+        flush()                                             # Lambda can freeze the environment once this returns, so the in-memory state (i.e. write-behind refs) must be saved first
+
+def is_scheduled_event(event):
+    return type(event) is dict and event.get('source') == 'aws.events' and event.get('detail-type') == 'Scheduled Event'
+
+def flush():                                                # a failed flush must not replace the response (its writes are retried in the next flush)
+    try:
+        return cache_service.flush()
+    except Exception:
+        logging.getLogger(__name__).exception('failed to flush the cache service state')
+        return None
@@ -1,16 +1,25 @@
+import json
 from typing                                                                     import Dict, Any
+from fastapi.responses                                                          import StreamingResponse
 from osbot_fast_api.api.routes.Fast_API__Routes                                 import Fast_API__Routes
 from osbot_fast_api.api.schemas.safe_str.Safe_Str__Fast_API__Route__Prefix      import Safe_Str__Fast_API__Route__Prefix
 from osbot_fast_api.api.schemas.safe_str.Safe_Str__Fast_API__Route__Tag         import Safe_Str__Fast_API__Route__Tag
 from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id import Safe_Str__Id
 from mgraph_ai_service_cache_client.schemas.consts.const__Fast_API              import FAST_API__PARAM__NAMESPACE
 from mgraph_ai_service_cache.service.cache.Cache__Service                       import Cache__Service
+from mgraph_ai_service_cache.schemas.cache.namespace.Schema__Cache__Namespace__Page import Schema__Cache__Namespace__Page
 
 TAG__ROUTES_NAMESPACE                  = 'namespace'
 PREFIX__ROUTES_NAMESPACE               = '/{namespace}'
-ROUTES_PATHS__NAMESPACE                = [ PREFIX__ROUTES_NAMESPACE + '/file-hashes',
-                                           PREFIX__ROUTES_NAMESPACE + '/file-ids'   ,
-                                           PREFIX__ROUTES_NAMESPACE + '/stats'      ]
+ROUTES_PATHS__NAMESPACE                = [ PREFIX__ROUTES_NAMESPACE + '/file-hashes'       ,
+                                           PREFIX__ROUTES_NAMESPACE + '/file-ids'          ,
+                                           PREFIX__ROUTES_NAMESPACE + '/stats'             ,
+                                           PREFIX__ROUTES_NAMESPACE + '/file-hashes/page'  ,
+                                           PREFIX__ROUTES_NAMESPACE + '/file-hashes/ndjson',
+                                           PREFIX__ROUTES_NAMESPACE + '/file-ids/page'     ,
+                                           PREFIX__ROUTES_NAMESPACE + '/file-ids/ndjson'   ,
+                                           PREFIX__ROUTES_NAMESPACE + '/popular'           ]
+MEDIA_TYPE__NDJSON                     = 'application/x-ndjson'
 
 
 class Routes__Namespace(Fast_API__Routes):
@@ -26,23 +35,68 @@ class Routes__Namespace(Fast_API__Routes):
     def file_ids(self, namespace: Safe_Str__Id = FAST_API__PARAM__NAMESPACE):
         return self.cache_service.get_namespace__file_ids(namespace=namespace)
 
+    def file_hashes__page(self, namespace : Safe_Str__Id = FAST_API__PARAM__NAMESPACE,
+                                limit     : int          = None                      ,
+                                cursor    : str          = None
+                           ) -> Schema__Cache__Namespace__Page:                     # Cursor based pagination (pass next_cursor as cursor to get the next page), one request per page on S3 but O(n) per page on the Memory, Local_Disk and Sqlite storage
+        return self.cache_service.get_namespace__file_hashes__page(namespace=namespace, limit=limit, cursor=cursor)
+
+    def file_hashes__ndjson(self, namespace: Safe_Str__Id = FAST_API__PARAM__NAMESPACE) -> StreamingResponse:      # One {"cache_hash": ...} json object per line, streamed as the namespace is listed
+        cache_hashes = self.cache_service.iter_namespace__file_hashes(namespace=namespace)
+        return self.ndjson_response('cache_hash', cache_hashes)
+
+    def file_ids__page(self, namespace : Safe_Str__Id = FAST_API__PARAM__NAMESPACE,
+                             limit     : int          = None                      ,
+                             cursor    : str          = None
+                        ) -> Schema__Cache__Namespace__Page:
+        return self.cache_service.get_namespace__file_ids__page(namespace=namespace, limit=limit, cursor=cursor)
+
+    def file_ids__ndjson(self, namespace: Safe_Str__Id = FAST_API__PARAM__NAMESPACE) -> StreamingResponse:         # One {"cache_id": ...} json object per line
+        cache_ids = self.cache_service.iter_namespace__file_ids(namespace=namespace)
+        return self.ndjson_response('cache_id', cache_ids)
+
+    def ndjson_response(self, key, values) -> StreamingResponse:
+        lines = (json.dumps({key: value}) + '\n' for value in values)
+        return StreamingResponse(lines, media_type=MEDIA_TYPE__NDJSON)
+
     def stats(self, namespace: Safe_Str__Id = FAST_API__PARAM__NAMESPACE) -> Dict[str, Any]:       # Get cache statistics
         namespace = namespace or Safe_Str__Id("default")
 
         try:
-            # Get file counts using shared method
-            counts_data = self.cache_service.get_namespace__file_counts(namespace)
-            handler     = counts_data['handler']
+            # Get file counts from the namespace counters (no storage listing)
+            namespace_stats = self.cache_service.get_namespace__stats(namespace)
+            handler         = self.cache_service.get_or_create_handler(namespace)
             # Build stats response
-            stats = { "namespace": str(namespace)         ,
-                      "ttl_hours": handler.cache_ttl_hours,
-                      **counts_data['file_counts'        ]}  # Spread all the file counts
+            stats = { "namespace"       : str(namespace)                  ,
+                      "ttl_hours"       : handler.cache_ttl_hours         ,
+                      **namespace_stats.file_counts()                     ,  # Spread all the file counts
+                      "entries"         : namespace_stats.entries         ,  # usage
+                      "content_bytes"   : namespace_stats.content_bytes   ,
+                      "data_files"      : namespace_stats.data_files      ,
+                      "reconciled_at"   : namespace_stats.reconciled_at   ,
+                      "max_entries"     : handler.max_entries             ,  # quotas (0 = unbounded)
+                      "max_bytes"       : handler.max_bytes               ,
+                      "eviction_policy" : handler.eviction_policy         ,
+                      "evictions"       : namespace_stats.evictions       ,
+                      "exists_filter"   : self.cache_service.exists_filter().stats(namespace).json()}
 
             return stats
         except Exception as e:
             return {"error": str(e), "namespace": str(namespace)}
 
+    def popular(self, namespace : Safe_Str__Id = FAST_API__PARAM__NAMESPACE,
+                      limit     : int          = 10
+                 ) -> Dict[str, Any]:                                               # The most read entries (from the sampled access counters, including the ones not flushed yet)
+        namespace = namespace or Safe_Str__Id("default")
+        return { "namespace" : str(namespace)                                                           ,
+                 "entries"   : self.cache_service.get_namespace__popularity(namespace, limit=limit)    }
+
     def setup_routes(self):
         self.add_route_get(self.file_hashes)
         self.add_route_get(self.file_ids   )
-        self.add_route_get(self.stats      )
\ No newline at end of file
+        self.add_route_get(self.stats      )
+        self.add_route_get(self.file_hashes__page  )
+        self.add_route_get(self.file_hashes__ndjson)
+        self.add_route_get(self.file_ids__page     )
+        self.add_route_get(self.file_ids__ndjson   )
+        self.add_route_get(self.popular            )
\ No newline at end of file
@@ -6,7 +6,8 @@ from mgraph_ai_service_cache.service.cache.Cache__Service
 
 TAG__ROUTES_NAMESPACES      = 'namespaces'
 PREFIX__ROUTES_NAMESPACES   = '/namespaces'
-ROUTES_PATHS__NAMESPACES    = [ PREFIX__ROUTES_NAMESPACES + '/list']
+ROUTES_PATHS__NAMESPACES    = [ PREFIX__ROUTES_NAMESPACES + '/list'         ,
+                                PREFIX__ROUTES_NAMESPACES + '/sweep-expired']
 
 
 class Routes__Namespaces(Fast_API__Routes):
@@ -20,8 +21,11 @@ class Routes__Namespaces(Fast_API__Routes):
 
     # todo, move this to a namespaces service
     def list(self):
-        namespaces = self.storage_fs().folder__folders(parent_folder='/', return_full_path=False)       # the list of namespaces is the list of root folders
-        return namespaces
+        return self.cache_service.namespaces()                                                          # the list of namespaces is the list of root folders
+
+    def sweep_expired(self):                                                                            # Delete the expired entries of all namespaces (i.e. from a scheduled call, since the background sweeper doesn't run in a frozen Lambda)
+        return self.cache_service.sweep_expired()
 
     def setup_routes(self):
-        self.add_route_get(self.list)
\ No newline at end of file
+        self.add_route_get (self.list         )
+        self.add_route_post(self.sweep_expired)
\ No newline at end of file
@@ -1,10 +1,12 @@
-from osbot_fast_api.api.routes.Fast_API__Routes                     import Fast_API__Routes
-from mgraph_ai_service_cache_client.schemas.cache.consts__Cache_Service    import DEFAULT_CACHE__NAMESPACE
-from mgraph_ai_service_cache.service.cache.Cache__Service           import Cache__Service
-from mgraph_ai_service_cache.utils.testing.Cache__Test__Fixtures    import Cache__Test__Fixtures
+from osbot_fast_api.api.routes.Fast_API__Routes                                        import Fast_API__Routes
+from mgraph_ai_service_cache_client.schemas.cache.consts__Cache_Service                import DEFAULT_CACHE__NAMESPACE
+from mgraph_ai_service_cache.service.cache.Cache__Service                              import Cache__Service
+from mgraph_ai_service_cache.utils.testing.Cache__Test__Fixtures                       import Cache__Test__Fixtures
+from mgraph_ai_service_cache.schemas.cache.hot_cache.Schema__Cache__Hot_Cache__Stats   import Schema__Cache__Hot_Cache__Stats
 
 TAG__ROUTES_SERVER                  = 'server'
-ROUTES_PATHS__SERVER                = [f'/{TAG__ROUTES_SERVER}' + '/storage/info' ,
+ROUTES_PATHS__SERVER                = [f'/{TAG__ROUTES_SERVER}' + '/storage/info'         ,
+                                       f'/{TAG__ROUTES_SERVER}' + '/hot-cache/stats'      ,
                                        f'/{TAG__ROUTES_SERVER}' + '/create/test-fixtures' ]
 
 class Routes__Server(Fast_API__Routes):
@@ -14,6 +16,9 @@ class Routes__Server(Fast_API__Routes):
     def storage__info(self) -> dict:                                                                     # Get current storage backend information
         return self.cache_service.get_storage_info()
 
+    def hot_cache__stats(self) -> Schema__Cache__Hot_Cache__Stats:                                        # Hits, misses and evictions of the in-process hot cache
+        return self.cache_service.hot_cache().stats()
+
     def create__test_fixtures(self):
         with Cache__Test__Fixtures(cache_service=self.cache_service     ,
                                    namespace  = DEFAULT_CACHE__NAMESPACE) as _:
@@ -22,5 +27,6 @@ class Routes__Server(Fast_API__Routes):
 
     def setup_routes(self):
         self.add_route_get(self.storage__info        )
+        self.add_route_get(self.hot_cache__stats     )
         self.add_route_get(self.create__test_fixtures)
 
@@ -27,8 +27,11 @@ class Routes__File__Exists(Fast_API__Routes):
         handler = self.cache_service.get_or_create_handler(namespace)
         file_id = Safe_Str__Id(cache_id)
 
-        with handler.fs__refs_id.file__json__single(file_id) as ref_fs:
-            exists = ref_fs.exists()
+        if self.cache_service.refs_write_behind().refs_id(namespace, cache_id):             # stored, but its refs are still queued (write-behind)
+            exists = True
+        else:
+            with handler.fs__refs_id.file__json__single(file_id) as ref_fs:
+                exists = ref_fs.exists()
 
         return Schema__Cache__Exists__Response(exists    = exists   ,
                                                cache_id  = cache_id ,
@@ -38,11 +41,7 @@ class Routes__File__Exists(Fast_API__Routes):
     def exists__hash__cache_hash(self, cache_hash : Safe_Str__Cache_Hash                    ,   # Check if hash exists
                                        namespace  : Safe_Str__Id = FAST_API__PARAM__NAMESPACE
                                 ) -> Schema__Cache__Exists__Response:
-        handler = self.cache_service.get_or_create_handler(namespace)
-        file_id = Safe_Str__Id(cache_hash)
-
-        with handler.fs__refs_hash.file__json__single(file_id) as ref_fs:
-            exists = ref_fs.exists()
+        exists = self.cache_service.exists_by_hash(cache_hash, namespace)                       # most misses are answered from memory (when the Bloom filters are enabled)
 
         return Schema__Cache__Exists__Response(exists     = exists    ,
                                                cache_hash = cache_hash,
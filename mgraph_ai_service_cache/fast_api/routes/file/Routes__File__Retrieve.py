@@ -20,6 +20,9 @@ from mgraph_ai_service_cache_client.schemas.cache.Schema__Cache__Binary__Referen
 from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Data_Type           import Enum__Cache__Data_Type
 from mgraph_ai_service_cache_client.schemas.consts.const__Fast_API                       import FAST_API__PARAM__NAMESPACE
 from mgraph_ai_service_cache.service.cache.retrieve.Cache__Service__Retrieve             import Cache__Service__Retrieve
+from mgraph_ai_service_cache.service.cache.retrieve.Cache__Service__Retrieve__Batch      import Cache__Service__Retrieve__Batch
+from mgraph_ai_service_cache.schemas.cache.retrieve.Schema__Cache__Retrieve__Batch__Request  import Schema__Cache__Retrieve__Batch__Request
+from mgraph_ai_service_cache.schemas.cache.retrieve.Schema__Cache__Retrieve__Batch__Response import Schema__Cache__Retrieve__Batch__Response
 
 TAG__ROUTES_RETRIEVE                  = 'retrieve'
 PREFIX__ROUTES_RETRIEVE               = '/{namespace}'
@@ -38,7 +41,8 @@ ROUTES_PATHS__RETRIEVE                = [ BASE_PATH__ROUTES_RETRIEVE + '{cache_i
                                           BASE_PATH__ROUTES_RETRIEVE + 'hash/{cache_hash}/string'   ,
                                           BASE_PATH__ROUTES_RETRIEVE + 'hash/{cache_hash}/metadata' ,
                                           BASE_PATH__ROUTES_RETRIEVE + 'hash/{cache_hash}/refs-hash',
-                                          BASE_PATH__ROUTES_RETRIEVE + 'hash/{cache_hash}/cache-id']
+                                          BASE_PATH__ROUTES_RETRIEVE + 'hash/{cache_hash}/cache-id' ,
+                                          BASE_PATH__ROUTES_RETRIEVE + 'batch'                     ]
 
 class Routes__File__Retrieve(Fast_API__Routes):                                             # FastAPI routes for cache retrieval operations
     tag            : Safe_Str__Fast_API__Route__Tag    = TAG__ROUTES_RETRIEVE
@@ -49,18 +53,30 @@ class Routes__File__Retrieve(Fast_API__Routes):
     def retrieve_service(self):                                                                             # Service layer for business logic
         return Cache__Service__Retrieve(cache_service=self.cache_service)                                   # create Cache__Service__Retrieve object (once, using the shared Cache_Service)
 
+    @cache_on_self
+    def retrieve_batch_service(self):                                                                       # Service layer for multi-get
+        return Cache__Service__Retrieve__Batch(cache_service=self.cache_service)
+
     @type_safe
     def handle_not_found(self, result        : Union[Type_Safe, Dict] = None,                                 # Base method for 404 handling
                                cache_id      : Cache_Id            = None,
                                cache_hash    : Safe_Str__Cache_Hash   = None,
                                namespace     : Safe_Str__Id           = None):
         if result is None:
+            if cache_id:
+                self.raise_if_expired(cache_id, namespace)
             error = self.retrieve_service().get_not_found_error(cache_id   = cache_id  ,
                                                                 cache_hash = cache_hash,
                                                                 namespace  = namespace )
             raise HTTPException(status_code=404, detail=error.json())
         return result
 
+    def raise_if_expired(self, cache_id  : Cache_Id,
+                               namespace : Safe_Str__Id = None):                                            # 410 (instead of 404) for entries that are past their TTL (and haven't been deleted by the TTL sweeper yet)
+        error = self.retrieve_service().retrieve_by_id__expired(cache_id, namespace or Safe_Str__Id("default"))
+        if error:
+            raise HTTPException(status_code=410, detail=error.json())
+
     def retrieve__cache_id(self, cache_id  : Cache_Id,
                                  namespace : Safe_Str__Id = FAST_API__PARAM__NAMESPACE
                             ): # todo union is not supported by Fast_API. Refactor to one class -> Union[Schema__Cache__Retrieve__Success, Schema__Cache__Binary__Reference]:             # Retrieve by cache ID with metadata
@@ -143,6 +159,7 @@ class Routes__File__Retrieve(Fast_API__Routes):
         result = self.retrieve_service().retrieve_by_id(cache_id, namespace)
         
         if result is None:
+            self.raise_if_expired(cache_id, namespace)
             raise HTTPException(status_code=404, detail="Cache entry not found")
         
         # Convert data to string format
@@ -166,6 +183,7 @@ class Routes__File__Retrieve(Fast_API__Routes):
         result = self.retrieve_service().retrieve_by_id(cache_id, namespace)
         
         if result is None:
+            self.raise_if_expired(cache_id, namespace)
             raise HTTPException(status_code=404, detail="Cache entry not found")
         
         # Return data based on type
@@ -197,6 +215,7 @@ class Routes__File__Retrieve(Fast_API__Routes):
         result = self.retrieve_service().retrieve_by_id(cache_id, namespace)
         
         if result is None:
+            self.raise_if_expired(cache_id, namespace)
             raise HTTPException(status_code=404, detail="Cache entry not found")
         
         # Convert to binary format
@@ -325,6 +344,14 @@ class Routes__File__Retrieve(Fast_API__Routes):
     
 
 
+    def retrieve__batch(self, request   : Schema__Cache__Retrieve__Batch__Request,
+                              namespace : Safe_Str__Id = FAST_API__PARAM__NAMESPACE
+                         ) -> Schema__Cache__Retrieve__Batch__Response:                                                     # Retrieve many entries (by cache_id and/or hash) in one call
+        try:
+            return self.retrieve_batch_service().retrieve_batch(request=request, namespace=namespace)
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+
     def setup_routes(self):                                                                                                 # Configure all routes
         self.add_route_get(self.retrieve__cache_id                  )               # Generic retrieval (with metadata)
         self.add_route_get(self.retrieve__cache_id__config          )
@@ -342,4 +369,6 @@ class Routes__File__Retrieve(Fast_API__Routes):
         self.add_route_get(self.retrieve__hash__cache_hash__binary   )
         self.add_route_get(self.retrieve__hash__cache_hash__metadata )
         self.add_route_get(self.retrieve__hash__cache_hash__refs_hash)
-        self.add_route_get(self.retrieve__hash__cache_hash__cache_id )
\ No newline at end of file
+        self.add_route_get(self.retrieve__hash__cache_hash__cache_id )
+
+        self.add_route_post(self.retrieve__batch                     )               # Multi-get
\ No newline at end of file
@@ -9,6 +9,7 @@ from osbot_fast_api.api.routes.Fast_API__Routes
 from osbot_fast_api.api.schemas.safe_str.Safe_Str__Fast_API__Route__Prefix                      import Safe_Str__Fast_API__Route__Prefix
 from osbot_fast_api.api.schemas.safe_str.Safe_Str__Fast_API__Route__Tag                         import Safe_Str__Fast_API__Route__Tag
 from osbot_utils.decorators.methods.cache_on_self                                               import cache_on_self
+from osbot_utils.type_safe.primitives.core.Safe_UInt                                            import Safe_UInt
 from osbot_utils.type_safe.primitives.domains.files.safe_str.Safe_Str__File__Path               import Safe_Str__File__Path
 from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id                 import Safe_Str__Id
 from mgraph_ai_service_cache_client.schemas.cache.consts__Cache_Service                         import DEFAULT_CACHE__STORE__STRATEGY
@@ -16,6 +17,9 @@ from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Stra
 from mgraph_ai_service_cache_client.schemas.consts.const__Fast_API                              import FAST_API__PARAM__NAMESPACE
 from mgraph_ai_service_cache.service.cache.store.Cache__Service__Store                          import Cache__Service__Store
 from mgraph_ai_service_cache_client.schemas.cache.Schema__Cache__Store__Response                import Schema__Cache__Store__Response
+from mgraph_ai_service_cache.schemas.cache.store.Schema__Cache__Store__Batch__Request          import Schema__Cache__Store__Batch__Request
+from mgraph_ai_service_cache.schemas.cache.store.Schema__Cache__Store__Batch__Response         import Schema__Cache__Store__Batch__Response
+from mgraph_ai_service_cache.service.cache.store.Cache__Service__Store__Batch                  import Cache__Service__Store__Batch
 
 TAG__ROUTES_STORE                  = 'store'
 PREFIX__ROUTES_STORE               = '/{namespace}/{strategy}'
@@ -24,7 +28,8 @@ ROUTES_PATHS__STORE                = [ f'{PREFIX__ROUTES_STORE}/{TAG__ROUTES_STO
                                        f'{PREFIX__ROUTES_STORE}/{TAG__ROUTES_STORE}/' + 'json'                    ,
                                        f'{PREFIX__ROUTES_STORE}/{TAG__ROUTES_STORE}/' + 'json/{cache_key:path}'   ,
                                        f'{PREFIX__ROUTES_STORE}/{TAG__ROUTES_STORE}/' + 'binary'                  ,
-                                       f'{PREFIX__ROUTES_STORE}/{TAG__ROUTES_STORE}/' + 'binary/{cache_key:path}' ]
+                                       f'{PREFIX__ROUTES_STORE}/{TAG__ROUTES_STORE}/' + 'binary/{cache_key:path}' ,
+                                       f'{PREFIX__ROUTES_STORE}/{TAG__ROUTES_STORE}/' + 'batch'                   ]
 
 
 class Routes__File__Store(Fast_API__Routes):                                                                  # FastAPI routes for cache store operations
@@ -39,10 +44,15 @@ class Routes__File__Store(Fast_API__Routes):
     def store_service(self):                                                                            # Service layer for business logic
         return Cache__Service__Store(cache_service=self.cache_service)                                  # create Cache__Service__Store object (once, using the shared Cache_Service)
 
+    @cache_on_self
+    def store_batch_service(self):                                                                      # Service layer for batch stores
+        return Cache__Service__Store__Batch(cache_service=self.cache_service)
+
 
     def store__string(self, data      : str = Body(...),
                             strategy  : Enum__Cache__Store__Strategy = DEFAULT_CACHE__STORE__STRATEGY,
-                            namespace : Safe_Str__Id                 = FAST_API__PARAM__NAMESPACE
+                            namespace : Safe_Str__Id                 = FAST_API__PARAM__NAMESPACE,
+                            ttl_hours : Safe_UInt                    = None                                          # optional per-store TTL (0 = never expires)
                        ) -> Schema__Cache__Store__Response:                                                         # Store string data
 
         if not data:                                                                                                # Validate input
@@ -54,7 +64,8 @@ class Routes__File__Store(Fast_API__Routes):
         # Use service layer
         result = self.store_service().store_string(data      = data       ,
                                                  strategy  = strategy   ,
-                                                 namespace = namespace  )
+                                                 namespace = namespace  ,
+                                                 ttl_hours = ttl_hours  )
 
         if result is None:
             raise HTTPException(status_code=500, detail="Failed to store data")
@@ -66,7 +77,8 @@ class Routes__File__Store(Fast_API__Routes):
                                        namespace  : Safe_Str__Id                 = FAST_API__PARAM__NAMESPACE         ,
                                        strategy   : Enum__Cache__Store__Strategy = DEFAULT_CACHE__STORE__STRATEGY   ,
                                        cache_key  : Safe_Str__File__Path         = None,
-                                       file_id    : Safe_Str__Id                 = None
+                                       file_id    : Safe_Str__Id                 = None,
+                                       ttl_hours  : Safe_UInt                    = None
                                   ) -> Schema__Cache__Store__Response:                                  # Store string with semantic key
 
         if not data:                                                                                    # Validate input
@@ -85,7 +97,8 @@ class Routes__File__Store(Fast_API__Routes):
                                                    strategy  = strategy   ,                               # todo: we should we using a Type_Safe class for these params
                                                    namespace = namespace  ,
                                                    cache_key = cache_key  ,
-                                                   file_id   = file_id    )
+                                                   file_id   = file_id    ,
+                                                   ttl_hours = ttl_hours  )
 
         if result is None:
             raise HTTPException(status_code=500, detail="Failed to store data")
@@ -94,12 +107,14 @@ class Routes__File__Store(Fast_API__Routes):
 
     def store__json(self, data     : dict,                                                                          # JSON can be empty object, that's valid
                           strategy  : Enum__Cache__Store__Strategy = DEFAULT_CACHE__STORE__STRATEGY,
-                          namespace : Safe_Str__Id                 = FAST_API__PARAM__NAMESPACE
+                          namespace : Safe_Str__Id                 = FAST_API__PARAM__NAMESPACE,
+                          ttl_hours : Safe_UInt                    = None
                      ) -> Schema__Cache__Store__Response:                                                           # Store JSON data
 
         result = self.store_service().store_json(data      = data     ,                                               # Use service layer
                                                strategy  = strategy ,                                               # todo: we should we using a Type_Safe class for these params
-                                               namespace = namespace)
+                                               namespace = namespace,
+                                               ttl_hours = ttl_hours)
 
         if result is None:
             raise HTTPException(status_code=500, detail="Failed to store data")
@@ -113,7 +128,8 @@ class Routes__File__Store(Fast_API__Routes):
                                      strategy        : Enum__Cache__Store__Strategy     = DEFAULT_CACHE__STORE__STRATEGY,
                                      cache_key       : Safe_Str__Cache__File__Cache_Key = None                          ,
                                      file_id         : Safe_Str__Cache__File__File_Id   = None                          ,
-                                     json_field_path : Safe_Str__Json__Field_Path       = None
+                                     json_field_path : Safe_Str__Json__Field_Path       = None                          ,
+                                     ttl_hours       : Safe_UInt                        = None
                                 ) -> Schema__Cache__Store__Response:                                                # Store JSON with semantic key
 
         if not cache_key:                                                                                           # todo: check this path, since I think this path can't be reached (due to how FastAPI handles routes)
@@ -127,7 +143,8 @@ class Routes__File__Store(Fast_API__Routes):
                                                  namespace       = namespace,
                                                  cache_key       = cache_key,
                                                  json_field_path = json_field_path,
-                                                 file_id         = file_id  )
+                                                 file_id         = file_id  ,
+                                                 ttl_hours       = ttl_hours)
 
         if result is None:
             raise HTTPException(status_code=500, detail="Failed to store data")
@@ -137,7 +154,8 @@ class Routes__File__Store(Fast_API__Routes):
     def store__binary(self, request  : Request,
                             body     : bytes                        = Body(..., media_type="application/octet-stream"),
                             strategy : Enum__Cache__Store__Strategy = DEFAULT_CACHE__STORE__STRATEGY,
-                            namespace: Safe_Str__Id                 = FAST_API__PARAM__NAMESPACE
+                            namespace: Safe_Str__Id                 = FAST_API__PARAM__NAMESPACE,
+                            ttl_hours: Safe_UInt                    = None
                        ) -> Schema__Cache__Store__Response:                                                         # Store binary data
 
         if not body:                                                                                                # Validate input
@@ -152,7 +170,8 @@ class Routes__File__Store(Fast_API__Routes):
         result = self.store_service().store_binary(data             = body            ,                               # Use service layer
                                                  strategy         = strategy        ,                               # todo: we should we using a Type_Safe class for these params
                                                  namespace        = namespace       ,
-                                                 content_encoding = content_encoding)
+                                                 content_encoding = content_encoding,
+                                                 ttl_hours        = ttl_hours       )
 
         if result is None:
             raise HTTPException(status_code=500, detail="Failed to store data")
@@ -165,7 +184,8 @@ class Routes__File__Store(Fast_API__Routes):
                                        strategy   : Enum__Cache__Store__Strategy = DEFAULT_CACHE__STORE__STRATEGY,
                                        cache_key  : Safe_Str__File__Path         = None,
                                        file_id    : Safe_Str__Id                 = None,
-                                       request    : Request                      = None
+                                       request    : Request                      = None,
+                                       ttl_hours  : Safe_UInt                    = None
                                   ) -> Schema__Cache__Store__Response:                                              # Store binary with semantic key
 
         if not body:                                                                                                # Validate input
@@ -188,13 +208,31 @@ class Routes__File__Store(Fast_API__Routes):
                                                    namespace        = namespace       ,
                                                    cache_key        = cache_key       ,
                                                    file_id          = file_id         ,
-                                                   content_encoding = content_encoding)
+                                                   content_encoding = content_encoding,
+                                                   ttl_hours        = ttl_hours       )
 
         if result is None:
             raise HTTPException(status_code=500, detail="Failed to store data")
 
         return result
 
+    def store__batch(self, request   : Schema__Cache__Store__Batch__Request                            ,
+                           strategy  : Enum__Cache__Store__Strategy = DEFAULT_CACHE__STORE__STRATEGY   ,
+                           namespace : Safe_Str__Id                 = FAST_API__PARAM__NAMESPACE
+                      ) -> Schema__Cache__Store__Batch__Response:                                                   # Store many string/json/binary (base64) items in one call
+
+        if not request.items:
+            error = self.store_service().get_invalid_input_error(field_name    = "items"                      ,
+                                                                 expected_type = "non-empty list"             ,
+                                                                 message       = "Batch items cannot be empty")
+            raise HTTPException(status_code=400, detail=error.json())
+        try:
+            return self.store_batch_service().store_batch(request   = request  ,
+                                                          strategy  = strategy ,
+                                                          namespace = namespace)
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+
     def setup_routes(self):                                                             # Configure all routes
         self.add_route_post(self.store__string              )                           # String endpoints
         self.add_route_post(self.store__string__cache_key   )
@@ -203,4 +241,6 @@ class Routes__File__Store(Fast_API__Routes):
         self.add_route_post(self.store__json__cache_key     )                           # JSON endpoints
 
         self.add_route_post(self.store__binary              )                           # Binary endpoints
-        self.add_route_post(self.store__binary__cache_key   )
\ No newline at end of file
+        self.add_route_post(self.store__binary__cache_key   )
+
+        self.add_route_post(self.store__batch               )                           # Batch endpoint
\ No newline at end of file
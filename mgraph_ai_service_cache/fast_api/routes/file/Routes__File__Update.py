@@ -5,6 +5,7 @@ from osbot_fast_api.api.routes.Fast_API__Routes
 from osbot_fast_api.api.schemas.safe_str.Safe_Str__Fast_API__Route__Prefix           import Safe_Str__Fast_API__Route__Prefix
 from osbot_fast_api.api.schemas.safe_str.Safe_Str__Fast_API__Route__Tag              import Safe_Str__Fast_API__Route__Tag
 from osbot_utils.decorators.methods.cache_on_self                                    import cache_on_self
+from osbot_utils.type_safe.primitives.core.Safe_UInt                                 import Safe_UInt
 from osbot_utils.type_safe.primitives.domains.identifiers.Cache_Id                   import Cache_Id
 from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id      import Safe_Str__Id
 from osbot_utils.type_safe.type_safe_core.decorators.type_safe                       import type_safe
@@ -34,7 +35,8 @@ class Routes__File__Update(Fast_API__Routes):
     def update__string(self,
                        data      : str           = Body(...)                     ,
                        cache_id  : Cache_Id      = None                          ,
-                       namespace : Safe_Str__Id  = FAST_API__PARAM__NAMESPACE
+                       namespace : Safe_Str__Id  = FAST_API__PARAM__NAMESPACE    ,
+                       ttl_hours : Safe_UInt     = None                          # refreshes the entry's TTL (from now, 0 = never expires)
                   ) -> Schema__Cache__Update__Response:                          # Update existing cache entry with string data
 
         if not data:                                                            # Validate input
@@ -45,24 +47,28 @@ class Routes__File__Update(Fast_API__Routes):
 
         return self._execute_update(cache_id  = cache_id  ,
                                     namespace = namespace ,
-                                    data      = data      )
+                                    data      = data      ,
+                                    ttl_hours = ttl_hours )
 
     @route_path("/update/{cache_id}/json")
     def update__json(self,
                      data      : dict          = Body(...)                     ,
                      cache_id  : Cache_Id      = None                          ,
-                     namespace : Safe_Str__Id  = FAST_API__PARAM__NAMESPACE
+                     namespace : Safe_Str__Id  = FAST_API__PARAM__NAMESPACE    ,
+                     ttl_hours : Safe_UInt     = None
                 ) -> Schema__Cache__Update__Response:                            # Update existing cache entry with JSON data
 
         return self._execute_update(cache_id  = cache_id  ,
                                     namespace = namespace ,
-                                    data      = data      )
+                                    data      = data      ,
+                                    ttl_hours = ttl_hours )
 
     @route_path("/update/{cache_id}/binary")
     def update__binary(self,
                        body      : bytes         = Body(..., media_type="application/octet-stream"),
                        cache_id  : Cache_Id      = None                          ,
-                       namespace : Safe_Str__Id  = FAST_API__PARAM__NAMESPACE
+                       namespace : Safe_Str__Id  = FAST_API__PARAM__NAMESPACE    ,
+                       ttl_hours : Safe_UInt     = None
                   ) -> Schema__Cache__Update__Response:                          # Update existing cache entry with binary data
 
         if not body:                                                            # Validate input
@@ -73,18 +79,21 @@ class Routes__File__Update(Fast_API__Routes):
 
         return self._execute_update(cache_id  = cache_id  ,
                                     namespace = namespace ,
-                                    data      = body      )
+                                    data      = body      ,
+                                    ttl_hours = ttl_hours )
 
     @type_safe
     def _execute_update(self,
                         cache_id  : Cache_Id      ,
                         namespace : Safe_Str__Id  ,
                         data      : Any           ,
+                        ttl_hours : Safe_UInt     = None
                    ) -> Schema__Cache__Update__Response:                         # Common update logic for all data types
 
         result = self.update_service().update_by_id(cache_id  = cache_id  ,
                                                     namespace = namespace ,
-                                                    data      = data      )
+                                                    data      = data      ,
+                                                    ttl_hours = ttl_hours )
 
         if result is None:                                                      # Handle update failure
             error_detail = { "error_type" : "UPDATE_FAILED"                          ,
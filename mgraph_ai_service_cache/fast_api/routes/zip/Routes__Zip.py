@@ -1,4 +1,5 @@
-from fastapi                                                                                    import HTTPException, Response, Body
+from fastapi                                                                                    import HTTPException, Request, Response, Body
+from fastapi.responses                                                                          import StreamingResponse
 from osbot_fast_api.api.decorators.route_path                                                   import route_path
 from osbot_fast_api.api.routes.Fast_API__Routes                                                 import Fast_API__Routes
 from osbot_fast_api.api.schemas.safe_str.Safe_Str__Fast_API__Route__Prefix                      import Safe_Str__Fast_API__Route__Prefix
@@ -15,6 +16,8 @@ from mgraph_ai_service_cache.service.cache.Cache__Service
 from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Store                       import Cache__Service__Zip__Store
 from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Operations                  import Cache__Service__Zip__Operations
 from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Batch                       import Cache__Service__Zip__Batch
+from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Stream                      import Cache__Service__Zip__Stream, CACHE__ZIP__STREAM__ERROR__NOT_BINARY, CACHE__ZIP__STREAM__ERROR__RANGE
+from mgraph_ai_service_cache.schemas.cache.zip.Schema__Cache__Zip__Stream                      import Schema__Cache__Zip__Stream
 from mgraph_ai_service_cache_client.schemas.cache.zip.Schema__Cache__Zip__Store__Request        import Schema__Cache__Zip__Store__Request
 from mgraph_ai_service_cache_client.schemas.cache.zip.Schema__Cache__Zip__Store__Response       import Schema__Cache__Zip__Store__Response
 from mgraph_ai_service_cache_client.schemas.cache.zip.Schema__Cache__Zip__Operation__Request    import Schema__Cache__Zip__Operation__Request
@@ -54,6 +57,31 @@ class Routes__Zip(Fast_API__Routes):                                       # Fas
     def zip_batch_service(self) -> Cache__Service__Zip__Batch:             # Service for batch operations
         return Cache__Service__Zip__Batch(cache_service=self.cache_service)
 
+    @cache_on_self
+    def zip_stream_service(self) -> Cache__Service__Zip__Stream:           # Service for streaming zips (and their files)
+        return Cache__Service__Zip__Stream(cache_service=self.cache_service)
+
+    def stream_response(self, stream     : Schema__Cache__Zip__Stream,
+                              media_type : str                       ,
+                              headers    : dict = None
+                         ) -> Response:                                     # 200 (or 206 for a Range), streamed when it is bigger than one chunk
+        if not stream.success:
+            if stream.error_type == CACHE__ZIP__STREAM__ERROR__RANGE:
+                raise HTTPException(status_code=416, detail=stream.error_message, headers={"Content-Range": f"bytes */{stream.size}"})
+            if stream.error_type == CACHE__ZIP__STREAM__ERROR__NOT_BINARY:
+                raise HTTPException(status_code=400, detail=stream.error_message)
+            raise HTTPException(status_code=404, detail=stream.error_message)
+
+        headers     = {**(headers or {}), "Accept-Ranges": "bytes"}
+        status_code = 200
+        if stream.partial:
+            status_code              = 206
+            headers["Content-Range"] = f"bytes {stream.start}-{stream.end}/{stream.size}"
+        if stream.length() <= self.zip_stream_service().chunk_size:        # small content is sent in one piece
+            return Response(content=b''.join(stream.chunks), status_code=status_code, media_type=media_type, headers=headers)
+        headers["Content-Length"] = str(stream.length())
+        return StreamingResponse(stream.chunks, status_code=status_code, media_type=media_type, headers=headers)
+
     @route_path("/{strategy}/zip/create/{cache_key:path}/{file_id}")
     def zip_create(self,namespace  : Safe_Str__Id                 = FAST_API__PARAM__NAMESPACE  ,
                         strategy   : Enum__Cache__Store__Strategy = DEFAULT_CACHE__ZIP__STRATEGY,
@@ -112,20 +140,16 @@ class Routes__Zip(Fast_API__Routes):                                       # Fas
     @route_path("/zip/{cache_id}/file/retrieve/{file_path:path}")
     def zip_file_retrieve(self, cache_id  : Cache_Id   ,
                            file_path : Safe_Str__File__Path,
-                           namespace : Safe_Str__Id = FAST_API__PARAM__NAMESPACE
-                      ) -> Response:                                         # Get specific file from zip
-
-        request = Schema__Cache__Zip__Operation__Request(cache_id  = cache_id   ,
-                                                         operation = "get"      ,
-                                                         file_path = file_path  ,
-                                                         namespace = namespace  )
-
-        result = self.zip_ops_service().perform_operation(request)
+                           namespace : Safe_Str__Id = FAST_API__PARAM__NAMESPACE,
+                           request   : Request      = None
+                      ) -> Response:                                         # Get specific file from zip (streamed, with Range support)
 
-        if not result.success:
-            raise HTTPException(status_code=404, detail=result.error_details)
-
-        return Response(content=result.file_content, media_type="application/octet-stream")
+        range_header = request.headers.get('range') if request else None
+        stream       = self.zip_stream_service().member_stream(cache_id     = cache_id    ,
+                                                               namespace    = namespace   ,
+                                                               file_path    = file_path   ,
+                                                               range_header = range_header)
+        return self.stream_response(stream, media_type="application/octet-stream")
 
     @route_path("/zip/{cache_id}/file/add/from/string/{file_path:path}")
     def zip_file_add_from_string(self, cache_id  : Cache_Id   ,
@@ -195,24 +219,15 @@ class Routes__Zip(Fast_API__Routes):                                       # Fas
 
     @route_path("/zip/{cache_id}/retrieve")
     def zip_retrieve(self, cache_id : Cache_Id   ,
-                           namespace: Safe_Str__Id = FAST_API__PARAM__NAMESPACE
-                      ) -> Response:                                         # Download entire zip file
-
-        result = self.cache_service.retrieve_by_id(cache_id, namespace)
-
-        if not result:
-            raise HTTPException(status_code=404, detail="Zip file not found")
-
-        if result.get('data_type') != 'binary':
-            raise HTTPException(status_code=400, detail="Cached item is not a binary file")
-
-        zip_bytes = result.get('data')
-
-        return Response(
-            content=zip_bytes,
-            media_type="application/zip",
-            headers={"Content-Disposition": f"attachment; filename={cache_id}.zip"}
-        )
+                           namespace: Safe_Str__Id = FAST_API__PARAM__NAMESPACE,
+                           request  : Request      = None
+                      ) -> Response:                                         # Download entire zip file (streamed, with Range support)
+
+        range_header = request.headers.get('range') if request else None
+        stream       = self.zip_stream_service().zip_stream(cache_id, namespace, range_header)
+        return self.stream_response(stream                                                                   ,
+                                    media_type = "application/zip"                                           ,
+                                    headers    = {"Content-Disposition": f"attachment; filename={cache_id}.zip"})
 
     def setup_routes(self):                                                # Configure all routes
         self.add_route_post  (self.zip_create              )
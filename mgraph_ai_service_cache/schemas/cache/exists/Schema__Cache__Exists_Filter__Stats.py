@@ -0,0 +1,14 @@
+from osbot_utils.type_safe.Type_Safe                                 import Type_Safe
+from osbot_utils.type_safe.primitives.core.Safe_UInt                 import Safe_UInt
+
+
+class Schema__Cache__Exists_Filter__Stats(Type_Safe):                               # Current state of a namespace's exists-by-hash filter
+    enabled              : bool                                                     # False when there is no Bloom filter loaded for the namespace
+    size_bits            : Safe_UInt                                                # Bloom filter size (m)
+    size_bytes           : Safe_UInt                                                # Memory (and snapshot) size of the bit array
+    hash_count           : Safe_UInt                                                # Bit positions per hash (k)
+    items_added          : Safe_UInt                                                # Hashes added to the filter (n)
+    false_positive_rate  : float                                                    # Estimated rate of 'maybe present' answers for missing hashes
+    negative_ttl_seconds : Safe_UInt                                                # How long confirmed misses are remembered (0 = disabled)
+    definite_misses      : Safe_UInt                                                # Checks answered 'not found' without touching storage
+    storage_checks       : Safe_UInt                                                # Checks that had to go to the storage backend
@@ -0,0 +1,13 @@
+from osbot_utils.type_safe.primitives.core.Safe_UInt                                     import Safe_UInt
+from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id          import Safe_Str__Id
+from mgraph_ai_service_cache_client.schemas.cache.file.Schema__Cache__File__Refs         import Schema__Cache__File__Refs
+from mgraph_ai_service_cache_client.schemas.cache.store.Schema__Cache__Store__Metadata   import Schema__Cache__Store__Metadata
+
+# todo: move these extra fields into Schema__Cache__File__Refs (in the client project), once the service has been using them for a while
+
+class Schema__Cache__File__Refs__Extended(Schema__Cache__File__Refs):                   # by-id refs file, with the content details needed to serve a retrieve
+    content_size : Safe_UInt                                                            # Size (in bytes) of the stored content
+    metadata     : Schema__Cache__Store__Metadata = None                                # Copy of the store metadata (content_encoding, file_type, stored_at, ...) so that retrieve doesn't need to read the .metadata file
+    content_digest : Safe_Str__Id                   = None                              # sha256 of the content, when the content file is shared with other entries (see Cache__Content__Dedup)
+    shared_blob    : bool                                                               # True when the content is in the cross-namespace blobs (see Cache__Shared_Blobs)
+    expires_at     : Safe_UInt                                                          # When the entry expires (0 = never), entries past it are not returned and are deleted by the TTL sweeper
@@ -0,0 +1,14 @@
+from osbot_utils.type_safe.Type_Safe                                 import Type_Safe
+from osbot_utils.type_safe.primitives.core.Safe_UInt                 import Safe_UInt
+
+
+class Schema__Cache__Hot_Cache__Stats(Type_Safe):                                   # Current state and counters of the in-process hot cache
+    enabled       : bool                                                            # False when max_bytes or max_entries is 0
+    max_bytes     : Safe_UInt                                                       # Upper bound on the size of all cached values
+    max_entries   : Safe_UInt                                                       # Upper bound on the number of cached values
+    total_bytes   : Safe_UInt                                                       # Current size of all cached values
+    total_entries : Safe_UInt                                                       # Current number of cached values
+    hits          : Safe_UInt                                                       # Lookups served from memory
+    misses        : Safe_UInt                                                       # Lookups that had to go to the storage backend
+    evictions     : Safe_UInt                                                       # Values dropped to stay within max_bytes / max_entries
+    invalidations : Safe_UInt                                                       # Values dropped because the entry was stored, updated or deleted
@@ -0,0 +1,9 @@
+from typing                                                          import List
+from osbot_utils.type_safe.Type_Safe                                 import Type_Safe
+
+
+class Schema__Cache__Namespace__Page(Type_Safe):                                    # One page of a namespace's cache hashes (or cache ids)
+    namespace   : str
+    items       : List[str]                                                         # Sorted hashes (or ids) in this page
+    limit       : int                                                               # Max items requested
+    next_cursor : str       = None                                                  # Pass as 'cursor' to get the next page (None when there are no more pages)
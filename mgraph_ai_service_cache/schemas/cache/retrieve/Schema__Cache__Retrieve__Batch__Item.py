@@ -0,0 +1,15 @@
+from typing                                                                                 import Any
+from osbot_utils.type_safe.Type_Safe                                                        import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Cache_Id                          import Cache_Id
+from osbot_utils.type_safe.primitives.domains.cryptography.safe_str.Safe_Str__Cache_Hash    import Safe_Str__Cache_Hash
+from mgraph_ai_service_cache_client.schemas.cache.Schema__Cache__Metadata                   import Schema__Cache__Metadata
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Data_Type              import Enum__Cache__Data_Type
+
+
+class Schema__Cache__Retrieve__Batch__Item(Type_Safe):                                      # Result for one requested cache_id or cache_hash
+    cache_id   : Cache_Id                = None                                             # Requested id (or the latest id of the requested hash)
+    cache_hash : Safe_Str__Cache_Hash    = None                                             # Set when the entry was requested by hash
+    found      : bool
+    data       : Any                     = None                                             # binary data is returned as a base64 string
+    data_type  : Enum__Cache__Data_Type  = None
+    metadata   : Schema__Cache__Metadata = None
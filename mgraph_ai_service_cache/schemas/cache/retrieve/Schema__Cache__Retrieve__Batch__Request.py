@@ -0,0 +1,9 @@
+from typing                                                                                 import List
+from osbot_utils.type_safe.Type_Safe                                                        import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Cache_Id                          import Cache_Id
+from osbot_utils.type_safe.primitives.domains.cryptography.safe_str.Safe_Str__Cache_Hash    import Safe_Str__Cache_Hash
+
+
+class Schema__Cache__Retrieve__Batch__Request(Type_Safe):                                   # Request to retrieve many entries (in one namespace)
+    cache_ids    : List[Cache_Id]                                                           # Entries to retrieve by id
+    cache_hashes : List[Safe_Str__Cache_Hash]                                               # Entries to retrieve by hash (latest version)
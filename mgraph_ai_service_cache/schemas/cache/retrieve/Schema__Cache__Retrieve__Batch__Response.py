@@ -0,0 +1,11 @@
+from typing                                                                                 import List
+from osbot_utils.type_safe.Type_Safe                                                        import Type_Safe
+from osbot_utils.type_safe.primitives.core.Safe_UInt                                        import Safe_UInt
+from mgraph_ai_service_cache.schemas.cache.retrieve.Schema__Cache__Retrieve__Batch__Item   import Schema__Cache__Retrieve__Batch__Item
+
+
+class Schema__Cache__Retrieve__Batch__Response(Type_Safe):                                  # Found / not found result per requested key
+    results         : List[Schema__Cache__Retrieve__Batch__Item]                            # cache_ids first, then cache_hashes (in request order)
+    total_requested : Safe_UInt
+    total_found     : Safe_UInt
+    total_not_found : Safe_UInt
@@ -0,0 +1,27 @@
+from osbot_utils.type_safe.Type_Safe                                 import Type_Safe
+
+
+class Schema__Cache__Namespace__Stats(Type_Safe):                                   # Counters for a namespace (maintained on store/update/delete, persisted to {namespace}/index/stats.json)
+    entries                  : int                                                  # Cache entries (i.e. by-id refs)
+    content_bytes            : int                                                  # Size of the entries' content (one copy per entry)
+    direct_files             : int                                                  # Files under data/direct
+    key_based_files          : int                                                  # Files under data/key-based
+    temporal_files           : int                                                  # Files under data/temporal
+    temporal_latest_files    : int                                                  # Files under data/temporal-latest
+    temporal_versioned_files : int                                                  # Files under data/temporal-versioned
+    refs_hash_files          : int                                                  # Files under refs/by-hash
+    refs_id_files            : int                                                  # Files under refs/by-id
+    data_files               : int                                                  # Child data files (stored in the entries' data folders)
+    reconciled_at            : int                                                  # When the counters were last rebuilt from storage (0 = never)
+    evictions                : int                                                  # Entries evicted to keep the namespace under its quota (kept by the reconciliation)
+
+    def file_counts(self) -> dict:                                                  # Same keys as Cache__Service.get_namespace__file_counts
+        file_counts = dict(direct_files             = self.direct_files             ,
+                           key_based_files          = self.key_based_files          ,
+                           temporal_files           = self.temporal_files           ,
+                           temporal_latest_files    = self.temporal_latest_files    ,
+                           temporal_versioned_files = self.temporal_versioned_files ,
+                           refs_hash_files          = self.refs_hash_files          ,
+                           refs_id_files            = self.refs_id_files            )
+        file_counts['total_files'] = sum(file_counts.values())
+        return file_counts
@@ -0,0 +1,18 @@
+from typing                                                                                     import Union, Dict
+from osbot_utils.type_safe.Type_Safe                                                            import Type_Safe
+from osbot_utils.type_safe.primitives.core.Safe_UInt                                            import Safe_UInt
+from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id                 import Safe_Str__Id
+from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Json__Field_Path   import Safe_Str__Json__Field_Path
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Data_Type                  import Enum__Cache__Data_Type
+from mgraph_ai_service_cache_client.schemas.cache.safe_str.Safe_Str__Cache__File__Cache_Key     import Safe_Str__Cache__File__Cache_Key
+from mgraph_ai_service_cache_client.schemas.cache.safe_str.Safe_Str__Cache__File__File_Id       import Safe_Str__Cache__File__File_Id
+
+
+class Schema__Cache__Store__Batch__Item(Type_Safe):                                             # One item of a batch store request
+    data_type        : Enum__Cache__Data_Type            = None                                 # string, json or binary
+    data             : Union[str, Dict]                  = None                                 # binary items are sent as base64 strings
+    cache_key        : Safe_Str__Cache__File__Cache_Key  = None                                 # Optional semantic cache key
+    file_id          : Safe_Str__Cache__File__File_Id    = None                                 # Optional file ID (defaults to cache_id)
+    json_field_path  : Safe_Str__Json__Field_Path        = None                                 # Optional field used to calculate the hash (json items only)
+    content_encoding : Safe_Str__Id                      = None                                 # Optional encoding (e.g., 'gzip', binary items only)
+    ttl_hours        : Safe_UInt                         = None                                 # Optional per-item TTL (overrides the namespace's TTL, 0 = never expires)
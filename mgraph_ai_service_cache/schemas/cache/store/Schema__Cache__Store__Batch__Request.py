@@ -0,0 +1,7 @@
+from typing                                                                                 import List
+from osbot_utils.type_safe.Type_Safe                                                        import Type_Safe
+from mgraph_ai_service_cache.schemas.cache.store.Schema__Cache__Store__Batch__Item         import Schema__Cache__Store__Batch__Item
+
+
+class Schema__Cache__Store__Batch__Request(Type_Safe):                                      # Request to store many items (in one namespace and strategy)
+    items : List[Schema__Cache__Store__Batch__Item]                                         # Items to store (results are returned in the same order)
@@ -0,0 +1,11 @@
+from typing                                                                                 import List
+from osbot_utils.type_safe.Type_Safe                                                        import Type_Safe
+from osbot_utils.type_safe.primitives.core.Safe_UInt                                        import Safe_UInt
+from mgraph_ai_service_cache.schemas.cache.store.Schema__Cache__Store__Batch__Result       import Schema__Cache__Store__Batch__Result
+
+
+class Schema__Cache__Store__Batch__Response(Type_Safe):                                     # Per-item results of a batch store
+    results      : List[Schema__Cache__Store__Batch__Result]                                # In the same order as the request's items
+    total_items  : Safe_UInt
+    total_stored : Safe_UInt
+    total_failed : Safe_UInt
@@ -0,0 +1,10 @@
+from osbot_utils.type_safe.Type_Safe                                                        import Type_Safe
+from osbot_utils.type_safe.primitives.core.Safe_UInt                                        import Safe_UInt
+from mgraph_ai_service_cache_client.schemas.cache.Schema__Cache__Store__Response            import Schema__Cache__Store__Response
+
+
+class Schema__Cache__Store__Batch__Result(Type_Safe):                                       # Result of storing one item of a batch
+    index    : Safe_UInt                                                                    # Position of the item in the request
+    success  : bool
+    response : Schema__Cache__Store__Response = None                                        # Set when the item was stored
+    error    : str                            = None                                        # Set when the item failed
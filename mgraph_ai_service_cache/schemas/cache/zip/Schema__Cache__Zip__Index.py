@@ -0,0 +1,22 @@
+from typing                                                          import Dict, List, Optional, Tuple
+from osbot_utils.type_safe.Type_Safe                                 import Type_Safe
+
+
+class Schema__Cache__Zip__Index(Type_Safe):                                         # Central directory of a stored zip (persisted as the entry's zip/index.json data file)
+    zip_size : int                                                                  # Size of the zip the index was built from (the offsets are only valid for it)
+    entries  : list                                                                 # [{file_name, header_offset, data_offset, compress_size, file_size, crc, compress_type, content_hash}] in archive order
+
+    def file_list(self) -> List[str]:                                               # Same as zip_bytes__file_list (sorted, duplicated names included)
+        return sorted(entry['file_name'] for entry in self.entries)
+
+    def entry(self, file_name: str) -> Optional[dict]:                              # The member that is read for file_name (the last one, like zipfile, when the name is duplicated)
+        for entry in reversed(self.entries):
+            if entry['file_name'] == str(file_name):
+                return entry
+        return None
+
+    def member_hashes(self) -> List[Tuple[str, Optional[str]]]:                     # (file_name, content hash) in archive order (the hash is None in the indexes saved before it was added)
+        return [(entry['file_name'], entry.get('content_hash')) for entry in self.entries]
+
+    def source_hashes(self) -> Dict[int, str]:                                      # header_offset -> content hash, i.e. the hashes an edit can reuse for the members it copies
+        return {entry['header_offset']: entry['content_hash'] for entry in self.entries if entry.get('content_hash')}
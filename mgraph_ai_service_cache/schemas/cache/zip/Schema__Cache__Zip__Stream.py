@@ -0,0 +1,16 @@
+from typing                                                          import Any
+from osbot_utils.type_safe.Type_Safe                                 import Type_Safe
+
+
+class Schema__Cache__Zip__Stream(Type_Safe):                                        # A zip (or one of its files) to send in chunks, with the byte range that was requested
+    success       : bool
+    error_type    : str  = None                                                     # NOT_FOUND, NOT_BINARY or RANGE_NOT_SATISFIABLE
+    error_message : str  = None
+    size          : int                                                             # full size of the zip (or of the file)
+    start         : int                                                             # first byte sent
+    end           : int                                                             # last byte sent (inclusive, i.e. size - 1 when there was no Range)
+    partial       : bool                                                            # True when a Range was served (206)
+    chunks        : Any  = None                                                     # iterator with the bytes start .. end
+
+    def length(self) -> int:
+        return self.end - self.start + 1 if self.size else 0
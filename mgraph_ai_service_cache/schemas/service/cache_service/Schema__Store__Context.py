@@ -30,6 +30,7 @@ class Schema__Store__Context(Type_Safe):
     namespace         : Safe_Str__Cache__Namespace          = None                              # Namespace for isolation
     storage_data      : Union[str, Dict, bytes]                                                 # Data to be stored (string, dict, or bytes)
     strategy          : Enum__Cache__Store__Strategy        = None                              # Storage strategy to use
+    ttl_hours         : Safe_UInt                           = None                              # Optional per-store TTL (overrides the namespace's TTL, 0 = never expires)
 
 
     # Computed during storage process (now using Type_Safe classes)
@@ -38,4 +39,8 @@ class Schema__Store__Context(Type_Safe):
     all_paths          : Schema__Cache__Store__Paths        = None                              # Paths organized by type
     file_paths         : Schema__Cache__File__Paths                                             # Paths to actual content files and data folders
     timestamp          : Timestamp_Now                      = None                              # When the entry was stored
-    metadata           : Schema__Cache__Store__Metadata     = None
\ No newline at end of file
+    hash_reference_created : bool                                                               # True when this store created the by-hash refs file (i.e. first entry with this hash)
+    metadata           : Schema__Cache__Store__Metadata     = None
+    content_digest     : Safe_Str__Id                       = None                              # sha256 of the content (set when the content file is shared via the content dedup index)
+    shared_blob        : bool                                                                   # True when the content is in the cross-namespace blobs (see Cache__Shared_Blobs)
+    expires_at         : Safe_UInt                                                              # When the entry expires (0 = never)
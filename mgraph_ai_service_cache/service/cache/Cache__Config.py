@@ -5,7 +5,8 @@ from memory_fs.storage_fs.providers.Storage_FS__Sqlite
 from memory_fs.storage_fs.providers.Storage_FS__Zip                                      import Storage_FS__Zip
 from mgraph_ai_service_cache_client.schemas.consts.const__Storage                        import ENV_VAR__CACHE__SERVICE__LOCAL_DISK_PATH, ENV_VAR__CACHE__SERVICE__SQLITE_PATH, ENV_VAR__CACHE__SERVICE__ZIP_PATH, ENV_VAR__CACHE__SERVICE__STORAGE_MODE
 from mgraph_ai_service_cache.service.storage.Storage_FS__S3                              import Storage_FS__S3
-from mgraph_ai_service_cache.utils.for_osbot_utils.Env                                   import get_env_enum
+from mgraph_ai_service_cache.utils.for_osbot_utils.Env                                   import get_env_enum, get_env_primitive
+from typing                                                                              import Dict
 from osbot_utils.type_safe.Type_Safe                                                     import Type_Safe
 from osbot_utils.type_safe.primitives.core.Safe_UInt                                     import Safe_UInt
 from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id          import Safe_Str__Id
@@ -16,6 +17,35 @@ from mgraph_ai_service_cache_client.schemas.consts.const__Fast_API
                                                                                                  DEFAULT__CACHE__SERVICE__BUCKET_NAME,
                                                                                                  DEFAULT__CACHE__SERVICE__DEFAULT_TTL_HOURS)
 
+ENV_VAR__CACHE__SERVICE__HOT_CACHE__MAX_BYTES        = 'CACHE__SERVICE__HOT_CACHE__MAX_BYTES'
+ENV_VAR__CACHE__SERVICE__HOT_CACHE__MAX_ENTRIES      = 'CACHE__SERVICE__HOT_CACHE__MAX_ENTRIES'
+DEFAULT__CACHE__SERVICE__HOT_CACHE__MAX_BYTES        = 0                                    # hot cache is disabled by default (since other instances could have changed the entries)
+DEFAULT__CACHE__SERVICE__HOT_CACHE__MAX_ENTRIES      = 10_000
+ENV_VAR__CACHE__SERVICE__EXISTS_FILTER__CAPACITY     = 'CACHE__SERVICE__EXISTS_FILTER__CAPACITY'
+ENV_VAR__CACHE__SERVICE__EXISTS_FILTER__SINGLE_WRITER = 'CACHE__SERVICE__EXISTS_FILTER__SINGLE_WRITER'
+ENV_VAR__CACHE__SERVICE__NEGATIVE_CACHE__TTL_SECONDS = 'CACHE__SERVICE__NEGATIVE_CACHE__TTL_SECONDS'
+DEFAULT__CACHE__SERVICE__EXISTS_FILTER__CAPACITY     = 0                                    # Bloom filters are disabled by default (other instances' stores are not seen by this instance's filter)
+DEFAULT__CACHE__SERVICE__NEGATIVE_CACHE__TTL_SECONDS = 0
+ENV_VAR__CACHE__SERVICE__NAMESPACE_STATS__RECONCILE_SECONDS = 'CACHE__SERVICE__NAMESPACE_STATS__RECONCILE_SECONDS'
+DEFAULT__CACHE__SERVICE__NAMESPACE_STATS__RECONCILE_SECONDS = 0                             # background reconciliation of the namespace stats is disabled by default
+ENV_VAR__CACHE__SERVICE__REFS_WRITE_BEHIND_MS               = 'CACHE__SERVICE__REFS_WRITE_BEHIND_MS'
+DEFAULT__CACHE__SERVICE__REFS_WRITE_BEHIND_MS               = 0                             # refs are written on the store path by default (i.e. write-behind is disabled)
+ENV_VAR__CACHE__SERVICE__LEAN_DATA_FILES                    = 'CACHE__SERVICE__LEAN_DATA_FILES'
+ENV_VAR__CACHE__SERVICE__CONTENT_DEDUP                      = 'CACHE__SERVICE__CONTENT_DEDUP'
+ENV_VAR__CACHE__SERVICE__SHARED_BLOBS__MIN_BYTES            = 'CACHE__SERVICE__SHARED_BLOBS__MIN_BYTES'
+DEFAULT__CACHE__SERVICE__SHARED_BLOBS__MIN_BYTES            = 0                             # the cross-namespace blob store is disabled by default
+ENV_VAR__CACHE__SERVICE__TTL_ENABLED                        = 'CACHE__SERVICE__TTL_ENABLED'
+ENV_VAR__CACHE__SERVICE__NAMESPACE_TTL_HOURS                = 'CACHE__SERVICE__NAMESPACE_TTL_HOURS'     # i.e. 'namespace-1=12,namespace-2=0' (0 = never expires)
+ENV_VAR__CACHE__SERVICE__TTL_SWEEP_SECONDS                  = 'CACHE__SERVICE__TTL_SWEEP_SECONDS'
+DEFAULT__CACHE__SERVICE__TTL_SWEEP_SECONDS                  = 0                             # the background sweep of the expired entries is disabled by default
+ENV_VAR__CACHE__SERVICE__NAMESPACE_MAX_ENTRIES              = 'CACHE__SERVICE__NAMESPACE_MAX_ENTRIES'   # i.e. 'namespace-1=10000,namespace-2=500'
+ENV_VAR__CACHE__SERVICE__NAMESPACE_MAX_BYTES                = 'CACHE__SERVICE__NAMESPACE_MAX_BYTES'     # i.e. 'namespace-1=1073741824'
+ENV_VAR__CACHE__SERVICE__EVICTION_POLICY                    = 'CACHE__SERVICE__EVICTION_POLICY'
+DEFAULT__CACHE__SERVICE__EVICTION_POLICY                    = 'lru'                         # 'lru' or 'lfu' (used by the namespaces with a quota)
+ENV_VAR__CACHE__SERVICE__ACCESS__SAMPLE_RATE                = 'CACHE__SERVICE__ACCESS__SAMPLE_RATE'
+ENV_VAR__CACHE__SERVICE__ACCESS__FLUSH_SECONDS              = 'CACHE__SERVICE__ACCESS__FLUSH_SECONDS'
+DEFAULT__CACHE__SERVICE__ACCESS__SAMPLE_RATE                = 1                             # every read is counted (in memory)
+DEFAULT__CACHE__SERVICE__ACCESS__FLUSH_SECONDS              = 0                             # the access counters are only saved by an explicit flush by default
 
 # todo: refactor all the parms below to an Schema__Cache__Config
 class Cache__Config(Type_Safe):                                                             # Configuration for cache service
@@ -25,6 +55,24 @@ class Cache__Config(Type_Safe):
     local_disk_path   : str                           = None                                # Path for local disk storage
     sqlite_path       : str                           = None                                # Path for SQLite storage
     zip_path          : str                           = None                                # Path for ZIP storage
+    hot_cache_max_bytes   : Safe_UInt                 = None                                # Max bytes held by the in-process hot cache (0 = disabled)
+    hot_cache_max_entries : Safe_UInt                 = None                                # Max entries held by the in-process hot cache
+    exists_filter_capacity     : Safe_UInt            = None                                # Hashes each namespace's Bloom filter is sized for (0 = disabled)
+    exists_filter_single_writer: bool                 = None                                # Only one instance stores (required by the Bloom filters, since they don't see other instances' stores)
+    negative_cache_ttl_seconds : Safe_UInt            = None                                # How long 'hash not found' results are remembered (0 = disabled)
+    namespace_stats_reconcile_seconds : Safe_UInt     = None                                # Interval of the background rebuild of the namespace stats from storage (0 = disabled)
+    refs_write_behind_ms              : Safe_UInt     = None                                # Interval of the background flush of queued refs writes (0 = refs are written on the store path)
+    lean_data_files                   : bool          = None                                # Store only the content files (no .config / .metadata sidecars, the store metadata is in the by-id refs)
+    content_dedup                     : bool          = None                                # Direct strategy stores of the same content share one content file (refcounted by the refs/by-content index)
+    shared_blobs_min_bytes            : Safe_UInt     = None                                # Binary direct strategy stores of at least this size go to the cross-namespace _blobs store (0 = disabled)
+    ttl_enabled                       : bool          = None                                # Entries expire default_ttl_hours after being stored (disabled by default, so that existing deployments keep their entries)
+    namespace_ttl_hours               : Dict[str, int]                                      # Per-namespace TTL overrides (these namespaces' entries expire even when ttl_enabled is False, 0 = never)
+    ttl_sweep_seconds                 : Safe_UInt     = None                                # Interval of the background sweep that deletes the expired entries (0 = disabled, expired entries are still not returned)
+    namespace_max_entries             : Dict[str, int]                                      # Per-namespace entry quotas (the namespaces without one are unbounded)
+    namespace_max_bytes               : Dict[str, int]                                      # Per-namespace content bytes quotas
+    eviction_policy                   : str           = None                                # Which entries are evicted when a namespace is over its quota ('lru' or 'lfu')
+    access_sample_rate                : Safe_UInt     = None                                # One in this many reads is recorded by the access tracker (with its hits scaled up)
+    access_flush_seconds              : Safe_UInt     = None                                # Interval of the background flush of the access counters to the namespaces' access segments (0 = disabled)
 
     # todo: see if we can move this __init__ actions to a setup() class since it is never good to have any changes done on __init__
     def __init__(self, **kwargs):
@@ -61,6 +109,63 @@ class Cache__Config(Type_Safe):
             self.default_ttl_hours = get_env(ENV_VAR__CACHE__SERVICE__DEFAULT_TTL_HOURS,
                                              DEFAULT__CACHE__SERVICE__DEFAULT_TTL_HOURS)
 
+        if self.hot_cache_max_bytes is None:                                                # Configure in-process hot cache (applies to all modes)
+            self.hot_cache_max_bytes = get_env_primitive(ENV_VAR__CACHE__SERVICE__HOT_CACHE__MAX_BYTES, Safe_UInt,
+                                                         Safe_UInt(DEFAULT__CACHE__SERVICE__HOT_CACHE__MAX_BYTES))
+        if self.hot_cache_max_entries is None:
+            self.hot_cache_max_entries = get_env_primitive(ENV_VAR__CACHE__SERVICE__HOT_CACHE__MAX_ENTRIES, Safe_UInt,
+                                                           Safe_UInt(DEFAULT__CACHE__SERVICE__HOT_CACHE__MAX_ENTRIES))
+
+        if self.exists_filter_capacity is None:                                             # Configure exists-by-hash Bloom filters and negative cache (applies to all modes)
+            self.exists_filter_capacity = get_env_primitive(ENV_VAR__CACHE__SERVICE__EXISTS_FILTER__CAPACITY, Safe_UInt,
+                                                            Safe_UInt(DEFAULT__CACHE__SERVICE__EXISTS_FILTER__CAPACITY))
+        if self.exists_filter_single_writer is None:                                        # without it, the Bloom filters are not used (even with a capacity)
+            self.exists_filter_single_writer = str(get_env(ENV_VAR__CACHE__SERVICE__EXISTS_FILTER__SINGLE_WRITER, '')).lower() in ('1', 'true', 'yes')
+        if self.negative_cache_ttl_seconds is None:
+            self.negative_cache_ttl_seconds = get_env_primitive(ENV_VAR__CACHE__SERVICE__NEGATIVE_CACHE__TTL_SECONDS, Safe_UInt,
+                                                                Safe_UInt(DEFAULT__CACHE__SERVICE__NEGATIVE_CACHE__TTL_SECONDS))
+
+        if self.namespace_stats_reconcile_seconds is None:                                  # Configure background reconciliation of the namespace stats (applies to all modes)
+            self.namespace_stats_reconcile_seconds = get_env_primitive(ENV_VAR__CACHE__SERVICE__NAMESPACE_STATS__RECONCILE_SECONDS, Safe_UInt,
+                                                                       Safe_UInt(DEFAULT__CACHE__SERVICE__NAMESPACE_STATS__RECONCILE_SECONDS))
+
+        if self.refs_write_behind_ms is None:                                               # Configure write-behind of the refs files (applies to all modes)
+            self.refs_write_behind_ms = get_env_primitive(ENV_VAR__CACHE__SERVICE__REFS_WRITE_BEHIND_MS, Safe_UInt,
+                                                          Safe_UInt(DEFAULT__CACHE__SERVICE__REFS_WRITE_BEHIND_MS))
+
+        if self.lean_data_files is None:                                                    # Configure the lean data files profile (applies to all modes, disabled by default)
+            self.lean_data_files = str(get_env(ENV_VAR__CACHE__SERVICE__LEAN_DATA_FILES, '')).lower() in ('1', 'true', 'yes')
+
+        if self.content_dedup is None:                                                      # Configure the content dedup of the direct strategy (applies to all modes, disabled by default)
+            self.content_dedup = str(get_env(ENV_VAR__CACHE__SERVICE__CONTENT_DEDUP, '')).lower() in ('1', 'true', 'yes')
+
+        if self.shared_blobs_min_bytes is None:                                             # Configure the cross-namespace blob store (applies to all modes)
+            self.shared_blobs_min_bytes = get_env_primitive(ENV_VAR__CACHE__SERVICE__SHARED_BLOBS__MIN_BYTES, Safe_UInt,
+                                                            Safe_UInt(DEFAULT__CACHE__SERVICE__SHARED_BLOBS__MIN_BYTES))
+
+        if self.ttl_enabled is None:                                                        # Configure TTL expiry (applies to all modes, disabled by default)
+            self.ttl_enabled = str(get_env(ENV_VAR__CACHE__SERVICE__TTL_ENABLED, '')).lower() in ('1', 'true', 'yes')
+        if not self.namespace_ttl_hours:
+            self.namespace_ttl_hours = self.parse_namespace_ttl_hours(get_env(ENV_VAR__CACHE__SERVICE__NAMESPACE_TTL_HOURS, ''))
+        if self.ttl_sweep_seconds is None:
+            self.ttl_sweep_seconds = get_env_primitive(ENV_VAR__CACHE__SERVICE__TTL_SWEEP_SECONDS, Safe_UInt,
+                                                       Safe_UInt(DEFAULT__CACHE__SERVICE__TTL_SWEEP_SECONDS))
+
+        if not self.namespace_max_entries:                                                  # Configure the size-bounded namespaces (applies to all modes)
+            self.namespace_max_entries = self.parse_namespace_values(get_env(ENV_VAR__CACHE__SERVICE__NAMESPACE_MAX_ENTRIES, ''))
+        if not self.namespace_max_bytes:
+            self.namespace_max_bytes = self.parse_namespace_values(get_env(ENV_VAR__CACHE__SERVICE__NAMESPACE_MAX_BYTES, ''))
+        if self.eviction_policy is None:
+            eviction_policy      = str(get_env(ENV_VAR__CACHE__SERVICE__EVICTION_POLICY, '')).lower()
+            self.eviction_policy = eviction_policy if eviction_policy in ('lru', 'lfu') else DEFAULT__CACHE__SERVICE__EVICTION_POLICY
+
+        if self.access_sample_rate is None:                                                 # Configure the access tracking (applies to all modes)
+            self.access_sample_rate = get_env_primitive(ENV_VAR__CACHE__SERVICE__ACCESS__SAMPLE_RATE, Safe_UInt,
+                                                        Safe_UInt(DEFAULT__CACHE__SERVICE__ACCESS__SAMPLE_RATE))
+        if self.access_flush_seconds is None:
+            self.access_flush_seconds = get_env_primitive(ENV_VAR__CACHE__SERVICE__ACCESS__FLUSH_SECONDS, Safe_UInt,
+                                                          Safe_UInt(DEFAULT__CACHE__SERVICE__ACCESS__FLUSH_SECONDS))
+
         if self.storage_mode == Enum__Cache__Storage_Mode.S3:                               # Mode-specific configuration
             if self.default_bucket is None:
                 self.default_bucket = get_env(ENV_VAR__CACHE__SERVICE__BUCKET_NAME,
@@ -78,6 +183,31 @@ class Cache__Config(Type_Safe):
             if self.zip_path is None:
                 self.zip_path = get_env(ENV_VAR__CACHE__SERVICE__ZIP_PATH, '/tmp/cache.zip')                        # todo: refactor this value into a static config variable
 
+    def parse_namespace_ttl_hours(self, value: str) -> Dict[str, int]:                     # 'namespace-1=12,namespace-2=0' -> {'namespace-1': 12, 'namespace-2': 0} (invalid items are ignored)
+        return self.parse_namespace_values(value)
+
+    def parse_namespace_values(self, value: str) -> Dict[str, int]:                        # 'namespace-1=10,namespace-2=0' -> {'namespace-1': 10, 'namespace-2': 0} (invalid items are ignored)
+        namespace_values = {}
+        for item in str(value or '').split(','):
+            namespace, _, namespace_value = item.partition('=')
+            if namespace.strip() and namespace_value.strip().isdigit():
+                namespace_values[namespace.strip()] = int(namespace_value.strip())
+        return namespace_values
+
+    def ttl_enabled_for(self, namespace: str) -> bool:                                      # TTL expiry applies to the namespace (globally enabled, or with a namespace override)
+        return bool(self.ttl_enabled) or str(namespace) in self.namespace_ttl_hours
+
+    def ttl_hours_for(self, namespace: str) -> int:                                         # The namespace's TTL (its override, or default_ttl_hours)
+        if str(namespace) in self.namespace_ttl_hours:
+            return int(self.namespace_ttl_hours[str(namespace)])
+        return int(self.default_ttl_hours or 0)
+
+    def max_entries_for(self, namespace: str) -> int:                                       # The namespace's entry quota (0 = unbounded)
+        return int(self.namespace_max_entries.get(str(namespace)) or 0)
+
+    def max_bytes_for(self, namespace: str) -> int:                                         # The namespace's content bytes quota (0 = unbounded)
+        return int(self.namespace_max_bytes.get(str(namespace)) or 0)
+
     def create_storage_backend(self) -> Storage_FS:                                                                 # Create the appropriate storage backend
         if self.storage_mode == Enum__Cache__Storage_Mode.MEMORY:
             return Storage_FS__Memory()
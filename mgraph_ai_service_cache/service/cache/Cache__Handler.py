@@ -1,13 +1,20 @@
+from typing                                                                             import Any
 from memory_fs.Memory_FS                                                                import Memory_FS
 from memory_fs.helpers.Memory_FS__Temporal                                              import Memory_FS__Temporal
 from memory_fs.helpers.Memory_FS__Latest_Temporal                                       import Memory_FS__Latest_Temporal
 from memory_fs.path_handlers.Path__Handler__Hash_Sharded                                import Path__Handler__Hash_Sharded
 from memory_fs.path_handlers.Path__Handler__Key_Based                                   import Path__Handler__Key_Based
 from memory_fs.storage_fs.Storage_FS                                                    import Storage_FS
+from osbot_utils.decorators.methods.cache_on_self                                       import cache_on_self
 from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
 from osbot_utils.type_safe.primitives.domains.files.safe_str.Safe_Str__File__Path       import Safe_Str__File__Path
 from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy    import Enum__Cache__Store__Strategy
 from osbot_utils.utils.Http                                                             import url_join_safe
+from mgraph_ai_service_cache.service.cache.refs.Cache__Hash__Refs__History             import Cache__Hash__Refs__History
+from mgraph_ai_service_cache.service.cache.dedup.Cache__Content__Dedup                 import Cache__Content__Dedup
+from mgraph_ai_service_cache.service.cache.dedup.Cache__Shared_Blobs                   import Cache__Shared_Blobs
+from mgraph_ai_service_cache.service.storage.Storage_FS__Compare_And_Swap               import Storage_FS__Compare_And_Swap
+from mgraph_ai_service_cache.service.cache.ttl.Cache__TTL__Expiry_Index                import Cache__TTL__Expiry_Index
 
 # Constants for all prefix paths
 CACHE__HANDLER__PREFIX_PATH__FS__REFS_ID                            = 'refs/by-id'
@@ -26,6 +33,14 @@ class Cache__Handler(Type_Safe):
     storage_backend         : Storage_FS                  = None                                        # Storage backend instance (from Cache__Config)
     namespace               : str                         = ""                                          # Namespace prefix for isolation
     cache_ttl_hours         : int                         = 24
+    ttl_enabled             : bool                        = False                                       # Entries expire cache_ttl_hours after being stored (a per-store TTL is always applied)
+    lean_data_files         : bool                        = False                                       # Store only the content files (no Memory_FS .config / .metadata sidecars)
+    content_dedup           : bool                        = False                                       # Direct strategy stores of the same content share one content file
+    shared_blobs            : Cache__Shared_Blobs         = None                                        # Cross-namespace blob store (shared by all handlers)
+    shared_blobs_min_bytes  : int                         = 0                                           # Binary direct stores of at least this size go to the shared blobs (0 = disabled)
+    max_entries             : int                         = 0                                           # Entry quota (0 = unbounded, entries over it are evicted)
+    max_bytes               : int                         = 0                                           # Content bytes quota (0 = unbounded)
+    eviction_policy         : str                         = 'lru'                                       # Which entries are evicted first ('lru' or 'lfu')
 
     # All Memory_FS instances for different strategies
     fs__data_direct             : Memory_FS                   = None                                    # Direct to hash location
@@ -99,6 +114,49 @@ class Cache__Handler(Type_Safe):
 
         return self
 
+    @cache_on_self
+    def hash_refs_history(self) -> Cache__Hash__Refs__History:                                         # Older by-hash versions (so that the by-hash refs files stay bounded)
+        return Cache__Hash__Refs__History(storage_fs=self.storage_backend, namespace=self.namespace)
+
+    @cache_on_self
+    def refs_compare_and_swap(self) -> Storage_FS__Compare_And_Swap:                                    # Concurrency-safe updates of the refs files (shared by all stores in this namespace)
+        return Storage_FS__Compare_And_Swap(storage_fs=self.storage_backend).setup()
+
+    @cache_on_self
+    def content_dedup_index(self) -> Cache__Content__Dedup:                                             # Content digest -> shared content files (and the cache_ids using them)
+        return Cache__Content__Dedup(refs_cas=self.refs_compare_and_swap(), namespace=self.namespace)
+
+    @cache_on_self
+    def expiry_index(self) -> Cache__TTL__Expiry_Index:                                                 # Time-bucketed index of the entries with a TTL (used by the TTL sweeper)
+        return Cache__TTL__Expiry_Index(storage_fs=self.storage_backend, namespace=self.namespace)
+
+    def expires_at(self, stored_at : int      ,
+                         ttl_hours : int = None
+                    ) -> int:                                                                           # When an entry stored at stored_at expires (0 = never)
+        if ttl_hours is None:
+            if not self.ttl_enabled:
+                return 0
+            ttl_hours = self.cache_ttl_hours
+        if int(ttl_hours) <= 0:
+            return 0
+        return int(stored_at) + int(ttl_hours) * 3_600_000
+
+    def use_shared_blob(self, content : Any) -> bool:                                                   # Large binary content goes to the cross-namespace blobs
+        return (self.shared_blobs is not None and self.shared_blobs_min_bytes > 0 and
+                isinstance(content, bytes)    and len(content) >= self.shared_blobs_min_bytes)
+
+    def content_dedup_index__for(self, shared_blob: bool) -> Cache__Content__Dedup:                    # Index of an entry's shared content
+        if shared_blob:
+            return self.shared_blobs
+        return self.content_dedup_index()
+
+    def content_dedup_ref(self, cache_id   : str ,
+                                shared_blob: bool
+                           ) -> str:                                                                    # How the entry is listed in that index
+        if shared_blob:
+            return self.shared_blobs.entry_ref(self.namespace, cache_id)
+        return str(cache_id)
+
     def get_fs_for_strategy(self, strategy: Enum__Cache__Store__Strategy
                              ) -> Memory_FS:                                                                         # Return appropriate Memory_FS for strategy
         if strategy == "direct":
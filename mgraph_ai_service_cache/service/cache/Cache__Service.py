@@ -1,6 +1,6 @@
 import gzip
 import json
-from typing                                                                                      import Dict, Optional, Any, List, Union
+from typing                                                                                      import Dict, Optional, Any, Iterator, List, Union
 from mgraph_ai_service_cache_client.schemas.cache.file.Schema__Cache__File__Metadata             import Schema__Cache__File__Metadata
 from mgraph_ai_service_cache_client.schemas.cache.safe_str.Safe_Str__Cache__File__Cache_Hash     import Safe_Str__Cache__File__Cache_Hash
 from mgraph_ai_service_cache_client.schemas.cache.safe_str.Safe_Str__Cache__File__Cache_Key      import Safe_Str__Cache__File__Cache_Key
@@ -11,22 +11,46 @@ from osbot_utils.helpers.cache.schemas.Schema__Cache__Hash__Config
 from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                            import Random_Guid
 from osbot_utils.type_safe.type_safe_core.decorators.type_safe                                   import type_safe
 from memory_fs.schemas.Schema__Memory_FS__File__Config                                           import Schema__Memory_FS__File__Config
+from memory_fs.storage_fs.Storage_FS                                                             import Storage_FS
 from osbot_utils.decorators.methods.cache_on_self                                                import cache_on_self
 from osbot_utils.type_safe.Type_Safe                                                             import Type_Safe
+from osbot_utils.type_safe.primitives.core.Safe_UInt                                             import Safe_UInt
 from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id                  import Safe_Str__Id
 from osbot_utils.utils.Files                                                                     import file_extension, file_name_without_extension
 from osbot_utils.type_safe.primitives.domains.identifiers.Cache_Id                               import Cache_Id
 from osbot_utils.utils.Http                                                                      import url_join_safe
+from osbot_utils.utils.Json                                                                      import bytes_to_json
+from osbot_utils.utils.Misc                                                                      import timestamp_now
 from osbot_utils.type_safe.primitives.domains.cryptography.safe_str.Safe_Str__Cache_Hash         import Safe_Str__Cache_Hash
 from mgraph_ai_service_cache.schemas.service.cache_service.Schema__Store__Context                import Schema__Store__Context       # todo: review this schema since it is not currently stored in the client project
 from mgraph_ai_service_cache_client.schemas.cache.file.Schema__Cache__File__Refs                 import Schema__Cache__File__Refs
+from mgraph_ai_service_cache.schemas.cache.file.Schema__Cache__File__Refs__Extended              import Schema__Cache__File__Refs__Extended
 from mgraph_ai_service_cache_client.schemas.cache.consts__Cache_Service                          import DEFAULT_CACHE__NAMESPACE
 from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy             import Enum__Cache__Store__Strategy
 from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Json__Field_Path    import Safe_Str__Json__Field_Path
 from mgraph_ai_service_cache.service.cache.Cache__Config                                         import Cache__Config
-from mgraph_ai_service_cache.service.cache.Cache__Handler                                        import Cache__Handler
+from mgraph_ai_service_cache.service.cache.Cache__Handler                                        import (Cache__Handler                                          ,
+                                                                                                         CACHE__HANDLER__PREFIX_PATH__FS__REFS_ID                ,
+                                                                                                         CACHE__HANDLER__PREFIX_PATH__FS__REFS_HASH              ,
+                                                                                                         CACHE__HANDLER__PREFIX_PATH__FS__DATA_DIRECT            ,
+                                                                                                         CACHE__HANDLER__PREFIX_PATH__FS__DATA_KEY_BASED         ,
+                                                                                                         CACHE__HANDLER__PREFIX_PATH__FS__DATA_TEMPORAL          ,
+                                                                                                         CACHE__HANDLER__PREFIX_PATH__FS__DATA_TEMPORAL_LATEST   ,
+                                                                                                         CACHE__HANDLER__PREFIX_PATH__FS__DATA_TEMPORAL_VERSIONED)
+from mgraph_ai_service_cache.service.storage.Storage_FS__Listing                                 import Storage_FS__Listing
+from mgraph_ai_service_cache.schemas.cache.namespace.Schema__Cache__Namespace__Page              import Schema__Cache__Namespace__Page
+from mgraph_ai_service_cache.service.cache.hot_cache.Cache__Hot_Cache                            import Cache__Hot_Cache
+from mgraph_ai_service_cache.service.cache.exists.Cache__Exists__Filter                          import Cache__Exists__Filter
+from mgraph_ai_service_cache.service.cache.stats.Cache__Namespace__Stats                         import Cache__Namespace__Stats
+from mgraph_ai_service_cache.schemas.cache.stats.Schema__Cache__Namespace__Stats                 import Schema__Cache__Namespace__Stats
 from mgraph_ai_service_cache_client.schemas.cache.Schema__Cache__Store__Response                 import Schema__Cache__Store__Response
 from mgraph_ai_service_cache.service.cache.store.Cache__Service__Store__With_Strategy            import Cache__Service__Store__With_Strategy
+from mgraph_ai_service_cache.service.cache.refs.Cache__Refs__Write_Behind                        import Cache__Refs__Write_Behind
+from mgraph_ai_service_cache.service.cache.dedup.Cache__Shared_Blobs                             import Cache__Shared_Blobs, CACHE__SHARED_BLOBS__PREFIX_PATH
+from mgraph_ai_service_cache.service.storage.Storage_FS__Compare_And_Swap                         import Storage_FS__Compare_And_Swap
+from mgraph_ai_service_cache.service.cache.ttl.Cache__TTL__Sweeper                               import Cache__TTL__Sweeper
+from mgraph_ai_service_cache.service.cache.access.Cache__Access__Tracker                         import Cache__Access__Tracker
+from mgraph_ai_service_cache.service.cache.eviction.Cache__Namespace__Eviction                   import Cache__Namespace__Eviction
 
 # todo: review this usage, taking into account the actual Cache__Service__Fast_API
 class Cache__Service(Type_Safe):                                                    # Main cache service orchestrator
@@ -44,12 +68,102 @@ class Cache__Service(Type_Safe):
     def storage_fs(self):                                                           # Return storage backend for direct operations
         return self.storage_backend()                                               # This is used for admin operations that need direct storage access
 
+    @cache_on_self
+    def hot_cache(self) -> Cache__Hot_Cache:                                        # In-process LRU for hot refs files and content bytes
+        return Cache__Hot_Cache(max_bytes   = self.cache_config.hot_cache_max_bytes  ,
+                                max_entries = self.cache_config.hot_cache_max_entries).setup()
+
+    @cache_on_self
+    def exists_filter(self) -> Cache__Exists__Filter:                               # Per-namespace Bloom filters and negative cache for exists-by-hash checks
+        return Cache__Exists__Filter(storage_fs           = self.storage_backend()                       ,
+                                     capacity             = self.cache_config.exists_filter_capacity     ,
+                                     single_writer        = bool(self.cache_config.exists_filter_single_writer),
+                                     negative_ttl_seconds = self.cache_config.negative_cache_ttl_seconds ).setup()
+
+    @cache_on_self
+    def namespace_stats(self) -> Cache__Namespace__Stats:                           # Per-namespace counters (entries, bytes, files) maintained on store/update/delete
+        namespace_stats = Cache__Namespace__Stats(storage_fs        = self.storage_backend()                              ,
+                                                  reconcile_seconds = self.cache_config.namespace_stats_reconcile_seconds ).setup()
+        namespace_stats.start_reconciler(lambda: list(self.cache_handlers.values()))                      # no-op when the reconciliation interval is 0
+        return namespace_stats
+
+    @cache_on_self
+    def refs_write_behind(self) -> Cache__Refs__Write_Behind:                       # Queue of refs writes saved in batches by a background flush (when refs_write_behind_ms > 0)
+        refs_write_behind = Cache__Refs__Write_Behind(flush_ms                  = self.cache_config.refs_write_behind_ms                                   ,
+                                                      on_hash_reference_created = lambda namespace, files: self.namespace_stats().change(namespace, refs_hash_files=files)).setup()
+        refs_write_behind.start()                                                   # no-op when write-behind is disabled
+        return refs_write_behind
+
+    @cache_on_self
+    def shared_blobs(self) -> Cache__Shared_Blobs:                                  # Cross-namespace content-addressed blob store (used when shared_blobs_min_bytes > 0)
+        return Cache__Shared_Blobs(refs_cas=Storage_FS__Compare_And_Swap(storage_fs=self.storage_backend()).setup())
+
+    @cache_on_self
+    def ttl_sweeper(self) -> Cache__TTL__Sweeper:                                   # Deletes the expired entries (in a background thread when ttl_sweep_seconds > 0)
+        ttl_sweeper = Cache__TTL__Sweeper(refs_data     = self.retrieve_by_id__refs_data                ,
+                                          delete_by_id  = self.delete_by_id                             ,
+                                          sweep_seconds = int(self.cache_config.ttl_sweep_seconds or 0) )
+        ttl_sweeper.start(self.namespaces__handlers)                                                    # no-op when the sweep interval is 0
+        return ttl_sweeper
+
+    @cache_on_self
+    def access_tracker(self) -> Cache__Access__Tracker:                             # Last-access time and hit counts of the entries (recorded in memory, flushed to the namespaces' access segments)
+        access_tracker = Cache__Access__Tracker(storage_fs    = self.storage_backend()                                 ,
+                                                sample_rate   = max(1, int(self.cache_config.access_sample_rate or 1)) ,
+                                                flush_seconds = int(self.cache_config.access_flush_seconds or 0)       ).setup()
+        access_tracker.start()                                                                          # no-op when the flush interval is 0
+        return access_tracker
+
+    def flush_access(self) -> int:                                                  # Save the access counters recorded since the last flush (one segment per namespace)
+        return self.access_tracker().flush()
+
+    def get_namespace__popularity(self, namespace : Safe_Str__Id = None,
+                                        limit     : int          = 10
+                                   ) -> List[Dict[str, int]]:                       # The namespace's most read entries (from the access segments of all instances)
+        namespace = namespace or Safe_Str__Id("default")
+        return self.access_tracker().popularity(namespace, limit)
+
+    @cache_on_self
+    def namespace_eviction(self) -> Cache__Namespace__Eviction:                     # Keeps the namespaces with a quota under it (evicting via delete_by_id)
+        return Cache__Namespace__Eviction(access_tracker  = self.access_tracker()           ,
+                                          namespace_stats = self.namespace_stats()          ,
+                                          delete_by_id    = self.delete_by_id               ,
+                                          refs_data       = self.retrieve_by_id__refs_data  ,
+                                          file_ids        = self.iter_namespace__file_ids   ).setup()
+
+    def sweep_expired(self, namespace: Safe_Str__Id = None) -> Dict[str, Any]:      # Delete the expired entries of one (or all the stored) namespaces now
+        if namespace:
+            handlers = [self.get_or_create_handler(namespace)]
+        else:
+            handlers = self.namespaces__handlers()
+        return self.ttl_sweeper().sweep(handlers)
+
+    def namespaces(self) -> List[str]:                                              # The namespaces in storage (i.e. also the ones not used by this process)
+        folders = self.storage_fs().folder__folders(parent_folder='/', return_full_path=False)          # the namespaces are the root folders
+        return [folder for folder in folders if folder != CACHE__SHARED_BLOBS__PREFIX_PATH]
+
+    def namespaces__handlers(self) -> List[Cache__Handler]:                         # The handlers of all the namespaces in storage
+        return [self.get_or_create_handler(Safe_Str__Id(namespace)) for namespace in self.namespaces()]
+
+    def is_expired(self, ref_data: Dict[str, Any]) -> bool:                         # Entries past their expires_at are not returned (even before the sweeper deletes them)
+        expires_at = (ref_data or {}).get("expires_at") or 0
+        return 0 < expires_at <= timestamp_now()
+
+    def flush_refs(self) -> int:                                                    # Save the queued refs writes (call before the process is frozen or stopped)
+        return self.refs_write_behind().flush()
+
+    def flush(self) -> Dict[str, int]:                                              # Save everything that is only in memory (call before the process is frozen or stopped)
+        return dict(refs            = self.flush_refs()                          ,
+                    exists_filter   = self.exists_filter().flush()               ,
+                    namespace_stats = len(self.namespace_stats().save_all())     )
+
     # todo: this logic is starting to be quite complex to be in a method, I think we can refactor this logic into a separate class and have methods for
     #       each logic step/action
     # todo: refactor to add type safe return type
     def delete_by_id(self, cache_id: Cache_Id, namespace: Safe_Str__Id = None) -> Dict[str, Any]:
         namespace = namespace or Safe_Str__Id("default")
         handler   = self.get_or_create_handler(namespace)
+        self.refs_write_behind().flush_entry(namespace, cache_id)                                   # the entry's refs could still be queued (write-behind)
 
         with handler.fs__refs_id.file__json__single(Safe_Str__Id(str(cache_id))) as ref_fs:
             if not ref_fs.exists():
@@ -60,11 +174,18 @@ class Cache__Service(Type_Safe):
             cache_hash   = id_ref_data.get("cache_hash")
             strategy     = id_ref_data.get("strategy")
 
+        data_paths  = all_paths.get("data", [])
+        shared_blob = bool(id_ref_data.get("shared_blob"))
+        if id_ref_data.get("content_digest"):                                                       # shared content (content dedup), only deleted with its last cache_id
+            data_paths = handler.content_dedup_index__for(shared_blob).release(id_ref_data.get("content_digest")             ,
+                                                                               handler.content_dedup_ref(cache_id, shared_blob))
+
         deleted_paths = []                                                                          # Track deletion results
         failed_paths  = []
+        deleted_refs_hash = 0
 
         fs_data = handler.get_fs_for_strategy(strategy)                                             # Delete data files first (use the appropriate fs based on strategy)
-        for path in all_paths.get("data", []):
+        for path in data_paths:
             try:
                 if fs_data.storage_fs.file__delete(path):
                     deleted_paths.append(path)
@@ -72,28 +193,49 @@ class Cache__Service(Type_Safe):
                     failed_paths.append(path)
             except Exception as e:
                 failed_paths.append(f"{path}: {str(e)}")
+        deleted_data = len(deleted_paths)
+        counted_data = 0 if shared_blob else deleted_data                                           # the shared blobs are not in the namespace's stats
 
         if cache_hash:                                                                              # Update hash reference (remove this cache_id from the list)
             with handler.fs__refs_hash.file__json__single(Safe_Str__Id(cache_hash)) as ref_fs:
-                if ref_fs.exists():
-                    refs                   = ref_fs.content()
-                    refs["cache_ids"]      = [entry for entry in refs["cache_ids"]                  # Remove this cache_id from the list
-                                              if entry["cache_id"] != str(cache_id)]
+                refs_history     = handler.hash_refs_history()
+                restored_segment = []
+                archived_removed = []
+
+                def remove_entry(refs):                                                             # compare-and-swap (called again when a concurrent store changed the refs)
+                    if not refs:
+                        return None
+                    cache_ids = [entry for entry in refs["cache_ids"]                               # Remove this cache_id from the list
+                                 if entry["cache_id"] != str(cache_id)]
+                    archived_removed[:]     = [len(cache_ids) == len(refs["cache_ids"])]           # not inline, so it is in one of the history segments (removed once the refs were saved)
+                    refs["cache_ids"]       = cache_ids
                     refs["total_versions"] -= 1
-
+                    restored_segment.clear()
                     if refs["total_versions"] > 0:
+                        restored_segment.append(refs_history.restore(refs))                         # bring back the newest archived versions (if all inline ones were deleted)
+                        refs["cache_ids"] = [entry for entry in refs["cache_ids"]                   # the segment is only updated after the save, so it can still have this cache_id
+                                             if entry["cache_id"] != str(cache_id)]
                         if refs["latest_id"] == str(cache_id) and refs["cache_ids"]:                # Update the latest_id if needed
                             refs["latest_id"] = refs["cache_ids"][-1]["cache_id"]
-                        ref_fs.update(file_data=refs)
-                    else:
-                        for path in all_paths.get("by_hash", []):                                   # No more versions, delete the hash reference files
-                            try:
-                                if handler.fs__refs_hash.storage_fs.file__delete(path):
-                                    deleted_paths.append(path)
-                                else:
-                                    failed_paths.append(path)
-                            except Exception as e:
-                                failed_paths.append(f"{path}: {str(e)}")
+                    return refs
+
+                refs = handler.refs_compare_and_swap().update_json(ref_fs.paths()[0], remove_entry)     # the callback only reads (it is re-run on every conflict), the history writes happen here
+                if refs and restored_segment and restored_segment[0]:                               # its entries are now inline
+                    handler.storage_backend.file__delete(restored_segment[0])
+                if refs and archived_removed and archived_removed[0]:
+                    refs_history.remove(cache_hash, cache_id)
+                if refs and refs["total_versions"] <= 0:
+                    self.exists_filter().record_miss(namespace, cache_hash)                         # Bloom filters can't remove items, so remember the miss
+                    refs_history.delete_all(cache_hash)
+                    for path in all_paths.get("by_hash", []):                                       # No more versions, delete the hash reference files
+                        try:
+                            if handler.fs__refs_hash.storage_fs.file__delete(path):
+                                deleted_paths.append(path)
+                                deleted_refs_hash += 1
+                            else:
+                                failed_paths.append(path)
+                        except Exception as e:
+                            failed_paths.append(f"{path}: {str(e)}")
 
         for path in all_paths.get("by_id", []):                                                 # Finally, delete the ID reference files
             try:
@@ -104,6 +246,19 @@ class Cache__Service(Type_Safe):
             except Exception as e:
                 failed_paths.append(f"{path}: {str(e)}")
 
+        self.namespace_stats().record_delete(namespace       = namespace                                               ,
+                                             strategy        = strategy                                                ,
+                                             data_files      = counted_data                                            ,
+                                             content_bytes   = id_ref_data.get("content_size") or 0                    ,
+                                             refs_hash_files = deleted_refs_hash                                       ,
+                                             refs_id_files   = len(deleted_paths) - deleted_data - deleted_refs_hash   )
+
+        handler.expiry_index().remove_entry(cache_id, id_ref_data.get("expires_at"))           # so that the TTL sweeper doesn't need to check it
+        self.namespace_eviction().on_delete(namespace, cache_id)                                # not an eviction candidate anymore
+        self.hot_cache().invalidate__cache_id(namespace, cache_id)                              # drop any in-process copies of this entry
+        if cache_hash:
+            self.hot_cache().invalidate__cache_hash(namespace, cache_hash)
+
         return { "status"        : "success" if not failed_paths else "partial",                    # todo: this should be a Type_Safe class
                  "cache_id"      : str(cache_id)        ,
                  "deleted_count" : len(deleted_paths)   ,
@@ -111,14 +266,14 @@ class Cache__Service(Type_Safe):
                  "deleted_paths" : deleted_paths        ,
                  "failed_paths"  : failed_paths         }
 
-    def get_all_namespaces_stats(self) -> Dict[str, Any]:                          # Get file counts for all active namespaces
+    def get_all_namespaces_stats(self) -> Dict[str, Any]:                          # Get file counts for all active namespaces (from the cached counters)
         all_stats = {}
 
-        for namespace in self.cache_handlers.keys():
-            counts_data = self.get_namespace__file_counts(namespace)
+        for namespace in list(self.cache_handlers.keys()):
+            file_counts = self.get_namespace__stats(namespace).file_counts()
             all_stats[str(namespace)] = {
-                'total_files': counts_data['total_files'],
-                'file_counts': counts_data['file_counts']
+                'total_files': file_counts['total_files'],
+                'file_counts': file_counts
             }
 
         return { 'namespaces'       : all_stats                 ,                               # todo: this should be a Type_Safe class
@@ -127,68 +282,89 @@ class Cache__Service(Type_Safe):
                  'storage_mode'     : self.cache_config.storage_mode.value                }     # Include storage mode in stats
 
     # todo: BUG: rename form file_hashes to cache_hashes
-    def get_namespace__file_hashes(self, namespace: Safe_Str__Cache__Namespace) -> List[str]:
-        file_hashes = []
-        handler = self.get_or_create_handler(namespace)
-
-        parent_folder = url_join_safe(str(namespace), "refs/by-hash")                                           # Build the namespace-specific folder path
-
-        for file_path in handler.fs__refs_hash.storage_fs.folder__files__all(parent_folder=parent_folder):      # Use folder__files__all to get only files in this namespace's refs/by-hash folder
-            if file_extension(file_path) == '.json':
-                file_id     = file_name_without_extension(file_path)                                            # Extract just the hash part (last segment after any sharding)
-                hash_parts  = file_id.split('/')
-                if hash_parts:
-                    file_hashes.append(hash_parts[-1])
-        return sorted(file_hashes)
+    def get_namespace__file_hashes(self, namespace: Safe_Str__Cache__Namespace) -> List[str]:          # all hashes (see get_namespace__file_hashes__page for large namespaces)
+        return sorted(self.iter_namespace__file_hashes(namespace))
 
     # todo: BUG: rename form file_hashes to cache_ids_hashes
-    def get_namespace__file_ids(self, namespace: Safe_Str__Id) -> List[str]:
-        file_ids = []
-        handler = self.get_or_create_handler(namespace)
+    def get_namespace__file_ids(self, namespace: Safe_Str__Id) -> List[str]:                           # all ids (see get_namespace__file_ids__page for large namespaces)
+        return sorted(self.iter_namespace__file_ids(namespace))
 
-        parent_folder = url_join_safe(str(namespace), "refs/by-id")                                             # Build the namespace-specific folder path
+    def get_namespace__stats(self, namespace: Safe_Str__Id = None) -> Schema__Cache__Namespace__Stats:    # O(1) namespace counters (no storage listing)
+        namespace = namespace or Safe_Str__Id("default")
+        self.get_or_create_handler(namespace)                                       # loads the namespace's stats file (when there isn't one, the namespace is scanned by the first get)
+        return self.namespace_stats().get(namespace)
+
+    def reconcile_namespace__stats(self, namespace: Safe_Str__Id = None) -> Schema__Cache__Namespace__Stats:    # Rebuild the namespace counters from storage
+        namespace = namespace or Safe_Str__Id("default")
+        return self.namespace_stats().reconcile(self.get_or_create_handler(namespace))
+
+    def get_namespace__file_hashes__page(self, namespace : Safe_Str__Id = None,
+                                               limit     : int          = None,
+                                               cursor    : str          = None
+                                          ) -> Schema__Cache__Namespace__Page:          # One page of the namespace's cache hashes (sorted), without listing the whole namespace
+        return self.get_namespace__refs_page(namespace, CACHE__HANDLER__PREFIX_PATH__FS__REFS_HASH, limit, cursor)
+
+    def get_namespace__file_ids__page(self, namespace : Safe_Str__Id = None,
+                                            limit     : int          = None,
+                                            cursor    : str          = None
+                                       ) -> Schema__Cache__Namespace__Page:             # One page of the namespace's cache ids (sorted)
+        return self.get_namespace__refs_page(namespace, CACHE__HANDLER__PREFIX_PATH__FS__REFS_ID, limit, cursor)
+
+    def get_namespace__refs_page(self, namespace : Safe_Str__Id,
+                                       prefix    : str         ,
+                                       limit     : int         ,
+                                       cursor    : str
+                                  ) -> Schema__Cache__Namespace__Page:
+        namespace           = namespace or Safe_Str__Id("default")
+        handler             = self.get_or_create_handler(namespace)
+        listing             = Storage_FS__Listing(storage_fs=self.storage_fs())
+        paths, next_cursor  = listing.page(handler.build_namespaced_path(prefix), limit=limit, cursor=cursor, suffix='.json')    # the refs files only (not their .config / .metadata files)
+        return Schema__Cache__Namespace__Page(namespace   = str(namespace)          ,
+                                              items       = self.refs_file_ids(paths),
+                                              limit       = limit or listing.page_size,
+                                              next_cursor = next_cursor             )
+
+    def iter_namespace__file_hashes(self, namespace: Safe_Str__Id = None) -> Iterator[str]:      # All the namespace's cache hashes, one listing page at a time
+        return self.iter_namespace__refs(namespace, CACHE__HANDLER__PREFIX_PATH__FS__REFS_HASH)
+
+    def iter_namespace__file_ids(self, namespace: Safe_Str__Id = None) -> Iterator[str]:         # All the namespace's cache ids, one listing page at a time
+        return self.iter_namespace__refs(namespace, CACHE__HANDLER__PREFIX_PATH__FS__REFS_ID)
+
+    def iter_namespace__refs(self, namespace: Safe_Str__Id, prefix: str) -> Iterator[str]:
+        namespace = namespace or Safe_Str__Id("default")
+        handler   = self.get_or_create_handler(namespace)
+        listing   = Storage_FS__Listing(storage_fs=self.storage_fs())
+        for paths in listing.pages(handler.build_namespaced_path(prefix)):
+            yield from self.refs_file_ids(paths)
 
-        for file_path in handler.fs__refs_id.storage_fs.folder__files__all(parent_folder=parent_folder):        # Use folder__files__all to get only files in this namespace's refs/by-id folder
+    def refs_file_ids(self, paths: List[str]) -> List[str]:                        # refs/by-hash (or by-id) '.json' paths -> hashes (or ids), i.e. the last segment after the sharding
+        file_ids = []
+        for file_path in paths:
             if file_extension(file_path) == '.json':
-                file_id = file_name_without_extension(file_path)
-                id_parts = file_id.split('/')                                                                   # Extract just the ID part (last segment after any sharding)
-                if id_parts:
-                    file_ids.append(id_parts[-1])
-        return sorted(file_ids)
+                file_ids.append(file_name_without_extension(file_path).split('/')[-1])
+        return file_ids
 
-    def get_namespace__file_counts(self, namespace: Safe_Str__Id = None) -> Dict[str, Any]:       # Get file counts for all strategies in a namespace
+    def get_namespace__file_counts(self, namespace: Safe_Str__Id = None) -> Dict[str, Any]:       # Get file counts for all strategies in a namespace (full scan, see get_namespace__stats for the O(1) counters)
         namespace = namespace or Safe_Str__Id("default")
-        handler = self.get_or_create_handler(namespace)
+        handler   = self.get_or_create_handler(namespace)
+        listing   = Storage_FS__Listing(storage_fs=self.storage_fs())                  # prefix-scoped and paginated (only the namespace's keys are listed)
 
         file_counts = {}
         total_files = 0
 
-        for strategy in ["direct", "temporal", "temporal_latest", "temporal_versioned"]:
+        for name, prefix in [("direct_files"            , CACHE__HANDLER__PREFIX_PATH__FS__DATA_DIRECT            ),
+                             ("key_based_files"         , CACHE__HANDLER__PREFIX_PATH__FS__DATA_KEY_BASED         ),
+                             ("temporal_files"          , CACHE__HANDLER__PREFIX_PATH__FS__DATA_TEMPORAL          ),
+                             ("temporal_latest_files"   , CACHE__HANDLER__PREFIX_PATH__FS__DATA_TEMPORAL_LATEST   ),
+                             ("temporal_versioned_files", CACHE__HANDLER__PREFIX_PATH__FS__DATA_TEMPORAL_VERSIONED),
+                             ("refs_hash_files"         , CACHE__HANDLER__PREFIX_PATH__FS__REFS_HASH              ),
+                             ("refs_id_files"           , CACHE__HANDLER__PREFIX_PATH__FS__REFS_ID                )]:
             try:
-                fs = handler.get_fs_for_strategy(strategy)
-                if fs and fs.storage_fs:
-                    count = len(fs.storage_fs.files__paths())
-                    file_counts[f"{strategy}_files"] = count
-                    total_files += count
-                else:
-                    file_counts[f"{strategy}_files"] = 0
+                count = listing.count(handler.build_namespaced_path(prefix))
             except Exception:
-                file_counts[f"{strategy}_files"] = 0
-
-        # Count reference store files
-        try:
-            refs_hash_count = len(handler.fs__refs_hash.storage_fs.files__paths())
-            file_counts['refs_hash_files'] = refs_hash_count
-            total_files += refs_hash_count
-        except Exception:
-            file_counts['refs_hash_files'] = 0
-
-        try:
-            refs_id_count = len(handler.fs__refs_id.storage_fs.files__paths())
-            file_counts['refs_id_files'] = refs_id_count
-            total_files += refs_id_count
-        except Exception:
-            file_counts['refs_id_files'] = 0
+                count = 0
+            file_counts[name]  = count
+            total_files       += count
 
         file_counts['total_files'] = total_files
 
@@ -202,10 +378,21 @@ class Cache__Service(Type_Safe):
 
     def get_or_create_handler(self, namespace: Safe_Str__Id = DEFAULT_CACHE__NAMESPACE) -> Cache__Handler:
         if namespace not in self.cache_handlers:                                                         # Create handler with shared storage backend and namespace
-            handler = Cache__Handler(storage_backend  = self.storage_backend(),                          # Shared storage backend
-                                     namespace        = str(namespace),                                  # Namespace for path prefixing
-                                     cache_ttl_hours  = self.cache_config.default_ttl_hours).setup()
+            handler = Cache__Handler(storage_backend        = self.storage_backend()                           ,     # Shared storage backend
+                                     namespace              = str(namespace)                                   ,     # Namespace for path prefixing
+                                     cache_ttl_hours        = self.cache_config.ttl_hours_for(namespace)       ,     # the namespace's override (or the default TTL)
+                                     ttl_enabled            = self.cache_config.ttl_enabled_for(namespace)     ,
+                                     lean_data_files        = bool(self.cache_config.lean_data_files)          ,
+                                     content_dedup          = bool(self.cache_config.content_dedup  )          ,
+                                     shared_blobs           = self.shared_blobs()                              ,     # Shared by all namespaces
+                                     shared_blobs_min_bytes = int(self.cache_config.shared_blobs_min_bytes or 0),
+                                     max_entries            = self.cache_config.max_entries_for(namespace)     ,     # the namespace's quotas (0 = unbounded)
+                                     max_bytes              = self.cache_config.max_bytes_for  (namespace)     ,
+                                     eviction_policy        = str(self.cache_config.eviction_policy or 'lru')  ).setup()
             self.cache_handlers[namespace] = handler
+            self.exists_filter().load_or_rebuild(namespace, lambda: self.get_namespace__file_hashes(namespace))    # no-op when the Bloom filters are disabled
+            self.namespace_stats().load_or_scan(handler)
+            self.ttl_sweeper()                                                                           # starts the background sweep (when enabled)
         return self.cache_handlers[namespace]
 
     def get_storage_info(self) -> Dict[str, Any]:                                  # Get information about current storage configuration
@@ -226,7 +413,8 @@ class Cache__Service(Type_Safe):
                                   json_field_path  : Safe_Str__Json__Field_Path         = None                    ,
                                   namespace        : Safe_Str__Cache__Namespace         = DEFAULT_CACHE__NAMESPACE,
                                   content_encoding : Safe_Str__Id                       = None                    ,
-                                  metadata         : Dict[str, Any]                     = None
+                                  metadata         : Dict[str, Any]                     = None                    ,
+                                  ttl_hours        : Safe_UInt                          = None
                             ) -> Schema__Cache__Store__Response:                    # Store data using the specified strategy
 
         if not cache_hash:
@@ -247,10 +435,23 @@ class Cache__Service(Type_Safe):
                                            strategy         = strategy         ,
                                            content_encoding = content_encoding ,
                                            handler          = handler          ,
-                                           metadata         = metadata         )
-
-        store_strategy = Cache__Service__Store__With_Strategy()
-        return store_strategy.execute(context)                                                  # Execute storage strategy
+                                           metadata         = metadata         ,
+                                           ttl_hours        = ttl_hours        )
+
+        store_strategy = Cache__Service__Store__With_Strategy(refs_write_behind=self.refs_write_behind())
+        self.exists_filter().before_store(namespace)                                            # the Bloom filter's snapshot is behind from now on
+        response       = store_strategy.execute(context)                                        # Execute storage strategy
+        self.hot_cache().invalidate__cache_hash(namespace, cache_hash)                          # by-hash refs now point to this new cache_id
+        self.hot_cache().invalidate__cache_id  (namespace, cache_id  )
+        self.exists_filter().add(namespace, cache_hash)
+        self.namespace_stats().record_store(namespace       = namespace                                                              ,
+                                            strategy        = strategy                                                               ,
+                                            data_files      = len(context.all_paths.data)                                            ,
+                                            content_bytes   = context.file_size or 0                                                 ,
+                                            refs_hash_files = len(context.all_paths.by_hash) if context.hash_reference_created else 0,
+                                            refs_id_files   = len(context.all_paths.by_id)                                           )
+        self.namespace_eviction().on_store(handler, cache_id)                                   # evicts other entries when the namespace is now over its quota
+        return response
 
     # todo: change return to type_safe value
     @type_safe
@@ -258,19 +459,43 @@ class Cache__Service(Type_Safe):
                                namespace  : Safe_Str__Id = None
                           ) -> Optional[Dict[str, Any]]:                        # Retrieve latest by hash"""
         namespace = namespace or Safe_Str__Id("default")
-        handler   = self.get_or_create_handler(namespace)
-
-        with handler.fs__refs_hash.file__json__single(Safe_Str__Id(cache_hash)) as ref_fs:   # Get hash->ID mapping
-            if not ref_fs.exists():
-                return None
-            refs = ref_fs.content()
-            latest_id = refs.get("latest_id")
+        refs      = self.retrieve_by_hash__refs_hash(cache_hash, namespace)           # Get hash->ID mapping
+        if not refs:
+            return None
+        latest_id = refs.get("latest_id")
 
         if not latest_id:
             return None
 
         return self.retrieve_by_id(Cache_Id(latest_id), namespace)           # Delegate to retrieve_by_id which handles the path lookup
 
+    def retrieve_by_hash__versions(self, cache_hash : Safe_Str__Cache_Hash,
+                                         namespace  : Safe_Str__Id = None
+                                    ) -> Optional[List[Dict[str, Any]]]:            # All versions of a hash (oldest first), including the ones archived in the history segments
+        namespace = namespace or Safe_Str__Id("default")
+        refs      = self.retrieve_by_hash__refs_hash(cache_hash, namespace)
+        if not refs:
+            return None
+        return self.get_or_create_handler(namespace).hash_refs_history().all_entries(refs)
+
+    @type_safe
+    def exists_by_hash(self, cache_hash : Safe_Str__Cache_Hash,
+                             namespace  : Safe_Str__Id = DEFAULT_CACHE__NAMESPACE
+                        ) -> bool:                                              # Check if a hash exists, answering most misses without a storage request
+        exists_filter = self.exists_filter()
+        handler       = self.get_or_create_handler(namespace)                   # makes sure the namespace's Bloom filter is loaded
+        if exists_filter.definitely_missing(namespace, cache_hash):
+            return False
+        if self.refs_write_behind().refs_hash_entries(namespace, cache_hash):      # stored, but its refs are still queued
+            return True
+        if self.hot_cache().refs_hash__get(namespace, cache_hash):
+            return True
+        with handler.fs__refs_hash.file__json__single(Safe_Str__Id(cache_hash)) as ref_fs:
+            exists = ref_fs.exists()
+        if not exists:
+            exists_filter.record_miss(namespace, cache_hash)
+        return exists
+
     # todo: change return to type_safe value
     @type_safe
     def retrieve_by_hash__refs_hash(self, cache_hash : Safe_Str__Cache_Hash,
@@ -278,79 +503,120 @@ class Cache__Service(Type_Safe):
                           ) -> Optional[Dict[str, Any]]:                        # Retrieve latest by hash"""
         namespace = namespace or Safe_Str__Id("default")
         handler   = self.get_or_create_handler(namespace)
+        queued    = self.refs_write_behind().refs_hash_entries(namespace, cache_hash)  # read-your-writes (read before the by-hash file, so that entries being flushed are not missed)
+        if queued:
+            with handler.fs__refs_hash.file__json__single(file_id=Safe_Str__Id(cache_hash)) as ref_fs:
+                return self.refs_write_behind().merge_hash_entries(ref_fs.content(), cache_hash, queued)
+        refs_hash = self.hot_cache().refs_hash__get(namespace, cache_hash)
+        if refs_hash:
+            return refs_hash
+        if self.exists_filter().definitely_missing(namespace, cache_hash):     # skip the storage read for hashes known not to exist
+            return None
         file_id   = Safe_Str__Id(cache_hash)                                    # Get hash->ID mapping
         with handler.fs__refs_hash.file__json__single(file_id=file_id) as ref_fs:
-            if not ref_fs.exists():
-                return None
             refs_hash = ref_fs.content()
-            return refs_hash
+        if not refs_hash:
+            self.exists_filter().record_miss(namespace, cache_hash)
+            return None
+        self.hot_cache().refs_hash__set(namespace, cache_hash, refs_hash)
+        return refs_hash
 
     # todo: same as with the delete method above,  this logic is starting to be too complex to be all in one method
-    #       also I think we are doing too much here, with far too many calls to the file system
-    #       at least we should just return the data (i.e. we don't need to return the metadata here (since there is an enpoint to get that)
     def retrieve_by_id(self, cache_id  : Cache_Id,
                              namespace : Safe_Str__Id = DEFAULT_CACHE__NAMESPACE
                         ) -> Optional[Dict[str, Any]]:                     # todo: review this return value, since we had some exceptions here
         handler   = self.get_or_create_handler(namespace)
+        ref_data  = self.retrieve_by_id__refs_data(cache_id, namespace)                     # Get ID reference with content path
 
-        # Get ID reference with content path
-        with handler.fs__refs_id.file__json__single(Safe_Str__Id(cache_id)) as ref_fs:
-            if not ref_fs.exists():
-                return None
-            ref_data = ref_fs.content()
+        if not ref_data or self.is_expired(ref_data):                                   # expired entries are gone (see Cache__Service__Retrieve.retrieve_by_id__expired)
+            return None
 
         paths__content = ref_data.get("file_paths", {}).get("content_files")
-        file_type     = ref_data.get("file_type", "json")
+        file_type      = ref_data.get("file_type", "json")
 
         if not paths__content:
             return None
 
-        # Get the storage backend
-        storage = handler.fs__refs_id.storage_fs
+        storage       = handler.fs__refs_id.storage_fs
+        content_path  = paths__content[0]                                   # Read the content file directly (first path is the main content)
+        metadata_data = ref_data.get("metadata")                            # Store metadata embedded in the by-id refs file (see Schema__Cache__File__Refs__Extended)
 
-        # Read the content file directly (first path is the main content)
-        content_path = paths__content[0] if paths__content else None
+        if metadata_data is None:                                           # Entries stored before the metadata was embedded in the refs, need the .metadata file
+            return self.retrieve_by_id__with_metadata_file(storage, content_path, file_type)
 
+        content_bytes = self.hot_cache().content__get(namespace, cache_id)
+        if content_bytes is None:
+            content_bytes = storage.file__bytes(content_path)               # Single read of the content (no exists check needed)
+            if content_bytes is None:
+                return None
+            self.hot_cache().content__set(namespace, cache_id, content_bytes)
+        if file_type == "binary":
+            data = content_bytes
+        else:
+            data = bytes_to_json(content_bytes)
+        self.access_tracker().record(namespace, cache_id)                               # in memory (used by the eviction of the namespaces with a quota)
+        return self.retrieve_result(data, metadata_data)
+
+    def retrieve_by_id__refs_data(self, cache_id  : Cache_Id,
+                                        namespace : Safe_Str__Id
+                                   ) -> Optional[Dict[str, Any]]:            # Raw by-id refs data (served from the hot cache when possible)
+        ref_data = self.refs_write_behind().refs_id(namespace, cache_id)            # read-your-writes (refs still queued)
+        if ref_data:
+            return ref_data
+        ref_data = self.hot_cache().refs_id__get(namespace, cache_id)
+        if ref_data:
+            return ref_data
+        handler = self.get_or_create_handler(namespace)
+        with handler.fs__refs_id.file__json__single(Safe_Str__Id(cache_id)) as ref_fs:     # one read, content() is None when the file doesn't exist
+            ref_data = ref_fs.content()
+        if ref_data:
+            self.hot_cache().refs_id__set(namespace, cache_id, ref_data)
+        return ref_data
+
+    def retrieve_by_id__with_metadata_file(self, storage      : Storage_FS,
+                                                 content_path : str       ,
+                                                 file_type    : str
+                                            ) -> Optional[Dict[str, Any]]:  # Legacy retrieve path, which needs the content's .metadata file
         if content_path and storage.file__exists(content_path):
             if file_type == "binary":
                 data = storage.file__bytes(content_path)
             else:
                 data = storage.file__json(content_path)
 
-            # Read metadata                                         # todo: review the use of metadata here, since this probably one extra call we don't need to make (since we already have the data from the by-refs file
             metadata_path = content_path + '.metadata'              # todo: review this usage since we should have a much better way to do this using Memory_FS
             metadata_data = {}
 
             if storage.file__exists(metadata_path):
-                metadata_raw = storage.file__json(metadata_path)
-                # Convert metadata keys to Safe_Str__Id for consistency
+                metadata_raw  = storage.file__json(metadata_path)
                 metadata_data = metadata_raw.get('data')            # todo: use native Memory_FS methods here (and we should be using a Type_Safe class here)
 
-            # Get content encoding from metadata
-            content_encoding = metadata_data.get('content_encoding')
-
-            # Handle decompression if needed
-            if content_encoding == 'gzip' and isinstance(data, bytes):
-                data = gzip.decompress(data)
-                # After decompression, determine if it's JSON or remains binary
-                try:                                            # todo: we should know this from the metadata/config
-                    data = json.loads(data.decode('utf-8'))
-                    data_type = "json"
-                except (json.JSONDecodeError, UnicodeDecodeError):
-                    data_type = "binary"
-            else:
-                data_type = self.determine_data_type(data)
+            return self.retrieve_result(data, metadata_data)
+        return None
 
-            return { "data"            : data             ,                     # ths should be a Type_Safe class
-                     "metadata"        : metadata_data    ,
-                     "data_type"       : data_type        ,
-                     "content_encoding": content_encoding }
+    def retrieve_result(self, data          : Any,
+                              metadata_data : Dict[str, Any]
+                         ) -> Dict[str, Any]:                       # Build the retrieve result (handling decompression if needed)
+        content_encoding = metadata_data.get('content_encoding')
+
+        if content_encoding == 'gzip' and isinstance(data, bytes):
+            data = gzip.decompress(data)
+            # After decompression, determine if it's JSON or remains binary
+            try:                                            # todo: we should know this from the metadata/config
+                data = json.loads(data.decode('utf-8'))
+                data_type = "json"
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                data_type = "binary"
+        else:
+            data_type = self.determine_data_type(data)
 
-        return None
+        return { "data"            : data             ,                     # ths should be a Type_Safe class
+                 "metadata"        : metadata_data    ,
+                 "data_type"       : data_type        ,
+                 "content_encoding": content_encoding }
 
     def retrieve_by_id__config(self, cache_id  : Cache_Id,
                                      namespace : Safe_Str__Id
-                                ) -> Schema__Memory_FS__File__Config:
+                                ) -> Schema__Memory_FS__File__Config:        # None for lean data files (which have no .config file)
         file_refs = self.retrieve_by_id__refs(cache_id, namespace)
         if not file_refs or not file_refs.file_paths.content_files:
             return None
@@ -381,20 +647,29 @@ class Cache__Service(Type_Safe):
             metadata_json = handler.storage_backend.file__json(metadata_path)
 
             if not metadata_json:
-                return None
+                return self.retrieve_by_id__metadata__from_refs(file_refs)          # lean data files (and migrated entries) have no .metadata file
 
             return Schema__Cache__File__Metadata.from_json(metadata_json)
         return None
 
+    def retrieve_by_id__metadata__from_refs(self, file_refs: Schema__Cache__File__Refs
+                                             ) -> Optional[Schema__Cache__File__Metadata]:    # Metadata rebuilt from the store metadata embedded in the by-id refs (content__hash is not available)
+        metadata = getattr(file_refs, 'metadata', None)
+        if metadata is None:
+            return None
+        metadata_json = metadata.json()
+        return Schema__Cache__File__Metadata.from_json(dict(content__size = getattr(file_refs, "content_size", 0) or 0,
+                                                            timestamp     = metadata_json.get('stored_at')   ,
+                                                            data          = metadata_json                    ))
+
     def retrieve_by_id__refs(self, cache_id  : Cache_Id,
                                    namespace : Safe_Str__Id
                                 ) -> Schema__Cache__File__Refs:                      #   Retrieve by cache ID using direct path from reference
         if cache_id:
-            handler   = self.get_or_create_handler(namespace)
-            with handler.fs__refs_id.file__json__single(Safe_Str__Id(cache_id)) as ref_fs:           # get the main by-id file, which contains pointers to the other files
-                json_data = ref_fs.content()                                                 # todo refactor this so that we get the Schema__Cache__File__Refs directly from fs__refs_id
-                if json_data:
-                    return Schema__Cache__File__Refs.from_json(json_data)
+            self.refs_write_behind().flush_entry(namespace, cache_id)                       # this is used before changing entries (update, child data), which need the refs files saved
+            json_data = self.retrieve_by_id__refs_data(cache_id, namespace)                 # get the main by-id file, which contains pointers to the other files
+            if json_data:
+                return Schema__Cache__File__Refs__Extended.from_json(json_data)              # also supports refs files created before the content details were added
         return None
 
     def determine_data_type(self, data) -> str:
@@ -0,0 +1,295 @@
+import atexit
+import heapq
+import logging
+import threading
+from typing                                                                             import Any, Dict, List, Optional, Tuple
+from memory_fs.storage_fs.Storage_FS                                                    import Storage_FS
+from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                   import Random_Guid
+from osbot_utils.utils.Http                                                             import url_join_safe
+from osbot_utils.utils.Json                                                             import json_to_bytes, bytes_to_json
+from osbot_utils.utils.Misc                                                             import timestamp_now
+from osbot_utils.decorators.methods.cache_on_self                                       import cache_on_self
+from mgraph_ai_service_cache.service.storage.Storage_FS__Compare_And_Swap               import Storage_FS__Compare_And_Swap
+from mgraph_ai_service_cache.service.storage.Storage_FS__Listing                       import Storage_FS__Listing
+
+CACHE__ACCESS__TRACKER__SAMPLE_RATE      = 1                                        # record one in this many reads (1 = every read)
+CACHE__ACCESS__TRACKER__PREFIX_PATH      = 'index/access'                           # per namespace (i.e. {namespace}/index/access/{timestamp}-{instance}-{flush}.json)
+CACHE__ACCESS__TRACKER__COMPACT_SEGMENTS = 32                                       # a namespace's segments are merged into one when there are more than this
+CACHE__ACCESS__TRACKER__COMPACT_LOCK     = 'index/access.lock'                      # per namespace (outside the segments folder, so that it is not listed as a segment)
+CACHE__ACCESS__TRACKER__COMPACT_LEASE_MS = 300_000                                  # a compaction lock not released after this long (i.e. its instance died) can be taken by another instance
+CACHE__ACCESS__TRACKER__MAX_PENDING      = 10_000                                   # a namespace's counters are flushed when this many entries are pending (even when the background flush is disabled)
+CACHE__ACCESS__TRACKER__MAX_ENTRIES      = 100_000                                  # per namespace, the least recently accessed entries are dropped from memory above this (their flushed counters stay in the segments)
+
+
+class Cache__Access__Tracker(Type_Safe):                                            # Last-access time and hit counts of the entries, recorded in memory and flushed as per-namespace append segments (no storage writes on the read path)
+    storage_fs       : Storage_FS = None                                            # where the access segments are saved
+    sample_rate      : int        = CACHE__ACCESS__TRACKER__SAMPLE_RATE
+    flush_seconds    : int        = 0                                               # interval of the background flush (0 = disabled, see flush)
+    compact_segments : int        = CACHE__ACCESS__TRACKER__COMPACT_SEGMENTS
+    max_pending      : int        = CACHE__ACCESS__TRACKER__MAX_PENDING
+    max_entries      : int        = CACHE__ACCESS__TRACKER__MAX_ENTRIES
+    entries          : dict                                                         # namespace -> {cache_id: [last_access, hits]}
+    pending          : dict                                                         # namespace -> {cache_id: [last_access, hits] (since the last flush), or None (deleted)}
+    loaded           : dict                                                         # namespace -> True once its segments were merged into entries
+    reads            : int        = 0                                               # reads seen (used for the sampling)
+    flushes          : int        = 0
+    flush_errors     : int        = 0                                               # failed background flushes (their counters were requeued)
+    instance_id      : str        = ''                                              # in the segment names (so that the instances' segments don't collide)
+    lock             : Any        = None                                            # threading.Lock (created on setup)
+    flush_lock       : Any        = None                                            # one flush (or compaction) at a time
+    flusher          : Any        = None                                            # background flush thread
+    flusher_stop     : Any        = None                                            # threading.Event used to stop the flusher
+
+    def setup(self) -> 'Cache__Access__Tracker':
+        self.lock        = threading.Lock()
+        self.flush_lock  = threading.Lock()
+        self.instance_id = str(Random_Guid())[:8]
+        return self
+
+    # ---- read / store / delete path (memory only) ----
+
+    def record(self, namespace : str,
+                     cache_id  : str,
+                     now       : int = None
+                ) -> bool:                                                          # A read of the entry (only one in sample_rate reads is recorded, with its hits scaled up)
+        sample_rate = max(1, int(self.sample_rate))
+        namespace   = str(namespace)
+        cache_id    = str(cache_id)
+        with self.lock:
+            self.reads += 1
+            if self.reads % sample_rate:
+                return False
+            now      = now or timestamp_now()
+            entries  = self.entries.setdefault(namespace, {})
+            entry    = entries.setdefault(cache_id, [0, 0])
+            entry[0] = now
+            entry[1] += sample_rate
+            pending  = self.pending.setdefault(namespace, {})
+            delta    = pending.get(cache_id) or [0, 0]
+            pending[cache_id] = [now, delta[1] + sample_rate]
+            self.trim_entries(entries)
+            flush    = len(pending) >= self.max_pending
+        if flush:
+            self.flush_if_idle()
+        return True
+
+    def record_store(self, namespace : str,
+                           cache_id  : str,
+                           now       : int = None
+                      ):                                                            # A new entry (accessed now, with no hits)
+        now = now or timestamp_now()
+        with self.lock:
+            entries = self.entries.setdefault(str(namespace), {})
+            pending = self.pending.setdefault(str(namespace), {})
+            entries[str(cache_id)] = [now, 0]
+            pending[str(cache_id)] = [now, 0]
+            self.trim_entries(entries)
+            flush   = len(pending) >= self.max_pending
+        if flush:
+            self.flush_if_idle()
+
+    def forget(self, namespace : str,
+                     cache_id  : str
+                ) -> bool:                                                          # The entry was deleted (so that the flushed counters of the entry are dropped too)
+        with self.lock:
+            pending = self.pending.setdefault(str(namespace), {})
+            pending[str(cache_id)] = None
+            removed = self.entries.get(str(namespace), {}).pop(str(cache_id), None) is not None
+            flush   = len(pending) >= self.max_pending
+        if flush:
+            self.flush_if_idle()
+        return removed
+
+    def trim_entries(self, entries: Dict[str, List[int]]) -> int:                   # (called with the lock) Drop the least recently accessed entries when there are more than max_entries (down to 90%, so that it doesn't run on every read)
+        if len(entries) <= self.max_entries:
+            return 0
+        drop_count = len(entries) - self.max_entries * 9 // 10
+        for cache_id in heapq.nsmallest(drop_count, entries, key=lambda cache_id: entries[cache_id][0]):
+            del entries[cache_id]
+        return drop_count
+
+    def access(self, namespace : str,
+                     cache_id  : str
+                ) -> Optional[Tuple[int, int]]:                                     # (last_access, hits) of the entry, None when there is no access data for it
+        with self.lock:
+            entry = self.entries.get(str(namespace), {}).get(str(cache_id))
+            if entry is None:
+                return None
+            return entry[0], entry[1]
+
+    # ---- access segments ----
+
+    def segments_folder(self, namespace: str) -> str:
+        return url_join_safe(str(namespace), CACHE__ACCESS__TRACKER__PREFIX_PATH)
+
+    def segment_path(self, namespace: str) -> str:                                  # sortable by time (so that the segments are merged in order)
+        self.flushes += 1
+        return f'{self.segments_folder(namespace)}/{timestamp_now():013d}-{self.instance_id}-{self.flushes:06d}.json'
+
+    def segments(self, namespace: str) -> List[str]:                                # the namespace's segments (oldest first)
+        return sorted(Storage_FS__Listing(storage_fs=self.storage_fs).files(self.segments_folder(namespace)))
+
+    def merge_segment(self, counters : Dict[str, List[int]],
+                            segment  : Dict[str, Any]
+                       ) -> Dict[str, List[int]]:                                   # the segment's hits are added, its last_access is kept when newer, and its deleted entries are removed
+        for cache_id, delta in (segment or {}).items():
+            if delta is None:
+                counters.pop(cache_id, None)
+                continue
+            counter    = counters.setdefault(cache_id, [0, 0])
+            counter[0] = max(counter[0], int(delta[0]))
+            counter[1] += int(delta[1])
+        return counters
+
+    def merge_pending(self, older : Dict[str, Any],
+                            newer : Dict[str, Any]
+                       ) -> Dict[str, Any]:                                         # two batches of pending counters (deletes replace the older counters)
+        merged = dict(older)
+        for cache_id, delta in newer.items():
+            previous = merged.get(cache_id)
+            if delta is None or previous is None:
+                merged[cache_id] = delta
+            else:
+                merged[cache_id] = [max(previous[0], delta[0]), previous[1] + delta[1]]
+        return merged
+
+    def read_segments(self, namespace: str) -> Tuple[Dict[str, List[int]], List[str]]:     # (the merged counters, the segments that were merged)
+        counters = {}
+        segments = self.segments(namespace)
+        for segment_path in segments:
+            segment_bytes = self.storage_fs.file__bytes(segment_path)
+            if segment_bytes:
+                self.merge_segment(counters, bytes_to_json(segment_bytes))
+        return counters, segments
+
+    def flush(self) -> int:                                                         # Save the counters recorded since the last flush (one segment per namespace), returns the number of segments written
+        with self.flush_lock:
+            return self.flush_unlocked()
+
+    def flush_if_idle(self) -> int:                                                 # Flush now, unless a flush is already running (used when too many counters are pending)
+        if not self.flush_lock.acquire(blocking=False):
+            return 0
+        try:
+            return self.flush_unlocked()
+        finally:
+            self.flush_lock.release()
+
+    def flush_unlocked(self) -> int:
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        segments_written = 0
+        for namespace, deltas in pending.items():
+            if not deltas:
+                continue
+            try:
+                self.storage_fs.file__save(self.segment_path(namespace), json_to_bytes(deltas))
+                segments_written += 1
+            except Exception:                                                       # requeued (ahead of the newer reads), so that it is retried in the next flush
+                with self.lock:
+                    self.pending[namespace] = self.merge_pending(deltas, self.pending.get(namespace, {}))
+                continue
+            if len(self.segments(namespace)) > self.compact_segments:
+                self.compact_unlocked(namespace)
+        return segments_written
+
+    def compact(self, namespace: str) -> int:                                       # Merge the namespace's segments into one (returns the number of segments merged)
+        with self.flush_lock:
+            return self.compact_unlocked(namespace)
+
+    def compact_unlocked(self, namespace: str) -> int:                              # only one instance compacts a namespace at a time (see compact_lock), so that no segment is merged twice or deleted unmerged
+        lock_version = self.compact_lock(namespace)
+        if lock_version is None:                                                    # another instance is compacting it
+            return 0
+        try:
+            counters, segments = self.read_segments(namespace)
+            if len(segments) < 2:
+                return 0
+            self.storage_fs.file__save(self.segment_path(namespace), json_to_bytes(counters))     # written before the merged segments are deleted (so that no counters are lost)
+            for segment_path in segments:
+                self.storage_fs.file__delete(segment_path)
+            return len(segments)
+        finally:
+            self.storage_cas().delete(self.compact_lock_path(namespace), lock_version)
+
+    # ---- compaction lock (across instances) ----
+
+    @cache_on_self
+    def storage_cas(self) -> Storage_FS__Compare_And_Swap:
+        return Storage_FS__Compare_And_Swap(storage_fs=self.storage_fs).setup()
+
+    def compact_lock_path(self, namespace: str) -> str:
+        return url_join_safe(str(namespace), CACHE__ACCESS__TRACKER__COMPACT_LOCK)
+
+    def compact_lock(self, namespace: str) -> Optional[str]:                        # Take the namespace's compaction lock (a conditional write), returns its version (for the release) or None when another instance holds it
+        lock_path     = self.compact_lock_path(namespace)
+        data, version = self.storage_cas().read(lock_path)
+        now           = timestamp_now()
+        if data and (bytes_to_json(data).get('expires_at') or 0) > now:
+            return None
+        lock_data = json_to_bytes(dict(instance_id=self.instance_id, expires_at=now + CACHE__ACCESS__TRACKER__COMPACT_LEASE_MS))
+        if not self.storage_cas().write(lock_path, lock_data, version):
+            return None
+        data, version = self.storage_cas().read(lock_path)
+        if data != lock_data:                                                       # taken by another instance after our write
+            return None
+        return version
+
+    def load(self, namespace: str) -> bool:                                         # Merge the namespace's flushed counters (all instances) into entries (once)
+        namespace = str(namespace)
+        with self.lock:
+            if self.loaded.get(namespace):
+                return False
+        counters, _ = self.read_segments(namespace)
+        with self.lock:
+            if self.loaded.get(namespace):
+                return False
+            entries = self.entries.setdefault(namespace, {})
+            for cache_id, (last_access, hits) in counters.items():                  # this instance's flushed hits are in both, so the max is kept (not the sum)
+                entry = entries.setdefault(cache_id, [0, 0])
+                entry[0] = max(entry[0], last_access)
+                entry[1] = max(entry[1], hits       )
+            self.loaded[namespace] = True
+        return True
+
+    def popularity(self, namespace : str,
+                         limit     : int = 10
+                    ) -> List[Dict[str, int]]:                                      # The most read entries of the namespace (flushed counters plus the ones not flushed yet)
+        with self.flush_lock:
+            counters, _ = self.read_segments(namespace)
+        with self.lock:
+            self.merge_segment(counters, dict(self.pending.get(str(namespace), {})))
+        popular = sorted(counters.items(), key=lambda item: (-item[1][1], -item[1][0], item[0]))
+        return [dict(cache_id=cache_id, hits=hits, last_access=last_access)
+                for cache_id, (last_access, hits) in popular[:max(0, int(limit))]]
+
+    # ---- background flush ----
+
+    def start(self) -> bool:                                                        # Flush every flush_seconds (in a daemon thread), and on interpreter shutdown
+        if self.flush_seconds <= 0 or self.flusher is not None:
+            return False
+        self.flusher_stop = threading.Event()
+
+        def run():
+            while not self.flusher_stop.wait(self.flush_seconds):
+                self.background_flush()
+
+        self.flusher = threading.Thread(target=run, name='cache-access-tracker', daemon=True)
+        self.flusher.start()
+        atexit.register(self.stop)
+        return True
+
+    def background_flush(self) -> Optional[int]:                                    # Flush, logging (and counting) the failures instead of stopping the flusher
+        try:
+            return self.flush()
+        except Exception:                                                           # the counters that weren't saved are requeued
+            self.flush_errors += 1
+            logging.getLogger(__name__).exception('failed to flush the access counters')
+            return None
+
+    def stop(self) -> int:                                                          # Stop the flusher and flush what is still in memory
+        if self.flusher is not None:
+            self.flusher_stop.set()
+            self.flusher.join()
+            self.flusher = None
+        return self.flush()
@@ -0,0 +1,57 @@
+import asyncio
+from functools                                                                          import partial
+from typing                                                                             import Any, Dict, List, Optional
+from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Cache_Id                      import Cache_Id
+from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id         import Safe_Str__Id
+from mgraph_ai_service_cache_client.schemas.cache.consts__Cache_Service                 import DEFAULT_CACHE__NAMESPACE
+from mgraph_ai_service_cache_client.schemas.cache.Schema__Cache__Store__Response        import Schema__Cache__Store__Response
+from mgraph_ai_service_cache.service.cache.Cache__Service                               import Cache__Service
+from mgraph_ai_service_cache.service.storage.Storage_FS__Async                         import Storage_FS__Async
+
+
+class Cache__Service__Async(Type_Safe):                                                 # Async versions of the store/retrieve paths (for use from async routes and workers)
+    cache_service : Cache__Service
+    storage_async : Storage_FS__Async = None                                            # defaults to a thread-offload wrapper of cache_service.storage_fs()
+
+    def setup(self) -> 'Cache__Service__Async':
+        if self.storage_async is None:
+            self.storage_async = Storage_FS__Async(storage_fs=self.cache_service.storage_fs()).setup()
+        self.cache_service.hot_cache()                                                  # create the in-process caches before any worker thread uses them
+        return self
+
+    async def run(self, namespace, function, *args):                                   # Run one of cache_service's (blocking) methods in the executor
+        self.cache_service.get_or_create_handler(namespace)                             # create the handler in this thread (handlers are not created concurrently)
+        return await self.storage_async.run_in_executor(function, *args)
+
+    # ---- retrieve (the sync read path, so that expiry, the write-behind overlay and the access tracking stay the same) ----
+
+    async def retrieve_by_id__refs_data(self, cache_id  : Cache_Id,
+                                              namespace : Safe_Str__Id = DEFAULT_CACHE__NAMESPACE
+                                         ) -> Optional[Dict[str, Any]]:
+        return await self.run(namespace, self.cache_service.retrieve_by_id__refs_data, cache_id, namespace)
+
+    async def retrieve_by_hash__refs_hash(self, cache_hash : str,
+                                                namespace  : Safe_Str__Id = DEFAULT_CACHE__NAMESPACE
+                                           ) -> Optional[Dict[str, Any]]:
+        return await self.run(namespace, self.cache_service.retrieve_by_hash__refs_hash, cache_hash, namespace)
+
+    async def retrieve_by_id(self, cache_id  : Cache_Id,
+                                   namespace : Safe_Str__Id = DEFAULT_CACHE__NAMESPACE
+                              ) -> Optional[Dict[str, Any]]:                            # Same result as Cache__Service.retrieve_by_id
+        return await self.run(namespace, self.cache_service.retrieve_by_id, cache_id, namespace)
+
+    async def retrieve_by_hash(self, cache_hash : str,
+                                     namespace  : Safe_Str__Id = DEFAULT_CACHE__NAMESPACE
+                                ) -> Optional[Dict[str, Any]]:
+        return await self.run(namespace, self.cache_service.retrieve_by_hash, cache_hash, namespace)
+
+    async def retrieve_by_ids(self, cache_ids : List[Cache_Id],
+                                    namespace : Safe_Str__Id = DEFAULT_CACHE__NAMESPACE
+                               ) -> List[Optional[Dict[str, Any]]]:                     # All reads are in flight at the same time
+        return list(await asyncio.gather(*[self.retrieve_by_id(cache_id, namespace) for cache_id in cache_ids]))
+
+    # ---- store ----
+
+    async def store_with_strategy(self, **kwargs) -> Schema__Cache__Store__Response:    # Same params as Cache__Service.store_with_strategy
+        return await self.run(kwargs.get('namespace', DEFAULT_CACHE__NAMESPACE), partial(self.cache_service.store_with_strategy, **kwargs))
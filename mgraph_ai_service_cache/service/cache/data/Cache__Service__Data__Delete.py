@@ -64,7 +64,8 @@ class Cache__Service__Data__Delete(Type_Safe):
             return False
 
         handler = self.cache_service.get_or_create_handler(request.namespace)
-        deleted = False
+        deleted       = False
+        deleted_count = 0
 
         for data_folder in file_refs.file_paths.data_folders:                                   # Try each data folder
             full_path = self.build_data_file_path(data_folder   = data_folder        ,
@@ -73,8 +74,13 @@ class Cache__Service__Data__Delete(Type_Safe):
                                                   data_type     = request.data_type  )
 
             if handler.storage_backend.file__exists(full_path):
-                deleted = handler.storage_backend.file__delete(full_path) or deleted
+                if handler.storage_backend.file__delete(full_path):
+                    deleted        = True
+                    deleted_count += 1
 
+        if deleted_count:
+            self.cache_service.namespace_stats().record_data_files(namespace  = request.namespace,
+                                                                   data_files = -deleted_count   )
         return deleted
 
     @type_safe
@@ -103,4 +109,7 @@ class Cache__Service__Data__Delete(Type_Safe):
                         delete_response.deleted_count += 1
                         delete_response.deleted_files.append(str(file_path))
 
+            if delete_response.deleted_count:
+                self.cache_service.namespace_stats().record_data_files(namespace  = namespace                      ,
+                                                                       data_files = -delete_response.deleted_count )
         return delete_response
\ No newline at end of file
@@ -46,6 +46,8 @@ class Cache__Service__Data__Store(Type_Safe):
                 else:
                     raise RuntimeError(f"Failed to save child file at {data_path}")
 
+            self.cache_service.namespace_stats().record_data_files(namespace  = request.namespace ,
+                                                                   data_files = len(files_created))
 
             return Schema__Cache__Data__Store__Response(cache_id           = request.cache_id,
                                                         data_files_created = files_created,
@@ -0,0 +1,81 @@
+import hashlib
+from typing                                                                             import Callable, List
+from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
+from osbot_utils.utils.Http                                                             import url_join_safe
+from osbot_utils.utils.Json                                                             import bytes_to_json
+from osbot_utils.utils.Misc                                                             import timestamp_now
+from mgraph_ai_service_cache.service.storage.Storage_FS__Compare_And_Swap               import Storage_FS__Compare_And_Swap
+
+CACHE__CONTENT_DEDUP__PREFIX_PATH = 'refs/by-content'                               # per namespace (i.e. {namespace}/refs/by-content/{d[0:2]}/{d[2:4]}/{digest}.json)
+
+
+class Cache__Content__Dedup(Type_Safe):                                             # Content-addressed index: one content copy per digest, shared by all the cache_ids that stored it (the list of ids is the refcount)
+    refs_cas    : Storage_FS__Compare_And_Swap = None                               # concurrency-safe updates of the index files
+    namespace   : str                          = ''
+    prefix_path : str                          = CACHE__CONTENT_DEDUP__PREFIX_PATH
+
+    def digest(self, content_bytes: bytes) -> str:                                  # full sha256 (the cache_hash can't be used, since it can be calculated from a json field, or be shorter)
+        return hashlib.sha256(content_bytes).hexdigest()
+
+    def index_path(self, digest: str) -> str:
+        return url_join_safe(str(self.namespace), f'{self.prefix_path}/{digest[0:2]}/{digest[2:4]}/{digest}.json')
+
+    def index(self, digest: str) -> dict:                                           # {digest, content_files, cache_ids} (empty when the digest is not stored)
+        index_bytes = self.refs_cas.storage_fs.file__bytes(self.index_path(digest))
+        if not index_bytes:
+            return {}
+        return bytes_to_json(index_bytes)
+
+    def acquire(self, digest        : str                   ,
+                      cache_id      : str                   ,
+                      content_files : List[str]             ,
+                      save_content  : Callable[[], None]
+                 ) -> List[str]:                                                    # Add cache_id to the digest's ids, and return the content files it should point to (save_content is only called when there is no live copy)
+        cache_id = str(cache_id)
+        index    = self.index(digest)
+        if not index.get('cache_ids'):                                              # no live copy, so save this one (before it is in the index, so that the index never points to missing content)
+            save_content()
+        saved    = not index.get('cache_ids')
+        result   = []
+
+        def add_cache_id(index):
+            if index and index.get('cache_ids'):                                    # join the live copy (saved by this or another store)
+                if cache_id not in index['cache_ids']:
+                    index['cache_ids'].append(cache_id)
+            else:
+                if not saved:                                                       # the live copy was released since our first read
+                    return None
+                index = dict(digest=digest, content_files=list(content_files), cache_ids=[cache_id])
+            result[:] = [index['content_files']]
+            return index
+
+        if self.refs_cas.update_json(self.index_path(digest), add_cache_id) is None:    # the copy we were joining was released, so save our own
+            return self.acquire(digest, cache_id, content_files, save_content)
+        content_files_used = result[0]
+        if saved and content_files_used != list(content_files):                     # another store saved the same content first, so ours is not needed
+            for path in content_files:
+                if path not in content_files_used:
+                    self.refs_cas.storage_fs.file__delete(path)
+        return content_files_used
+
+    def release(self, digest  : str,
+                      cache_id: str
+                 ) -> List[str]:                                                    # Remove cache_id from the digest's ids, and return the content files to delete (only when it was the last id)
+        cache_id = str(cache_id)
+        result   = []
+
+        def remove_cache_id(index):
+            result.clear()
+            if not index or cache_id not in (index.get('cache_ids') or []):
+                return None
+            index['cache_ids'].remove(cache_id)
+            if not index['cache_ids']:                                              # last id, the index is kept (empty) so that a concurrent acquire can't join the deleted copy
+                result.extend(index.get('content_files') or [])
+                index['released_at'] = timestamp_now()
+            return index
+
+        self.refs_cas.update_json(self.index_path(digest), remove_cache_id)
+        return list(result)
+
+    def refcount(self, digest: str) -> int:
+        return len(self.index(digest).get('cache_ids') or [])
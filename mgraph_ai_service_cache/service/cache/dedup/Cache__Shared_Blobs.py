@@ -0,0 +1,68 @@
+from typing                                                                             import Dict
+from osbot_utils.utils.Json                                                             import bytes_to_json
+from osbot_utils.utils.Misc                                                             import timestamp_now
+from mgraph_ai_service_cache.service.cache.dedup.Cache__Content__Dedup                 import Cache__Content__Dedup
+from mgraph_ai_service_cache.service.storage.Storage_FS__Listing                       import Storage_FS__Listing
+
+CACHE__SHARED_BLOBS__PREFIX_PATH       = '_blobs'                                   # shared by all namespaces (i.e. _blobs/{d[0:2]}/{d[2:4]}/{digest}.json and _blobs/{d[0:2]}/{d[2:4]}/{digest}/{copy})
+CACHE__SHARED_BLOBS__GC_GRACE_SECONDS  = 3600                                       # garbage is only collected after this long (so that in-flight stores are never affected)
+
+
+class Cache__Shared_Blobs(Cache__Content__Dedup):                                   # Cross-namespace content dedup: one copy of each blob, referenced by '{namespace}/{cache_id}'
+    prefix_path : str = CACHE__SHARED_BLOBS__PREFIX_PATH
+
+    def shard_folder(self, digest: str) -> str:
+        return f'{self.prefix_path}/{digest[0:2]}/{digest[2:4]}'
+
+    def index_path(self, digest: str) -> str:                                       # not namespaced
+        return f'{self.shard_folder(digest)}/{digest}.json'
+
+    def copy_path(self, digest    : str,
+                        namespace : str,
+                        cache_id  : str
+                   ) -> str:                                                        # unique per store (so that a released copy is never overwritten by a new one), starting with the creation time (used by gc)
+        return f'{self.shard_folder(digest)}/{digest}/{timestamp_now()}-{namespace}-{cache_id}'
+
+    def entry_ref(self, namespace: str,
+                        cache_id : str
+                   ) -> str:                                                        # the ids in the index are namespace qualified
+        return f'{namespace}/{cache_id}'
+
+    # ---- garbage collection ----
+
+    def copy_created_at(self, path: str) -> int:
+        try:
+            return int(path.split('/')[-1].split('-')[0])
+        except ValueError:
+            return 0
+
+    def gc(self, grace_seconds: int = CACHE__SHARED_BLOBS__GC_GRACE_SECONDS) -> Dict[str, int]:     # Delete the released index files and the copies no index uses (left by failed deletes or interrupted stores)
+        storage_fs = self.refs_cas.storage_fs
+        cutoff     = timestamp_now() - grace_seconds * 1000
+        indexes    = {}                                                             # digest -> (index data, version)
+        copies     = []
+        for path in Storage_FS__Listing(storage_fs=storage_fs).files(self.prefix_path):
+            parts = path.split('/')
+            if len(parts) == 4 and path.endswith('.json'):
+                data, version = self.refs_cas.read(path)
+                indexes[parts[3][:-len('.json')]] = (bytes_to_json(data) if data else {}, version)
+            elif len(parts) == 5:
+                copies.append(path)
+
+        result = dict(indexes_deleted=0, copies_deleted=0, bytes_deleted=0)
+        for path in copies:                                                         # a copy is live while its index has ids and lists it
+            index, _ = indexes.get(path.split('/')[3], ({}, None))
+            if index.get('cache_ids') and path in (index.get('content_files') or []):
+                continue
+            if self.copy_created_at(path) > cutoff:
+                continue
+            size = len(storage_fs.file__bytes(path) or b'')
+            if storage_fs.file__delete(path):
+                result['copies_deleted'] += 1
+                result['bytes_deleted' ] += size
+        for digest, (index, version) in indexes.items():                            # released index files (only deleted if unchanged, since a store could be reusing it)
+            if index.get('cache_ids') or (index.get('released_at') or 0) > cutoff:
+                continue
+            if self.refs_cas.delete(self.index_path(digest), version):
+                result['indexes_deleted'] += 1
+        return result
@@ -0,0 +1,157 @@
+import random
+import threading
+from typing                                                                             import Any, List, Optional, Tuple
+from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
+from mgraph_ai_service_cache.service.cache.Cache__Handler                              import Cache__Handler
+from mgraph_ai_service_cache.service.cache.access.Cache__Access__Tracker               import Cache__Access__Tracker
+from mgraph_ai_service_cache.service.cache.stats.Cache__Namespace__Stats               import Cache__Namespace__Stats
+
+CACHE__EVICTION__POLICY__LRU             = 'lru'                                    # least recently used entries are evicted first
+CACHE__EVICTION__POLICY__LFU             = 'lfu'                                    # least frequently used entries are evicted first (ties go to the least recently used)
+CACHE__EVICTION__POLICIES                = (CACHE__EVICTION__POLICY__LRU, CACHE__EVICTION__POLICY__LFU)
+CACHE__NAMESPACE_EVICTION__SAMPLE_SIZE   = 16                                       # candidates compared for each eviction (approximated LRU/LFU, so that no ordered index is needed)
+
+
+class Cache__Namespace__Eviction(Type_Safe):                                        # Keeps the size-bounded namespaces under their quota, evicting (via delete_by_id) the least recently or frequently used entries
+    access_tracker  : Cache__Access__Tracker  = None
+    namespace_stats : Cache__Namespace__Stats = None
+    delete_by_id    : Any                     = None                                # callable (cache_id, namespace) (i.e. Cache__Service.delete_by_id)
+    refs_data       : Any                     = None                                # callable (cache_id, namespace) -> by-id refs data (for the entries this instance hasn't seen)
+    file_ids        : Any                     = None                                # callable (namespace) -> the namespace's cache ids (used once, to load the candidates)
+    sample_size     : int                     = CACHE__NAMESPACE_EVICTION__SAMPLE_SIZE
+    candidates      : dict                                                          # namespace -> [cache_id, ...] (the entries that can be evicted)
+    positions       : dict                                                          # namespace -> {cache_id: index in candidates} (for O(1) removals)
+    lock            : Any                     = None                                # threading.Lock (created on setup)
+
+    def setup(self) -> 'Cache__Namespace__Eviction':
+        self.lock = threading.Lock()
+        return self
+
+    def bounded(self, handler: Cache__Handler) -> bool:                             # the namespace has a quota
+        return handler.max_entries > 0 or handler.max_bytes > 0
+
+    def over_quota(self, handler: Cache__Handler) -> bool:
+        stats = self.namespace_stats.get(handler.namespace)
+        if handler.max_entries and stats.entries > handler.max_entries:
+            return True
+        if handler.max_bytes and stats.content_bytes > handler.max_bytes:
+            return True
+        return False
+
+    # ---- candidates ----
+
+    def load_candidates(self, namespace: str) -> bool:                              # Load the namespace's cache ids (once, later changes are applied by add_candidate / remove_candidate)
+        namespace = str(namespace)
+        with self.lock:
+            if namespace in self.candidates:
+                return False
+        self.access_tracker.load(namespace)                                         # the access counters flushed by all the instances
+        cache_ids = [str(cache_id) for cache_id in self.file_ids(namespace)]
+        with self.lock:
+            if namespace in self.candidates:
+                return False
+            self.candidates[namespace] = cache_ids
+            self.positions [namespace] = {cache_id: index for index, cache_id in enumerate(cache_ids)}
+        return True
+
+    def add_candidate(self, namespace : str,
+                            cache_id  : str
+                       ) -> bool:
+        namespace, cache_id = str(namespace), str(cache_id)
+        with self.lock:
+            positions = self.positions.get(namespace)
+            if positions is None or cache_id in positions:
+                return False
+            positions[cache_id] = len(self.candidates[namespace])
+            self.candidates[namespace].append(cache_id)
+        return True
+
+    def remove_candidate(self, namespace : str,
+                               cache_id  : str
+                          ) -> bool:                                                # swap with the last candidate and pop it
+        namespace, cache_id = str(namespace), str(cache_id)
+        with self.lock:
+            positions = self.positions.get(namespace)
+            if not positions or cache_id not in positions:
+                return False
+            cache_ids        = self.candidates[namespace]
+            index            = positions.pop(cache_id)
+            last             = cache_ids.pop()
+            if last != cache_id:
+                cache_ids[index] = last
+                positions[last]  = index
+        return True
+
+    def sample_candidates(self, namespace : str,
+                                exclude   : str = None
+                           ) -> List[str]:                                          # up to sample_size random candidates (never the excluded one)
+        with self.lock:
+            cache_ids = self.candidates.get(str(namespace)) or []
+            sample    = random.sample(cache_ids, min(len(cache_ids), self.sample_size + 1))
+        return [cache_id for cache_id in sample if cache_id != str(exclude)][:self.sample_size]
+
+    # ---- eviction ----
+
+    def score(self, handler  : Cache__Handler,
+                    cache_id : str
+               ) -> Optional[Tuple[int, ...]]:                                      # lower scores are evicted first (None when the entry doesn't exist anymore)
+        access = self.access_tracker.access(handler.namespace, cache_id)
+        if access is None:                                                          # never read (since the access tracking), so it was last used when it was stored
+            ref_data = self.refs_data(cache_id, handler.namespace)
+            if not ref_data:
+                return None
+            access = (ref_data.get('timestamp') or 0, 0)
+        last_access, hits = access
+        if handler.eviction_policy == CACHE__EVICTION__POLICY__LFU:
+            return hits, last_access
+        return (last_access,)
+
+    def select_victim(self, handler : Cache__Handler,
+                            exclude : str = None
+                       ) -> Optional[str]:                                          # the sampled candidate with the lowest score
+        while True:
+            sample = self.sample_candidates(handler.namespace, exclude)
+            if not sample:
+                return None
+            victim, victim_score = None, None
+            for cache_id in sample:
+                score = self.score(handler, cache_id)
+                if score is None:                                                   # deleted by another instance
+                    self.remove_candidate(handler.namespace, cache_id)
+                    continue
+                if victim_score is None or score < victim_score:
+                    victim, victim_score = cache_id, score
+            if victim:
+                return victim
+
+    def on_store(self, handler  : Cache__Handler,
+                       cache_id : str
+                  ) -> int:                                                         # A new entry was stored (returns the number of entries evicted to make room for it)
+        if not self.bounded(handler):
+            return 0
+        self.load_candidates(handler.namespace)
+        self.add_candidate  (handler.namespace, cache_id)
+        self.access_tracker.record_store(handler.namespace, cache_id)
+        return self.enforce(handler, exclude=cache_id)
+
+    def on_delete(self, namespace : str,
+                        cache_id  : str):                                           # An entry was deleted (by any path)
+        self.remove_candidate(namespace, cache_id)
+        self.access_tracker.forget(namespace, cache_id)
+
+    def enforce(self, handler : Cache__Handler,
+                      exclude : str = None
+                 ) -> int:                                                          # Evict entries until the namespace is within its quota (the excluded entry, i.e. the one just stored, is kept)
+        if not self.bounded(handler):
+            return 0
+        evicted = 0
+        while self.over_quota(handler):
+            cache_id = self.select_victim(handler, exclude)
+            if cache_id is None:                                                    # nothing else to evict
+                break
+            result = self.delete_by_id(cache_id, handler.namespace)                 # also calls on_delete
+            self.remove_candidate(handler.namespace, cache_id)
+            if result.get('status') != 'not_found':
+                self.namespace_stats.record_eviction(handler.namespace)
+                evicted += 1
+        return evicted
@@ -0,0 +1,73 @@
+import hashlib
+import json
+import math
+from typing                                                 import Optional
+from osbot_utils.type_safe.Type_Safe                        import Type_Safe
+
+BLOOM_FILTER__DEFAULT__CAPACITY            = 100_000                                # number of items the filter is sized for
+BLOOM_FILTER__DEFAULT__FALSE_POSITIVE_RATE = 0.01                                   # target false positive rate at capacity
+
+
+class Cache__Bloom_Filter(Type_Safe):                                               # Bloom filter: answers 'definitely not present' or 'maybe present'
+    size_bits   : int       = 0                                                     # m: number of bits
+    hash_count  : int       = 0                                                     # k: number of bit positions per item
+    items_added : int       = 0                                                     # n: number of add() calls (used to estimate the false positive rate)
+    bits        : bytearray
+
+    def setup(self, capacity            : int   = BLOOM_FILTER__DEFAULT__CAPACITY           ,
+                    false_positive_rate : float = BLOOM_FILTER__DEFAULT__FALSE_POSITIVE_RATE
+               ) -> 'Cache__Bloom_Filter':                                          # Size the filter for the expected capacity and error rate
+        capacity        = max(1, capacity)
+        self.size_bits  = max(8, int(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size_bits / capacity * math.log(2)))
+        self.bits       = bytearray((self.size_bits + 7) // 8)
+        return self
+
+    def positions(self, value: str):                                               # k positions using double hashing over one sha256
+        digest = hashlib.sha256(str(value).encode('utf-8')).digest()
+        hash_1 = int.from_bytes(digest[0:8 ], 'big')
+        hash_2 = int.from_bytes(digest[8:16], 'big') | 1
+        for i in range(self.hash_count):
+            yield (hash_1 + i * hash_2) % self.size_bits
+
+    def add(self, value: str) -> 'Cache__Bloom_Filter':
+        for position in self.positions(value):
+            self.bits[position >> 3] |= (1 << (position & 7))
+        self.items_added += 1
+        return self
+
+    def might_contain(self, value: str) -> bool:                                   # False means 'definitely not added'
+        for position in self.positions(value):
+            if not self.bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def false_positive_rate(self) -> float:                                         # (1 - e^(-kn/m))^k
+        if self.size_bits == 0:
+            return 0.0
+        return (1 - math.exp(-self.hash_count * self.items_added / self.size_bits)) ** self.hash_count
+
+    def size_bytes(self) -> int:
+        return len(self.bits)
+
+    # ---- snapshot (one json header line, followed by the raw bits) ----
+
+    def to_bytes(self) -> bytes:
+        header = dict(size_bits   = self.size_bits  ,
+                      hash_count  = self.hash_count ,
+                      items_added = self.items_added)
+        return json.dumps(header).encode('utf-8') + b'\n' + bytes(self.bits)          # json.dumps (without indent) keeps the header in one line
+
+    @classmethod
+    def from_bytes(cls, snapshot: bytes) -> Optional['Cache__Bloom_Filter']:
+        if not snapshot or b'\n' not in snapshot:
+            return None
+        header_bytes, bits = snapshot.split(b'\n', 1)
+        header             = json.loads(header_bytes.decode('utf-8'))
+        size_bits          = header.get('size_bits', 0)
+        if len(bits) != (size_bits + 7) // 8:                                       # truncated or corrupted snapshot
+            return None
+        return cls(size_bits   = size_bits                      ,
+                   hash_count  = header.get('hash_count' , 0)   ,
+                   items_added = header.get('items_added', 0)   ,
+                   bits        = bytearray(bits)                )
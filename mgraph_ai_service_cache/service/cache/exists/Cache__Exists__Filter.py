@@ -0,0 +1,169 @@
+import threading
+import time
+from typing                                                                             import Any, Dict, List, Optional
+from memory_fs.storage_fs.Storage_FS                                                    import Storage_FS
+from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
+from osbot_utils.utils.Http                                                             import url_join_safe
+from mgraph_ai_service_cache.schemas.cache.exists.Schema__Cache__Exists_Filter__Stats  import Schema__Cache__Exists_Filter__Stats
+from mgraph_ai_service_cache.service.cache.exists.Cache__Bloom_Filter                  import Cache__Bloom_Filter
+
+CACHE__EXISTS_FILTER__SNAPSHOT_PATH     = 'index/exists/by-hash.bloom'              # per namespace (i.e. {namespace}/index/exists/by-hash.bloom)
+CACHE__EXISTS_FILTER__DIRTY_PATH        = 'index/exists/by-hash.dirty'              # per namespace, exists while hashes were stored that are not in the snapshot yet
+
+
+class Cache__Exists__Filter(Type_Safe):                                             # Per-namespace Bloom filters (plus a short-TTL negative cache) for 'does this hash exist' checks
+    storage_fs           : Storage_FS                   = None                      # where the snapshots are stored
+    capacity             : int                          = 0                         # hashes each namespace's filter is sized for (0 disables the Bloom filters)
+    single_writer        : bool                         = False                     # the Bloom filters are only used when this is the only instance storing (they don't see other instances' stores)
+    negative_ttl_seconds : int                          = 0                         # 0 disables the negative cache
+    bloom_filters        : Dict[str, Cache__Bloom_Filter]                           # namespace -> filter
+    pending_adds         : Dict[str, int]                                           # namespace -> stores since the last snapshot
+    dirty                : Dict[str, bool]                                          # namespace -> the dirty file was written (i.e. the snapshot is behind)
+    negative_cache       : Dict[str, float]                                         # namespace/hash -> expiry (time.monotonic)
+    definite_misses      : Dict[str, int]                                           # namespace -> misses answered in memory
+    storage_checks       : Dict[str, int]                                           # namespace -> checks that went to storage
+    lock                 : Any                          = None
+
+    def setup(self) -> 'Cache__Exists__Filter':
+        self.lock = threading.Lock()
+        return self
+
+    def enabled(self) -> bool:
+        return self.capacity > 0 and self.single_writer
+
+    def snapshot_path(self, namespace: str) -> str:
+        return url_join_safe(str(namespace), CACHE__EXISTS_FILTER__SNAPSHOT_PATH)
+
+    def dirty_path(self, namespace: str) -> str:
+        return url_join_safe(str(namespace), CACHE__EXISTS_FILTER__DIRTY_PATH)
+
+    # ---- filter lifecycle ----
+
+    def load_or_rebuild(self, namespace   : str      ,
+                              list_hashes            ,                              # callable that returns all hashes in the namespace (only used when there is no up to date snapshot)
+                         ) -> bool:
+        if not self.enabled():
+            return False
+        bloom_filter = None
+        dirty        = self.storage_fs.file__exists(self.dirty_path(namespace))     # the process stopped before saving the snapshot
+        if not dirty:
+            bloom_filter = self.load_snapshot(namespace)
+        if bloom_filter is None:
+            bloom_filter = self.rebuild(namespace, list_hashes())
+            if dirty:
+                self.storage_fs.file__delete(self.dirty_path(namespace))
+        with self.lock:
+            self.bloom_filters[str(namespace)] = bloom_filter
+            self.dirty        [str(namespace)] = False
+            self.pending_adds [str(namespace)] = 0
+        return True
+
+    def load_snapshot(self, namespace: str) -> Optional[Cache__Bloom_Filter]:
+        snapshot = self.storage_fs.file__bytes(self.snapshot_path(namespace))
+        if snapshot:
+            return Cache__Bloom_Filter.from_bytes(snapshot)
+        return None
+
+    def rebuild(self, namespace   : str,
+                      cache_hashes: List[str]
+                 ) -> Cache__Bloom_Filter:                                          # Build a new filter from the namespace's refs/by-hash files and persist it
+        bloom_filter = Cache__Bloom_Filter().setup(capacity=max(self.capacity, len(cache_hashes) * 2))
+        for cache_hash in cache_hashes:
+            bloom_filter.add(cache_hash)
+        self.storage_fs.file__save(self.snapshot_path(namespace), bloom_filter.to_bytes())
+        return bloom_filter
+
+    def save_snapshot(self, namespace: str) -> bool:                                # Save the filter and (when no store happened meanwhile) delete the dirty file
+        namespace = str(namespace)
+        with self.lock:
+            bloom_filter = self.bloom_filters.get(namespace)
+            if bloom_filter is None:
+                return False
+            snapshot = bloom_filter.to_bytes()
+            self.pending_adds[namespace] = 0
+        self.storage_fs.file__save(self.snapshot_path(namespace), snapshot)
+        with self.lock:
+            clean = self.pending_adds.get(namespace, 0) == 0 and self.dirty.get(namespace)
+            if clean:
+                self.dirty[namespace] = False
+        if clean:
+            self.storage_fs.file__delete(self.dirty_path(namespace))
+        return True
+
+    def flush(self) -> int:                                                         # Save the snapshots that are behind (call before the process is frozen or stopped), returns the number saved
+        with self.lock:
+            namespaces = [namespace for namespace, pending in self.pending_adds.items() if pending]
+        for namespace in namespaces:
+            self.save_snapshot(namespace)
+        return len(namespaces)
+
+    # ---- updates (on store / delete) ----
+
+    def before_store(self, namespace: str) -> bool:                                 # Call before a store's files are written: marks the snapshot as behind (one write per snapshot, not per store), so that a restart never trusts it
+        namespace = str(namespace)
+        with self.lock:
+            if namespace not in self.bloom_filters:
+                return False
+            self.pending_adds[namespace] = self.pending_adds.get(namespace, 0) + 1
+            if self.dirty.get(namespace):
+                return False
+            self.dirty[namespace] = True
+        self.storage_fs.file__save(self.dirty_path(namespace), b'dirty')
+        return True
+
+    def add(self, namespace : str,
+                  cache_hash: str):                                                 # A hash was stored in the namespace (after before_store)
+        namespace = str(namespace)
+        with self.lock:
+            self.negative_cache.pop(self.negative_key(namespace, cache_hash), None)
+            bloom_filter = self.bloom_filters.get(namespace)
+            if bloom_filter is not None and bloom_filter.might_contain(cache_hash) is False:     # (so that items_added stays close to the number of distinct hashes)
+                bloom_filter.add(cache_hash)
+
+    def record_miss(self, namespace : str,
+                          cache_hash: str):                                         # Storage confirmed the hash doesn't exist (or it was just deleted)
+        if self.negative_ttl_seconds > 0:
+            with self.lock:
+                self.negative_cache[self.negative_key(namespace, cache_hash)] = time.monotonic() + self.negative_ttl_seconds
+
+    # ---- lookups ----
+
+    def negative_key(self, namespace: str, cache_hash: str) -> str:
+        return f'{namespace}/{cache_hash}'
+
+    def definitely_missing(self, namespace : str,
+                                 cache_hash: str
+                            ) -> bool:                                              # True when the hash is known not to exist (so no storage check is needed)
+        namespace = str(namespace)
+        with self.lock:
+            bloom_filter = self.bloom_filters.get(namespace)
+            missing      = bloom_filter is not None and bloom_filter.might_contain(cache_hash) is False
+            if not missing and self.negative_ttl_seconds > 0:
+                negative_key = self.negative_key(namespace, cache_hash)
+                expires_at   = self.negative_cache.get(negative_key)
+                if expires_at is not None:
+                    if expires_at > time.monotonic():
+                        missing = True
+                    else:
+                        del self.negative_cache[negative_key]
+            if missing:
+                self.definite_misses[namespace] = self.definite_misses.get(namespace, 0) + 1
+            else:
+                self.storage_checks [namespace] = self.storage_checks .get(namespace, 0) + 1
+            return missing
+
+    def stats(self, namespace: str) -> Schema__Cache__Exists_Filter__Stats:
+        namespace = str(namespace)
+        with self.lock:
+            bloom_filter = self.bloom_filters.get(namespace)
+            kwargs       = dict(enabled              = bloom_filter is not None                      ,
+                                negative_ttl_seconds = self.negative_ttl_seconds                    ,
+                                definite_misses      = self.definite_misses.get(namespace, 0)       ,
+                                storage_checks       = self.storage_checks .get(namespace, 0)       )
+            if bloom_filter:
+                kwargs.update(size_bits           = bloom_filter.size_bits            ,
+                              size_bytes          = bloom_filter.size_bytes()         ,
+                              hash_count          = bloom_filter.hash_count           ,
+                              items_added         = bloom_filter.items_added          ,
+                              false_positive_rate = bloom_filter.false_positive_rate())
+            return Schema__Cache__Exists_Filter__Stats(**kwargs)
@@ -0,0 +1,133 @@
+import threading
+from typing                                                                             import Any, Dict, Optional
+from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
+from osbot_utils.utils.Json                                                             import json_to_bytes, bytes_to_json
+from mgraph_ai_service_cache.schemas.cache.hot_cache.Schema__Cache__Hot_Cache__Stats    import Schema__Cache__Hot_Cache__Stats
+
+HOT_CACHE__KEY__REFS_ID   = 'refs-id'                                               # by-id refs file (json)
+HOT_CACHE__KEY__REFS_HASH = 'refs-hash'                                             # by-hash refs file (json)
+HOT_CACHE__KEY__CONTENT   = 'content'                                               # content file bytes (as stored)
+
+
+class Cache__Hot_Cache(Type_Safe):                                                  # Bounded, byte-size-aware LRU for hot refs files and content bytes
+    max_bytes     : int            = 0                                              # 0 disables the cache
+    max_entries   : int            = 0                                              # 0 disables the cache
+    entries       : dict                                                            # key -> bytes (dict insertion order is the LRU order, oldest first)
+    total_bytes   : int            = 0
+    hits          : int            = 0
+    misses        : int            = 0
+    evictions     : int            = 0
+    invalidations : int            = 0
+    lock          : Any            = None                                           # threading.Lock (created on setup)
+
+    def setup(self) -> 'Cache__Hot_Cache':
+        self.lock = threading.Lock()
+        return self
+
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.max_entries > 0
+
+    def key(self, key_type : str,
+                  namespace: str,
+                  key_id   : str
+             ) -> str:
+        return f'{namespace}/{key_type}/{key_id}'
+
+    # ---- generic LRU operations ----
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled():
+            return None
+        with self.lock:
+            value = self.entries.pop(key, None)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries[key] = value                                               # re-insert to mark as most recently used
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes) -> bool:
+        if not self.enabled() or value is None:
+            return False
+        value_size = len(value)
+        if value_size > self.max_bytes:                                             # never cache values that would evict everything else
+            return False
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= len(previous)
+            self.entries[key]  = value
+            self.total_bytes  += value_size
+            while self.total_bytes > self.max_bytes or len(self.entries) > self.max_entries:
+                oldest_key = next(iter(self.entries))
+                self.total_bytes -= len(self.entries.pop(oldest_key))
+                self.evictions   += 1
+        return True
+
+    def delete(self, key: str) -> bool:
+        if not self.enabled():
+            return False
+        with self.lock:
+            value = self.entries.pop(key, None)
+            if value is None:
+                return False
+            self.total_bytes   -= len(value)
+            self.invalidations += 1
+            return True
+
+    def clear(self) -> 'Cache__Hot_Cache':
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+        return self
+
+    # ---- cache service specific helpers ----
+
+    def content__get(self, namespace: str, cache_id: str) -> Optional[bytes]:
+        return self.get(self.key(HOT_CACHE__KEY__CONTENT, namespace, cache_id))
+
+    def content__set(self, namespace: str, cache_id: str, content_bytes: bytes) -> bool:
+        return self.set(self.key(HOT_CACHE__KEY__CONTENT, namespace, cache_id), content_bytes)
+
+    def refs_id__get(self, namespace: str, cache_id: str) -> Optional[Dict[str, Any]]:
+        return self.json__get(self.key(HOT_CACHE__KEY__REFS_ID, namespace, cache_id))
+
+    def refs_id__set(self, namespace: str, cache_id: str, refs_data: Dict[str, Any]) -> bool:
+        return self.json__set(self.key(HOT_CACHE__KEY__REFS_ID, namespace, cache_id), refs_data)
+
+    def refs_hash__get(self, namespace: str, cache_hash: str) -> Optional[Dict[str, Any]]:
+        return self.json__get(self.key(HOT_CACHE__KEY__REFS_HASH, namespace, cache_hash))
+
+    def refs_hash__set(self, namespace: str, cache_hash: str, refs_data: Dict[str, Any]) -> bool:
+        return self.json__set(self.key(HOT_CACHE__KEY__REFS_HASH, namespace, cache_hash), refs_data)
+
+    def json__get(self, key: str) -> Optional[Dict[str, Any]]:                     # json values are kept as bytes, so that callers always get a fresh (mutable) copy
+        value = self.get(key)
+        if value is None:
+            return None
+        return bytes_to_json(value)
+
+    def json__set(self, key: str, json_data: Dict[str, Any]) -> bool:
+        if not self.enabled() or not json_data:
+            return False
+        return self.set(key, json_to_bytes(json_data))
+
+    def invalidate__cache_id(self, namespace: str, cache_id: str):                 # call when an entry's content or by-id refs change
+        self.delete(self.key(HOT_CACHE__KEY__REFS_ID, namespace, cache_id))
+        self.delete(self.key(HOT_CACHE__KEY__CONTENT, namespace, cache_id))
+
+    def invalidate__cache_hash(self, namespace: str, cache_hash: str):             # call when an entry's by-hash refs change
+        self.delete(self.key(HOT_CACHE__KEY__REFS_HASH, namespace, cache_hash))
+
+    def stats(self) -> Schema__Cache__Hot_Cache__Stats:
+        with self.lock:
+            return Schema__Cache__Hot_Cache__Stats(enabled       = self.enabled()    ,
+                                                   max_bytes     = self.max_bytes    ,
+                                                   max_entries   = self.max_entries  ,
+                                                   total_bytes   = self.total_bytes  ,
+                                                   total_entries = len(self.entries) ,
+                                                   hits          = self.hits         ,
+                                                   misses        = self.misses       ,
+                                                   evictions     = self.evictions    ,
+                                                   invalidations = self.invalidations)
@@ -0,0 +1,107 @@
+from typing                                                                             import Any, Dict, List, Optional
+from memory_fs.storage_fs.Storage_FS                                                    import Storage_FS
+from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
+from osbot_utils.utils.Http                                                             import url_join_safe
+from osbot_utils.utils.Json                                                             import json_to_bytes, bytes_to_json
+from mgraph_ai_service_cache.service.storage.Storage_FS__Listing                       import Storage_FS__Listing
+
+CACHE__HASH_REFS__PREFIX_PATH__HISTORY = 'refs/by-hash-history'                     # per namespace (i.e. {namespace}/refs/by-hash-history/{h[0:2]}/{h[2:4]}/{hash}/{segment}.json)
+CACHE__HASH_REFS__INLINE_MAX           = 100                                        # most recent versions kept inline in the by-hash refs file
+CACHE__HASH_REFS__SEGMENT_SIZE         = 50                                         # oldest versions moved to a new history segment when the inline list is full
+
+
+class Cache__Hash__Refs__History(Type_Safe):                                        # Bounded by-hash refs (latest versions inline, older versions in append-only segment files)
+    storage_fs   : Storage_FS = None
+    namespace    : str        = ''
+    inline_max   : int        = CACHE__HASH_REFS__INLINE_MAX
+    segment_size : int        = CACHE__HASH_REFS__SEGMENT_SIZE
+
+    def history_folder(self, cache_hash: str) -> str:                               # same sharding as refs/by-hash
+        cache_hash = str(cache_hash)
+        return url_join_safe(str(self.namespace), f'{CACHE__HASH_REFS__PREFIX_PATH__HISTORY}/{cache_hash[0:2]}/{cache_hash[2:4]}/{cache_hash}')
+
+    def segment_path(self, cache_hash : str ,
+                           first_entry: dict
+                      ) -> str:                                                     # named after the segment's first entry (so that the names sort in store order)
+        segment_name = f"{int(first_entry.get('timestamp') or 0):015d}-{first_entry.get('cache_id')}.json"
+        return url_join_safe(self.history_folder(cache_hash), segment_name)
+
+    def segments(self, cache_hash: str) -> List[str]:                               # oldest first
+        listing = Storage_FS__Listing(storage_fs=self.storage_fs)
+        return sorted(path for path in listing.files(self.history_folder(cache_hash)) if path.endswith('.json'))
+
+    def segment_entries(self, path: str) -> List[dict]:
+        segment_bytes = self.storage_fs.file__bytes(path)
+        if not segment_bytes:
+            return []
+        return bytes_to_json(segment_bytes).get('cache_ids') or []
+
+    def save_segment(self, path     : str       ,
+                           cache_ids: List[dict]
+                      ) -> bool:
+        return self.storage_fs.file__save(path, json_to_bytes(dict(cache_ids=cache_ids)))
+
+    # ---- store path (constant cost: the inline list never grows past inline_max) ----
+
+    def archive(self, refs: Dict[str, Any]) -> Optional[str]:                       # Move the oldest inline entries into a new segment (when the inline list is over inline_max)
+        archived = self.overflow(refs)
+        return self.save_archived(refs.get('cache_hash'), archived)
+
+    def overflow(self, refs: Dict[str, Any]) -> List[dict]:                         # Trim the inline list and return the entries to archive (no storage writes, so it is safe inside a compare-and-swap callback)
+        cache_ids = refs.get('cache_ids') or []
+        if len(cache_ids) <= self.inline_max:
+            return []
+        refs['cache_ids'] = cache_ids[self.segment_size:]
+        return cache_ids[:self.segment_size]
+
+    def save_archived(self, cache_hash: str       ,
+                            archived  : List[dict]
+                       ) -> Optional[str]:                                          # Write the archived entries to a new segment (once the trimmed refs were saved)
+        if not archived:
+            return None
+        path = self.segment_path(cache_hash, archived[0])
+        self.save_segment(path, archived)                                           # segments are written once (and only rewritten when one of their entries is deleted)
+        return path
+
+    # ---- delete path ----
+
+    def remove(self, cache_hash: str,
+                     cache_id  : str
+                ) -> bool:                                                          # Remove an (archived) cache_id from its segment
+        cache_id = str(cache_id)
+        for path in reversed(self.segments(cache_hash)):                            # newest first (recent versions are more likely to be deleted)
+            cache_ids = self.segment_entries(path)
+            remaining = [entry for entry in cache_ids if entry.get('cache_id') != cache_id]
+            if len(remaining) != len(cache_ids):
+                if remaining:
+                    self.save_segment(path, remaining)
+                else:
+                    self.storage_fs.file__delete(path)
+                return True
+        return False
+
+    def restore(self, refs: Dict[str, Any]) -> Optional[str]:                       # Copy the newest segment back inline (when all inline entries were deleted), returns the segment to delete once refs are saved
+        if refs.get('cache_ids'):
+            return None
+        segments = self.segments(refs.get('cache_hash'))
+        if not segments:
+            return None
+        path              = segments[-1]
+        refs['cache_ids'] = self.segment_entries(path)
+        return path
+
+    def delete_all(self, cache_hash: str) -> List[str]:                             # Delete all segments (when the hash's last version is deleted)
+        deleted = []
+        for path in self.segments(cache_hash):
+            if self.storage_fs.file__delete(path):
+                deleted.append(path)
+        return deleted
+
+    # ---- reads ----
+
+    def all_entries(self, refs: Dict[str, Any]) -> List[dict]:                     # Full version history (oldest first): archived segments, then the inline entries
+        cache_ids = []
+        for path in self.segments(refs.get('cache_hash')):
+            cache_ids.extend(self.segment_entries(path))
+        cache_ids.extend(refs.get('cache_ids') or [])
+        return cache_ids
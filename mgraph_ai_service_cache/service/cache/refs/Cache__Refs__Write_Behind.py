@@ -0,0 +1,215 @@
+import atexit
+import copy
+import logging
+import threading
+from typing                                                                             import Any, List, Optional
+from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id         import Safe_Str__Id
+from mgraph_ai_service_cache.service.cache.Cache__Handler                              import Cache__Handler
+
+CACHE__REFS_WRITE_BEHIND__MAX_PENDING = 1_000                                       # queued stores before the store path flushes them itself (back pressure)
+
+
+class Cache__Refs__Write_Behind(Type_Safe):                                         # Queues the stores' refs writes (by-id and by-hash) and saves them in batches
+    flush_ms                  : int  = 0                                            # interval of the background flush (0 = disabled, refs are written on the store path)
+    max_pending               : int  = CACHE__REFS_WRITE_BEHIND__MAX_PENDING
+    pending_refs_id           : dict                                                # (namespace, cache_id)   -> (handler, by-id refs data)
+    pending_refs_hash         : dict                                                # (namespace, cache_hash) -> (handler, [by-hash entries])  (entries of the same hash are coalesced into one write)
+    flushing_refs_id          : dict                                                # same as above, for the writes of the flush in progress (still visible to reads)
+    flushing_refs_hash        : dict
+    on_hash_reference_created : Any  = None                                         # callable(namespace, files) called when a flush creates a by-hash refs file
+    flushes                   : int  = 0
+    files_written             : int  = 0
+    flush_errors              : int  = 0                                            # failed background flushes (their writes were requeued)
+    lock                      : Any  = None                                         # protects the pending and flushing dicts
+    flush_lock                : Any  = None                                         # one flush at a time (so that the writes of a hash stay in order)
+    worker                    : Any  = None                                         # background flush thread
+    worker_stop               : Any  = None                                         # threading.Event used to stop the worker
+
+    def setup(self) -> 'Cache__Refs__Write_Behind':
+        self.lock       = threading.Lock()
+        self.flush_lock = threading.Lock()
+        return self
+
+    def enabled(self) -> bool:
+        return self.flush_ms > 0
+
+    def pending_count(self) -> int:
+        with self.lock:
+            return len(self.pending_refs_id) + len(self.flushing_refs_id)
+
+    # ---- store path ----
+
+    def add(self, handler      : Cache__Handler,
+                  cache_id     : str           ,
+                  cache_hash   : str           ,
+                  refs_id_data : dict          ,
+                  hash_entry   : dict
+             ) -> int:                                                              # Queue a store's refs writes (returns the number of queued stores)
+        namespace = str(handler.namespace)
+        with self.lock:
+            self.pending_refs_id[(namespace, str(cache_id))] = (handler, refs_id_data)
+            _, entries = self.pending_refs_hash.setdefault((namespace, str(cache_hash)), (handler, []))
+            entries.append(hash_entry)
+            pending = len(self.pending_refs_id)
+        if pending >= self.max_pending:
+            self.flush()
+        return pending
+
+    # ---- read-your-writes overlay ----
+
+    def refs_id(self, namespace: str,
+                      cache_id : str
+                 ) -> Optional[dict]:                                               # by-id refs data of a queued (or being flushed) store
+        key = (str(namespace), str(cache_id))
+        with self.lock:
+            pending = self.pending_refs_id.get(key) or self.flushing_refs_id.get(key)
+            if pending:
+                return copy.deepcopy(pending[1])
+        return None
+
+    def refs_hash_entries(self, namespace : str,
+                                cache_hash: str
+                           ) -> List[dict]:                                         # by-hash entries not yet saved (call this before reading the by-hash file, so that no entry is missed)
+        key = (str(namespace), str(cache_hash))
+        entries = []
+        with self.lock:
+            for queue in (self.flushing_refs_hash, self.pending_refs_hash):
+                if key in queue:
+                    entries.extend(copy.deepcopy(queue[key][1]))
+        return entries
+
+    def merge_hash_entries(self, refs      : Optional[dict],
+                                 cache_hash: str           ,
+                                 entries   : List[dict]
+                            ) -> Optional[dict]:                                    # Add the queued entries to the by-hash refs data (skipping the ones already saved)
+        if not entries:
+            return refs
+        refs      = copy.deepcopy(refs) if refs else dict(cache_hash=str(cache_hash), cache_ids=[], latest_id=None, total_versions=0)
+        saved_ids = set(entry.get('cache_id') for entry in refs.get('cache_ids') or [])
+        for entry in entries:
+            if entry.get('cache_id') in saved_ids:
+                continue
+            refs['cache_ids'].append(entry)
+            refs['latest_id']       = entry.get('cache_id')
+            refs['total_versions'] += 1
+        return refs
+
+    # ---- flush ----
+
+    def flush(self) -> int:                                                         # Save all queued refs (by-id first, since the by-hash latest_id points to them), returns the number of files written
+        with self.flush_lock:
+            with self.lock:
+                self.flushing_refs_id   , self.pending_refs_id   = self.pending_refs_id  , {}
+                self.flushing_refs_hash , self.pending_refs_hash = self.pending_refs_hash, {}
+            return self.save_flushing()
+
+    def flush_entry(self, namespace: str,
+                          cache_id : str
+                     ) -> int:                                                      # Save only the refs of one queued store (and of the other queued stores of its hash), i.e. before deleting it
+        key_id = (str(namespace), str(cache_id))
+        if self.refs_id(namespace, cache_id) is None:                               # not queued (the common case), so no need to wait for a flush in progress
+            return 0
+        with self.flush_lock:
+            with self.lock:
+                pending = self.pending_refs_id.pop(key_id, None)
+                if pending is None:
+                    return 0
+                self.flushing_refs_id[key_id] = pending
+                key_hash = (str(namespace), str(pending[1].get('cache_hash')))
+                if key_hash in self.pending_refs_hash:
+                    self.flushing_refs_hash[key_hash] = self.pending_refs_hash.pop(key_hash)
+                    for entry in self.flushing_refs_hash[key_hash][1]:             # the by-hash latest_id can point to them
+                        key_entry = (str(namespace), str(entry.get('cache_id')))
+                        if key_entry in self.pending_refs_id:
+                            self.flushing_refs_id[key_entry] = self.pending_refs_id.pop(key_entry)
+            return self.save_flushing()
+
+    def save_flushing(self) -> int:                                                 # Save the refs moved to the flushing dicts (call with flush_lock held)
+        with self.lock:
+            refs_id   = list(self.flushing_refs_id  .items())
+            refs_hash = list(self.flushing_refs_hash.items())
+        if not refs_id and not refs_hash:
+            return 0
+        files_written = 0
+        try:
+            for key, (handler, refs_id_data) in refs_id:
+                self.save_refs_id(handler, key[1], refs_id_data)
+                files_written += 1
+                with self.lock:
+                    del self.flushing_refs_id[key]
+            for key, (handler, entries) in refs_hash:
+                self.save_refs_hash(handler, key[1], entries)
+                files_written += 1
+                with self.lock:
+                    del self.flushing_refs_hash[key]
+        finally:
+            with self.lock:                                                         # requeue what wasn't saved (i.e. when a write failed), ahead of the newer stores
+                for key, (handler, entries) in self.flushing_refs_hash.items():
+                    _, pending_entries = self.pending_refs_hash.get(key, (handler, []))
+                    self.pending_refs_hash[key] = (handler, entries + pending_entries)
+                self.pending_refs_id    = {**self.flushing_refs_id, **self.pending_refs_id}
+                self.flushing_refs_id   = {}
+                self.flushing_refs_hash = {}
+            self.flushes       += 1
+            self.files_written += files_written
+        return files_written
+
+    def save_refs_id(self, handler      : Cache__Handler,
+                           cache_id     : str           ,
+                           refs_id_data : dict
+                      ):
+        with handler.fs__refs_id.file__json__single(Safe_Str__Id(cache_id)) as ref_fs:
+            ref_fs.create(refs_id_data)
+
+    def save_refs_hash(self, handler    : Cache__Handler,
+                             cache_hash : str           ,
+                             entries    : List[dict]
+                        ):                                                          # One compare-and-swap update with all the hash's queued entries
+        refs_history = handler.hash_refs_history()
+        created      = []
+        archived     = []
+
+        def add_entries(refs):                                                      # re-run on every conflict, so it doesn't write anything
+            created[:]  = [not refs]
+            refs        = self.merge_hash_entries(refs, cache_hash, entries)
+            archived[:] = refs_history.overflow(refs)                               # keep the inline list bounded
+            return refs
+
+        with handler.fs__refs_hash.file__json__single(Safe_Str__Id(cache_hash)) as ref_fs:
+            path = ref_fs.paths()[0]
+        handler.refs_compare_and_swap().update_json(path, add_entries)
+        refs_history.save_archived(cache_hash, archived)                            # once the trimmed refs were saved
+        if created[0] and self.on_hash_reference_created:
+            self.on_hash_reference_created(handler.namespace, 1)
+
+    # ---- background worker ----
+
+    def start(self) -> bool:                                                        # Flush every flush_ms (in a daemon thread), and on interpreter shutdown
+        if not self.enabled() or self.worker is not None:
+            return False
+        self.worker_stop = threading.Event()
+
+        def run():
+            while not self.worker_stop.wait(self.flush_ms / 1000):
+                self.background_flush()
+
+        self.worker = threading.Thread(target=run, name='cache-refs-write-behind', daemon=True)
+        self.worker.start()
+        atexit.register(self.stop)
+        return True
+
+    def background_flush(self) -> Optional[int]:                                    # Flush, logging (and counting) the failures instead of stopping the worker
+        try:
+            return self.flush()
+        except Exception:                                                           # the failed writes were requeued (so they are retried in the next flush)
+            self.flush_errors += 1
+            logging.getLogger(__name__).exception('failed to flush the queued refs writes')
+            return None
+
+    def stop(self) -> int:                                                          # Stop the worker and flush what is still queued
+        if self.worker is not None:
+            self.worker_stop.set()
+            self.worker.join()
+            self.worker = None
+        return self.flush()
@@ -26,11 +26,7 @@ class Cache__Service__Retrieve(Type_Safe):
     def check_exists(self, cache_hash : Safe_Str__Cache_Hash,
                            namespace  : Safe_Str__Id        = DEFAULT_CACHE__NAMESPACE
                      ) -> bool:                                                       # Check if cache entry exists
-
-        handler   = self.cache_service.get_or_create_handler(namespace)
-
-        with handler.fs__refs_hash.file__json__single(Safe_Str__Id(str(cache_hash))) as ref_fs:
-            return ref_fs.exists()
+        return self.cache_service.exists_by_hash(cache_hash, namespace)             # uses the namespace's Bloom filter and negative cache (when enabled)
 
     @type_safe
     def retrieve_by_hash(self, cache_hash : Safe_Str__Cache_Hash,
@@ -151,6 +147,20 @@ class Cache__Service__Retrieve(Type_Safe):
                                           ttl_hours  = ttl_hours                                                ,
                                           namespace  = namespace                                                 )
     
+    @type_safe
+    def retrieve_by_id__expired(self, cache_id  : Cache_Id,
+                                      namespace : Safe_Str__Id = DEFAULT_CACHE__NAMESPACE
+                                ) -> Optional[Schema__Cache__Error__Gone]:                                                  # Expired error when the entry exists but has expired (None otherwise)
+        ref_data = self.cache_service.retrieve_by_id__refs_data(cache_id, namespace)
+        if not ref_data or not self._is_expired(ref_data):
+            return None
+        expires_at = ref_data.get("expires_at")
+        stored_at  = ref_data.get("timestamp") or expires_at
+        return self.get_expired_error(cache_id   = cache_id                                ,
+                                      expired_at = expires_at                              ,
+                                      ttl_hours  = max(0, expires_at - stored_at) // 3_600_000,
+                                      namespace  = namespace                               )
+
     def _build_metadata(self, cache_result: Dict[str, Any]) -> Schema__Cache__Metadata:                                     # Build metadata from cache result
         metadata_raw = cache_result.get("metadata", {})
 
@@ -178,7 +188,5 @@ class Cache__Service__Retrieve(Type_Safe):
         else:
             return Enum__Cache__Data_Type.STRING
     
-    def _is_expired(self, id_ref: Dict[str, Any]) -> bool:                           # Check if cache entry has expired
-        # TODO: Implement TTL expiration logic
-        # For now, always return False (nothing expires)
-        return False
\ No newline at end of file
+    def _is_expired(self, id_ref: Dict[str, Any]) -> bool:                           # Check if cache entry has expired (i.e. is past the expires_at in its by-id refs)
+        return self.cache_service.is_expired(id_ref)
\ No newline at end of file
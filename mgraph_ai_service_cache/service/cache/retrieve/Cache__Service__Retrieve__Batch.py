@@ -0,0 +1,100 @@
+import base64
+from concurrent.futures                                                                     import ThreadPoolExecutor
+from typing                                                                                 import Dict, List, Optional
+from osbot_utils.decorators.methods.cache_on_self                                           import cache_on_self
+from osbot_utils.type_safe.Type_Safe                                                        import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Cache_Id                          import Cache_Id
+from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id             import Safe_Str__Id
+from osbot_utils.type_safe.type_safe_core.decorators.type_safe                              import type_safe
+from mgraph_ai_service_cache_client.schemas.cache.Schema__Cache__Retrieve__Success          import Schema__Cache__Retrieve__Success
+from mgraph_ai_service_cache_client.schemas.cache.consts__Cache_Service                     import DEFAULT_CACHE__NAMESPACE
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Data_Type              import Enum__Cache__Data_Type
+from mgraph_ai_service_cache.schemas.cache.retrieve.Schema__Cache__Retrieve__Batch__Item   import Schema__Cache__Retrieve__Batch__Item
+from mgraph_ai_service_cache.schemas.cache.retrieve.Schema__Cache__Retrieve__Batch__Request import Schema__Cache__Retrieve__Batch__Request
+from mgraph_ai_service_cache.schemas.cache.retrieve.Schema__Cache__Retrieve__Batch__Response import Schema__Cache__Retrieve__Batch__Response
+from mgraph_ai_service_cache.service.cache.Cache__Service                                   import Cache__Service
+from mgraph_ai_service_cache.service.cache.retrieve.Cache__Service__Retrieve                import Cache__Service__Retrieve
+
+CACHE__RETRIEVE_BATCH__MAX_WORKERS = 16                                                     # concurrent retrieve_by_id calls
+CACHE__RETRIEVE_BATCH__MAX_KEYS    = 1_000                                                  # cache_ids + cache_hashes per request
+
+
+class Cache__Service__Retrieve__Batch(Type_Safe):                                           # Multi-get: retrieves many entries concurrently
+    cache_service : Cache__Service
+    max_workers   : int = CACHE__RETRIEVE_BATCH__MAX_WORKERS
+
+    @cache_on_self
+    def retrieve_service(self) -> Cache__Service__Retrieve:
+        return Cache__Service__Retrieve(cache_service=self.cache_service)
+
+    @type_safe
+    def retrieve_batch(self, request   : Schema__Cache__Retrieve__Batch__Request,
+                             namespace : Safe_Str__Id = DEFAULT_CACHE__NAMESPACE
+                        ) -> Schema__Cache__Retrieve__Batch__Response:
+        total_requested = len(request.cache_ids) + len(request.cache_hashes)
+        if total_requested > CACHE__RETRIEVE_BATCH__MAX_KEYS:
+            raise ValueError(f"Batch has {total_requested} keys, the max is {CACHE__RETRIEVE_BATCH__MAX_KEYS}")
+
+        self.cache_service.get_or_create_handler(namespace)                                 # one handler lookup (and in-process caches setup) before the worker threads use them
+        self.cache_service.hot_cache()
+
+        max_workers = max(1, min(self.max_workers, total_requested))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:                       # one pool for the hash lookups and the reads
+            hashes_ids = self.resolve_hashes(list(dict.fromkeys(request.cache_hashes)), namespace, executor)   # cache_hash -> latest cache_id (or None when not found)
+            unique_ids = list(dict.fromkeys(list(request.cache_ids) +                       # dedupe repeated ids (including ids shared by id and hash keys)
+                                            [cache_id for cache_id in hashes_ids.values() if cache_id]))
+            entries    = self.retrieve_entries(unique_ids, namespace, executor)
+
+        results = []
+        for cache_id in request.cache_ids:
+            results.append(self.batch_item(entries.get(cache_id), cache_id=cache_id))
+        for cache_hash in request.cache_hashes:
+            cache_id = hashes_ids.get(cache_hash)
+            results.append(self.batch_item(entries.get(cache_id) if cache_id else None, cache_id=cache_id, cache_hash=cache_hash))
+
+        total_found = sum(1 for result in results if result.found)
+        return Schema__Cache__Retrieve__Batch__Response(results         = results                        ,
+                                                        total_requested = total_requested                ,
+                                                        total_found     = total_found                    ,
+                                                        total_not_found = total_requested - total_found  )
+
+    def resolve_hashes(self, cache_hashes : List[str]          ,
+                             namespace    : Safe_Str__Id       ,
+                             executor     : ThreadPoolExecutor
+                        ) -> Dict[str, Optional[Cache_Id]]:                             # Fan out the by-hash refs reads (cache_hash -> latest cache_id)
+        def latest_id(cache_hash):
+            try:
+                refs_hash = self.cache_service.retrieve_by_hash__refs_hash(cache_hash, namespace)
+            except Exception:                                                               # one bad entry should not fail the whole batch
+                return None
+            cache_id = refs_hash.get('latest_id') if refs_hash else None
+            return Cache_Id(cache_id) if cache_id else None
+        return dict(zip(cache_hashes, executor.map(latest_id, cache_hashes)))
+
+    def retrieve_entries(self, cache_ids : List[Cache_Id]     ,
+                               namespace : Safe_Str__Id       ,
+                               executor  : ThreadPoolExecutor
+                          ) -> Dict[Cache_Id, Optional[Schema__Cache__Retrieve__Success]]:  # Fan out the reads over the thread pool
+        retrieve_service = self.retrieve_service()
+        def retrieve(cache_id):
+            try:
+                return retrieve_service.retrieve_by_id(cache_id, namespace)
+            except Exception:                                                               # one bad entry should not fail the whole batch
+                return None
+        return dict(zip(cache_ids, executor.map(retrieve, cache_ids)))
+
+    def batch_item(self, entry      : Optional[Schema__Cache__Retrieve__Success],
+                         cache_id   : Cache_Id = None                            ,
+                         cache_hash = None
+                    ) -> Schema__Cache__Retrieve__Batch__Item:
+        if entry is None:
+            return Schema__Cache__Retrieve__Batch__Item(cache_id=cache_id, cache_hash=cache_hash, found=False)
+        data = entry.data
+        if entry.data_type == Enum__Cache__Data_Type.BINARY:                                # binary data can't be returned in JSON
+            data = base64.b64encode(data).decode('utf-8')
+        return Schema__Cache__Retrieve__Batch__Item(cache_id   = cache_id        ,
+                                                    cache_hash = cache_hash      ,
+                                                    found      = True            ,
+                                                    data       = data            ,
+                                                    data_type  = entry.data_type ,
+                                                    metadata   = entry.metadata  )
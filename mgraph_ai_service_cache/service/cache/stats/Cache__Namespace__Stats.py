@@ -0,0 +1,286 @@
+import threading
+from typing                                                                             import Any, Callable, Dict, Iterator, List, Optional, Set
+from memory_fs.storage_fs.Storage_FS                                                    import Storage_FS
+from osbot_utils.decorators.methods.cache_on_self                                       import cache_on_self
+from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
+from osbot_utils.utils.Http                                                             import url_join_safe
+from osbot_utils.utils.Json                                                             import bytes_to_json
+from osbot_utils.utils.Misc                                                             import timestamp_now
+from mgraph_ai_service_cache.schemas.cache.stats.Schema__Cache__Namespace__Stats       import Schema__Cache__Namespace__Stats
+from mgraph_ai_service_cache.service.storage.Storage_FS__Compare_And_Swap               import Storage_FS__Compare_And_Swap
+from mgraph_ai_service_cache.service.storage.Storage_FS__Listing                       import Storage_FS__Listing
+from mgraph_ai_service_cache.service.cache.Cache__Handler                              import (Cache__Handler                                          ,
+                                                                                                CACHE__HANDLER__PREFIX_PATH__FS__REFS_ID                ,
+                                                                                                CACHE__HANDLER__PREFIX_PATH__FS__REFS_HASH              ,
+                                                                                                CACHE__HANDLER__PREFIX_PATH__FS__DATA_DIRECT            ,
+                                                                                                CACHE__HANDLER__PREFIX_PATH__FS__DATA_KEY_BASED         ,
+                                                                                                CACHE__HANDLER__PREFIX_PATH__FS__DATA_TEMPORAL          ,
+                                                                                                CACHE__HANDLER__PREFIX_PATH__FS__DATA_TEMPORAL_LATEST   ,
+                                                                                                CACHE__HANDLER__PREFIX_PATH__FS__DATA_TEMPORAL_VERSIONED)
+
+CACHE__NAMESPACE_STATS__PATH        = 'index/stats.json'                            # per namespace (i.e. {namespace}/index/stats.json)
+CACHE__NAMESPACE_STATS__SAVE_EVERY  = 10                                            # save the stats file (i.e. add this instance's deltas to it) after this many changes
+CACHE__NAMESPACE_STATS__STRATEGIES  = { 'direct'             : ('direct_files'            , CACHE__HANDLER__PREFIX_PATH__FS__DATA_DIRECT            ),
+                                        'key_based'          : ('key_based_files'         , CACHE__HANDLER__PREFIX_PATH__FS__DATA_KEY_BASED         ),
+                                        'temporal'           : ('temporal_files'          , CACHE__HANDLER__PREFIX_PATH__FS__DATA_TEMPORAL          ),
+                                        'temporal_latest'    : ('temporal_latest_files'   , CACHE__HANDLER__PREFIX_PATH__FS__DATA_TEMPORAL_LATEST   ),
+                                        'temporal_versioned' : ('temporal_versioned_files', CACHE__HANDLER__PREFIX_PATH__FS__DATA_TEMPORAL_VERSIONED)}
+
+
+class Cache__Namespace__Stats(Type_Safe):                                           # Per-namespace counters, so that stats don't need to list the storage
+    storage_fs        : Storage_FS                                  = None          # where the stats files are stored
+    reconcile_seconds : int                                         = 0             # interval of the background reconciliation scan (0 = disabled)
+    stats             : Dict[str, Schema__Cache__Namespace__Stats]                  # namespace -> counters
+    pending_changes   : Dict[str, int]                                              # namespace -> changes since the last save
+    deltas            : Dict[str, Dict[str, int]]                                   # namespace -> counter deltas since the last save (added to the stats file, so that other instances' changes are kept)
+    unscanned         : Dict[str, Cache__Handler]                                   # namespace -> handler, for the namespaces without a stats file (scanned on their first get, not on the request that creates the handler)
+    lock              : Any                                         = None
+    reconciler        : Any                                         = None          # background reconciliation thread
+    reconciler_stop   : Any                                         = None          # threading.Event used to stop the reconciler
+
+    def setup(self) -> 'Cache__Namespace__Stats':
+        self.lock = threading.Lock()
+        return self
+
+    def stats_path(self, namespace: str) -> str:
+        return url_join_safe(str(namespace), CACHE__NAMESPACE_STATS__PATH)
+
+    def strategy_field(self, strategy: str) -> Optional[str]:                       # Name of the counter with the strategy's files
+        strategy_details = CACHE__NAMESPACE_STATS__STRATEGIES.get(str(strategy))
+        if strategy_details:
+            return strategy_details[0]
+        return None
+
+    # ---- load / save ----
+
+    def load_or_scan(self, handler: Cache__Handler) -> bool:                        # Load the namespace's counters (when there is no stats file, the namespace is scanned on its first get)
+        namespace = str(handler.namespace)
+        with self.lock:
+            if namespace in self.stats or namespace in self.unscanned:
+                return False
+        stats = self.load(namespace)
+        with self.lock:
+            if stats is None:
+                self.unscanned.setdefault(namespace, handler)
+            else:
+                self.stats.setdefault(namespace, stats)
+        return True
+
+    def scan_unscanned(self, namespace: str) -> bool:                               # Build the counters of a namespace without a stats file (the changes made before it are in the scan)
+        with self.lock:
+            handler = self.unscanned.pop(namespace, None)
+        if handler is None:
+            return False
+        stats = self.scan(handler)
+        if stats.entries or stats.data_files or stats.file_counts().get('total_files'):     # don't create stats files for empty namespaces
+            saved = self.storage_cas().update_json(self.stats_path(namespace),
+                                                   lambda stats_json: stats_json or stats.json())       # (another instance could have created it meanwhile)
+            stats = Schema__Cache__Namespace__Stats.from_json(saved)
+        with self.lock:
+            self.stats[namespace] = stats
+        return True
+
+    def load(self, namespace: str) -> Optional[Schema__Cache__Namespace__Stats]:
+        stats_bytes = self.storage_fs.file__bytes(self.stats_path(namespace))
+        if not stats_bytes:
+            return None
+        return Schema__Cache__Namespace__Stats.from_json(bytes_to_json(stats_bytes))
+
+    @cache_on_self
+    def storage_cas(self) -> Storage_FS__Compare_And_Swap:                          # the stats files are shared by all instances
+        return Storage_FS__Compare_And_Swap(storage_fs=self.storage_fs).setup()
+
+    def apply_deltas(self, stats_json : dict          ,
+                           deltas     : Dict[str, int]
+                      ) -> dict:                                                    # (counters never go below zero)
+        stats_json = dict(stats_json)
+        for name, delta in deltas.items():
+            stats_json[name] = max(0, (stats_json.get(name) or 0) + int(delta))
+        return stats_json
+
+    def save(self, namespace: str) -> bool:                                         # Add this instance's deltas to the stats file (compare-and-swap), and pick up the other instances' changes
+        namespace = str(namespace)
+        with self.lock:
+            deltas = self.deltas.pop(namespace, None)
+            self.pending_changes[namespace] = 0
+        if not deltas:
+            return False
+        try:
+            saved = self.storage_cas().update_json(self.stats_path(namespace),
+                                                   lambda stats_json: self.apply_deltas(stats_json or Schema__Cache__Namespace__Stats().json(), deltas))
+        except Exception:
+            with self.lock:                                                         # keep them for the next save
+                self.merge_deltas(namespace, deltas)
+            raise
+        with self.lock:
+            stats_json = self.apply_deltas(saved, self.deltas.get(namespace) or {})     # plus the changes made during the save
+            self.stats[namespace] = Schema__Cache__Namespace__Stats.from_json(stats_json)
+        return True
+
+    def save_all(self) -> List[str]:                                                # Save the namespaces with unsaved changes (call before the process is frozen or stopped)
+        with self.lock:
+            namespaces = [namespace for namespace, deltas in self.deltas.items() if deltas]
+        for namespace in namespaces:
+            self.save(namespace)
+        return namespaces
+
+    def merge_deltas(self, namespace: str,
+                           deltas   : Dict[str, int]):                              # (call with the lock held)
+        namespace_deltas = self.deltas.setdefault(namespace, {})
+        for name, delta in deltas.items():
+            namespace_deltas[name] = namespace_deltas.get(name, 0) + int(delta)
+
+    # ---- updates (on store / update / delete) ----
+
+    def change(self, namespace: str, **deltas) -> Schema__Cache__Namespace__Stats:  # Apply the deltas to the namespace's counters (which never go below zero)
+        namespace = str(namespace)
+        with self.lock:
+            if namespace in self.unscanned:                                         # the scan (on the first get) will see this change in storage
+                return Schema__Cache__Namespace__Stats()
+            stats = self.stats.get(namespace)
+            if stats is None:
+                stats = self.stats[namespace] = Schema__Cache__Namespace__Stats()
+            for name, delta in deltas.items():
+                setattr(stats, name, max(0, getattr(stats, name) + int(delta)))
+            self.merge_deltas(namespace, deltas)
+            self.pending_changes[namespace] = self.pending_changes.get(namespace, 0) + 1
+            save = self.pending_changes[namespace] >= CACHE__NAMESPACE_STATS__SAVE_EVERY
+        if save:
+            self.save(namespace)
+        return stats
+
+    def record_store(self, namespace       : str,
+                           strategy        : str,
+                           data_files      : int,
+                           content_bytes   : int,
+                           refs_hash_files : int,
+                           refs_id_files   : int):                                  # An entry was stored (files that were overwritten, like temporal-latest's 'latest', are counted again until the next reconcile)
+        deltas         = dict(entries         = 1              ,
+                              content_bytes   = content_bytes  ,
+                              refs_hash_files = refs_hash_files,
+                              refs_id_files   = refs_id_files  )
+        strategy_field = self.strategy_field(strategy)
+        if strategy_field:
+            deltas[strategy_field] = data_files
+        return self.change(namespace, **deltas)
+
+    def record_delete(self, namespace       : str,
+                            strategy        : str,
+                            data_files      : int,
+                            content_bytes   : int,
+                            refs_hash_files : int,
+                            refs_id_files   : int):                                 # An entry was deleted
+        deltas         = dict(entries         = -1              ,
+                              content_bytes   = -content_bytes  ,
+                              refs_hash_files = -refs_hash_files,
+                              refs_id_files   = -refs_id_files  )
+        strategy_field = self.strategy_field(strategy)
+        if strategy_field:
+            deltas[strategy_field] = -data_files
+        return self.change(namespace, **deltas)
+
+    def record_update(self, namespace     : str,
+                            content_bytes : int):                                   # An entry's content was replaced (content_bytes is the size difference)
+        return self.change(namespace, content_bytes=content_bytes)
+
+    def record_data_files(self, namespace  : str,
+                                data_files : int):                                  # Child data files were added (or removed, when negative)
+        return self.change(namespace, data_files=data_files)
+
+    def record_eviction(self, namespace: str):                                      # An entry was evicted (its delete was already recorded)
+        return self.change(namespace, evictions=1)
+
+    # ---- lookups ----
+
+    def get(self, namespace: str) -> Schema__Cache__Namespace__Stats:               # Copy of the namespace's counters (O(1), no storage access after the namespace's first get)
+        self.scan_unscanned(str(namespace))
+        with self.lock:
+            stats = self.stats.get(str(namespace))
+            if stats is None:
+                return Schema__Cache__Namespace__Stats()
+            return Schema__Cache__Namespace__Stats.from_json(stats.json())
+
+    # ---- reconciliation (full scan of the namespace's folders) ----
+
+    def folder_files(self, storage_fs : Storage_FS,
+                           namespace  : str       ,
+                           prefix     : str
+                      ) -> Iterator[str]:                                           # Files under {namespace}/{prefix}/ (only lists the namespace's keys)
+        return Storage_FS__Listing(storage_fs=storage_fs).files(url_join_safe(str(namespace), prefix))
+
+    def in_data_folder(self, path        : str     ,
+                             data_folders: Set[str]
+                        ) -> bool:                                                  # True when the path is inside one of the entries' data folders
+        parts = path.split('/')
+        for index in range(1, len(parts)):
+            if '/'.join(parts[:index]) in data_folders:
+                return True
+        return False
+
+    def scan(self, handler: Cache__Handler) -> Schema__Cache__Namespace__Stats:     # Rebuild the counters from the namespace's refs and data folders
+        namespace    = str(handler.namespace)
+        storage_fs   = handler.storage_backend
+        stats        = Schema__Cache__Namespace__Stats(reconciled_at=timestamp_now())
+        data_folders = set()
+
+        for path in self.folder_files(storage_fs, namespace, CACHE__HANDLER__PREFIX_PATH__FS__REFS_ID):
+            stats.refs_id_files += 1
+            if path.endswith('.json'):
+                ref_data = storage_fs.file__json(path) or {}
+                if ref_data.get('cache_id'):
+                    stats.entries       += 1
+                    stats.content_bytes += ref_data.get('content_size') or 0
+                    data_folders.update(ref_data.get('file_paths', {}).get('data_folders') or [])
+
+        stats.refs_hash_files = sum(1 for _ in self.folder_files(storage_fs, namespace, CACHE__HANDLER__PREFIX_PATH__FS__REFS_HASH))
+
+        for strategy_field, prefix in CACHE__NAMESPACE_STATS__STRATEGIES.values():
+            for path in self.folder_files(storage_fs, namespace, prefix):
+                if self.in_data_folder(path, data_folders):
+                    stats.data_files += 1
+                else:
+                    setattr(stats, strategy_field, getattr(stats, strategy_field) + 1)
+        return stats
+
+    def reconcile(self, handler: Cache__Handler) -> Schema__Cache__Namespace__Stats:    # Replace the namespace's counters with a fresh scan (and save them)
+        namespace = str(handler.namespace)
+        with self.lock:
+            self.unscanned.pop(namespace, None)
+            deltas = self.deltas.pop(namespace, None) or {}                         # the scan sees the changes in storage (but not the evictions)
+            self.pending_changes[namespace] = 0
+        stats = self.scan(handler)
+
+        def replace_counters(stats_json):
+            stats_json_new              = stats.json()
+            stats_json_new['evictions'] = (stats_json or {}).get('evictions', 0) + deltas.get('evictions', 0)     # not in storage, so it can't be rebuilt by the scan
+            return stats_json_new
+
+        saved = self.storage_cas().update_json(self.stats_path(namespace), replace_counters)
+        with self.lock:
+            self.stats[namespace] = Schema__Cache__Namespace__Stats.from_json(saved)
+        return self.get(namespace)
+
+    def start_reconciler(self, handlers: Callable[[], List[Cache__Handler]]) -> bool:   # Reconcile all namespaces every reconcile_seconds (in a daemon thread)
+        if self.reconcile_seconds <= 0 or self.reconciler is not None:
+            return False
+        self.reconciler_stop = threading.Event()
+
+        def run():
+            while not self.reconciler_stop.wait(self.reconcile_seconds):
+                for handler in handlers():
+                    try:
+                        self.reconcile(handler)
+                    except Exception:                                               # keep reconciling the other namespaces (the counters will be fixed in the next run)
+                        pass
+
+        self.reconciler = threading.Thread(target=run, name='cache-namespace-stats-reconciler', daemon=True)
+        self.reconciler.start()
+        return True
+
+    def stop_reconciler(self) -> bool:
+        if self.reconciler is None:
+            return False
+        self.reconciler_stop.set()
+        self.reconciler.join()
+        self.reconciler = None
+        return True
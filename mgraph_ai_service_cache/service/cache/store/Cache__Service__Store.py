@@ -3,6 +3,7 @@ from mgraph_ai_service_cache_client.schemas.cache.safe_str.Safe_Str__Cache__File
 from mgraph_ai_service_cache_client.schemas.cache.safe_str.Safe_Str__Cache__File__File_Id       import Safe_Str__Cache__File__File_Id
 from mgraph_ai_service_cache_client.schemas.cache.safe_str.Safe_Str__Cache__Namespace           import Safe_Str__Cache__Namespace
 from osbot_utils.type_safe.Type_Safe                                                            import Type_Safe
+from osbot_utils.type_safe.primitives.core.Safe_UInt                                            import Safe_UInt
 from osbot_utils.type_safe.primitives.domains.common.safe_str.Safe_Str__Text                    import Safe_Str__Text
 from osbot_utils.type_safe.primitives.domains.files.safe_str.Safe_Str__File__Path               import Safe_Str__File__Path
 from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id                 import Safe_Str__Id
@@ -23,7 +24,8 @@ class Cache__Service__Store(Type_Safe):
                            strategy  : Enum__Cache__Store__Strategy = DEFAULT_CACHE__STORE__STRATEGY,
                            namespace : Safe_Str__Id                 = DEFAULT_CACHE__NAMESPACE      ,
                            cache_key : Safe_Str__File__Path         = None                          ,
-                           file_id   : Safe_Str__Id                 = None
+                           file_id   : Safe_Str__Id                 = None                          ,
+                           ttl_hours : Safe_UInt                    = None
                      ) -> Schema__Cache__Store__Response:                               # Store string data
 
         if not data:                                                                    # Validate input
@@ -36,7 +38,8 @@ class Cache__Service__Store(Type_Safe):
                                                       cache_key    = cache_key  ,
                                                       file_id      = file_id    ,
                                                       strategy     = strategy   ,
-                                                      namespace    = namespace  )
+                                                      namespace    = namespace  ,
+                                                      ttl_hours    = ttl_hours  )
 
     @type_safe
     def store_json(self, data             : dict                             = None                          ,
@@ -45,6 +48,7 @@ class Cache__Service__Store(Type_Safe):
                          cache_key        : Safe_Str__Cache__File__Cache_Key = None                          ,
                          file_id          : Safe_Str__Cache__File__File_Id   = None                          ,
                          json_field_path  : Safe_Str__Json__Field_Path       = None                          ,
+                         ttl_hours        : Safe_UInt                        = None
                     ) -> Schema__Cache__Store__Response:                                                # Store JSON data
 
         if json_field_path:                                                                             # Field-based hashing
@@ -58,7 +62,8 @@ class Cache__Service__Store(Type_Safe):
                                                       file_id         = file_id        ,
                                                       json_field_path = json_field_path,
                                                       strategy        = strategy       ,
-                                                      namespace       = namespace      )
+                                                      namespace       = namespace      ,
+                                                      ttl_hours       = ttl_hours      )
 
     @type_safe
     def store_binary(self, data             : bytes,
@@ -66,7 +71,8 @@ class Cache__Service__Store(Type_Safe):
                            namespace         : Safe_Str__Id                 = DEFAULT_CACHE__NAMESPACE      ,
                            cache_key         : Safe_Str__File__Path         = None                          ,
                            file_id           : Safe_Str__Id                 = None                          ,
-                           content_encoding  : str                          = None
+                           content_encoding  : str                          = None                          ,
+                           ttl_hours         : Safe_UInt                    = None
                       ) -> Schema__Cache__Store__Response:                               # Store binary data
 
         if not data:                                                                    # Validate input
@@ -88,7 +94,8 @@ class Cache__Service__Store(Type_Safe):
                                                       file_id          = file_id         ,  #          b) have been modified in this function and need to be passed to the next function
                                                       strategy         = strategy        ,
                                                       namespace        = namespace       ,
-                                                      content_encoding = content_encoding )
+                                                      content_encoding = content_encoding ,
+                                                      ttl_hours        = ttl_hours        )
 
 
     @type_safe
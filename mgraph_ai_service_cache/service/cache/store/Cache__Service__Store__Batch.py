@@ -0,0 +1,108 @@
+import base64
+import gzip
+from concurrent.futures                                                                 import ThreadPoolExecutor
+from typing                                                                             import Dict, List, Tuple, Union
+from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id         import Safe_Str__Id
+from osbot_utils.type_safe.type_safe_core.decorators.type_safe                          import type_safe
+from mgraph_ai_service_cache_client.schemas.cache.consts__Cache_Service                 import DEFAULT_CACHE__STORE__STRATEGY, DEFAULT_CACHE__NAMESPACE
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Data_Type          import Enum__Cache__Data_Type
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy    import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache.schemas.cache.store.Schema__Cache__Store__Batch__Item     import Schema__Cache__Store__Batch__Item
+from mgraph_ai_service_cache.schemas.cache.store.Schema__Cache__Store__Batch__Request  import Schema__Cache__Store__Batch__Request
+from mgraph_ai_service_cache.schemas.cache.store.Schema__Cache__Store__Batch__Response import Schema__Cache__Store__Batch__Response
+from mgraph_ai_service_cache.schemas.cache.store.Schema__Cache__Store__Batch__Result   import Schema__Cache__Store__Batch__Result
+from mgraph_ai_service_cache.service.cache.Cache__Service                               import Cache__Service
+
+CACHE__STORE_BATCH__MAX_WORKERS = 16                                                    # concurrent store_with_strategy calls (each one does several backend writes)
+CACHE__STORE_BATCH__MAX_ITEMS   = 10_000                                                # larger ingests should be split into multiple batches
+
+
+class Cache__Service__Store__Batch(Type_Safe):                                          # Stores many items using a thread pool over the storage backend
+    cache_service : Cache__Service
+    max_workers   : int = CACHE__STORE_BATCH__MAX_WORKERS
+
+    @type_safe
+    def store_batch(self, request   : Schema__Cache__Store__Batch__Request                          ,
+                          strategy  : Enum__Cache__Store__Strategy = DEFAULT_CACHE__STORE__STRATEGY ,
+                          namespace : Safe_Str__Id                 = DEFAULT_CACHE__NAMESPACE
+                     ) -> Schema__Cache__Store__Batch__Response:
+        if len(request.items) > CACHE__STORE_BATCH__MAX_ITEMS:
+            raise ValueError(f"Batch has {len(request.items)} items, the max is {CACHE__STORE_BATCH__MAX_ITEMS}")
+
+        self.cache_service.get_or_create_handler(namespace)                             # create the namespace handler and the in-process caches once (before the worker threads use them)
+        self.cache_service.hot_cache()
+        results      = [None] * len(request.items)
+        items_groups = self.items_by_hash(request.items, results)
+
+        def store_group(group: List[Tuple[int, Union[str, Dict, bytes], str, Schema__Cache__Store__Batch__Item]]):
+            for index, storage_data, cache_hash, item in group:                         # items with the same hash are stored in order (since they update the same by-hash refs file)
+                results[index] = self.store_item(index, item, storage_data, cache_hash, strategy, namespace)
+
+        if items_groups:
+            max_workers = max(1, min(self.max_workers, len(items_groups)))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(store_group, items_groups.values()))
+
+        total_stored = sum(1 for result in results if result.success)
+        return Schema__Cache__Store__Batch__Response(results      = results                      ,
+                                                     total_items  = len(results)                 ,
+                                                     total_stored = total_stored                 ,
+                                                     total_failed = len(results) - total_stored  )
+
+    def items_by_hash(self, items   : List[Schema__Cache__Store__Batch__Item],
+                            results : list
+                       ) -> Dict[str, list]:                                            # Prepare the items (data and hash), recording invalid items in results
+        items_groups = {}
+        for index, item in enumerate(items):
+            try:
+                storage_data, cache_hash = self.item_data_and_hash(item)
+                items_groups.setdefault(str(cache_hash), []).append((index, storage_data, cache_hash, item))
+            except Exception as error:
+                results[index] = Schema__Cache__Store__Batch__Result(index=index, success=False, error=str(error))
+        return items_groups
+
+    def item_data_and_hash(self, item: Schema__Cache__Store__Batch__Item) -> Tuple[Union[str, Dict, bytes], str]:   # Same hashing rules as Cache__Service__Store
+        data = item.data
+        if item.data_type == Enum__Cache__Data_Type.STRING:
+            if not isinstance(data, str) or not data:
+                raise ValueError("String data cannot be empty")
+            return data, self.cache_service.hash_from_string(data)
+
+        if item.data_type == Enum__Cache__Data_Type.JSON:
+            if not isinstance(data, dict):
+                raise ValueError("JSON data must be an object")
+            if item.json_field_path:
+                return data, self.cache_service.hash_from_json_field(data=data, json_field=item.json_field_path)
+            return data, self.cache_service.hash_from_json(data)
+
+        if item.data_type == Enum__Cache__Data_Type.BINARY:
+            if not isinstance(data, str) or not data:
+                raise ValueError("Binary data must be a non-empty base64 string")
+            data_bytes = base64.b64decode(data, validate=True)
+            if item.content_encoding == 'gzip':
+                return data_bytes, self.cache_service.hash_from_bytes(gzip.decompress(data_bytes))
+            return data_bytes, self.cache_service.hash_from_bytes(data_bytes)
+
+        raise ValueError(f"Invalid data_type: {item.data_type}")
+
+    def store_item(self, index        : int                                 ,
+                         item         : Schema__Cache__Store__Batch__Item   ,
+                         storage_data : Union[str, Dict, bytes]             ,
+                         cache_hash   : str                                 ,
+                         strategy     : Enum__Cache__Store__Strategy        ,
+                         namespace    : Safe_Str__Id
+                    ) -> Schema__Cache__Store__Batch__Result:
+        try:
+            response = self.cache_service.store_with_strategy(storage_data     = storage_data          ,
+                                                              cache_hash       = cache_hash            ,
+                                                              cache_key        = item.cache_key        ,
+                                                              file_id          = item.file_id          ,
+                                                              json_field_path  = item.json_field_path  ,
+                                                              strategy         = strategy              ,
+                                                              namespace        = namespace             ,
+                                                              content_encoding = item.content_encoding ,
+                                                              ttl_hours        = item.ttl_hours        )
+            return Schema__Cache__Store__Batch__Result(index=index, success=True, response=response)
+        except Exception as error:
+            return Schema__Cache__Store__Batch__Result(index=index, success=False, error=str(error))
@@ -0,0 +1,62 @@
+from typing                                                                             import Any, Dict, List
+from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id         import Safe_Str__Id
+from mgraph_ai_service_cache.service.cache.Cache__Service                              import Cache__Service
+
+CACHE__LEAN_MIGRATION__SIDECAR_EXTENSIONS = ('.config', '.metadata')                # Memory_FS files stored next to each content file
+
+
+class Cache__Service__Store__Lean__Migration(Type_Safe):                            # Converts existing entries to lean data files (i.e. deletes their .config / .metadata sidecars)
+    cache_service : Cache__Service
+
+    def is_sidecar(self, path: str) -> bool:
+        return str(path).endswith(CACHE__LEAN_MIGRATION__SIDECAR_EXTENSIONS)
+
+    def migrate_entry(self, cache_id  : str,
+                            namespace : str
+                       ) -> Dict[str, Any]:                                         # Embed the store metadata in the by-id refs (if missing), then delete the sidecars
+        namespace = Safe_Str__Id(namespace)
+        self.cache_service.refs_write_behind().flush_entry(namespace, cache_id)     # the entry's refs could still be queued (write-behind)
+        handler   = self.cache_service.get_or_create_handler(namespace)
+        storage   = handler.storage_backend
+        with handler.fs__refs_id.file__json__single(Safe_Str__Id(str(cache_id))) as ref_fs:
+            ref_data = ref_fs.content()
+            if not ref_data:
+                return dict(cache_id=str(cache_id), status='not_found')
+            strategy  = ref_data.get('strategy')
+            all_paths = ref_data.get('all_paths') or {}
+            sidecars  = [path for path in all_paths.get('data') or [] if self.is_sidecar(path)]
+            if strategy == 'temporal_versioned':                                    # its versions are tracked in the sidecars
+                return dict(cache_id=str(cache_id), status='skipped')
+            if not sidecars:
+                return dict(cache_id=str(cache_id), status='already_lean')
+
+            if ref_data.get('metadata') is None:                                    # entries stored before the metadata was embedded in the refs
+                content_files = (ref_data.get('file_paths') or {}).get('content_files') or []
+                metadata_json = storage.file__json(content_files[0] + '.metadata') if content_files else None
+                if not metadata_json:                                               # without the metadata, the entry could not be served after the migration
+                    return dict(cache_id=str(cache_id), status='skipped')
+                ref_data['metadata']     = metadata_json.get('data')
+                ref_data['content_size'] = metadata_json.get('content__size') or 0
+
+            all_paths['data']     = [path for path in all_paths.get('data') or [] if not self.is_sidecar(path)]
+            ref_data['all_paths'] = all_paths
+            ref_fs.create(ref_data)                                                 # save the refs first, so that the entry is never left pointing to deleted files
+
+        deleted = [path for path in sidecars if storage.file__delete(path)]
+        strategy_field = self.cache_service.namespace_stats().strategy_field(strategy)
+        if strategy_field and deleted:
+            self.cache_service.namespace_stats().change(namespace, **{strategy_field: -len(deleted)})
+        self.cache_service.hot_cache().invalidate__cache_id(namespace, cache_id)
+        return dict(cache_id=str(cache_id), status='migrated', deleted=deleted)
+
+    def migrate_namespace(self, namespace: str) -> Dict[str, Any]:                  # Migrate all the namespace's entries (one listing page at a time)
+        statuses      : Dict[str, int] = {}
+        deleted_files : List[str]      = []
+        for cache_id in self.cache_service.iter_namespace__file_ids(Safe_Str__Id(namespace)):
+            result = self.migrate_entry(cache_id, namespace)
+            statuses[result['status']] = statuses.get(result['status'], 0) + 1
+            deleted_files.extend(result.get('deleted', []))
+        return dict(namespace     = str(namespace)    ,
+                    statuses      = statuses          ,
+                    deleted_files = len(deleted_files))
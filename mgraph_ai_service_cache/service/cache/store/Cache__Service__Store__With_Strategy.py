@@ -1,22 +1,31 @@
+import json
+from typing                                                                              import Union
 from osbot_utils.type_safe.Type_Safe                                                     import Type_Safe
+from osbot_utils.utils.Json                                                              import json_to_bytes
+from osbot_utils.utils.Misc                                                              import str_to_bytes, timestamp_now
 from osbot_utils.type_safe.primitives.domains.files.safe_str.Safe_Str__File__Path        import Safe_Str__File__Path
 from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id          import Safe_Str__Id
-from osbot_utils.utils.Misc                                                              import timestamp_now
 from mgraph_ai_service_cache_client.schemas.cache.Schema__Cache__Store__Response         import Schema__Cache__Store__Response
-from mgraph_ai_service_cache_client.schemas.cache.file.Schema__Cache__File__Refs         import Schema__Cache__File__Refs
+from mgraph_ai_service_cache.schemas.cache.file.Schema__Cache__File__Refs__Extended     import Schema__Cache__File__Refs__Extended
 from mgraph_ai_service_cache_client.schemas.cache.store.Schema__Cache__Store__Metadata   import Schema__Cache__Store__Metadata
 from mgraph_ai_service_cache_client.schemas.cache.store.Schema__Cache__Store__Paths      import Schema__Cache__Store__Paths
 from mgraph_ai_service_cache_client.schemas.cache.store.Schema__Cache__Hash__Reference   import Schema__Cache__Hash__Reference, Schema__Cache__Hash__Entry
 from mgraph_ai_service_cache.schemas.service.cache_service.Schema__Store__Context        import Schema__Store__Context       # todo: review this schema since it is not currently stored in the client project
+from mgraph_ai_service_cache.service.cache.refs.Cache__Refs__Write_Behind              import Cache__Refs__Write_Behind
 
 class Cache__Service__Store__With_Strategy(Type_Safe):                                       # Orchestrates the storage of cache entries with different strategies
+    refs_write_behind : Cache__Refs__Write_Behind = None                                     # when enabled, the refs are queued (and saved in batches by a background flush)
 
     def execute(self, context: Schema__Store__Context                                        # Main orchestration method that coordinates all storage operations
                  ) -> Schema__Cache__Store__Response:
         self.initialize_context   (context)                                                 # Set defaults and initialize tracking
         self.store_data           (context)                                                 # Store the actual data using selected strategy
-        self.update_hash_reference(context)                                                 # Update or create hash-to-ID reference
-        self.create_file_refs     (context)                                                 # Create ID-to-hash reference with metadata
+        if self.refs_write_behind and self.refs_write_behind.enabled():
+            self.queue_refs       (context)                                                 # Queue both refs (retrieves see them via the write-behind overlay)
+        else:
+            self.update_hash_reference(context)                                             # Update or create hash-to-ID reference
+            self.create_file_refs     (context)                                             # Create ID-to-hash reference with metadata
+        self.add_to_expiry_index(context)                                                   # so that the TTL sweeper finds the entry when it expires
         return self.build_response(context)                                                 # Build and return the response
 
     def initialize_context(self, context: Schema__Store__Context):                          # Initialize context with defaults and tracking structures
@@ -28,6 +37,7 @@ class Cache__Service__Store__With_Strategy(Type_Safe):
 
         context.all_paths = Schema__Cache__Store__Paths()                                    # Initialize path tracking with Type_Safe
         context.timestamp = timestamp_now()                                                  # Capture storage timestamp
+        context.expires_at = context.handler.expires_at(context.timestamp, context.ttl_hours)      # 0 when the entry doesn't expire
 
     def store_data(self, context: Schema__Store__Context):                                  # Store the actual data using the appropriate strategy and format
         fs_data = context.handler.get_fs_for_strategy(context.strategy)                      # Get filesystem for the selected strategy
@@ -41,6 +51,11 @@ class Cache__Service__Store__With_Strategy(Type_Safe):
                                                    file_key = context.cache_key)
             context.file_type = "json"
 
+        if self.use_content_dedup(context):
+            return self.store_data__dedup(context, file_fs)
+        if self.use_lean_data_files(context):
+            return self.store_data__lean(context, file_fs)
+
         with file_fs:                                                                         # Store data with metadata
             context.all_paths.data            = file_fs.create(context.storage_data)                     # Store directly to Type_Safe list
             context.file_paths.content_files  = file_fs.file_fs__paths().paths__content     ()
@@ -51,6 +66,61 @@ class Cache__Service__Store__With_Strategy(Type_Safe):
 
             context.file_size = file_fs.metadata().content__size
 
+    def use_lean_data_files(self, context: Schema__Store__Context) -> bool:                # temporal_versioned is excluded, since its versions are tracked in the Memory_FS sidecars
+        return context.handler.lean_data_files and context.strategy != 'temporal_versioned'
+
+    def store_data__lean(self, context : Schema__Store__Context,
+                               file_fs                         ):                           # Store only the content files (the metadata is embedded in the by-id refs, so the .config and .metadata sidecars are not needed)
+        storage       = context.handler.storage_backend
+        content_bytes = self.serialize_data(context.storage_data)
+        with file_fs:                                                                         # file_fs is only used to resolve the paths (nothing is saved via Memory_FS)
+            context.file_paths.content_files = file_fs.file_fs__paths().paths__content     ()
+            context.file_paths.data_folders  = file_fs.file_fs__paths().paths__data_folders()
+        for content_path in context.file_paths.content_files:
+            storage.file__save(content_path, content_bytes)
+        context.all_paths.data = [Safe_Str__File__Path(content_path) for content_path in context.file_paths.content_files]
+        context.metadata       = self.build_metadata(context)
+        context.file_size      = len(content_bytes)
+
+    def use_content_dedup(self, context: Schema__Store__Context) -> bool:                  # only the direct strategy (the other strategies' paths have meaning, like the cache_key or the 'latest' file)
+        handler = context.handler
+        return context.strategy == 'direct' and (handler.content_dedup or handler.use_shared_blob(context.storage_data))
+
+    def store_data__dedup(self, context : Schema__Store__Context,
+                                file_fs                         ):                          # Point to the existing content file when the same content is already stored (lean, since the shared content can't have per-entry sidecars)
+        storage       = context.handler.storage_backend
+        content_bytes = self.serialize_data(context.storage_data)
+        with file_fs:                                                                         # the entry's own paths (used when there is no copy of this content, and for its child data folders)
+            content_files                    = [str(path) for path in file_fs.file_fs__paths().paths__content()]
+            context.file_paths.data_folders  = file_fs.file_fs__paths().paths__data_folders()
+
+        context.shared_blob    = context.handler.use_shared_blob(context.storage_data)
+        dedup                  = context.handler.content_dedup_index__for(context.shared_blob)
+        context.content_digest = dedup.digest(content_bytes)
+        if context.shared_blob:                                                              # the copy goes to the cross-namespace blobs
+            content_files = [dedup.copy_path(context.content_digest, context.namespace, context.cache_id)]
+
+        def save_content():
+            for content_path in content_files:
+                storage.file__save(content_path, content_bytes)
+
+        shared_files                     = dedup.acquire(context.content_digest                                     ,
+                                                         context.handler.content_dedup_ref(context.cache_id, context.shared_blob),
+                                                         content_files                                              ,
+                                                         save_content                                               )
+        context.file_paths.content_files = shared_files
+        if not context.shared_blob:                                                          # only the files saved by this store, in the namespace (so that the stats count each copy once)
+            context.all_paths.data       = [Safe_Str__File__Path(path) for path in shared_files if path in content_files]
+        context.metadata                 = self.build_metadata(context)
+        context.file_size                = len(content_bytes)
+
+    def serialize_data(self, storage_data: Union[str, dict, bytes]) -> bytes:               # same serialization as Cache__Service__Update (strings are stored as json)
+        if type(storage_data) is bytes:
+            return storage_data
+        if type(storage_data) is dict:
+            return json_to_bytes(storage_data)
+        return str_to_bytes(json.dumps(storage_data))
+
     def build_metadata(self, context: Schema__Store__Context  # Build metadata Type_Safe object for the stored file
                         ) -> Schema__Cache__Store__Metadata:
         return Schema__Cache__Store__Metadata(cache_hash       = context.cache_hash       ,     # todo: refactor this assigment to make better use of the fact that Schema__Store__Context and Schema__Cache__Store__Metadata share a lot of the same variables
@@ -64,66 +134,89 @@ class Cache__Service__Store__With_Strategy(Type_Safe):
                                               namespace        = str(context.namespace)   ,
                                               file_type        = context.file_type        )
 
-    def update_hash_reference(self, context: Schema__Store__Context):                       # Update or create the hash-to-ID reference
-        file_id = Safe_Str__Id(context.cache_hash)                                          # Use hash as file ID for reference
+    def update_hash_reference(self, context: Schema__Store__Context):                       # Update or create the hash-to-ID reference (compare-and-swap, so concurrent stores of the same hash don't lose versions)
+        file_id  = Safe_Str__Id(context.cache_hash)                                         # Use hash as file ID for reference
+        refs_cas     = context.handler.refs_compare_and_swap()
+        refs_history = context.handler.hash_refs_history()
+        archived     = []
 
-        #with context.handler.fs__refs_hash.file__json__single(file_id) as ref_fs:
         with context.handler.fs__refs_hash.file__json__single(file_id) as ref_fs:
-            if ref_fs.exists():
-                self.update_existing_hash_reference(ref_fs, context)                       # Update existing reference
-            else:
-                self.create_new_hash_reference(ref_fs, context)                             # Create new reference
-
-    def update_existing_hash_reference(self, ref_fs,  # Update existing hash reference with new cache ID
-                                             context: Schema__Store__Context):
-        existing_data = ref_fs.content()                                                     # Get existing data as dict
-
-        # Convert to Type_Safe object
-        hash_ref = Schema__Cache__Hash__Reference.from_json(existing_data)
-
-        # Add new entry
+            paths_hash_to_id = ref_fs.paths()
+
+            def add_entry(existing_data):                                                   # called again (with the latest data) when another store changed the file
+                if existing_data:
+                    hash_ref = self.update_existing_hash_reference(existing_data, context)  # Update existing reference
+                else:
+                    hash_ref = self.create_new_hash_reference(context)                      # Create new reference
+                context.hash_reference_created = not existing_data
+                hash_ref_data = hash_ref.json()
+                archived[:]   = refs_history.overflow(hash_ref_data)                        # keep the inline list bounded (only computed here, since this is re-run on every conflict)
+                return hash_ref_data
+
+            refs_cas.update_json(paths_hash_to_id[0], add_entry)
+            refs_history.save_archived(context.cache_hash, archived)                        # older versions go to append-only segments (written once, after the refs were saved)
+            context.all_paths.by_hash = paths_hash_to_id                                    # Track paths
+
+    def update_existing_hash_reference(self, existing_data : dict,                         # Add the new cache ID to an existing hash reference
+                                             context       : Schema__Store__Context
+                                        ) -> Schema__Cache__Hash__Reference:
+        hash_ref  = Schema__Cache__Hash__Reference.from_json(existing_data)                 # Convert to Type_Safe object
         new_entry = Schema__Cache__Hash__Entry(cache_id  = str(context.cache_id),
                                                timestamp = context.timestamp     )
         hash_ref.cache_ids.append(new_entry)
         hash_ref.latest_id       = str(context.cache_id)
         hash_ref.total_versions += 1
+        return hash_ref
 
-        # Update and track paths
-        paths_hash_to_id          = ref_fs.update(file_data=hash_ref.json())
-        context.all_paths.by_hash = paths_hash_to_id
-
-    def create_new_hash_reference(self, ref_fs,  # Create a new hash reference structure
-                                        context: Schema__Store__Context):
-        # Build new reference with Type_Safe
+    def create_new_hash_reference(self, context: Schema__Store__Context                     # Create a new hash reference structure
+                                   ) -> Schema__Cache__Hash__Reference:
         hash_entry = Schema__Cache__Hash__Entry(cache_id  = str(context.cache_id),
                                                 timestamp = context.timestamp     )
 
-        hash_ref = Schema__Cache__Hash__Reference(cache_hash     = str(context.cache_hash),
-                                                  cache_ids      = [hash_entry]          ,
-                                                  latest_id      = str(context.cache_id) ,
-                                                  total_versions = 1                      )
-
-        # Create and track paths
-        paths_hash_to_id          = ref_fs.create(file_data=hash_ref.json())
-        context.all_paths.by_hash = paths_hash_to_id
+        return Schema__Cache__Hash__Reference(cache_hash     = str(context.cache_hash),
+                                              cache_ids      = [hash_entry]          ,
+                                              latest_id      = str(context.cache_id) ,
+                                              total_versions = 1                      )
 
     def create_file_refs(self, context: Schema__Store__Context):                         # Create the ID-to-hash reference with content paths
         file_id = Safe_Str__Id(str(context.cache_id))                                        # Use cache ID as file ID
 
         with context.handler.fs__refs_id.file__json__single(file_id) as ref_fs:
             context.all_paths.by_id = ref_fs.paths()                                         # Track paths
-
-            # Build complete reference with Type_Safe
-            id_reference = Schema__Cache__File__Refs(all_paths         = context.all_paths      ,
-                                                     cache_id          = context.cache_id       ,
-                                                     cache_hash        = context.cache_hash     ,
-                                                     file_paths        = context.file_paths     ,
-                                                     namespace         = context.namespace      ,
-                                                     strategy          = context.strategy       ,
-                                                     file_type         = context.file_type      ,
-                                                     timestamp         = context.timestamp      )
-
-            ref_fs.create(id_reference.json())                                               # Store as JSON
+            ref_fs.create(self.build_file_refs(context).json())                              # Store as JSON
+
+    def build_file_refs(self, context: Schema__Store__Context                                # Build complete reference with Type_Safe (including the content details, so that retrieve only needs this file and the content file)
+                         ) -> Schema__Cache__File__Refs__Extended:
+        return Schema__Cache__File__Refs__Extended(all_paths         = context.all_paths      ,
+                                                   cache_id          = context.cache_id       ,
+                                                   cache_hash        = context.cache_hash     ,
+                                                   content_size      = context.file_size      ,
+                                                   file_paths        = context.file_paths     ,
+                                                   metadata          = context.metadata       ,
+                                                   namespace         = context.namespace      ,
+                                                   strategy          = context.strategy       ,
+                                                   file_type         = context.file_type      ,
+                                                   timestamp         = context.timestamp      ,
+                                                   content_digest    = context.content_digest ,
+                                                   shared_blob       = context.shared_blob    ,
+                                                   expires_at        = context.expires_at     )
+
+    def add_to_expiry_index(self, context: Schema__Store__Context):
+        if context.expires_at:
+            context.handler.expiry_index().add(context.cache_id, context.expires_at)
+
+    def queue_refs(self, context: Schema__Store__Context):                                  # Write-behind: only the paths are resolved here, the refs files are saved by the next flush
+        with context.handler.fs__refs_hash.file__json__single(Safe_Str__Id(context.cache_hash)) as ref_fs:
+            context.all_paths.by_hash = ref_fs.paths()
+        with context.handler.fs__refs_id.file__json__single(Safe_Str__Id(str(context.cache_id))) as ref_fs:
+            context.all_paths.by_id = ref_fs.paths()
+        hash_entry = Schema__Cache__Hash__Entry(cache_id  = str(context.cache_id),
+                                                timestamp = context.timestamp     )
+        self.refs_write_behind.add(handler      = context.handler                    ,
+                                   cache_id     = str(context.cache_id)              ,
+                                   cache_hash   = str(context.cache_hash)            ,
+                                   refs_id_data = self.build_file_refs(context).json(),
+                                   hash_entry   = hash_entry.json()                  )
 
     def build_response(self, context: Schema__Store__Context  # Build the final response object
                         ) -> Schema__Cache__Store__Response:
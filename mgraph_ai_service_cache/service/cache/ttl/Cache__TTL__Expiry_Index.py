@@ -0,0 +1,113 @@
+from datetime                                                                           import datetime, timezone
+from typing                                                                             import Iterator, List, Optional, Tuple
+from memory_fs.storage_fs.Storage_FS                                                    import Storage_FS
+from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
+from osbot_utils.utils.Http                                                             import url_join_safe
+from osbot_utils.utils.Json                                                             import json_to_bytes, bytes_to_json
+from mgraph_ai_service_cache.service.storage.Storage_FS__Listing                       import Storage_FS__Listing
+
+CACHE__TTL__EXPIRY_INDEX__PREFIX_PATH = 'index/expiry'                              # per namespace (i.e. {namespace}/index/expiry/{yyyy}/{mm}/{dd}/{hh}/{cache_id}.json)
+CACHE__TTL__EXPIRY_INDEX__BUCKET_MS   = 3_600_000                                   # one bucket per hour (UTC)
+CACHE__TTL__EXPIRY_INDEX__CURSOR_FILE = 'cursor.json'                               # where the sweeper is up to (so that only the past-due buckets are listed)
+
+
+class Cache__TTL__Expiry_Index(Type_Safe):                                          # Time-bucketed index of the entries with a TTL, so that the expired entries are found without listing the refs
+    storage_fs : Storage_FS = None
+    namespace  : str        = ''
+
+    def index_folder(self) -> str:
+        return url_join_safe(str(self.namespace), CACHE__TTL__EXPIRY_INDEX__PREFIX_PATH)
+
+    def bucket_start(self, timestamp: int) -> int:                                  # start (ms) of the hour bucket that timestamp is in
+        return int(timestamp) - int(timestamp) % CACHE__TTL__EXPIRY_INDEX__BUCKET_MS
+
+    def bucket_folder(self, expires_at: int) -> str:
+        bucket = datetime.fromtimestamp(int(expires_at) / 1000, tz=timezone.utc).strftime('%Y/%m/%d/%H')
+        return f'{self.index_folder()}/{bucket}'
+
+    def marker_path(self, cache_id  : str,
+                          expires_at: int
+                     ) -> str:
+        return f'{self.bucket_folder(expires_at)}/{cache_id}.json'
+
+    def add(self, cache_id  : str,
+                  expires_at: int
+             ) -> str:                                                              # Add the entry to its expiry bucket (returns the marker path)
+        marker_path = self.marker_path(cache_id, expires_at)
+        self.storage_fs.file__save(marker_path, json_to_bytes(dict(cache_id=str(cache_id), expires_at=int(expires_at))))
+        return marker_path
+
+    def parse_marker(self, path: str) -> Tuple[str, int]:                           # marker path -> (cache_id, start of its bucket), ('', 0) for other paths
+        parts = path[len(self.index_folder()) + 1:].split('/')
+        if len(parts) != 5 or not parts[4].endswith('.json'):
+            return '', 0
+        try:
+            bucket = datetime(int(parts[0]), int(parts[1]), int(parts[2]), int(parts[3]), tzinfo=timezone.utc)
+        except ValueError:
+            return '', 0
+        return parts[4][:-len('.json')], int(bucket.timestamp() * 1000)
+
+    def last_ended_bucket(self, now: int) -> int:                                   # start of the newest bucket that ended before now
+        return self.bucket_start(now) - CACHE__TTL__EXPIRY_INDEX__BUCKET_MS
+
+    def bucket_markers(self, bucket_start: int) -> List[Tuple[str, str]]:           # (marker path, cache_id) of one bucket (a single folder listing)
+        markers = []
+        for path in sorted(Storage_FS__Listing(storage_fs=self.storage_fs).files(self.bucket_folder(bucket_start))):
+            cache_id, _ = self.parse_marker(path)
+            if cache_id:
+                markers.append((path, cache_id))
+        return markers
+
+    def due_buckets(self, now      : int       ,
+                          swept_to : int = None
+                     ) -> Iterator[int]:                                            # starts of the buckets that ended before now and haven't been swept, i.e. after the swept_to cursor (oldest first)
+        last_ended = self.last_ended_bucket(now)
+        if swept_to is None:                                                        # first sweep (or index written before the cursor), so the buckets come from one listing of the index
+            bucket_starts = set()
+            for path in Storage_FS__Listing(storage_fs=self.storage_fs).files(self.index_folder()):
+                cache_id, bucket_start = self.parse_marker(path)
+                if cache_id and bucket_start <= last_ended:
+                    bucket_starts.add(bucket_start)
+            yield from sorted(bucket_starts)
+            return
+        yield from range(swept_to, last_ended + 1, CACHE__TTL__EXPIRY_INDEX__BUCKET_MS)     # only the past-due buckets are listed (new markers are never added to them, since a TTL is at least one hour)
+
+    def due(self, now: int) -> Iterator[Tuple[str, str]]:                           # (marker path, cache_id) of the markers in the buckets that ended before now (oldest first)
+        for bucket_start in self.due_buckets(now, self.swept_to()):
+            yield from self.bucket_markers(bucket_start)
+
+    # ---- sweep cursor ----
+
+    def cursor_path(self) -> str:
+        return f'{self.index_folder()}/{CACHE__TTL__EXPIRY_INDEX__CURSOR_FILE}'
+
+    def swept_to(self) -> Optional[int]:                                            # start of the oldest bucket that still needs to be swept (None when there is no cursor)
+        cursor_bytes = self.storage_fs.file__bytes(self.cursor_path())
+        if not cursor_bytes:
+            return None
+        return int(bytes_to_json(cursor_bytes).get('swept_to') or 0)
+
+    def save_swept_to(self, bucket_start: int) -> bool:                             # all the buckets before bucket_start have been swept
+        return self.storage_fs.file__save(self.cursor_path(), json_to_bytes(dict(swept_to=int(bucket_start))))
+
+    # ---- maintenance (so that the markers of deleted or refreshed entries don't need to be checked by the sweeper) ----
+
+    def remove(self, marker_path: str) -> bool:
+        return self.storage_fs.file__delete(marker_path)
+
+    def remove_entry(self, cache_id  : str,
+                           expires_at: int
+                      ) -> bool:
+        if not expires_at:
+            return False
+        return self.remove(self.marker_path(cache_id, expires_at))
+
+    def move_entry(self, cache_id       : str,
+                         old_expires_at : int,
+                         new_expires_at : int
+                    ) -> str:                                                       # TTL refresh (returns the new marker path, '' when the entry doesn't expire anymore)
+        if old_expires_at and self.marker_path(cache_id, old_expires_at) != self.marker_path(cache_id, new_expires_at or 0):
+            self.remove_entry(cache_id, old_expires_at)
+        if new_expires_at:
+            return self.add(cache_id, new_expires_at)
+        return ''
@@ -0,0 +1,107 @@
+import logging
+import threading
+from typing                                                                             import Any, Callable, Dict, List
+from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
+from osbot_utils.utils.Misc                                                             import timestamp_now
+from mgraph_ai_service_cache.service.cache.Cache__Handler                              import Cache__Handler
+from mgraph_ai_service_cache.service.cache.ttl.Cache__TTL__Expiry_Index                import Cache__TTL__Expiry_Index, CACHE__TTL__EXPIRY_INDEX__BUCKET_MS
+
+CACHE__TTL__SWEEPER__BATCH_SIZE = 1000                                              # max entries checked per namespace in each sweep
+
+
+class Cache__TTL__Sweeper(Type_Safe):                                               # Deletes the expired entries, walking the past-due buckets of each namespace's expiry index
+    refs_data     : Any = None                                                      # callable (cache_id, namespace) -> by-id refs data (i.e. Cache__Service.retrieve_by_id__refs_data)
+    delete_by_id  : Any = None                                                      # callable (cache_id, namespace) (i.e. Cache__Service.delete_by_id)
+    sweep_seconds : int = 0                                                         # interval of the background sweep (0 = disabled)
+    batch_size    : int = CACHE__TTL__SWEEPER__BATCH_SIZE
+    sweep_errors  : int = 0                                                         # failed background sweeps (of one namespace)
+    sweeper       : Any = None                                                      # background sweep thread
+    sweeper_stop  : Any = None                                                      # threading.Event used to stop the sweeper
+
+    def sweep_namespace(self, handler    : Cache__Handler,
+                              now        : int = None    ,
+                              batch_size : int = None
+                         ) -> Dict[str, int]:                                       # Delete (up to batch_size) expired entries of the handler's namespace
+        now          = now        or timestamp_now()
+        batch_size   = batch_size or self.batch_size
+        namespace    = handler.namespace
+        expiry_index = handler.expiry_index()
+        result       = dict(checked=0, expired=0, stale=0)
+        previous     = expiry_index.swept_to()
+        swept_to     = previous
+        complete     = True
+        for bucket_start in expiry_index.due_buckets(now, previous):                # only the past-due buckets are listed
+            markers   = expiry_index.bucket_markers(bucket_start)
+            remaining = batch_size - result['checked']
+            for marker_path, cache_id in markers[:remaining]:
+                self.sweep_marker(expiry_index, marker_path, cache_id, namespace, now, result)
+            if len(markers) > remaining:                                            # the rest of this bucket is picked up by the next sweep
+                complete = False
+                break
+            swept_to = bucket_start + CACHE__TTL__EXPIRY_INDEX__BUCKET_MS
+        if complete:                                                                # the (empty) buckets after the last marker are done too
+            swept_to = expiry_index.last_ended_bucket(now) + CACHE__TTL__EXPIRY_INDEX__BUCKET_MS
+        if swept_to != previous:
+            expiry_index.save_swept_to(swept_to)
+        return result
+
+    def sweep_marker(self, expiry_index : Cache__TTL__Expiry_Index,
+                           marker_path  : str                     ,
+                           cache_id     : str                     ,
+                           namespace    : str                     ,
+                           now          : int                     ,
+                           result       : Dict[str, int]
+                      ):                                                            # Delete the marker's entry (when it has expired) and the marker
+        result['checked'] += 1
+        refs_data  = self.refs_data(cache_id, namespace) or {}
+        expires_at = refs_data.get('expires_at') or 0
+        if 0 < expires_at <= now:
+            self.delete_by_id(cache_id, namespace)                                  # also removes the marker
+            result['expired'] += 1
+        else:                                                                       # already deleted, or its TTL was changed (which moved the marker)
+            result['stale'] += 1
+        expiry_index.remove(marker_path)
+
+    def sweep(self, handlers: List[Cache__Handler],
+                    now     : int = None
+               ) -> Dict[str, Dict[str, int]]:                                      # Sweep all the namespaces (namespace -> results)
+        now = now or timestamp_now()
+        return { handler.namespace : self.sweep_namespace(handler, now) for handler in handlers }
+
+    def start(self, handlers: Callable[[], List[Cache__Handler]]) -> bool:          # Sweep all namespaces every sweep_seconds (in a daemon thread)
+        if self.sweep_seconds <= 0 or self.sweeper is not None:
+            return False
+        self.sweeper_stop = threading.Event()
+
+        def run():
+            while not self.sweeper_stop.wait(self.sweep_seconds):
+                self.background_sweep(handlers)
+
+        self.sweeper = threading.Thread(target=run, name='cache-ttl-sweeper', daemon=True)
+        self.sweeper.start()
+        return True
+
+    def background_sweep(self, handlers: Callable[[], List[Cache__Handler]]) -> int:   # Sweep all namespaces, logging (and counting) the failures instead of stopping the sweeper
+        errors = 0
+        try:
+            namespaces = handlers()                                                 # all namespaces (per-store TTLs apply even when the namespace has no default TTL)
+        except Exception:
+            namespaces = []
+            errors    += 1
+            logging.getLogger(__name__).exception('failed to list the namespaces to sweep')
+        for handler in namespaces:
+            try:
+                self.sweep_namespace(handler)
+            except Exception:                                                       # keep sweeping the other namespaces (the markers are checked again in the next run)
+                errors += 1
+                logging.getLogger(__name__).exception(f'failed to sweep the expired entries of namespace {handler.namespace}')
+        self.sweep_errors += errors
+        return errors
+
+    def stop(self) -> bool:
+        if self.sweeper is None:
+            return False
+        self.sweeper_stop.set()
+        self.sweeper.join()
+        self.sweeper = None
+        return True
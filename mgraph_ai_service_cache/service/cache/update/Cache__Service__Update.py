@@ -1,40 +1,68 @@
 import json
-from typing import Any, Union
+from typing import Any, List, Union
 from osbot_utils.utils.Json                                                                      import json_to_bytes
-from osbot_utils.utils.Misc                                                                      import str_to_bytes
+from osbot_utils.utils.Misc                                                                      import str_to_bytes, timestamp_now
+from osbot_utils.type_safe.primitives.core.Safe_UInt                                             import Safe_UInt
+from osbot_utils.decorators.methods.cache_on_self                                                import cache_on_self
 from memory_fs.schemas.Schema__Memory_FS__File__Config                                           import Schema__Memory_FS__File__Config
 from osbot_utils.type_safe.Type_Safe                                                             import Type_Safe
 from osbot_utils.type_safe.primitives.domains.identifiers.Cache_Id                               import Cache_Id
 from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id                  import Safe_Str__Id
 from osbot_utils.type_safe.primitives.domains.cryptography.safe_str.Safe_Str__Cache_Hash         import Safe_Str__Cache_Hash
 from osbot_utils.type_safe.type_safe_core.decorators.type_safe                                   import type_safe
+from mgraph_ai_service_cache.service.cache.Cache__Handler                                        import Cache__Handler
 from mgraph_ai_service_cache.service.cache.Cache__Service                                        import Cache__Service
+from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Index                        import Cache__Service__Zip__Index
 from mgraph_ai_service_cache_client.schemas.cache.Schema__Cache__Update__Response                import Schema__Cache__Update__Response
-from mgraph_ai_service_cache_client.schemas.cache.file.Schema__Cache__File__Refs                 import Schema__Cache__File__Refs
+from mgraph_ai_service_cache.schemas.cache.file.Schema__Cache__File__Refs__Extended              import Schema__Cache__File__Refs__Extended
 
 
 class Cache__Service__Update(Type_Safe):                                            # Service layer for updating existing cache entries
     cache_service : Cache__Service                                                  # Underlying cache service instance
 
+    @cache_on_self
+    def zip_index(self) -> Cache__Service__Zip__Index:                              # the zip index (of binary entries) is only valid for the content it was built from
+        return Cache__Service__Zip__Index(cache_service=self.cache_service)
+
     @type_safe
     def update_by_id(self,
                      cache_id  : Cache_Id               ,
                      namespace : Safe_Str__Id           ,
                      data      : Union[str, dict, bytes],
-                ) -> Schema__Cache__Update__Response:                                # Update existing cache entry (hash-stable only, V1 limitation)
+                     ttl_hours : Safe_UInt              = None
+                ) -> Schema__Cache__Update__Response:                                # Update existing cache entry (hash-stable only, V1 limitation), ttl_hours refreshes its TTL (from now, 0 = never expires)
 
         existing_refs = self._load_existing_refs(cache_id  = cache_id  ,            # Load existing refs (1 S3 read)
                                                   namespace = namespace )
         if not existing_refs:                                                       # Entry doesn't exist
             return None
+        if self.cache_service.is_expired(existing_refs.json()):                     # Entry has expired (and is waiting for the TTL sweeper)
+            return None
 
         paths_to_update = existing_refs.file_paths.content_files
+        refs_data       = existing_refs.json()                                      # changes to the by-id refs (saved once, below)
         with self.cache_service.get_or_create_handler(namespace) as handler:        # Get direct storage access
             storage       = handler.storage_backend                                 # Direct storage backend
             serialized    = self._serialize_data(data)                              # Serialize new data
 
-            for content_path in paths_to_update:                                    # Update each content file (N S3 writes)
-                storage.file__save(content_path, serialized)
+            if existing_refs.content_digest:                                        # the content file is shared with other entries (content dedup), so this entry gets its own copy
+                paths_to_update = self._detach_shared_content(handler, cache_id, namespace, existing_refs, serialized, refs_data)
+            else:
+                for content_path in paths_to_update:                                # Update each content file (N S3 writes)
+                    storage.file__save(content_path, serialized)
+            if existing_refs.file_type == 'binary':                                 # a zip's saved index is for the previous content
+                self.zip_index().invalidate(namespace, refs_data)
+            refs_data['content_size'] = len(serialized)                             # so that the next update (and the stats' reconcile) use the new size
+            updated_id_ref = ttl_hours is not None
+            if updated_id_ref:
+                self._refresh_ttl(handler, cache_id, ttl_hours, refs_data)
+            if refs_data != existing_refs.json():                                   # (1 S3 write, only when the size, paths or TTL changed)
+                with handler.fs__refs_id.file__json__single(Safe_Str__Id(str(cache_id))) as ref_fs:
+                    ref_fs.create(refs_data)
+
+        self.cache_service.hot_cache().invalidate__cache_id(namespace, cache_id)    # drop any in-process copy of the previous content
+        self.cache_service.namespace_stats().record_update(namespace     = namespace                                         ,
+                                                          content_bytes = len(serialized) - (existing_refs.content_size or 0))
 
         return Schema__Cache__Update__Response(cache_id         = cache_id                        ,
                                                cache_hash       = existing_refs.cache_hash        ,  # V1: hash unchanged
@@ -44,7 +72,61 @@ class Cache__Service__Update(Type_Safe):
                                                updated_content  = True                            ,  # V1: content always updated
                                                updated_hash     = False                           ,  # V1: hash never updated
                                                updated_metadata = False                           ,  # V1: metadata never updated
-                                               updated_id_ref   = False                           )  # V1: ID ref never updated
+                                               updated_id_ref   = updated_id_ref                  )  # V1: ID ref pointers only updated on TTL refresh (its content_size is always kept in sync)
+
+    def _detach_shared_content(self, handler       : Cache__Handler                      ,
+                                     cache_id      : Cache_Id                            ,
+                                     namespace     : Safe_Str__Id                        ,
+                                     existing_refs : Schema__Cache__File__Refs__Extended ,
+                                     serialized    : bytes                               ,
+                                     refs_data     : dict
+                                ) -> List[str]:                                     # Copy-on-write: save the new content in the entry's own files and release the shared ones (refs_data is changed to point to them)
+        shared_blob  = existing_refs.shared_blob
+        shared_files = handler.content_dedup_index__for(shared_blob).release(existing_refs.content_digest                 ,
+                                                                             handler.content_dedup_ref(cache_id, shared_blob))     # not empty when this was the last entry using them
+        if shared_files and not shared_blob:                                        # last entry using the namespace's copy, so it becomes this entry's own (saved in place)
+            own_files   = shared_files
+            files_added = 0
+        else:                                                                       # the other entries still use the shared copy, so it is never written to
+            own_files = self._content_paths(handler, existing_refs, str(cache_id))
+            if set(own_files) & set(str(path) for path in existing_refs.file_paths.content_files):   # this entry stored the shared copy (at its own paths)
+                own_files = self._content_paths(handler, existing_refs, f'{cache_id}-{timestamp_now()}')
+            files_added = len(own_files)
+        for content_path in own_files:
+            handler.storage_backend.file__save(content_path, serialized)
+        for content_path in shared_files:                                           # the released shared blob (the namespace's copies are kept in place, see above)
+            if content_path not in own_files:
+                handler.storage_backend.file__delete(content_path)
+
+        refs_data['file_paths']['content_files'] = own_files
+        refs_data['all_paths' ]['data'         ] = own_files
+        refs_data['content_digest'             ] = None
+        refs_data['shared_blob'                ] = False
+        self.cache_service.namespace_stats().change(namespace, direct_files=files_added)
+        return own_files
+
+    def _content_paths(self, handler       : Cache__Handler                      ,
+                             existing_refs : Schema__Cache__File__Refs__Extended ,
+                             file_id       : str
+                        ) -> List[str]:                                             # content file paths (in the direct strategy) for file_id
+        fs_data = handler.fs__data_direct
+        if existing_refs.file_type == 'binary':
+            file_fs = fs_data.file__binary(file_id=Safe_Str__Id(file_id))
+        else:
+            file_fs = fs_data.file__json  (file_id=Safe_Str__Id(file_id))
+        return [str(path) for path in file_fs.file_fs__paths().paths__content()]
+
+    def _refresh_ttl(self, handler   : Cache__Handler,
+                           cache_id  : Cache_Id      ,
+                           ttl_hours : int           ,
+                           refs_data : dict
+                      ) -> int:                                                     # Set a new expires_at in refs_data (and move the entry in the expiry index)
+        old_expires_at = refs_data.get('expires_at') or 0
+        new_expires_at = handler.expires_at(timestamp_now(), ttl_hours)
+        refs_data['expires_at'] = new_expires_at
+        handler.expiry_index().move_entry(cache_id, old_expires_at, new_expires_at)
+        return new_expires_at
+
     @type_safe
     def _load_existing_config(self,
                               cache_id  : Cache_Id      ,
@@ -60,7 +142,7 @@ class Cache__Service__Update(Type_Safe):
     def _load_existing_refs(self,
                               cache_id  : Cache_Id      ,
                               namespace : Safe_Str__Id
-                         ) -> Schema__Cache__File__Refs:            # Retrieve existing entry's refs
+                         ) -> Schema__Cache__File__Refs__Extended:  # Retrieve existing entry's refs
 
         refs = self.cache_service.retrieve_by_id__refs(cache_id  = cache_id  ,
                                                          namespace = namespace )
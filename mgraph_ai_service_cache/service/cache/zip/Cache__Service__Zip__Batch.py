@@ -1,14 +1,12 @@
-import fnmatch
-import io
-import zipfile
 from typing                                                                                 import List, Tuple, Optional, Any
+from osbot_utils.decorators.methods.cache_on_self                                          import cache_on_self
 from osbot_utils.type_safe.Type_Safe                                                        import Type_Safe
 from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                       import Random_Guid
 from osbot_utils.type_safe.type_safe_core.decorators.type_safe                              import type_safe
 from osbot_utils.type_safe.primitives.domains.identifiers.Cache_Id                          import Cache_Id
-from osbot_utils.utils.Zip                                                                  import (zip_bytes__file_list, zip_bytes__add_file,
-                                                                                                    zip_bytes__remove_files, zip_bytes__replace_file)
 from mgraph_ai_service_cache.service.cache.Cache__Service                                   import Cache__Service
+from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Batch__Plan             import Cache__Service__Zip__Batch__Plan
+from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Index                   import Cache__Service__Zip__Index
 from mgraph_ai_service_cache_client.schemas.cache.zip.Schema__Cache__Zip__Batch__Request    import Schema__Cache__Zip__Batch__Request, Schema__Zip__Batch__Operation
 from mgraph_ai_service_cache_client.schemas.cache.zip.Schema__Cache__Zip__Batch__Response   import Schema__Cache__Zip__Batch__Response, Schema__Zip__Operation__Result
 
@@ -16,6 +14,10 @@ from mgraph_ai_service_cache_client.schemas.cache.zip.Schema__Cache__Zip__Batch_
 class Cache__Service__Zip__Batch(Type_Safe):                                             # Service layer for batch zip operations
     cache_service : Cache__Service                                                       # Underlying cache service
 
+    @cache_on_self
+    def zip_index(self) -> Cache__Service__Zip__Index:                                   # Central directory of the stored zips
+        return Cache__Service__Zip__Index(cache_service=self.cache_service)
+
     @type_safe
     def perform_batch(self, request: Schema__Cache__Zip__Batch__Request
                       ) -> Any:
@@ -29,7 +31,8 @@ class Cache__Service__Zip__Batch(Type_Safe):
                                                        original_cache_id    = request.cache_id              ,
                                                        error_message        = "Zip file not found in cache" )
 
-        working_zip        = original_zip                                                # Start with original
+        plan               = Cache__Service__Zip__Batch__Plan(zip_bytes=original_zip).setup()     # the operations are resolved against the central directory (the zip is only written once, at the end)
+        working_zip        = original_zip
         results            = []                                                          # Track individual results
         files_added        = []
         files_removed      = []
@@ -39,10 +42,9 @@ class Cache__Service__Zip__Batch(Type_Safe):
 
         for operation in request.operations:                                             # Process each operation
             try:
-                success, modified_zip, affected_files = self.apply_operation(working_zip, operation)        # todo: replace the return value with a Type_Safe class
+                success, affected_files = self.apply_operation(plan, operation)          # todo: replace the return value with a Type_Safe class
 
                 if success:
-                    working_zip = modified_zip                                           # Update working copy
                     operations_applied += 1
 
                     if operation.action == "add":                                        # Track changes
@@ -82,17 +84,20 @@ class Cache__Service__Zip__Batch(Type_Safe):
         # Create single new cache entry for all successful operations
         new_cache_id = None
         if operations_applied > 0:
+            working_zip = plan.write()                                                   # one rewrite for the whole batch (the unchanged members are copied without recompression)
             # metadata = { "parent_id"         : str(request.cache_id)       ,
             #              "operations_count"  : operations_applied          ,
             #              "batch_operation"   : True                        ,
             #              "operations"        : [r.obj() for r in results if r.success]}
-            new_cache_id = self.create_modified_zip(original_id = request.cache_id      ,
-                                                    namespace   = request.namespace     ,
-                                                    zip_bytes   = working_zip           ,
+            source_hashes = self.zip_index().source_hashes(request.cache_id, request.namespace, original_zip)
+            new_cache_id = self.create_modified_zip(original_id   = request.cache_id                   ,
+                                                    namespace     = request.namespace                  ,
+                                                    zip_bytes     = working_zip                        ,
+                                                    member_hashes = plan.member_hashes(source_hashes)  ,     # only the added/replaced content is hashed
                                                     #metadata    = metadata                         # todo: fix, clashing with Schema__Cache__Store__Metadata
                                                     )
 
-        final_file_list = zip_bytes__file_list(working_zip)                              # Get final stats
+        final_file_list = plan.file_list()                                               # Get final stats
 
         return Schema__Cache__Zip__Batch__Response(success              = operations_failed == 0                   ,
                                                    cache_id             = new_cache_id or request.cache_id        ,  # New ID if changes made
@@ -113,10 +118,11 @@ class Cache__Service__Zip__Batch(Type_Safe):
             return result.get('data')
         return None
 
-    def create_modified_zip(self, original_id : Cache_Id    ,
-                                  namespace   : str          ,
-                                  zip_bytes   : bytes        ,
-                                  metadata    : dict = None
+    def create_modified_zip(self, original_id   : Cache_Id                              ,
+                                  namespace     : str                                   ,
+                                  zip_bytes     : bytes                                 ,
+                                  metadata      : dict                            = None,
+                                  member_hashes : Optional[List[Tuple[str, str]]] = None                 # (file_name, content hash) of zip_bytes' members, saved in its index (computed when not provided)
                            ) -> Optional[Cache_Id   ]:                                   # Create new immutable cache entry
         cache_hash = self.cache_service.hash_from_bytes(zip_bytes)
 
@@ -130,62 +136,16 @@ class Cache__Service__Zip__Batch(Type_Safe):
                                                         namespace    = namespace                ,
                                                         strategy     = original_strategy        ,  # Preserve original's strategy
                                                         metadata     = metadata                 )   # Include batch metadata
+        if not result:
+            return None
+        member_hashes = [member_hash for _, member_hash in member_hashes] if member_hashes is not None else None
+        self.zip_index().save_for_bytes(result.cache_id, namespace, zip_bytes, member_hashes)
+        return result.cache_id
 
-        return result.cache_id if result else None
-
-    def apply_operation(self, zip_bytes: bytes,
+    def apply_operation(self, plan     : Cache__Service__Zip__Batch__Plan,
                               operation: Schema__Zip__Batch__Operation
-                         ) -> Tuple[bool, bytes, List[str]]:                             # Apply single operation
-
-        if operation.condition != "always":                                              # Check conditions
-            file_list   = zip_bytes__file_list(zip_bytes)
-            file_exists = str(operation.path) in file_list
-
-            if operation.condition == "if_exists" and not file_exists:
-                return True, zip_bytes, []                                               # Skip - condition not met
-            if operation.condition == "if_not_exists" and file_exists:
-                return True, zip_bytes, []                                               # Skip - condition not met
-
-        if operation.action == "add":                                                    # Execute operation
-            if not operation.content:
-                raise ValueError(f"Content required for add operation on {operation.path}")
-            new_zip = zip_bytes__add_file(zip_bytes, str(operation.path), operation.content)
-            return True, new_zip, [operation.path]
-
-        elif operation.action == "remove":
-            if operation.pattern:                                                        # Pattern-based removal
-                files_to_remove = self.match_pattern(zip_bytes, operation.pattern)
-                new_zip = zip_bytes__remove_files(zip_bytes, files_to_remove)
-                success = zip_bytes != new_zip                                           # was any file removed
-                return success, new_zip, files_to_remove
-            else:
-                new_zip = zip_bytes__remove_files(zip_bytes, [str(operation.path)])
-                success = zip_bytes != new_zip                                           # was any file removed
-                return success, new_zip, [operation.path]
-
-        elif operation.action == "replace":
-            if not operation.content:
-                raise ValueError(f"Content required for replace operation on {operation.path}")
-            new_zip = zip_bytes__replace_file(zip_bytes, str(operation.path), operation.content)
-            return True, new_zip, [operation.path]
-
-        elif operation.action in ["rename", "move"]:
-            if not operation.new_path:
-                raise ValueError(f"new_path required for {operation.action} operation")
-            # Extract, remove old, add with new name
-
-            with zipfile.ZipFile(io.BytesIO(zip_bytes), 'r') as zf:                         # todo: we should be using OSBot-Utils here
-                content = zf.read(str(operation.path))
-            new_zip = zip_bytes__remove_files(zip_bytes, [str(operation.path)])
-            new_zip = zip_bytes__add_file(new_zip, str(operation.new_path), content)
-            return True, new_zip, [operation.path, operation.new_path]
-
-        else:
-            raise ValueError(f"Unknown action: {operation.action}")
-
-    def match_pattern(self, zip_bytes: bytes, pattern: str) -> List[str]:                # Match files by pattern
-        file_list = zip_bytes__file_list(zip_bytes)
-        return [f for f in file_list if fnmatch.fnmatch(f, str(pattern))]
+                         ) -> Tuple[bool, List[str]]:                                    # Apply single operation (to the plan)
+        return plan.apply(operation)
 
     def rollback_batch(self, request, ops_applied, ops_failed,
                       results, error_msg) -> Schema__Cache__Zip__Batch__Response:        # Build rollback response
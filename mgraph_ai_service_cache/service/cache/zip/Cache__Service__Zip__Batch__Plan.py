@@ -0,0 +1,119 @@
+import fnmatch
+import io
+import zipfile
+from typing                                                                                 import Dict, List, Optional, Tuple
+from osbot_utils.type_safe.Type_Safe                                                        import Type_Safe
+from mgraph_ai_service_cache_client.schemas.cache.zip.Schema__Cache__Zip__Batch__Request    import Schema__Zip__Batch__Operation
+from mgraph_ai_service_cache.utils.for_osbot_utils.Zip                                      import (zip_bytes__rewrite, zip_bytes__members, zip_member__new,
+                                                                                                   zip_member__content_hash, zip_members__content_hash)
+
+
+class Cache__Service__Zip__Batch__Plan(Type_Safe):                                       # Resolves a batch's operations against the zip's central directory, so that the new zip is written once (see write)
+    zip_bytes : bytes                                                                    # the original zip (its members are copied without recompression)
+    members   : list                                                                     # [(file_name, ZipInfo of an original member or new content bytes)] in the new zip's order
+
+    def setup(self) -> 'Cache__Service__Zip__Batch__Plan':
+        self.members = zip_bytes__members(self.zip_bytes)                                # only the central directory is read
+        return self
+
+    def file_list(self) -> List[str]:                                                    # same as zip_bytes__file_list of the zip that write() returns
+        return sorted(file_name for file_name, _ in self.members)
+
+    def exists(self, file_name: str) -> bool:
+        return any(name == file_name for name, _ in self.members)
+
+    def match_pattern(self, pattern: str) -> List[str]:
+        return [file_name for file_name in self.file_list() if fnmatch.fnmatch(file_name, str(pattern))]
+
+    def source(self, file_name: str):                                                    # the member that is read for file_name (the last one, like zipfile)
+        for name, source in reversed(self.members):
+            if name == file_name:
+                return source
+        return None
+
+    # ---- operations (on the plan, nothing is written) ----
+
+    def add(self, file_name: str, content: bytes):                                       # like zip_bytes__add_file (appended, so an existing name is duplicated)
+        new_member = zip_member__new(file_name, content)
+        if new_member:
+            self.members.append(new_member)
+
+    def remove(self, file_names: List[str]) -> bool:                                     # True when any member was removed
+        file_names   = set(file_names)
+        members      = [(name, source) for name, source in self.members if name not in file_names]
+        removed      = len(members) != len(self.members)
+        self.members = members
+        return removed
+
+    def replace(self, file_name: str, content: bytes):
+        self.remove([file_name])
+        self.add(file_name, content)
+
+    def rename(self, file_name: str, new_file_name: str):                                # the member's compressed data is kept (only its local header is rebuilt)
+        source = self.source(file_name)
+        if source is None:
+            raise KeyError(f"There is no item named '{file_name}' in the archive")
+        self.remove([file_name])
+        self.members.append((new_file_name.lstrip('/\\'), source))
+
+    def apply(self, operation: Schema__Zip__Batch__Operation) -> Tuple[bool, List[str]]:  # (success, affected files) of one operation
+        path = str(operation.path)
+        if operation.condition != "always":                                              # Check conditions
+            file_exists = self.exists(path)
+            if operation.condition == "if_exists" and not file_exists:
+                return True, []                                                          # Skip - condition not met
+            if operation.condition == "if_not_exists" and file_exists:
+                return True, []                                                          # Skip - condition not met
+
+        if operation.action == "add":
+            if not operation.content:
+                raise ValueError(f"Content required for add operation on {operation.path}")
+            self.add(path, operation.content)
+            return True, [operation.path]
+
+        elif operation.action == "remove":
+            if operation.pattern:                                                        # Pattern-based removal
+                files_to_remove = self.match_pattern(operation.pattern)
+                return self.remove(files_to_remove), files_to_remove
+            return self.remove([path]), [operation.path]
+
+        elif operation.action == "replace":
+            if not operation.content:
+                raise ValueError(f"Content required for replace operation on {operation.path}")
+            self.replace(path, operation.content)
+            return True, [operation.path]
+
+        elif operation.action in ["rename", "move"]:
+            if not operation.new_path:
+                raise ValueError(f"new_path required for {operation.action} operation")
+            self.rename(path, str(operation.new_path))
+            return True, [operation.path, operation.new_path]
+
+        else:
+            raise ValueError(f"Unknown action: {operation.action}")
+
+    def write(self) -> bytes:                                                            # The new zip, in one pass (the unchanged members are copied byte-for-byte)
+        return zip_bytes__rewrite(self.zip_bytes, self.members)
+
+    def member_hashes(self, source_hashes: Dict[int, str]) -> List[Tuple[str, str]]:    # (file_name, content hash) of the members of the zip that write() returns
+        member_hashes = []                                                               # the copied members reuse the original's hashes (by header_offset), so only the new content (and the members without a known hash) is hashed
+        missing       = {}
+        for file_name, source in self.members:
+            if isinstance(source, zipfile.ZipInfo):
+                member_hash = source_hashes.get(source.header_offset)
+                if member_hash is None:
+                    missing[source.header_offset] = source
+            else:
+                member_hash = zip_member__content_hash(source)
+            member_hashes.append((file_name, member_hash))
+        if missing:
+            with zipfile.ZipFile(io.BytesIO(self.zip_bytes), 'r') as zf:
+                hashes = {header_offset: zip_member__content_hash(zf.read(info)) for header_offset, info in missing.items()}
+            member_hashes = [(file_name, member_hash or hashes[source.header_offset])
+                             for (file_name, member_hash), (_, source) in zip(member_hashes, self.members)]
+        return member_hashes
+
+    def content_hash(self, source_hashes : Dict[int, str],
+                           hash_length   : int
+                      ) -> str:                                                          # same as zip_bytes__content_hash(self.write(), hash_length)
+        return zip_members__content_hash(self.member_hashes(source_hashes), hash_length)
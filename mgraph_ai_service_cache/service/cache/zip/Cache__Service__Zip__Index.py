@@ -0,0 +1,151 @@
+from typing                                                                                 import Any, Dict, List, Optional
+from osbot_utils.decorators.methods.cache_on_self                                          import cache_on_self
+from osbot_utils.type_safe.Type_Safe                                                        import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Cache_Id                          import Cache_Id
+from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id             import Safe_Str__Id
+from osbot_utils.utils.Http                                                                 import url_join_safe
+from osbot_utils.utils.Zip                                                                  import zip_bytes__file
+from mgraph_ai_service_cache_client.schemas.cache.data.Schema__Cache__Data__Store__Request import Schema__Cache__Data__Store__Request
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Data_Type              import Enum__Cache__Data_Type
+from mgraph_ai_service_cache.schemas.cache.zip.Schema__Cache__Zip__Index                   import Schema__Cache__Zip__Index
+from mgraph_ai_service_cache.service.cache.Cache__Service                                   import Cache__Service
+from mgraph_ai_service_cache.service.cache.data.Cache__Service__Data__Store                 import Cache__Service__Data__Store
+from mgraph_ai_service_cache.service.storage.Storage_FS__Range                              import Storage_FS__Range
+from mgraph_ai_service_cache.utils.for_osbot_utils.Zip                                      import (zip_bytes__index, zip_bytes__member_hashes, zip_member__decompress,
+                                                                                                   zip_members__content_hash)
+
+CACHE__ZIP__INDEX__DATA_KEY     = 'zip'                                              # i.e. {data_folder}/zip/index.json
+CACHE__ZIP__INDEX__DATA_FILE_ID = 'index'
+
+
+class Cache__Service__Zip__Index(Type_Safe):                                        # Zip central-directory index, so that list and get don't need to read (and parse) the whole zip
+    cache_service : Cache__Service
+
+    @cache_on_self
+    def data_store(self) -> Cache__Service__Data__Store:
+        return Cache__Service__Data__Store(cache_service=self.cache_service)
+
+    def build(self, zip_bytes     : bytes                    ,
+                    member_hashes : Optional[List[str]] = None                      # content hash of each member (in archive order), computed (one full read) when not provided
+               ) -> Schema__Cache__Zip__Index:                                      # raises when zip_bytes is not a valid zip
+        entries = zip_bytes__index(zip_bytes)
+        if member_hashes is None:
+            member_hashes = zip_bytes__member_hashes(zip_bytes)
+        for entry, member_hash in zip(entries, member_hashes):
+            entry['content_hash'] = member_hash
+        return Schema__Cache__Zip__Index(zip_size = len(zip_bytes),
+                                         entries  = entries       )
+
+    def content_hash(self, index       : Schema__Cache__Zip__Index,
+                           hash_length : int
+                      ) -> str:                                                     # Same as zip_bytes__content_hash, but from the member hashes in the index
+        return zip_members__content_hash(index.member_hashes(), hash_length)
+
+    def save(self, cache_id  : Cache_Id                 ,
+                   namespace : str                      ,
+                   index     : Schema__Cache__Zip__Index
+              ) -> bool:                                                            # Store the index as a child data file of the zip's entry
+        request = Schema__Cache__Data__Store__Request(cache_id     = cache_id                                      ,
+                                                      namespace    = namespace                                     ,
+                                                      data         = index.json()                                  ,
+                                                      data_type    = Enum__Cache__Data_Type.JSON                   ,
+                                                      data_key     = CACHE__ZIP__INDEX__DATA_KEY                   ,
+                                                      data_file_id = Safe_Str__Id(CACHE__ZIP__INDEX__DATA_FILE_ID) )
+        return self.data_store().store_data(request) is not None
+
+    def save_for_bytes(self, cache_id      : Cache_Id                   ,
+                             namespace     : str                        ,
+                             zip_bytes     : bytes                      ,
+                             member_hashes : Optional[List[str]] = None
+                        ) -> Schema__Cache__Zip__Index:                             # Build and store the index of a zip that was just stored
+        index = self.build(zip_bytes, member_hashes)
+        self.save(cache_id, namespace, index)
+        return index
+
+    def invalidate(self, namespace : str          ,
+                         ref_data  : Dict[str, Any]
+                    ) -> bool:                                                      # Delete the saved index (call when the zip's content changes, the next load rebuilds it)
+        index_path = self.index_path(ref_data)
+        if not index_path:
+            return False
+        storage_fs = self.cache_service.get_or_create_handler(namespace).storage_backend
+        if not storage_fs.file__exists(index_path) or not storage_fs.file__delete(index_path):
+            return False
+        self.cache_service.namespace_stats().record_data_files(namespace=namespace, data_files=-1)
+        return True
+
+    def source_hashes(self, cache_id  : Cache_Id,
+                            namespace : str     ,
+                            zip_bytes : bytes
+                       ) -> Dict[int, str]:                                         # header_offset -> content hash of the stored zip's members (empty when its index is not for zip_bytes)
+        index = self.load(cache_id, namespace)
+        if index is None or index.zip_size != len(zip_bytes):
+            return {}
+        return index.source_hashes()
+
+    def refs_data(self, cache_id  : Cache_Id,
+                        namespace : str
+                   ) -> Optional[Dict[str, Any]]:                                   # the entry's by-id refs (None when it doesn't exist or has expired)
+        ref_data = self.cache_service.retrieve_by_id__refs_data(cache_id, namespace)
+        if not ref_data or self.cache_service.is_expired(ref_data):
+            return None
+        return ref_data
+
+    def index_path(self, ref_data: Dict[str, Any]) -> Optional[str]:
+        data_folders = ref_data.get('file_paths', {}).get('data_folders') or []
+        if not data_folders:
+            return None
+        return url_join_safe(url_join_safe(data_folders[0], CACHE__ZIP__INDEX__DATA_KEY), CACHE__ZIP__INDEX__DATA_FILE_ID) + '.json'
+
+    def content_path(self, ref_data: Dict[str, Any]) -> Optional[str]:
+        content_files = ref_data.get('file_paths', {}).get('content_files') or []
+        return content_files[0] if content_files else None
+
+    def load(self, cache_id  : Cache_Id,
+                   namespace : str
+              ) -> Optional[Schema__Cache__Zip__Index]:                             # The zip's index (built from the zip, and saved, for the zips stored before the index), None when the zip doesn't exist
+        ref_data = self.refs_data(cache_id, namespace)
+        if ref_data is None:
+            return None
+        storage_fs = self.cache_service.get_or_create_handler(namespace).storage_backend
+        index_path = self.index_path(ref_data)
+        index_json = storage_fs.file__json(index_path) if index_path else None
+        if index_json:
+            return Schema__Cache__Zip__Index.from_json(index_json)                  # (older indexes have no content_hash: see Cache__Service__Zip__Batch__Plan.member_hashes)
+        zip_bytes = self.zip_bytes(cache_id, namespace)                             # one full read (only the first time)
+        if zip_bytes is None:
+            return None
+        return self.save_for_bytes(cache_id, namespace, zip_bytes)
+
+    def zip_bytes(self, cache_id  : Cache_Id,
+                        namespace : str
+                   ) -> Optional[bytes]:
+        result = self.cache_service.retrieve_by_id(cache_id, namespace)
+        if result and result.get('data_type') == 'binary':
+            return result.get('data')
+        return None
+
+    def read_member(self, cache_id  : Cache_Id                 ,
+                          namespace : str                      ,
+                          index     : Schema__Cache__Zip__Index,
+                          file_name : str
+                     ) -> Optional[bytes]:                                          # One member's content, reading only its compressed bytes (None when it is not in the zip)
+        entry = index.entry(file_name)
+        if entry is None:
+            return None
+        ref_data     = self.refs_data(cache_id, namespace)
+        content_path = self.content_path(ref_data) if ref_data else None
+        if content_path:
+            storage_fs = self.cache_service.get_or_create_handler(namespace).storage_backend
+            compressed = Storage_FS__Range(storage_fs=storage_fs).read(content_path, entry['data_offset'], entry['compress_size'])
+            if compressed is not None and len(compressed) == entry['compress_size']:
+                try:
+                    content = zip_member__decompress(compressed, entry['compress_type'], entry['crc'])
+                    self.cache_service.access_tracker().record(namespace, cache_id)
+                    return content
+                except ValueError:                                                  # i.e. unsupported compression, or a content file that isn't the raw zip (like gzip encoded)
+                    pass
+        zip_bytes = self.zip_bytes(cache_id, namespace)                             # fallback to the full read
+        if zip_bytes is None:
+            return None
+        return zip_bytes__file(zip_bytes, str(file_name))
@@ -1,17 +1,16 @@
-from typing                                                                                     import Optional
+from typing                                                                                     import List, Optional, Tuple
 from osbot_utils.decorators.methods.cache_on_self                                               import cache_on_self
 from osbot_utils.type_safe.Type_Safe                                                            import Type_Safe
 from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                           import Random_Guid
 from osbot_utils.type_safe.type_safe_core.decorators.type_safe                                  import type_safe
 from osbot_utils.type_safe.primitives.domains.identifiers.Cache_Id                              import Cache_Id
-from osbot_utils.utils.Zip                                                                      import (zip_bytes__file_list, zip_bytes__file,
-                                                                                                        zip_bytes__add_file, zip_bytes__remove_file,
-                                                                                                        zip_bytes__replace_file)
 from mgraph_ai_service_cache_client.schemas.cache.zip.enums.Enum__Cache__Zip__Operation         import Enum__Cache__Zip__Operation
 from mgraph_ai_service_cache.service.cache.Cache__Service                                       import Cache__Service
+from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Batch__Plan                 import Cache__Service__Zip__Batch__Plan
+from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Index                       import Cache__Service__Zip__Index
 from mgraph_ai_service_cache_client.schemas.cache.zip.Schema__Cache__Zip__Operation__Request    import Schema__Cache__Zip__Operation__Request
 from mgraph_ai_service_cache_client.schemas.cache.zip.Schema__Cache__Zip__Operation__Response   import Schema__Cache__Zip__Operation__Response
-from mgraph_ai_service_cache.utils.for_osbot_utils.Zip                                          import zip_bytes__content_hash
+from mgraph_ai_service_cache.utils.for_osbot_utils.Zip                                          import zip_members__content_hash
 
 
 class Cache__Service__Zip__Operations(Type_Safe):                                        # Service layer for zip file operations
@@ -25,6 +24,10 @@ class Cache__Service__Zip__Operations(Type_Safe):
                  Enum__Cache__Zip__Operation.REMOVE  : self.operation__remove  ,
                  Enum__Cache__Zip__Operation.REPLACE : self.operation__replace }
 
+    @cache_on_self
+    def zip_index(self) -> Cache__Service__Zip__Index:                                    # Central directory of the stored zips (so that list and get don't read the whole zip)
+        return Cache__Service__Zip__Index(cache_service=self.cache_service)
+
     @type_safe
     def perform_operation(self, request: Schema__Cache__Zip__Operation__Request
                            ) -> Schema__Cache__Zip__Operation__Response:                   # Route operation to appropriate handler
@@ -43,12 +46,12 @@ class Cache__Service__Zip__Operations(Type_Safe):
 
     @type_safe
     def operation__list(self, request: Schema__Cache__Zip__Operation__Request
-                         ) -> Schema__Cache__Zip__Operation__Response:                     # List all files in zip (read-only)
-        zip_bytes = self.retrieve_zip_bytes(request.cache_id, request.namespace)
-        if not zip_bytes:
+                         ) -> Schema__Cache__Zip__Operation__Response:                     # List all files in zip (read-only, from the zip's index)
+        zip_index = self.zip_index().load(request.cache_id, request.namespace)
+        if zip_index is None:
             return self.error_response(request, "Zip file not found in cache")
 
-        file_list = zip_bytes__file_list(zip_bytes)
+        file_list = zip_index.file_list()
         return Schema__Cache__Zip__Operation__Response(success    = True                                  ,
                                                        operation  = Enum__Cache__Zip__Operation.LIST      ,
                                                        cache_id   = request.cache_id                      ,
@@ -57,15 +60,15 @@ class Cache__Service__Zip__Operations(Type_Safe):
 
     @type_safe
     def operation__get(self, request: Schema__Cache__Zip__Operation__Request
-                        ) -> Schema__Cache__Zip__Operation__Response:                      # Get single file from zip (read-only)
+                        ) -> Schema__Cache__Zip__Operation__Response:                      # Get single file from zip (read-only, only the member's bytes are read)
         if not request.file_path:
             return self.error_response(request, "file_path required for get operation")
 
-        zip_bytes = self.retrieve_zip_bytes(request.cache_id, request.namespace)
-        if not zip_bytes:
+        zip_index = self.zip_index().load(request.cache_id, request.namespace)
+        if zip_index is None:
             return self.error_response(request, "Zip file not found in cache")
 
-        file_content = zip_bytes__file(zip_bytes, str(request.file_path))
+        file_content = self.zip_index().read_member(request.cache_id, request.namespace, zip_index, str(request.file_path))
         if file_content is None:
             return self.error_response(request, f"File '{request.file_path}' not found in zip")
 
@@ -86,13 +89,15 @@ class Cache__Service__Zip__Operations(Type_Safe):
         if not zip_bytes:
             return self.error_response(request, "Zip file not found in cache")
 
-        new_zip = zip_bytes__add_file(zip_bytes, str(request.file_path), request.file_content)
+        plan = Cache__Service__Zip__Batch__Plan(zip_bytes=zip_bytes).setup()
+        plan.add(str(request.file_path), request.file_content)                                                   # only the new file is compressed (and hashed)
 
-        new_cache_id = self.create_modified_zip(original_id = request.cache_id                      ,           # Create new immutable cache entry
-                                                namespace   = request.namespace                     ,
-                                                zip_bytes   = new_zip                               ,
-                                                operation   = "add"                                 ,
-                                                details     = {"added_file": str(request.file_path)})
+        new_cache_id = self.create_modified_zip(original_id   = request.cache_id                      ,           # Create new immutable cache entry
+                                                namespace     = request.namespace                     ,
+                                                zip_bytes     = plan.write()                          ,
+                                                member_hashes = self.member_hashes(request, plan)     ,
+                                                operation     = "add"                                 ,
+                                                details       = {"added_file": str(request.file_path)})
 
         if not new_cache_id:
             return self.error_response(request, "Failed to create new cache entry")
@@ -114,14 +119,16 @@ class Cache__Service__Zip__Operations(Type_Safe):
         if not zip_bytes:
             return self.error_response(request, "Zip file not found in cache")
 
-        new_zip = zip_bytes__remove_file(zip_bytes, str(request.file_path))
+        plan = Cache__Service__Zip__Batch__Plan(zip_bytes=zip_bytes).setup()
+        plan.remove([str(request.file_path)])                                                                    # the other files are copied as they are
 
         # Create new immutable cache entry
-        new_cache_id = self.create_modified_zip(original_id = request.cache_id                                 ,
-                                                namespace   = request.namespace                                ,
-                                                zip_bytes   = new_zip                                          ,
-                                                operation   = "remove"                                         ,
-                                                details     = {"removed_file": str(request.file_path)})
+        new_cache_id = self.create_modified_zip(original_id   = request.cache_id                                 ,
+                                                namespace     = request.namespace                                ,
+                                                zip_bytes     = plan.write()                                     ,
+                                                member_hashes = self.member_hashes(request, plan)                ,
+                                                operation     = "remove"                                         ,
+                                                details       = {"removed_file": str(request.file_path)})
 
         if not new_cache_id:
             return self.error_response(request, "Failed to create new cache entry")
@@ -144,14 +151,16 @@ class Cache__Service__Zip__Operations(Type_Safe):
         if not zip_bytes:
             return self.error_response(request, "Zip file not found in cache")
 
-        new_zip = zip_bytes__replace_file(zip_bytes, str(request.file_path), request.file_content)
+        plan = Cache__Service__Zip__Batch__Plan(zip_bytes=zip_bytes).setup()
+        plan.replace(str(request.file_path), request.file_content)                                               # only the new content is compressed (and hashed)
 
         # Create new immutable cache entry
-        new_cache_id = self.create_modified_zip(original_id = request.cache_id                                  ,
-                                                namespace   = request.namespace                                 ,
-                                                zip_bytes   = new_zip                                           ,
-                                                operation   = "replace"                                         ,
-                                                details     = {"replaced_file": str(request.file_path)}
+        new_cache_id = self.create_modified_zip(original_id   = request.cache_id                                  ,
+                                                namespace     = request.namespace                                 ,
+                                                zip_bytes     = plan.write()                                      ,
+                                                member_hashes = self.member_hashes(request, plan)                 ,
+                                                operation     = "replace"                                         ,
+                                                details       = {"replaced_file": str(request.file_path)}
 )
 
         if not new_cache_id:
@@ -165,16 +174,25 @@ class Cache__Service__Zip__Operations(Type_Safe):
             files_affected    = [request.file_path]                                    ,
             message           = f"Replaced '{request.file_path}' in zip (new cache_id: {new_cache_id})")
 
-    def create_modified_zip(self, original_id : Cache_Id     ,
-                                  namespace   : str          ,
-                                  zip_bytes   : bytes        ,
-                                  operation   : str          ,
-                                  details     : dict = None
+    def member_hashes(self, request : Schema__Cache__Zip__Operation__Request,
+                            plan    : Cache__Service__Zip__Batch__Plan
+                       ) -> List[Tuple[str, str]]:                                                                  # (file_name, content hash) of the modified zip (reusing the hashes in the original's index)
+        source_hashes = self.zip_index().source_hashes(request.cache_id, request.namespace, plan.zip_bytes)
+        return plan.member_hashes(source_hashes)
+
+    def create_modified_zip(self, original_id   : Cache_Id                              ,
+                                  namespace     : str                                   ,
+                                  zip_bytes     : bytes                                 ,
+                                  operation     : str                                   ,
+                                  details       : dict                            = None,
+                                  member_hashes : Optional[List[Tuple[str, str]]] = None                            # (file_name, content hash) of zip_bytes' members, computed (one full read) when not provided
                              ) -> Optional[Cache_Id   ]:                                                            # Create new immutable cache entry for modified zip
 
+        if member_hashes is None:
+            member_hashes = self.zip_index().build(zip_bytes).member_hashes()
         hash_length = self.cache_service.hash_config.length
-        cache_hash  = zip_bytes__content_hash(zip_bytes   = zip_bytes,
-                                              hash_length = hash_length)                                            # use the bytes content and files path to calculate the zip's hash (which is different mode than when we just store bytes)
+        cache_hash  = zip_members__content_hash(member_hashes = member_hashes,
+                                                hash_length   = hash_length  )                                      # use the files content and path to calculate the zip's hash (which is different mode than when we just store bytes)
 
         original_entry__refs      = self.cache_service.retrieve_by_id__refs    (original_id, namespace)             # Get original entry to preserve strategy
         #original_entry__metadata  = self.cache_service.retrieve_by_id__metadata(original_id, namespace)           # Get original entry to preserve strategy
@@ -195,7 +213,10 @@ class Cache__Service__Zip__Operations(Type_Safe):
                                                         cache_id     = Cache_Id(Random_Guid()),   # Always new ID for immutability
                                                         namespace    = namespace              ,
                                                         strategy     = original_strategy)   # Preserve original's strategy
-        return result.cache_id if result else None
+        if not result:
+            return None
+        self.zip_index().save_for_bytes(result.cache_id, namespace, zip_bytes, [member_hash for _, member_hash in member_hashes])
+        return result.cache_id
 
     def retrieve_zip_bytes(self, cache_id  : Random_Guid    ,
                                  namespace : str
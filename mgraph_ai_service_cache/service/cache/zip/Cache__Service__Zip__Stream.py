@@ -0,0 +1,145 @@
+import re
+import zipfile
+from typing                                                                         import Iterator, Optional, Tuple
+from osbot_utils.decorators.methods.cache_on_self                                  import cache_on_self
+from osbot_utils.type_safe.Type_Safe                                                import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Cache_Id                  import Cache_Id
+from mgraph_ai_service_cache.schemas.cache.zip.Schema__Cache__Zip__Stream          import Schema__Cache__Zip__Stream
+from mgraph_ai_service_cache.service.cache.Cache__Service                           import Cache__Service
+from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Index           import Cache__Service__Zip__Index
+from mgraph_ai_service_cache.service.storage.Storage_FS__Range                      import Storage_FS__Range
+from mgraph_ai_service_cache.utils.for_osbot_utils.Zip                              import zip_member__decompress__chunks, bytes__chunks__slice
+
+CACHE__ZIP__STREAM__CHUNK_SIZE        = 1024 * 1024                                 # bytes read (and sent) at a time (content up to this size is sent in one piece)
+CACHE__ZIP__STREAM__ERROR__NOT_FOUND  = 'NOT_FOUND'
+CACHE__ZIP__STREAM__ERROR__NOT_BINARY = 'NOT_BINARY'
+CACHE__ZIP__STREAM__ERROR__RANGE      = 'RANGE_NOT_SATISFIABLE'
+CACHE__ZIP__STREAM__RANGE__REGEX      = re.compile(r'^bytes=(\d*)-(\d*)$')             # a single range (multiple ranges are not supported, so they get the whole content)
+
+
+class Cache__Service__Zip__Stream(Type_Safe):                                       # Streams stored zips (and their files) from storage in chunks, with support for HTTP Range requests
+    cache_service : Cache__Service
+    chunk_size    : int = CACHE__ZIP__STREAM__CHUNK_SIZE
+
+    @cache_on_self
+    def zip_index(self) -> Cache__Service__Zip__Index:
+        return Cache__Service__Zip__Index(cache_service=self.cache_service)
+
+    def parse_range(self, range_header : Optional[str],
+                          size         : int
+                     ) -> Optional[Tuple[int, int]]:                                # (start, end) of a single 'bytes=' range, None to send everything (no header, or one that is not supported), raises ValueError when it is not satisfiable
+        if not range_header:
+            return None
+        match = CACHE__ZIP__STREAM__RANGE__REGEX.match(range_header.strip())
+        if not match or match.group(1) == match.group(2) == '':                    # multiple ranges (or other units) are ignored
+            return None
+        first, last = match.group(1), match.group(2)
+        if first == '':                                                             # suffix range, i.e. the last N bytes
+            suffix = int(last)
+            if suffix == 0 or size == 0:
+                raise ValueError(f"Range '{range_header}' not satisfiable")
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end   = min(int(last), size - 1) if last else size - 1
+        if start >= size or end < start:
+            raise ValueError(f"Range '{range_header}' not satisfiable")
+        return start, end
+
+    def stream(self, size         : int          ,
+                     range_header : Optional[str],
+                     read_chunks                                                    # (start, length) -> iterator of bytes
+                ) -> Schema__Cache__Zip__Stream:
+        try:
+            byte_range = self.parse_range(range_header, size)
+        except ValueError as error:
+            return Schema__Cache__Zip__Stream(success       = False                          ,
+                                              error_type    = CACHE__ZIP__STREAM__ERROR__RANGE,
+                                              error_message = str(error)                      ,
+                                              size          = size                            )
+        start, end = byte_range if byte_range else (0, size - 1)
+        length     = end - start + 1 if size else 0
+        return Schema__Cache__Zip__Stream(success = True                            ,
+                                          size    = size                            ,
+                                          start   = start                           ,
+                                          end     = max(end, 0)                     ,
+                                          partial = byte_range is not None          ,
+                                          chunks  = read_chunks(start, length)      )
+
+    def stream_bytes(self, content      : bytes        ,
+                           range_header : Optional[str] = None
+                      ) -> Schema__Cache__Zip__Stream:                              # content that is already in memory
+        def read_chunks(start, length):
+            for position in range(start, start + length, self.chunk_size):
+                yield content[position:min(position + self.chunk_size, start + length)]
+        return self.stream(len(content), range_header, read_chunks)
+
+    def not_found(self, error_message: str, error_type: str = CACHE__ZIP__STREAM__ERROR__NOT_FOUND) -> Schema__Cache__Zip__Stream:
+        return Schema__Cache__Zip__Stream(success=False, error_type=error_type, error_message=error_message)
+
+    def content_source(self, cache_id  : Cache_Id,
+                             namespace : str
+                        ) -> Optional[Tuple[Storage_FS__Range, str]]:               # (range reader, content path) when the entry's content file is the raw zip (None for missing, encoded, non-binary or legacy entries)
+        ref_data = self.zip_index().refs_data(cache_id, namespace)
+        if ref_data is None or ref_data.get('file_type') != 'binary':
+            return None
+        metadata = ref_data.get('metadata')
+        if metadata is None or metadata.get('content_encoding'):                    # i.e. gzip (the bytes in storage are not the zip)
+            return None
+        content_path = self.zip_index().content_path(ref_data)
+        if not content_path:
+            return None
+        storage_fs = self.cache_service.get_or_create_handler(namespace).storage_backend
+        return Storage_FS__Range(storage_fs=storage_fs), content_path
+
+    def zip_stream(self, cache_id     : Cache_Id            ,
+                         namespace    : str                 ,
+                         range_header : Optional[str] = None
+                    ) -> Schema__Cache__Zip__Stream:                                # The whole zip (or the requested range), read from storage a chunk at a time
+        source = self.content_source(cache_id, namespace)
+        if source:
+            reader, content_path = source
+            size = reader.size(content_path)
+            if size is not None:
+                self.cache_service.access_tracker().record(namespace, cache_id)
+                return self.stream(size, range_header, lambda start, length: reader.chunks(content_path, start, length, self.chunk_size))
+        result = self.cache_service.retrieve_by_id(cache_id, namespace)             # entries that can't be streamed from storage are read in full
+        if not result:
+            return self.not_found("Zip file not found")
+        if result.get('data_type') != 'binary':
+            return self.not_found("Cached item is not a binary file", CACHE__ZIP__STREAM__ERROR__NOT_BINARY)
+        return self.stream_bytes(result.get('data'), range_header)
+
+    def member_stream(self, cache_id     : Cache_Id            ,
+                            namespace    : str                 ,
+                            file_path    : str                 ,
+                            range_header : Optional[str] = None
+                       ) -> Schema__Cache__Zip__Stream:                             # One file of the zip (or the requested range), decompressed while it is read from storage
+        try:
+            zip_index = self.zip_index().load(cache_id, namespace)
+        except (zipfile.BadZipFile, ValueError) as error:                           # a binary entry that isn't a zip
+            return self.not_found(f"Invalid zip file: {error}", CACHE__ZIP__STREAM__ERROR__NOT_BINARY)
+        if zip_index is None:
+            return self.not_found("Zip file not found in cache")
+        entry = zip_index.entry(str(file_path))
+        if entry is None:
+            return self.not_found(f"File '{file_path}' not found in zip")
+
+        source = self.content_source(cache_id, namespace)
+        if (source is None or entry['file_size'] <= self.chunk_size or
+            entry['compress_type'] not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)):       # small (or bzip2) files are read in one go (with the CRC checked before anything is sent)
+            content = self.zip_index().read_member(cache_id, namespace, zip_index, str(file_path))
+            if content is None:
+                return self.not_found(f"File '{file_path}' not found in zip")
+            return self.stream_bytes(content, range_header)
+
+        reader, content_path = source
+        self.cache_service.access_tracker().record(namespace, cache_id)
+
+        def read_chunks(start, length) -> Iterator[bytes]:
+            if entry['compress_type'] == zipfile.ZIP_STORED:                        # the range is read directly
+                return reader.chunks(content_path, entry['data_offset'] + start, length, self.chunk_size)
+            compressed = reader.chunks(content_path, entry['data_offset'], entry['compress_size'], self.chunk_size)
+            content    = zip_member__decompress__chunks(compressed, entry['compress_type'], entry['crc'], self.chunk_size)
+            return bytes__chunks__slice(content, start, length)                     # decompressed from the start (only up to the end of the range)
+
+        return self.stream(entry['file_size'], range_header, read_chunks)
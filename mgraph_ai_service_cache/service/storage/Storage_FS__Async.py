@@ -0,0 +1,52 @@
+import asyncio
+from concurrent.futures                                                           import ThreadPoolExecutor
+from typing                                                                       import Any, List, Optional
+from memory_fs.storage_fs.Storage_FS                                              import Storage_FS
+from osbot_utils.type_safe.Type_Safe                                              import Type_Safe
+from osbot_utils.utils.Json                                                       import bytes_to_json
+
+STORAGE_FS__ASYNC__MAX_WORKERS = 64                                                     # max blocking backend calls in flight (S3 calls are mostly waiting on the network)
+
+
+class Storage_FS__Async(Type_Safe):                                                     # Async storage interface, that offloads the calls of a (sync) Storage_FS to a thread pool
+    storage_fs  : Storage_FS = None                                                     # wrapped backend (e.g. Storage_FS__S3)
+    max_workers : int        = STORAGE_FS__ASYNC__MAX_WORKERS
+    executor    : Any        = None                                                     # ThreadPoolExecutor (created on setup)
+
+    def setup(self) -> 'Storage_FS__Async':
+        self.executor = ThreadPoolExecutor(max_workers        = self.max_workers    ,
+                                           thread_name_prefix = 'storage-fs-async'  )
+        return self
+
+    async def run_in_executor(self, function, *args):                                   # Run one blocking backend call without blocking the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    async def file__bytes(self, path: str) -> Optional[bytes]:
+        return await self.run_in_executor(self.storage_fs.file__bytes, path)
+
+    async def file__delete(self, path: str) -> bool:
+        return await self.run_in_executor(self.storage_fs.file__delete, path)
+
+    async def file__exists(self, path: str) -> bool:
+        return await self.run_in_executor(self.storage_fs.file__exists, path)
+
+    async def file__json(self, path: str):
+        file_bytes = await self.file__bytes(path)
+        if file_bytes:
+            return bytes_to_json(file_bytes)
+        return None
+
+    async def file__save(self, path: str, data: bytes) -> bool:
+        return await self.run_in_executor(self.storage_fs.file__save, path, data)
+
+    async def files__bytes(self, paths: List[str]) -> List[Optional[bytes]]:            # Read many files concurrently
+        return list(await asyncio.gather(*[self.file__bytes(path) for path in paths]))
+
+    async def folder__files__all(self, parent_folder: str) -> List[str]:
+        return await self.run_in_executor(self.storage_fs.folder__files__all, parent_folder)
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self.executor = None
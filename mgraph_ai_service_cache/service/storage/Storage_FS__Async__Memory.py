@@ -0,0 +1,39 @@
+import asyncio
+from typing                                                                       import Dict, List, Optional
+from mgraph_ai_service_cache.service.storage.Storage_FS__Async                   import Storage_FS__Async
+
+
+class Storage_FS__Async__Memory(Storage_FS__Async):                                     # Native async in-memory backend (no threads), used in tests
+    files        : Dict[str, bytes]
+    call_latency : float = 0.0                                                          # optional simulated backend latency (in seconds)
+
+    def setup(self) -> 'Storage_FS__Async__Memory':
+        return self
+
+    async def wait(self):
+        await asyncio.sleep(self.call_latency)                                          # always yield to the event loop (like a real network call would)
+
+    async def file__bytes(self, path: str) -> Optional[bytes]:
+        await self.wait()
+        return self.files.get(str(path))
+
+    async def file__delete(self, path: str) -> bool:
+        await self.wait()
+        return self.files.pop(str(path), None) is not None
+
+    async def file__exists(self, path: str) -> bool:
+        await self.wait()
+        return str(path) in self.files
+
+    async def file__save(self, path: str, data: bytes) -> bool:
+        await self.wait()
+        self.files[str(path)] = bytes(data)
+        return True
+
+    async def folder__files__all(self, parent_folder: str) -> List[str]:
+        await self.wait()
+        prefix = str(parent_folder).rstrip('/') + '/' if parent_folder else ''
+        return sorted(path for path in self.files if path.startswith(prefix))
+
+    def shutdown(self):
+        pass
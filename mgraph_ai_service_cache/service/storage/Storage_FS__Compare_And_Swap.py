@@ -0,0 +1,114 @@
+import fcntl
+import hashlib
+import random
+import threading
+import time
+from contextlib                                                                     import contextmanager
+from typing                                                                         import Callable, Iterator, Optional, Tuple
+from memory_fs.storage_fs.Storage_FS                                                import Storage_FS
+from memory_fs.storage_fs.providers.Storage_FS__Local_Disk                          import Storage_FS__Local_Disk
+from memory_fs.storage_fs.providers.Storage_FS__Sqlite                              import Storage_FS__Sqlite
+from osbot_utils.type_safe.Type_Safe                                                import Type_Safe
+from osbot_utils.utils.Json                                                         import json_to_bytes, bytes_to_json
+from mgraph_ai_service_cache.service.storage.Storage_FS__S3                        import Storage_FS__S3
+
+STORAGE_FS__CAS__MAX_ATTEMPTS        = 50                                           # read-modify-write attempts before giving up
+STORAGE_FS__CAS__BACKOFF_BASE_MS     = 2                                            # exponential backoff (with full jitter) between attempts
+STORAGE_FS__CAS__BACKOFF_MAX_MS      = 200
+STORAGE_FS__CAS__LOCK_STRIPES        = 64                                           # in-process locks (paths are hashed into one of these)
+
+
+class Storage_FS__Compare_And_Swap(Type_Safe):                                      # Concurrency-safe read-modify-write of small (json) files
+    storage_fs      : Storage_FS = None
+    max_attempts    : int        = STORAGE_FS__CAS__MAX_ATTEMPTS
+    backoff_base_ms : int        = STORAGE_FS__CAS__BACKOFF_BASE_MS
+    backoff_max_ms  : int        = STORAGE_FS__CAS__BACKOFF_MAX_MS
+    locks           : list                                                          # striped threading.Lock (created on setup)
+    conflicts       : int        = 0                                                # writes rejected because the file had changed
+
+    def setup(self) -> 'Storage_FS__Compare_And_Swap':
+        self.locks = [threading.Lock() for _ in range(STORAGE_FS__CAS__LOCK_STRIPES)]
+        return self
+
+    def is_s3(self) -> bool:                                                        # S3 has native conditional writes (If-Match / If-None-Match)
+        return isinstance(self.storage_fs, Storage_FS__S3)
+
+    def version(self, data: Optional[bytes]) -> Optional[str]:                      # content based version (for the providers without ETags)
+        if data is None:
+            return None
+        return hashlib.md5(data).hexdigest()
+
+    def lock_file_path(self) -> Optional[str]:                                      # cross-process lock file (next to the local disk folder or the sqlite db, so that it is not listed as a file)
+        if isinstance(self.storage_fs, Storage_FS__Local_Disk):
+            return f'{str(self.storage_fs.root_path).rstrip("/")}.lock'
+        if isinstance(self.storage_fs, Storage_FS__Sqlite) and not self.storage_fs.in_memory:
+            return f'{self.storage_fs.db_path}.lock'
+        return None
+
+    @contextmanager
+    def local_lock(self, path: str) -> Iterator[None]:                              # in-process mutex (plus a file lock when other processes can share the storage)
+        with self.locks[hash(str(path)) % len(self.locks)]:
+            lock_file_path = self.lock_file_path()
+            if lock_file_path is None:
+                yield
+                return
+            with open(lock_file_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ---- compare and swap ----
+
+    def read(self, path: str) -> Tuple[Optional[bytes], Optional[str]]:             # content and its version (None, None when the file doesn't exist)
+        if self.is_s3():
+            return self.storage_fs.file__bytes__with_etag(path)
+        data = self.storage_fs.file__bytes(path)
+        return data, self.version(data)
+
+    def write(self, path    : str          ,
+                    data    : bytes        ,
+                    version : Optional[str]
+               ) -> bool:                                                           # save data only if the file is still at version (None = file must not exist)
+        if self.is_s3():
+            saved = self.storage_fs.file__save__if_match(path, data, version)
+        else:
+            with self.local_lock(path):
+                saved = self.version(self.storage_fs.file__bytes(path)) == version
+                if saved:
+                    self.storage_fs.file__save(path, data)
+        if not saved:
+            self.conflicts += 1
+        return saved
+
+    def delete(self, path    : str,
+                     version : str
+                ) -> bool:                                                          # delete the file only if it is still at version
+        if self.is_s3():
+            deleted = self.storage_fs.file__delete__if_match(path, version)
+        else:
+            with self.local_lock(path):
+                deleted = self.version(self.storage_fs.file__bytes(path)) == version
+                if deleted:
+                    self.storage_fs.file__delete(path)
+        if not deleted:
+            self.conflicts += 1
+        return deleted
+
+    def backoff(self, attempt: int):                                                # exponential backoff with full jitter (so that competing writers spread out)
+        delay_ms = min(self.backoff_max_ms, self.backoff_base_ms * (2 ** attempt))
+        time.sleep(random.uniform(0, delay_ms) / 1000)
+
+    def update_json(self, path   : str                                           ,
+                          mutate : Callable[[Optional[dict]], Optional[dict]]
+                     ) -> Optional[dict]:                                           # read -> mutate -> conditional write, retried until no other writer got in between
+        for attempt in range(self.max_attempts):
+            data, version = self.read(path)
+            updated       = mutate(bytes_to_json(data) if data else None)           # mutate gets a fresh copy on each attempt (None when the file doesn't exist)
+            if updated is None:                                                     # nothing to write
+                return None
+            if self.write(path, json_to_bytes(updated), version):
+                return updated
+            self.backoff(attempt)
+        raise Exception(f"in Storage_FS__Compare_And_Swap.update_json, {path} was changed by other writers in all {self.max_attempts} attempts")
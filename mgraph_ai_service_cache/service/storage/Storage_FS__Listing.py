@@ -0,0 +1,55 @@
+from typing                                                         import Iterator, List, Optional, Tuple
+from memory_fs.storage_fs.Storage_FS                                import Storage_FS
+from osbot_utils.type_safe.Type_Safe                                import Type_Safe
+from mgraph_ai_service_cache.service.storage.Storage_FS__S3        import Storage_FS__S3
+
+STORAGE_FS__LISTING__PAGE_SIZE = 1000                                               # paths per page (S3's max keys per ListObjectsV2 request)
+
+
+class Storage_FS__Listing(Type_Safe):                                               # Prefix-scoped, paginated listing (so that only the keys under a folder are read, never the whole storage)
+    storage_fs : Storage_FS = None
+    page_size  : int        = STORAGE_FS__LISTING__PAGE_SIZE
+
+    def pages(self, parent_folder: str) -> Iterator[List[str]]:                     # Files under parent_folder/, one page at a time
+        parent_folder = str(parent_folder).rstrip('/')
+        prefix        = parent_folder + '/'                                         # so that 'data/temporal' doesn't match 'data/temporal-latest'
+        if isinstance(self.storage_fs, Storage_FS__S3):
+            pages = self.storage_fs.folder__files__pages(prefix, self.page_size)    # one ListObjectsV2 request per page
+        else:
+            pages = self.chunks(self.storage_fs.folder__files__all(parent_folder=parent_folder) or [])
+        for page in pages:
+            yield [str(path) for path in page if str(path).startswith(prefix)]
+
+    def page(self, parent_folder : str        ,
+                   limit         : int = None ,
+                   cursor        : str = None ,
+                   suffix        : str = ''
+              ) -> Tuple[List[str], Optional[str]]:                                 # One page (up to limit files ending with suffix) under parent_folder/ and the cursor for the next page (None when done)
+        limit         = max(1, min(limit or self.page_size, STORAGE_FS__LISTING__PAGE_SIZE))
+        parent_folder = str(parent_folder).rstrip('/')
+        prefix        = parent_folder + '/'
+        if isinstance(self.storage_fs, Storage_FS__S3):                             # cursor is S3's ContinuationToken (one ListObjectsV2 request per page, more when the suffix filtered some paths out)
+            paths = []
+            while True:
+                page_paths, cursor = self.storage_fs.folder__files__page(prefix, limit - len(paths), cursor)    # never asks for more than what is missing, so that no path is skipped
+                paths.extend(str(path) for path in page_paths if str(path).endswith(suffix))
+                if len(paths) >= limit or not cursor:
+                    return paths, cursor
+        all_paths = self.storage_fs.folder__files__all(parent_folder=parent_folder) or []       # Memory, Local_Disk and Sqlite have no paginated listing: every page lists all the files under the prefix, i.e. O(n) per page (the cursor is the last path of the previous page)
+        paths     = sorted(str(path) for path in all_paths
+                           if str(path).startswith(prefix) and str(path).endswith(suffix) and (cursor is None or str(path) > cursor))      # filtered before the page is cut, so pages are only short at the end
+        page  = paths[:limit]
+        if len(paths) > limit:
+            return page, page[-1]
+        return page, None
+
+    def chunks(self, paths: List[str]) -> Iterator[List[str]]:
+        for index in range(0, len(paths), self.page_size):
+            yield paths[index:index + self.page_size]
+
+    def files(self, parent_folder: str) -> Iterator[str]:
+        for page in self.pages(parent_folder):
+            yield from page
+
+    def count(self, parent_folder: str) -> int:                                     # Counts page by page (the paths are never all in memory)
+        return sum(len(page) for page in self.pages(parent_folder))
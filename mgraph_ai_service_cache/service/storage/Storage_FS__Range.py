@@ -0,0 +1,76 @@
+import os
+from typing                                                                         import Iterator, Optional
+from memory_fs.storage_fs.Storage_FS                                                import Storage_FS
+from memory_fs.storage_fs.providers.Storage_FS__Local_Disk                          import Storage_FS__Local_Disk
+from osbot_utils.type_safe.Type_Safe                                                import Type_Safe
+from mgraph_ai_service_cache.service.storage.Storage_FS__S3                        import Storage_FS__S3
+
+
+class Storage_FS__Range(Type_Safe):                                                 # Reads a byte range of a file without reading the whole file (S3 ranged GET, seek on local disk)
+    storage_fs : Storage_FS = None
+
+    def local_path(self, path: str) -> Optional[str]:                               # the file on disk (None for the other providers)
+        if isinstance(self.storage_fs, Storage_FS__Local_Disk):
+            return os.path.join(str(self.storage_fs.root_path), str(path))
+        return None
+
+    def read(self, path   : str,
+                   start  : int,
+                   length : int
+              ) -> Optional[bytes]:                                                 # bytes start .. start+length-1 of the file (None when the file doesn't exist)
+        if length <= 0:
+            return b''
+        if isinstance(self.storage_fs, Storage_FS__S3):
+            return self.storage_fs.file__bytes__range(path, start, length)
+        local_path = self.local_path(path)
+        if local_path and os.path.isfile(local_path):
+            with open(local_path, 'rb') as file:
+                file.seek(start)
+                return file.read(length)
+        file_bytes = self.storage_fs.file__bytes(path)                              # the in-memory providers (and sqlite) already hold the whole file
+        if file_bytes is None:
+            return None
+        return file_bytes[start:start + length]
+
+    def size(self, path: str) -> Optional[int]:                                     # size of the file (None when it doesn't exist)
+        if isinstance(self.storage_fs, Storage_FS__S3):
+            return self.storage_fs.file__size(path)                                 # one HEAD request
+        local_path = self.local_path(path)
+        if local_path and os.path.isfile(local_path):
+            return os.path.getsize(local_path)
+        file_bytes = self.storage_fs.file__bytes(path)
+        if file_bytes is None:
+            return None
+        return len(file_bytes)
+
+    def chunks(self, path       : str,
+                     start      : int,
+                     length     : int,
+                     chunk_size : int
+                ) -> Iterator[bytes]:                                               # bytes start .. start+length-1 of the file, read chunk_size bytes at a time (so that only one chunk is in memory)
+        local_path = self.local_path(path)
+        if local_path and os.path.isfile(local_path):
+            with open(local_path, 'rb') as file:                                    # one file handle for all the chunks
+                file.seek(start)
+                while length > 0:
+                    chunk = file.read(min(chunk_size, length))
+                    if not chunk:
+                        return
+                    length -= len(chunk)
+                    yield chunk
+            return
+        if isinstance(self.storage_fs, Storage_FS__S3):
+            while length > 0:
+                chunk = self.read(path, start, min(chunk_size, length))             # one ranged GET per chunk
+                if not chunk:
+                    return
+                start  += len(chunk)
+                length -= len(chunk)
+                yield chunk
+            return
+        file_bytes = self.storage_fs.file__bytes(path)                              # the other providers (memory, sqlite) have no range reads, so the file is read once and sliced
+        if file_bytes is None:
+            return
+        file_view = memoryview(file_bytes)[start:start + length]                    # (slices of the view don't copy the file)
+        for index in range(0, len(file_view), chunk_size):
+            yield bytes(file_view[index:index + chunk_size])
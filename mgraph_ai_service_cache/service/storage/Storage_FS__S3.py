@@ -1,4 +1,5 @@
-from typing                                                                       import List, Optional
+from typing                                                                       import Iterator, List, Optional, Tuple
+from botocore.exceptions                                                          import ClientError
 from osbot_aws.AWS_Config                                                         import aws_config
 from osbot_utils.type_safe.primitives.domains.files.safe_str.Safe_Str__File__Path import Safe_Str__File__Path
 from osbot_utils.type_safe.type_safe_core.decorators.type_safe                    import type_safe
@@ -7,11 +8,16 @@ from osbot_utils.utils.Json
 from osbot_aws.aws.s3.S3                                                          import S3
 from memory_fs.storage_fs.Storage_FS                                              import Storage_FS
 
+S3__ERROR_CODES__NOT_FOUND = ('NoSuchKey', '404', 'NotFound')                          # returned by GET (NoSuchKey) and HEAD (404, since HEAD responses have no body)
+S3__LIST__MAX_KEYS         = 1000                                                       # max keys returned by one ListObjectsV2 request
+S3__ERROR_CODES__CONFLICT  = ('PreconditionFailed', 'ConditionalRequestConflict', '412', '409')   # returned by conditional PUTs (If-Match / If-None-Match) when the object changed
+
 # todo: see if we should move this to the boto3-fs project
 class Storage_FS__S3(Storage_FS):
     s3_bucket    : str                                                                  # S3 bucket name for storage
     s3_prefix    : str = ""                                                             # Optional prefix for all keys
     s3           : S3  = None                                                           # S3 instance (will be created if not provided)
+    optimistic   : bool = True                                                          # single GET/HEAD per read (no file__exists check before it)
     
     def setup(self) -> 'Storage_FS__S3':                                                # Initialize S3 client if not provided
         if self.s3 is None:
@@ -39,10 +45,32 @@ class Storage_FS__S3(Storage_FS):
                 s3_key = s3_key[len(prefix):]
         return Safe_Str__File__Path(s3_key)
     
+    def is_not_found_error(self, error: ClientError) -> bool:
+        return error.response.get('Error', {}).get('Code') in S3__ERROR_CODES__NOT_FOUND
+
+    def _get_object_bytes(self, s3_key: str) -> Optional[bytes]:                                   # One GET request (NoSuchKey is mapped to None)
+        try:
+            response = self.s3.client().get_object(Bucket=self.s3_bucket, Key=s3_key)
+            return response.get('Body').read()
+        except ClientError as error:
+            if self.is_not_found_error(error):
+                return None
+            raise
+
+    def _head_object(self, s3_key: str) -> Optional[dict]:                                          # One HEAD request (404 is mapped to None)
+        try:
+            return self.s3.client().head_object(Bucket=self.s3_bucket, Key=s3_key)
+        except ClientError as error:
+            if self.is_not_found_error(error):
+                return None
+            raise
+
     @type_safe
     def file__bytes(self, path: Safe_Str__File__Path                                                # Read file content as bytes from S3
                     ) -> Optional[bytes]:
         s3_key = self._get_s3_key(path)
+        if self.optimistic:
+            return self._get_object_bytes(s3_key)
         if self.file__exists(path):
             return self.s3.file_bytes(bucket=self.s3_bucket, key=s3_key)
         return None
@@ -51,7 +79,7 @@ class Storage_FS__S3(Storage_FS):
     def file__delete(self, path: Safe_Str__File__Path                                  # Delete a file from S3
                      ) -> bool:
         s3_key = self._get_s3_key(path)
-        if self.file__exists(path) is True:
+        if self.file__exists(path) is True:                                             # also in optimistic mode: S3 deletes are idempotent (the DELETE response doesn't say if the file existed), and the callers count the deleted files
             return self.s3.file_delete(bucket=self.s3_bucket, key=s3_key)
         return False
     
@@ -81,10 +109,68 @@ class Storage_FS__S3(Storage_FS):
             key=s3_key
         )
     
+    def is_conflict_error(self, error: ClientError) -> bool:
+        return error.response.get('Error', {}).get('Code') in S3__ERROR_CODES__CONFLICT
+
+    def file__bytes__with_etag(self, path: Safe_Str__File__Path
+                               ) -> Tuple[Optional[bytes], Optional[str]]:             # One GET request, returning the content and its ETag (None, None when not found)
+        try:
+            response = self.s3.client().get_object(Bucket=self.s3_bucket, Key=self._get_s3_key(path))
+            return response.get('Body').read(), response.get('ETag')
+        except ClientError as error:
+            if self.is_not_found_error(error):
+                return None, None
+            raise
+
+    def file__bytes__range(self, path   : Safe_Str__File__Path,
+                                 start  : int                 ,
+                                 length : int
+                            ) -> Optional[bytes]:                                       # One ranged GET (only bytes start .. start+length-1 are transferred), None when not found
+        try:
+            response = self.s3.client().get_object(Bucket = self.s3_bucket                           ,
+                                                   Key    = self._get_s3_key(path)                   ,
+                                                   Range  = f'bytes={start}-{start + length - 1}'    )
+            return response.get('Body').read()
+        except ClientError as error:
+            if self.is_not_found_error(error):
+                return None
+            raise
+
+    def file__save__if_match(self, path : Safe_Str__File__Path,
+                                   data : bytes               ,
+                                   etag : Optional[str] = None
+                              ) -> bool:                                                # Conditional PUT (If-Match: etag, or If-None-Match: * when etag is None), False when the object changed since it was read
+        kwargs = dict(Bucket=self.s3_bucket, Key=self._get_s3_key(path), Body=data)
+        if etag:
+            kwargs['IfMatch'    ] = etag
+        else:
+            kwargs['IfNoneMatch'] = '*'
+        try:
+            self.s3.client().put_object(**kwargs)
+            return True
+        except ClientError as error:
+            if self.is_conflict_error(error):
+                return False
+            raise
+
+    def file__delete__if_match(self, path : Safe_Str__File__Path,
+                                     etag : str
+                                ) -> bool:                                              # Conditional DELETE (If-Match: etag), False when the object changed since it was read
+        try:
+            self.s3.client().delete_object(Bucket=self.s3_bucket, Key=self._get_s3_key(path), IfMatch=etag)
+            return True
+        except ClientError as error:
+            if self.is_conflict_error(error) or self.is_not_found_error(error):
+                return False
+            raise
+
     @type_safe
     def file__str(self, path: Safe_Str__File__Path                                     # Read file content as string from S3
                   ) -> Optional[str]:
         s3_key = self._get_s3_key(path)
+        if self.optimistic:
+            file_bytes = self._get_object_bytes(s3_key)
+            return file_bytes.decode('utf-8') if file_bytes is not None else None
         if self.file__exists(path):
             return self.s3.file_contents(bucket=self.s3_bucket, key=s3_key)
         return None
@@ -117,6 +203,9 @@ class Storage_FS__S3(Storage_FS):
     
     def file__metadata(self, path: Safe_Str__File__Path) -> Optional[dict]:            # Get S3 file metadata
         s3_key = self._get_s3_key(path)
+        if self.optimistic:
+            details = self._head_object(s3_key)
+            return details.get('Metadata') if details is not None else None
         if self.file__exists(path):
             return self.s3.file_metadata(bucket=self.s3_bucket, key=s3_key)
         return None
@@ -163,22 +252,26 @@ class Storage_FS__S3(Storage_FS):
                                      dest_key=dest_key )
         return False
     
-    def file__size(self, path: Safe_Str__File__Path) -> Optional[int]:                 # Get file size in bytes
+    def file__details(self, path: Safe_Str__File__Path) -> Optional[dict]:             # HEAD details (ContentLength, LastModified, Metadata, ...)
         s3_key = self._get_s3_key(path)
+        if self.optimistic:
+            return self._head_object(s3_key)
         if self.file__exists(path):
-            details = self.s3.file_details(bucket=self.s3_bucket, key=s3_key)
-            if details:
-                return details.get('ContentLength')
+            return self.s3.file_details(bucket=self.s3_bucket, key=s3_key)
+        return None
+
+    def file__size(self, path: Safe_Str__File__Path) -> Optional[int]:                 # Get file size in bytes
+        details = self.file__details(path)
+        if details:
+            return details.get('ContentLength')
         return None
     
     def file__last_modified(self, path: Safe_Str__File__Path) -> Optional[str]:        # Get last modified time
-        s3_key = self._get_s3_key(path)
-        if self.file__exists(path):
-            details = self.s3.file_details(bucket=self.s3_bucket, key=s3_key)
-            if details:
-                last_modified = details.get('LastModified')
-                if last_modified:
-                    return last_modified.isoformat()
+        details = self.file__details(path)
+        if details:
+            last_modified = details.get('LastModified')
+            if last_modified:
+                return last_modified.isoformat()
         return None
 
     def folder__folders(self, parent_folder='', return_full_path=False):
@@ -192,6 +285,29 @@ class Storage_FS__S3(Storage_FS):
                       prefix    = parent_folder   )
         return self.s3.find_files(**kwargs)
 
+    def folder__files__page(self, parent_folder      : str                       ,
+                                  page_size          : int = S3__LIST__MAX_KEYS  ,
+                                  continuation_token : str = None
+                             ) -> Tuple[List[Safe_Str__File__Path], Optional[str]]:     # One ListObjectsV2 request: the paths under the prefix, and the token for the next page (None when done)
+        kwargs = dict(Bucket  = self.s3_bucket                          ,
+                      Prefix  = self._get_s3_key(parent_folder)         ,
+                      MaxKeys = max(1, min(page_size, S3__LIST__MAX_KEYS)))
+        if continuation_token:
+            kwargs['ContinuationToken'] = continuation_token
+        response = self.s3.client().list_objects_v2(**kwargs)
+        paths    = [self._get_path_from_key(item.get('Key')) for item in response.get('Contents', [])]
+        return paths, response.get('NextContinuationToken')
+
+    def folder__files__pages(self, parent_folder : str                      ,
+                                   page_size     : int = S3__LIST__MAX_KEYS
+                              ) -> Iterator[List[Safe_Str__File__Path]]:               # All paths under the prefix, one page (i.e. one request) at a time
+        continuation_token = None
+        while True:
+            paths, continuation_token = self.folder__files__page(parent_folder, page_size, continuation_token)
+            yield paths
+            if not continuation_token:
+                break
+
     def folder__files(self, folder_path: str,                                          # List files in a specific folder
                             return_full_path: bool = False
                       ) -> List[Safe_Str__File__Path]:
@@ -1,20 +1,356 @@
+import copy
 import hashlib
+import io
+import struct
+import zipfile
+import zlib
+from typing                                                                              import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from osbot_utils.type_safe.primitives.domains.cryptography.safe_str.Safe_Str__Cache_Hash import Safe_Str__Cache_Hash
-from osbot_utils.utils.Zip                                                               import zip_bytes__files
+
+ZIP__LOCAL_HEADER__SIGNATURE   = b'PK\x03\x04'
+ZIP__LOCAL_HEADER__SIZE        = 30                                                 # fixed part of a local file header (followed by the file name and the extra field)
+ZIP__CENTRAL_DIR__SIGNATURE    = b'PK\x01\x02'
+ZIP__CENTRAL_DIR__STRUCT       = '<4s4B4HL2L5H2L'                                   # central directory file header (followed by the file name, the extra field and the comment)
+ZIP__END_RECORD__SIGNATURE     = b'PK\x05\x06'
+ZIP__END_RECORD__STRUCT        = '<4s4H2LH'                                         # end of central directory record (followed by the zip comment)
+ZIP__END_RECORD__SIZE          = 22
+ZIP__END_RECORD_64__SIGNATURE  = b'PK\x06\x06'
+ZIP__END_RECORD_64__STRUCT     = '<4sQ2H2L4Q'
+ZIP__END_RECORD_64__SIZE       = 56
+ZIP__END_LOCATOR_64__SIGNATURE = b'PK\x06\x07'
+ZIP__END_LOCATOR_64__STRUCT    = '<4sLQL'
+ZIP__END_LOCATOR_64__SIZE      = 20
+ZIP__FLAG__DATA_DESCRIPTOR     = 0x08                                               # the CRC and sizes are after the compressed data (not in the local header)
+ZIP__FLAG__UTF8_FILE_NAME      = 0x800
+ZIP__EXTRA__ZIP64              = 0x0001                                             # zip64 extra field id (rebuilt when a header is written)
+ZIP__ZIP64__LIMIT              = (1 << 31) - 1                                      # same limits as zipfile (so that the headers are the ones zipfile writes)
+ZIP__ZIP64__FILE_COUNT_LIMIT   = (1 << 16) - 1
+ZIP__ZIP64__VERSION            = 45
+ZIP__MIN_VERSION               = { zipfile.ZIP_BZIP2: 46, zipfile.ZIP_LZMA: 63 }    # version needed to extract (by compression method)
+
+
+def zip_member__content_hash(file_content: bytes) -> str:                           # Hash of one file's content (the zip's hash is built from these, see zip_members__content_hash)
+    return hashlib.sha256(file_content).hexdigest()
+
+
+def zip_members__content_hash(member_hashes : Iterable[Tuple[str, str]],
+                              hash_length   : int
+                         ) -> Safe_Str__Cache_Hash:                                 # Zip hash from the (file_path, content hash) of its members, so that an edit only needs the hashes of the files it changed
+    files = {}
+    for file_path, member_hash in member_hashes:                                    # in archive order (for duplicated names the last one is the one that is read)
+        files[file_path] = member_hash
+    hasher = hashlib.sha256()
+    for file_path in sorted(files):                                                 # Sort files by name for deterministic ordering
+        hasher.update(file_path.encode('utf-8')   )
+        hasher.update(b'\x00'                     )                                 # Null separator between path and content hash
+        hasher.update(files[file_path].encode()   )
+        hasher.update(b'\x00'                     )                                 # Null separator between entries
+    return Safe_Str__Cache_Hash(hasher.hexdigest()[:hash_length])
+
+
+def zip_bytes__member_hashes(zip_bytes: bytes) -> List[str]:                        # content hash of each member (in archive order), i.e. one full read of the zip
+    with zipfile.ZipFile(io.BytesIO(zip_bytes), 'r') as zf:
+        return [zip_member__content_hash(zf.read(info)) for info in zf.infolist()]
 
 
 def zip_bytes__content_hash(zip_bytes: bytes, hash_length: int) -> Safe_Str__Cache_Hash:     # Calculate hash based on ZIP content, not raw bytes. This ensures identical content produces the same hash regardless of  creation time or compression settings.
+    with zipfile.ZipFile(io.BytesIO(zip_bytes), 'r') as zf:
+        file_paths = [info.filename for info in zf.infolist()]
+    return zip_members__content_hash(zip(file_paths, zip_bytes__member_hashes(zip_bytes)), hash_length)
+
+
+def zip_bytes__data_offset(zip_bytes: bytes, header_offset: int) -> int:           # Offset of a member's compressed data (after its local header, whose extra field can differ from the central directory's)
+    header = zip_bytes[header_offset:header_offset + ZIP__LOCAL_HEADER__SIZE]
+    if len(header) != ZIP__LOCAL_HEADER__SIZE or header[:4] != ZIP__LOCAL_HEADER__SIGNATURE:
+        raise ValueError(f"Invalid zip local header at offset {header_offset}")
+    name_length, extra_length = struct.unpack('<HH', header[26:30])
+    return header_offset + ZIP__LOCAL_HEADER__SIZE + name_length + extra_length
+
+
+def zip_bytes__index(zip_bytes: bytes) -> List[dict]:                               # Central directory entries (in archive order), with where each member's compressed data is
+    entries = []
+    with zipfile.ZipFile(io.BytesIO(zip_bytes), 'r') as zf:                         # only the central directory is parsed (no member is decompressed)
+        for info in zf.infolist():
+            entries.append(dict(file_name     = info.filename                                         ,
+                                header_offset = info.header_offset                                    ,
+                                data_offset   = zip_bytes__data_offset(zip_bytes, info.header_offset) ,
+                                compress_size = info.compress_size                                    ,
+                                file_size     = info.file_size                                        ,
+                                crc           = info.CRC                                              ,
+                                compress_type = info.compress_type                                    ))
+    return entries
+
+
+def zip_member__decompress(compressed: bytes, compress_type: int, crc: int = None) -> bytes:     # A member's content from its compressed data (raises ValueError when the method is not supported or the CRC doesn't match)
+    try:
+        if compress_type == zipfile.ZIP_STORED:
+            content = compressed
+        elif compress_type == zipfile.ZIP_DEFLATED:
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS)                      # raw deflate stream (no zlib header)
+            content      = decompressor.decompress(compressed) + decompressor.flush()
+        elif compress_type == zipfile.ZIP_BZIP2:
+            import bz2
+            content = bz2.decompress(compressed)
+        else:
+            raise ValueError(f"Unsupported zip compression method: {compress_type}")
+    except (zlib.error, OSError, EOFError) as error:                                # corrupted (or not a member's) data
+        raise ValueError(f"Invalid zip member data: {error}")
+    if crc is not None and zlib.crc32(content) != crc:
+        raise ValueError("Zip member CRC mismatch")
+    return content
+
+
+
+def zip_member__decompress__chunks(chunks        : Iterable[bytes],
+                                   compress_type : int            ,
+                                   crc           : int  = None    ,
+                                   max_length    : int  = 1048576
+                              ) -> Iterator[bytes]:                                 # A member's content from its compressed data, a chunk at a time (no chunk is bigger than max_length, even for highly compressed data)
+    if compress_type == zipfile.ZIP_STORED:
+        decompressor = None
+    elif compress_type == zipfile.ZIP_DEFLATED:
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    else:
+        raise ValueError(f"Unsupported zip compression method for streaming: {compress_type}")
+    crc_value = 0
+    try:
+        for chunk in chunks:
+            if decompressor is None:
+                crc_value = zlib.crc32(chunk, crc_value)
+                yield chunk
+                continue
+            data = chunk
+            while data:
+                content   = decompressor.decompress(data, max_length)
+                data      = decompressor.unconsumed_tail
+                crc_value = zlib.crc32(content, crc_value)
+                if content:
+                    yield content
+        if decompressor is not None:
+            content = decompressor.flush()
+            if content:
+                crc_value = zlib.crc32(content, crc_value)
+                yield content
+    except zlib.error as error:
+        raise ValueError(f"Invalid zip member data: {error}")
+    if crc is not None and crc_value != crc:
+        raise ValueError("Zip member CRC mismatch")
+
+
+def bytes__chunks__slice(chunks : Iterable[bytes],
+                         start  : int            ,
+                         length : int
+                    ) -> Iterator[bytes]:                                           # bytes start .. start+length-1 of a stream of chunks (the chunks after them are not read)
+    position = 0
+    if length <= 0:
+        return
+    for chunk in chunks:
+        chunk_end = position + len(chunk)
+        if chunk_end > start:
+            piece   = chunk[max(0, start - position):][:length]
+            length -= len(piece)
+            yield piece
+            if length <= 0:
+                return
+        position = chunk_end
+
+
+def zip_bytes__central_directory(zip_bytes: bytes) -> Tuple[int, int]:             # (offset, size) of the central directory, from the end of central directory record (and its zip64 version)
+    end_record = zip_bytes.rfind(ZIP__END_RECORD__SIGNATURE, max(0, len(zip_bytes) - ZIP__END_RECORD__SIZE - 0xFFFF))    # the record is followed by the zip comment (up to 64k)
+    if end_record < 0:
+        raise ValueError("Invalid zip: end of central directory record not found")
+    *_, size, offset, _ = struct.unpack(ZIP__END_RECORD__STRUCT, zip_bytes[end_record:end_record + ZIP__END_RECORD__SIZE])
+    start      = end_record
+    locator    = end_record - ZIP__END_LOCATOR_64__SIZE
+    if locator >= 0 and zip_bytes[locator:locator + 4] == ZIP__END_LOCATOR_64__SIGNATURE:
+        start  = locator - ZIP__END_RECORD_64__SIZE                                 # the zip64 record is just before its locator
+        record = struct.unpack(ZIP__END_RECORD_64__STRUCT, zip_bytes[start:locator])
+        if record[0] != ZIP__END_RECORD_64__SIGNATURE:
+            raise ValueError("Invalid zip: zip64 end of central directory record not found")
+        size, offset = record[8], record[9]
+    return start - size, size                                                       # from where the records are (like zipfile, for zips with bytes prepended)
+
+
+def zip_bytes__member_records(zip_bytes: bytes) -> dict:                          # header_offset -> end of the member's local record (i.e. header + data + data descriptor)
+    with zipfile.ZipFile(io.BytesIO(zip_bytes), 'r') as zf:
+        infos = zf.infolist()
+    start_dir, _ = zip_bytes__central_directory(zip_bytes)
+    offsets      = sorted({info.header_offset for info in infos}) + [start_dir]
+    next_offset  = dict(zip(offsets, offsets[1:]))
+    record_ends  = {}
+    for info in infos:
+        if info.flag_bits & ZIP__FLAG__DATA_DESCRIPTOR:                             # the descriptor's size varies (optional signature, zip64), so the record ends where the next one starts
+            record_ends[info.header_offset] = next_offset[info.header_offset]
+        else:
+            record_ends[info.header_offset] = zip_bytes__data_offset(zip_bytes, info.header_offset) + info.compress_size
+    return record_ends
+
+
+def zip_extra__strip(extra: bytes, field_ids: Tuple[int, ...]) -> bytes:           # The extra field without the blocks of field_ids
+    blocks   = []
+    position = 0
+    while position + 4 <= len(extra):
+        field_id, size = struct.unpack('<HH', extra[position:position + 4])
+        end            = position + 4 + size
+        if field_id not in field_ids:
+            blocks.append(extra[position:end])
+        position = end
+    return b''.join(blocks) + extra[position:]                                      # trailing bytes (shorter than a block header) are kept
+
+
+def zip_info__file_name(info: zipfile.ZipInfo) -> Tuple[bytes, int]:              # (encoded file name, flag bits), ascii when possible (else utf-8 with its flag)
+    try:
+        return info.filename.encode('ascii'), info.flag_bits
+    except UnicodeEncodeError:
+        return info.filename.encode('utf-8'), info.flag_bits | ZIP__FLAG__UTF8_FILE_NAME
+
+
+def zip_info__central_directory(info: zipfile.ZipInfo) -> bytes:                   # The member's central directory header (same bytes as zipfile writes on close)
+    year, month, day, hour, minute, second = info.date_time
+    dos_date      = (year - 1980) << 9 | month << 5 | day
+    dos_time      = hour << 11 | minute << 5 | (second // 2)
+    zip64         = []
+    file_size     = info.file_size
+    compress_size = info.compress_size
+    header_offset = info.header_offset
+    if file_size > ZIP__ZIP64__LIMIT or compress_size > ZIP__ZIP64__LIMIT:
+        zip64        += [file_size, compress_size]
+        file_size     = compress_size = 0xFFFFFFFF
+    if header_offset > ZIP__ZIP64__LIMIT:
+        zip64        += [header_offset]
+        header_offset = 0xFFFFFFFF
+    extra       = info.extra
+    min_version = 0
+    if zip64:
+        extra       = struct.pack('<HH' + 'Q' * len(zip64), ZIP__EXTRA__ZIP64, 8 * len(zip64), *zip64) + zip_extra__strip(extra, (ZIP__EXTRA__ZIP64,))
+        min_version = ZIP__ZIP64__VERSION
+    min_version           = max(min_version, ZIP__MIN_VERSION.get(info.compress_type, 0))
+    file_name, flag_bits  = zip_info__file_name(info)
+    header = struct.pack(ZIP__CENTRAL_DIR__STRUCT, ZIP__CENTRAL_DIR__SIGNATURE                   ,
+                         max(min_version, info.create_version ), info.create_system             ,
+                         max(min_version, info.extract_version), info.reserved                  ,
+                         flag_bits, info.compress_type, dos_time, dos_date, info.CRC            ,
+                         compress_size, file_size, len(file_name), len(extra), len(info.comment),
+                         0, info.internal_attr, info.external_attr, header_offset               )
+    return header + file_name + extra + info.comment
+
+
+def zip_end_records(count: int, offset: int, size: int, comment: bytes) -> bytes:  # The end of central directory record (after its zip64 record and locator, when needed)
+    records = b''
+    if count > ZIP__ZIP64__FILE_COUNT_LIMIT or offset > ZIP__ZIP64__LIMIT or size > ZIP__ZIP64__LIMIT:
+        records += struct.pack(ZIP__END_RECORD_64__STRUCT, ZIP__END_RECORD_64__SIGNATURE, ZIP__END_RECORD_64__SIZE - 12,
+                               ZIP__ZIP64__VERSION, ZIP__ZIP64__VERSION, 0, 0, count, count, size, offset)
+        records += struct.pack(ZIP__END_LOCATOR_64__STRUCT, ZIP__END_LOCATOR_64__SIGNATURE, 0, offset + size, 1)
+        count, size, offset = min(count, 0xFFFF), min(size, 0xFFFFFFFF), min(offset, 0xFFFFFFFF)
+    return records + struct.pack(ZIP__END_RECORD__STRUCT, ZIP__END_RECORD__SIGNATURE, 0, 0, count, count, size, offset, len(comment)) + comment
+
+
+def zip_member__copy(output      : io.BytesIO     ,
+                     zip_bytes   : bytes          ,
+                     info        : zipfile.ZipInfo,
+                     file_name   : str            ,
+                     record_end  : int
+                ) -> zipfile.ZipInfo:                                               # Copy a member's compressed data into output without decompressing it (the local header is only rebuilt when the member is renamed)
+    new_info               = copy.copy(info)
+    new_info.header_offset = output.tell()
+    if file_name == info.filename:
+        output.write(zip_bytes[info.header_offset:record_end])                      # local header, data (and data descriptor) byte-for-byte
+    else:
+        data_offset          = zip_bytes__data_offset(zip_bytes, info.header_offset)
+        new_info.filename    = file_name
+        new_info.flag_bits  &= ~ZIP__FLAG__DATA_DESCRIPTOR                          # the new header has the CRC and sizes (so no descriptor is needed)
+        new_info.extra       = zip_extra__strip(info.extra, (ZIP__EXTRA__ZIP64,))   # FileHeader adds it again when the sizes need it
+        output.write(new_info.FileHeader())
+        output.write(zip_bytes[data_offset:data_offset + info.compress_size])
+    return new_info
+
+
+def zip_bytes__new_members(contents: List[Tuple[str, bytes]]) -> Tuple[bytes, List[zipfile.ZipInfo]]:    # (zip, members) with the new contents, written by zipfile (so that they are copied like the original members)
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zf:                  # same compression as zip_bytes__add_files
+        for file_name, content in contents:
+            zf.writestr(file_name, content)
+    new_bytes = output.getvalue()
+    with zipfile.ZipFile(io.BytesIO(new_bytes), 'r') as zf:
+        return new_bytes, zf.infolist()
+
+
+def zip_bytes__rewrite(zip_bytes : bytes,
+                       members   : List[Tuple[str, Union[zipfile.ZipInfo, bytes]]]
+                  ) -> bytes:                                                       # Write a zip in one pass: (file_name, ZipInfo of a zip_bytes member) is copied without recompression, (file_name, bytes) is compressed as new content
+    record_ends = {}
+    comment     = b''
+    if zip_bytes:
+        record_ends = zip_bytes__member_records(zip_bytes)
+        with zipfile.ZipFile(io.BytesIO(zip_bytes), 'r') as source:
+            comment = source.comment
+    new_bytes, new_infos = zip_bytes__new_members([(file_name, member) for file_name, member in members if not isinstance(member, zipfile.ZipInfo)])
+    new_records          = zip_bytes__member_records(new_bytes)
+    new_infos            = iter(new_infos)
+    output               = io.BytesIO()
+    infos                = []
+    for file_name, member in members:
+        if isinstance(member, zipfile.ZipInfo):
+            infos.append(zip_member__copy(output, zip_bytes, member, file_name, record_ends[member.header_offset]))
+        else:
+            new_info = next(new_infos)
+            infos.append(zip_member__copy(output, new_bytes, new_info, new_info.filename, new_records[new_info.header_offset]))      # zipfile's name (i.e. normalised by ZipInfo)
+    start_dir = output.tell()
+    for info in infos:
+        output.write(zip_info__central_directory(info))
+    output.write(zip_end_records(len(infos), start_dir, output.tell() - start_dir, comment))
+    return output.getvalue()
+
+
+# ---- edits that copy the unchanged members without recompressing them (same results as osbot_utils' zip_bytes__add_files, zip_bytes__remove_files and zip_bytes__replace_files)
+
+def zip_bytes__members(zip_bytes: bytes) -> List[Tuple[str, zipfile.ZipInfo]]:     # (file_name, ZipInfo) of the zip's members in archive order (the input of zip_bytes__rewrite)
+    if not zip_bytes:
+        return []
+    with zipfile.ZipFile(io.BytesIO(zip_bytes), 'r') as zf:
+        return [(info.filename, info) for info in zf.infolist()]
+
+
+def zip_member__new(file_path: str, file_contents: Union[str, bytes]) -> Optional[Tuple[str, bytes]]:    # (file_name, bytes) of new content, None when it is not str or bytes (skipped, like zip_bytes__add_files)
+    if isinstance(file_contents, str):
+        file_contents = file_contents.encode('utf-8')
+    elif not isinstance(file_contents, bytes):
+        return None
+    return file_path.lstrip('/\\'), file_contents                                   # relative paths only
+
+
+def zip_bytes__add_files__raw_copy(zip_bytes: bytes, files_to_add: Dict[str, Union[str, bytes]]) -> bytes:     # appended (so an existing name is duplicated)
+    members = zip_bytes__members(zip_bytes)
+    for file_path, file_contents in files_to_add.items():
+        new_member = zip_member__new(file_path, file_contents)
+        if new_member:
+            members.append(new_member)
+    return zip_bytes__rewrite(zip_bytes, members)
+
+
+def zip_bytes__remove_files__raw_copy(zip_bytes: bytes, files_to_remove: List[str]) -> bytes:
+    files_to_remove = set(files_to_remove)
+    members         = [(file_name, info) for file_name, info in zip_bytes__members(zip_bytes) if file_name not in files_to_remove]
+    return zip_bytes__rewrite(zip_bytes, members)
+
+
+def zip_bytes__replace_files__raw_copy(zip_bytes: bytes, files_to_replace: Dict[str, Union[str, bytes]]) -> bytes:
+    files_to_remove = set(files_to_replace)
+    members         = [(file_name, info) for file_name, info in zip_bytes__members(zip_bytes) if file_name not in files_to_remove]
+    for file_path, file_contents in files_to_replace.items():
+        new_member = zip_member__new(file_path, file_contents)
+        if new_member:
+            members.append(new_member)
+    return zip_bytes__rewrite(zip_bytes, members)
+
+
+def zip_bytes__add_file__raw_copy(zip_bytes: bytes, zip_file_path: str, file_contents: Union[str, bytes]) -> bytes:
+    return zip_bytes__add_files__raw_copy(zip_bytes, {zip_file_path: file_contents})
 
-    files_dict  = zip_bytes__files(zip_bytes)                                       # Use existing zip_bytes__files to get all files and their content
-    sorted_files = sorted(files_dict.items())                                       # Sort files by name for deterministic ordering
-    hasher = hashlib.sha256()                                                       # Create hash from file paths and contents
 
-    for file_path, file_content in sorted_files:                                    # Hash the file path
-        hasher.update(file_path.encode('utf-8'))
-        hasher.update(b'\x00'                  )                                    # Null separator between path and content
-        hasher.update(file_content             )                                    # Hash the file content
-        hasher.update(b'\x00'                  )                                    # Null separator between entries
+def zip_bytes__remove_file__raw_copy(zip_bytes: bytes, file_to_remove: str) -> bytes:
+    return zip_bytes__remove_files__raw_copy(zip_bytes, [file_to_remove])
 
-    full_hash   = hasher.hexdigest()                                                # Get the full hash and truncate to configured length
 
-    return Safe_Str__Cache_Hash(full_hash[:hash_length])
\ No newline at end of file
+def zip_bytes__replace_file__raw_copy(zip_bytes: bytes, zip_file_path: str, file_contents: Union[str, bytes]) -> bytes:
+    return zip_bytes__replace_files__raw_copy(zip_bytes, {zip_file_path: file_contents})
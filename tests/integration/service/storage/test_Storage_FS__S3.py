@@ -474,4 +474,21 @@ class test_Storage_FS__S3(TestCase):
 
             # Files deleted through S3 should reflect in storage
             _.s3.file_delete(_.s3_bucket, s3_key)
-            assert _.file__exists(s3_key) is False
\ No newline at end of file
+            assert _.file__exists(s3_key) is False
+    def test_folder__files__page(self):                                              # Test prefix-scoped, paginated listing
+        with self.storage as _:
+            for name in ['a', 'b', 'c']:
+                _.file__save(Safe_Str__File__Path(f"paged/ns-1/{name}.txt"), b"data")
+            _.file__save(Safe_Str__File__Path("paged/ns-2/d.txt"), b"data")
+
+            paths, token = _.folder__files__page("paged/ns-1/", page_size=2)
+            assert paths          == ["paged/ns-1/a.txt", "paged/ns-1/b.txt"]       # keys are returned without the s3_prefix
+            assert token          is not None
+            paths, token = _.folder__files__page("paged/ns-1/", page_size=2, continuation_token=token)
+            assert paths          == ["paged/ns-1/c.txt"]
+            assert token          is None
+
+            pages = list(_.folder__files__pages("paged/", page_size=3))
+            assert [len(page) for page in pages] == [3, 1]
+            assert list(_.folder__files__pages("paged/ns-3/")) == [[]]
+            _.clear()
@@ -0,0 +1,71 @@
+from unittest                                                                       import TestCase
+from osbot_aws.utils.AWS_Sanitization                                               import str_to_valid_s3_bucket_name
+from osbot_utils.type_safe.primitives.domains.files.safe_str.Safe_Str__File__Path   import Safe_Str__File__Path
+from osbot_utils.utils.Misc                                                         import random_string_short
+from mgraph_ai_service_cache.service.storage.Storage_FS__S3                         import Storage_FS__S3
+from tests.integration.Service__Cache__Test_Objs__Integration                       import setup__service__cache__test_objs__integration
+
+
+class test_Storage_FS__S3__request_count(TestCase):                                 # Counts the HTTP requests sent to (LocalStack) S3 by each Storage_FS__S3 operation
+
+    @classmethod
+    def setUpClass(cls):
+        setup__service__cache__test_objs__integration()
+        cls.test_bucket = str_to_valid_s3_bucket_name(random_string_short("test-requests-"))
+        cls.storage     = Storage_FS__S3(s3_bucket=cls.test_bucket).setup()
+        cls.requests    = []
+        cls.storage.s3.client().meta.events.register('before-send.s3', cls.on_before_send)        # called once per HTTP request
+        cls.path        = Safe_Str__File__Path("counted/file.json")
+        cls.missing     = Safe_Str__File__Path("counted/missing.json")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.storage.s3.client().meta.events.unregister('before-send.s3', cls.on_before_send)
+        with cls.storage.s3 as _:
+            _.bucket_delete_all_files(cls.test_bucket)
+            _.bucket_delete(cls.test_bucket)
+
+    @classmethod
+    def on_before_send(cls, request, **kwargs):
+        cls.requests.append(request.method)
+
+    def request_count(self, optimistic, action) -> int:
+        self.storage.optimistic = optimistic
+        self.storage.file__save(self.path, b'{"a": 42}')
+        self.requests.clear()
+        action()
+        self.storage.optimistic = True
+        return len(self.requests)
+
+    def test_request_counts(self):
+        actions = dict(file__bytes         = lambda: self.storage.file__bytes        (self.path   ),
+                       file__bytes_missing = lambda: self.storage.file__bytes        (self.missing),
+                       file__str           = lambda: self.storage.file__str          (self.path   ),
+                       file__json          = lambda: self.storage.file__json         (self.path   ),
+                       file__metadata      = lambda: self.storage.file__metadata     (self.path   ),
+                       file__size          = lambda: self.storage.file__size         (self.path   ),
+                       file__last_modified = lambda: self.storage.file__last_modified(self.path   ))
+        for name, action in actions.items():
+            with_exists_check = self.request_count(optimistic=False, action=action)
+            optimistic        = self.request_count(optimistic=True , action=action)
+            assert optimistic == 1                              , name
+            if name != 'file__bytes_missing':                                        # a missing file is one HEAD with or without the exists check
+                assert with_exists_check == 2 * optimistic      , name               # the request count halves
+
+    def test_request_counts__file__delete(self):                                    # deletes keep the exists check (so that their result is truthful)
+        assert self.request_count(optimistic=False, action=lambda: self.storage.file__delete(self.path)) == 2
+        assert self.request_count(optimistic=True , action=lambda: self.storage.file__delete(self.path)) == 2
+
+    def test_optimistic__results(self):
+        with self.storage as _:
+            _.file__save(self.path, b'{"a": 42}')
+            assert _.file__bytes        (self.path   ) == b'{"a": 42}'
+            assert _.file__str          (self.path   ) == '{"a": 42}'
+            assert _.file__json         (self.path   ) == {'a': 42}
+            assert _.file__size         (self.path   ) == 9
+            assert _.file__last_modified(self.path   ) is not None
+            assert _.file__bytes        (self.missing) is None
+            assert _.file__str          (self.missing) is None
+            assert _.file__size         (self.missing) is None
+            assert _.file__metadata     (self.missing) is None
+            assert _.file__delete       (self.missing) is False
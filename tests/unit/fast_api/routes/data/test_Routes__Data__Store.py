@@ -335,6 +335,11 @@ class test_Routes__Data__Store(TestCase):
                                                           by_id   = [ f'{self.test_namespace}/refs/by-id/{cache_id[0:2]}/{cache_id[2:4]}/{cache_id}.json']),
                                          cache_id    = cache_id         ,
                                          cache_hash  = '2d456ae65174bccb',
+                                         content_size= __SKIP__          ,
+                                         metadata    = __SKIP__          ,
+                                         content_digest = None           ,
+                                         shared_blob = False             ,
+                                         expires_at  = 0                 ,
                                          file_type   = 'json'            ,
                                          namespace   = 'test-store-data' ,
                                          file_paths  = __(content_files = [f'{self.test_namespace}/data/temporal/{self.path_now}/{cache_id}.json'],
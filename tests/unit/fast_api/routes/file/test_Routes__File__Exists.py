@@ -49,7 +49,24 @@ class test_Routes__File__Exists(TestCase):
                                                                    default_ttl_hours = 24     ,
                                                                    local_disk_path   = None   ,
                                                                    sqlite_path       = None   ,
-                                                                   zip_path          = None   ),
+                                                                   zip_path          = None   ,
+                                                                   hot_cache_max_bytes   = 0      ,
+                                                                   hot_cache_max_entries = 10000   ,
+                                                                   exists_filter_capacity     = 0       ,
+                                                                   negative_cache_ttl_seconds = 0       ,
+                                                                   namespace_stats_reconcile_seconds = 0       ,
+                                                                   refs_write_behind_ms              = 0       ,
+                                                                   lean_data_files                   = False       ,
+                                                                   content_dedup                     = False       ,
+                                                                   shared_blobs_min_bytes            = 0           ,
+                                                                   ttl_enabled                       = False           ,
+                                                                   namespace_ttl_hours               = __()           ,
+                                                                   ttl_sweep_seconds                 = 0           ,
+                                                                   namespace_max_entries             = __()           ,
+                                                                   namespace_max_bytes               = __()           ,
+                                                                   eviction_policy                   = 'lru'           ,
+                                                                   access_sample_rate                = 1               ,
+                                                                   access_flush_seconds              = 0               ),
                                                    cache_handlers    = __()                                     ,
                                                    hash_config       = __(algorithm='sha256', length=16)        ,
                                                    hash_generator    = __(config=__(algorithm='sha256', length=16))),
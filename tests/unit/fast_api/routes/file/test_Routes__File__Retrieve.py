@@ -18,6 +18,8 @@ from mgraph_ai_service_cache.service.cache.retrieve.Cache__Service__Retrieve
 from mgraph_ai_service_cache.service.cache.store.Cache__Service__Store             import Cache__Service__Store
 from mgraph_ai_service_cache_client.schemas.cache.Schema__Cache__Binary__Reference import Schema__Cache__Binary__Reference
 from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Data_Type     import Enum__Cache__Data_Type
+from mgraph_ai_service_cache.schemas.cache.retrieve.Schema__Cache__Retrieve__Batch__Request  import Schema__Cache__Retrieve__Batch__Request
+from mgraph_ai_service_cache.schemas.cache.retrieve.Schema__Cache__Retrieve__Batch__Response import Schema__Cache__Retrieve__Batch__Response
 from tests.unit.Service__Cache__Test_Objs                                          import setup__service__cache__test_objs
 
 class test_Routes__File__Retrieve(TestCase):
@@ -289,4 +291,24 @@ class test_Routes__File__Retrieve(TestCase):
                     # String and JSON return data
                     result = _.retrieve__cache_id(fixture_id, self.fixtures_namespace)
                     fixture_data = self.cache_fixtures.get_fixture_data(fixture_name)
-                    assert result.data == fixture_data
\ No newline at end of file
+                    assert result.data == fixture_data
+
+    def test_retrieve__batch(self):                                                  # Test multi-get by cache_id and hash
+        missing_id = Random_Guid()
+        request    = Schema__Cache__Retrieve__Batch__Request(cache_ids    = [self.fixture_id_string, self.fixture_id_binary,
+                                                                             missing_id            , self.fixture_id_string],   # repeated id
+                                                             cache_hashes = [self.fixture_hash_json])
+        with self.routes as _:
+            response = _.retrieve__batch(request=request, namespace=self.fixtures_namespace)
+            results  = response.results
+            assert type(response)            is Schema__Cache__Retrieve__Batch__Response
+            assert response.total_requested  == 5
+            assert response.total_found      == 4
+            assert response.total_not_found  == 1
+            assert [result.found for result in results] == [True, True, False, True, True]
+            assert results[0].data           == self.test_string
+            assert results[1].data_type      == Enum__Cache__Data_Type.BINARY
+            assert base64.b64decode(results[1].data) == self.test_binary                  # binary is returned as base64
+            assert results[2].cache_id       == missing_id
+            assert results[4].cache_hash     == self.fixture_hash_json
+            assert results[4].data           == self.test_json
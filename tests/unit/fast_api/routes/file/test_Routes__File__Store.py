@@ -20,6 +20,10 @@ from mgraph_ai_service_cache_client.schemas.cache.file.Schema__Cache__File__Refs
 from mgraph_ai_service_cache_client.schemas.errors.Schema__Cache__Error__Invalid_Input       import Schema__Cache__Error__Invalid_Input
 from mgraph_ai_service_cache_client.schemas.cache.Schema__Cache__Store__Response             import Schema__Cache__Store__Response
 from mgraph_ai_service_cache.service.cache.store.Cache__Service__Store                       import Cache__Service__Store
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Data_Type               import Enum__Cache__Data_Type
+from mgraph_ai_service_cache.schemas.cache.store.Schema__Cache__Store__Batch__Item           import Schema__Cache__Store__Batch__Item
+from mgraph_ai_service_cache.schemas.cache.store.Schema__Cache__Store__Batch__Request        import Schema__Cache__Store__Batch__Request
+from mgraph_ai_service_cache.schemas.cache.store.Schema__Cache__Store__Batch__Response       import Schema__Cache__Store__Batch__Response
 from tests.unit.Service__Cache__Test_Objs                                                    import setup__service__cache__test_objs
 
 
@@ -125,6 +129,23 @@ class test_Routes__File__Store(TestCase):
             assert type(response_store.cache_id) is Cache_Id
             assert response_store.size           > 100
 
+    def test_store__batch(self):                                                                    # Test batch storage
+        request = Schema__Cache__Store__Batch__Request(items=[Schema__Cache__Store__Batch__Item(data_type=Enum__Cache__Data_Type.STRING, data='batch string'   ),
+                                                              Schema__Cache__Store__Batch__Item(data_type=Enum__Cache__Data_Type.JSON  , data={'batch': 'json'})])
+        with self.routes as _:
+            response_batch = _.store__batch(request   = request                            ,
+                                            strategy  = Enum__Cache__Store__Strategy.DIRECT,
+                                            namespace = self.test_namespace                )
+            assert type(response_batch)        is Schema__Cache__Store__Batch__Response
+            assert response_batch.total_stored == 2
+            assert response_batch.total_failed == 0
+            assert self.cache_service.retrieve_by_id(response_batch.results[1].response.cache_id,
+                                                     self.test_namespace)['data'] == {'batch': 'json'}
+
+            with pytest.raises(HTTPException) as exc_info:
+                _.store__batch(request=Schema__Cache__Store__Batch__Request(), namespace=self.test_namespace)
+            assert exc_info.value.status_code == 400
+
     def test_store__binary__cache_key(self):                                                        # Test binary storage
         binary_data = b'\x89PNG\r\n\x1a\n' + b'\x00' * 100                                          # Fake PNG header
         cache_key   = "an/cache-key"
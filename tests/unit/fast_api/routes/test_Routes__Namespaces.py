@@ -20,3 +20,8 @@ class test_Routes__Namespaces(TestCase):
         with self.routes_namespaces as _:
             assert 'fixtures-namespace' in _.list()
 
+    def test_sweep_expired(self):
+        with self.routes_namespaces as _:
+            result = _.sweep_expired()
+            assert 'fixtures-namespace' in result
+            assert set(result.get('fixtures-namespace')) == {'checked', 'expired', 'stale'}
@@ -114,7 +114,7 @@ class test_Routes__Zip__http(TestCase):
         result     = self._store_zip()
         cache_id   = result.get("cache_id")
         cache_hash = result.get("cache_hash")
-        assert cache_hash           == 'bd08a136c4cd5646'
+        assert cache_hash           == 'c4cdd8bbe45213eb'
         assert is_guid(cache_id)    is True
         assert len(cache_hash)      == 16
         assert result["namespace"]  == self.test_namespace
@@ -146,7 +146,7 @@ class test_Routes__Zip__http(TestCase):
         cache_id     = store_result["cache_id"]
         cache_hash   = store_result["cache_hash"]
 
-        assert cache_hash         == 'bd08a136c4cd5646'
+        assert cache_hash         == 'c4cdd8bbe45213eb'
         assert type(store_result) is dict
         assert obj(store_result)  ==  __( cache_id      = cache_id            ,
                                           cache_hash    = cache_hash          ,
@@ -138,7 +138,7 @@ class test_Routes__Zip(TestCase):
                                      strategy  = Enum__Cache__Store__Strategy.TEMPORAL )
             cache_id   = result.cache_id
             cache_hash = result.cache_hash
-            assert cache_hash           == 'd7e01b9f2e36c1bd'
+            assert cache_hash           == '7d6380afb87a3523'
             assert type(result)          is Schema__Cache__Zip__Store__Response
             assert type(result.cache_id) is Cache_Id
             assert result.namespace      == self.test_namespace
@@ -196,7 +196,7 @@ class test_Routes__Zip(TestCase):
             cache_id   = result.cache_id
             cache_hash = result.cache_hash
 
-            assert cache_hash        == 'd7e01b9f2e36c1bd'
+            assert cache_hash        == '7d6380afb87a3523'
             assert type(result)      is Schema__Cache__Zip__Store__Response
             assert result.namespace  == self.test_namespace
             assert result.file_count == 2
@@ -438,6 +438,33 @@ class test_Routes__Zip(TestCase):
             assert exc.value.status_code == 400
             assert "not a binary file" in exc.value.detail
 
+    def test_zip_retrieve__range(self):                                                          # Range requests (on the zip bytes in storage)
+        with self.routes as _:
+            request = Request(scope={"type": "http", "headers": [(b"range", b"bytes=0-3")]})
+            result  = _.zip_retrieve(cache_id=self.test_cache_id, namespace=self.test_namespace, request=request)
+            assert type(result)                    is Response
+            assert result.status_code              == 206
+            assert result.body                     == self.test_zip[:4] == b'PK\x03\x04'
+            assert result.headers["Content-Range"] == f"bytes 0-3/{len(self.test_zip)}"
+            assert result.headers["Accept-Ranges"] == "bytes"
+
+            request = Request(scope={"type": "http", "headers": [(b"range", f"bytes={len(self.test_zip)}-".encode())]})
+            with pytest.raises(HTTPException) as exc:
+                _.zip_retrieve(cache_id=self.test_cache_id, namespace=self.test_namespace, request=request)
+            assert exc.value.status_code              == 416
+            assert exc.value.headers["Content-Range"] == f"bytes */{len(self.test_zip)}"
+
+    def test_zip_file_retrieve__range(self):
+        with self.routes as _:
+            request = Request(scope={"type": "http", "headers": [(b"range", b"bytes=-1")]})
+            result  = _.zip_file_retrieve(cache_id  = self.test_cache_id               ,
+                                          file_path = Safe_Str__File__Path("file2.txt"),
+                                          namespace = self.test_namespace              ,
+                                          request   = request                          )
+            assert result.status_code              == 206
+            assert result.body                     == b"2"
+            assert result.headers["Content-Range"] == "bytes 8-8/9"
+
     def test_zip_file_add_from_string__round_trip(self):                                  # Test complete round-trip: add string → retrieve → verify
         with self.routes as _:
             # Add a string file to the test zip
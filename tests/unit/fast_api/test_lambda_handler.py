@@ -3,6 +3,8 @@ import types
 import pytest
 from unittest                                            import TestCase
 from osbot_utils.utils.Json                              import str_to_json
+from unittest.mock                                       import patch
+from mgraph_ai_service_cache.fast_api                    import lambda_handler
 from mgraph_ai_service_cache.fast_api.lambda_handler     import run
 
 
@@ -31,3 +33,20 @@ class test_lambda_handler(TestCase):
         assert response.get('statusCode') == 401
 
         assert str_to_json(response.get('body')).get('message') == 'Client API key is missing, you need to set it on a header or cookie'
+
+    def test_run__flush_error(self):                                                    # a failed flush is logged, and the handler's response is still returned
+        event = {'version'       : '2.0',
+                 'requestContext': {'http': {'method'  : 'GET',
+                                           'path'     : '/',
+                                           'sourceIp' : '127.0.0.1'}}}
+        with patch.object(type(lambda_handler.cache_service), 'flush', side_effect=Exception('an flush error')):
+            with self.assertLogs(lambda_handler.__name__, level='ERROR') as logs:
+                response = self.handler(event=event)
+        assert response.get('statusCode') == 401
+        assert 'failed to flush the cache service state' in logs.output[0]
+
+    def test_run__scheduled_event(self):                                                # EventBridge schedules sweep the expired entries (the background sweeper doesn't run in a frozen Lambda)
+        event = {'source': 'aws.events', 'detail-type': 'Scheduled Event', 'detail': {}}
+        with patch.object(type(lambda_handler.cache_service), 'sweep_expired', return_value={'a-namespace': {}}) as sweep_expired:
+            assert self.handler(event=event) == {'a-namespace': {}}
+        sweep_expired.assert_called_once_with()
@@ -0,0 +1,154 @@
+from unittest                                                                                 import TestCase
+from unittest.mock                                                                            import patch
+from memory_fs.storage_fs.providers.Storage_FS__Memory                                        import Storage_FS__Memory
+from osbot_utils.type_safe.Type_Safe                                                          import Type_Safe
+from osbot_utils.utils.Objects                                                                import base_classes
+from mgraph_ai_service_cache.service.cache.access.Cache__Access__Tracker                     import Cache__Access__Tracker
+
+
+class test_Cache__Access__Tracker(TestCase):
+
+    def setUp(self):
+        self.storage_fs     = Storage_FS__Memory()
+        self.access_tracker = Cache__Access__Tracker(storage_fs=self.storage_fs).setup()
+
+    def test__init__(self):
+        with self.access_tracker as _:
+            assert type(_)         is Cache__Access__Tracker
+            assert base_classes(_) == [Type_Safe, object]
+            assert _.sample_rate   == 1
+            assert _.entries       == {}
+            assert _.access('ns', 'id-1') is None
+            assert _.segments_folder('ns') == 'ns/index/access'
+            assert _.start()               is False                                             # the background flush is disabled
+
+    def test_record(self):
+        with self.access_tracker as _:
+            assert _.record('ns', 'id-1', now=1000) is True
+            assert _.record('ns', 'id-1', now=2000) is True
+            assert _.record('ns', 'id-2', now=1500) is True
+            assert _.access('ns'   , 'id-1') == (2000, 2)
+            assert _.access('ns'   , 'id-2') == (1500, 1)
+            assert _.access('other', 'id-1') is None                                            # per namespace
+
+    def test_record__sampled(self):
+        with self.access_tracker as _:
+            _.sample_rate = 4
+            recorded = [_.record('ns', 'id-1', now=index + 1) for index in range(8)]
+            assert recorded                == [False, False, False, True, False, False, False, True]
+            assert _.access('ns', 'id-1') == (8, 8)                                             # the hits are scaled up by the sample rate
+
+    def test_record_store__forget(self):
+        with self.access_tracker as _:
+            _.record      ('ns', 'id-1', now=1000)
+            _.record_store('ns', 'id-1', now=5000)                                              # stored again (i.e. a new entry)
+            assert _.access('ns', 'id-1') == (5000, 0)
+            assert _.forget('ns', 'id-1')  is True
+            assert _.forget('ns', 'id-1')  is False
+            assert _.access('ns', 'id-1')  is None
+
+    def test_flush(self):                                                                       # one segment per namespace, with the counters since the last flush
+        with self.access_tracker as _:
+            _.record('ns-1', 'id-1', now=1000)
+            _.record('ns-1', 'id-1', now=2000)
+            _.record('ns-2', 'id-2', now=3000)
+            assert _.flush()            == 2
+            assert _.flush()            == 0                                                    # nothing new
+            segments = _.segments('ns-1')
+            assert len(segments)        == 1
+            assert self.storage_fs.file__json(segments[0]) == {'id-1': [2000, 2]}
+            _.record('ns-1', 'id-1', now=4000)
+            _.forget('ns-1', 'id-3')
+            assert _.flush()            == 1
+            assert self.storage_fs.file__json(_.segments('ns-1')[1]) == {'id-1': [4000, 1], 'id-3': None}
+
+    def test_background_flush__error(self):                                                     # a failed flush is logged and counted (and the flusher keeps running)
+        with self.access_tracker as _:
+            _.record('ns', 'id-1', now=1000)
+            with patch.object(Cache__Access__Tracker, 'flush', side_effect=Exception('an flush error')):
+                with self.assertLogs(Cache__Access__Tracker.__module__, level='ERROR') as logs:
+                    assert _.background_flush() is None
+            assert _.flush_errors       == 1
+            assert 'failed to flush the access counters' in logs.output[0]
+            assert _.background_flush() == 1
+
+    def test_popularity(self):                                                                  # flushed segments (of all instances) plus the counters not flushed yet
+        other = Cache__Access__Tracker(storage_fs=self.storage_fs).setup()                      # i.e. another instance
+        other.instance_id = '00000000'                                                          # so that its segments are sorted first when flushed in the same ms
+        with self.access_tracker as _:
+            for index in range(3):
+                _.record('ns', 'id-1', now=1000 + index)
+            _.record('ns', 'id-2', now=5000)
+            _.record('ns', 'id-3', now=6000)
+            _.flush()
+            other.record('ns', 'id-2', now=7000)
+            other.record('ns', 'id-2', now=7001)
+            other.record('ns', 'id-2', now=7002)
+            other.flush()
+            _.record('ns', 'id-3', now=8000)                                                    # not flushed yet
+            assert _.popularity('ns') == [dict(cache_id='id-2', hits=4, last_access=7002),
+                                          dict(cache_id='id-1', hits=3, last_access=1002),
+                                          dict(cache_id='id-3', hits=2, last_access=8000)]
+            assert _.popularity('ns', limit=1) == [dict(cache_id='id-2', hits=4, last_access=7002)]
+            _.forget('ns', 'id-2')                                                              # deleted entries are dropped
+            _.flush()
+            assert [entry['cache_id'] for entry in _.popularity('ns')] == ['id-1', 'id-3']
+
+    def test_compact(self):
+        with self.access_tracker as _:
+            _.compact_segments = 3
+            for index in range(3):
+                _.record('ns', 'id-1', now=1000 + index)
+                _.flush()
+            assert len(_.segments('ns')) == 3
+            _.record('ns', 'id-2', now=2000)
+            _.flush()                                                                           # over compact_segments, so the segments are merged
+            assert len(_.segments('ns')) == 1
+            assert self.storage_fs.file__json(_.segments('ns')[0]) == {'id-1': [1002, 3], 'id-2': [2000, 1]}
+            assert _.compact('ns')       == 0
+
+    def test_compact__locked_by_other_instance(self):                                           # only one instance compacts a namespace at a time
+        other = Cache__Access__Tracker(storage_fs=self.storage_fs).setup()
+        with self.access_tracker as _:
+            for index in range(3):
+                _.record('ns', 'id-1', now=1000 + index)
+                _.flush()
+            lock_version = other.compact_lock('ns')
+            assert lock_version          is not None
+            assert _.compact_lock('ns')  is None
+            assert _.compact('ns')       == 0                                                   # skipped (the other instance holds the lock)
+            assert len(_.segments('ns')) == 3
+            other.storage_cas().delete(other.compact_lock_path('ns'), lock_version)
+            assert _.compact('ns')       == 3
+            assert self.storage_fs.file__exists(_.compact_lock_path('ns')) is False             # released
+
+    def test_record__max_pending(self):                                                         # flushed when too many counters are pending (even without the background flush)
+        with self.access_tracker as _:
+            _.max_pending = 3
+            _.record('ns', 'id-1', now=1000)
+            _.record('ns', 'id-2', now=1000)
+            assert _.segments('ns') == []
+            _.record('ns', 'id-3', now=1000)
+            assert len(_.segments('ns')) == 1
+            assert _.pending             == {}
+
+    def test_record__max_entries(self):                                                         # the least recently accessed entries are dropped from memory
+        with self.access_tracker as _:
+            _.max_entries = 10
+            for index in range(11):
+                _.record('ns', f'id-{index}', now=1000 + index)
+            assert len(_.entries['ns'])   == 9
+            assert _.access('ns', 'id-0') is None
+            assert _.access('ns', 'id-1') is None
+            assert _.access('ns', 'id-10') == (1010, 1)
+
+    def test_load(self):                                                                        # the flushed counters are merged into the ones of this instance (once)
+        other = Cache__Access__Tracker(storage_fs=self.storage_fs).setup()
+        other.record('ns', 'id-1', now=1000)
+        other.record('ns', 'id-1', now=1001)
+        other.flush()
+        with self.access_tracker as _:
+            _.record('ns', 'id-1', now=500)
+            assert _.load('ns')           is True
+            assert _.load('ns')           is False
+            assert _.access('ns', 'id-1') == (1001, 2)
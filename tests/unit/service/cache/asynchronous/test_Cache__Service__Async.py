@@ -0,0 +1,68 @@
+import asyncio
+from unittest                                                                           import TestCase
+from osbot_utils.type_safe.Type_Safe                                                    import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                   import Random_Guid
+from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id         import Safe_Str__Id
+from osbot_utils.utils.Misc                                                             import timestamp_now
+from osbot_utils.utils.Objects                                                          import base_classes
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode       import Enum__Cache__Storage_Mode
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy    import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache.service.cache.Cache__Config                                import Cache__Config
+from mgraph_ai_service_cache.service.cache.Cache__Service                               import Cache__Service
+from mgraph_ai_service_cache.service.cache.asynchronous.Cache__Service__Async          import Cache__Service__Async
+from mgraph_ai_service_cache.service.storage.Storage_FS__Async                         import Storage_FS__Async
+
+
+class test_Cache__Service__Async(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_service = Cache__Service(cache_config=Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY))
+        cls.async_service = Cache__Service__Async(cache_service=cls.cache_service).setup()
+        cls.namespace     = 'test-async'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.async_service.storage_async.shutdown()
+
+    def store(self, data):
+        cache_hash = self.cache_service.hash_from_json(data)
+        return asyncio.run(self.async_service.store_with_strategy(storage_data = data                               ,
+                                                                  cache_hash   = cache_hash                         ,
+                                                                  strategy     = Enum__Cache__Store__Strategy.DIRECT,
+                                                                  namespace    = self.namespace                     ))
+
+    def test__init__(self):
+        with self.async_service as _:
+            assert type(_)               is Cache__Service__Async
+            assert base_classes(_)       == [Type_Safe, object]
+            assert type(_.storage_async) is Storage_FS__Async
+
+    def test_retrieve_by_id__expired(self):                                                     # same read path as the sync version (expired entries are not returned)
+        response = self.store({'async': 'expired'})
+        refs     = self.cache_service.retrieve_by_id__refs(response.cache_id, self.namespace)
+        refs.expires_at = timestamp_now() - 1
+        with self.cache_service.get_or_create_handler(self.namespace).fs__refs_id.file__json__single(Safe_Str__Id(str(response.cache_id))) as ref_fs:
+            ref_fs.create(refs.json())
+        self.cache_service.hot_cache().invalidate__cache_id(self.namespace, response.cache_id)
+        assert asyncio.run(self.async_service.retrieve_by_id(response.cache_id, self.namespace)) is None
+
+    def test_retrieve_by_id(self):
+        response = self.store({'async': 'retrieve'})
+        result   = asyncio.run(self.async_service.retrieve_by_id(response.cache_id, self.namespace))
+        assert result == self.cache_service.retrieve_by_id(response.cache_id, self.namespace)                 # same result as the sync version
+        assert result['data'] == {'async': 'retrieve'}
+        assert asyncio.run(self.async_service.retrieve_by_id(Random_Guid(), self.namespace)) is None
+
+    def test_retrieve_by_hash(self):
+        data     = {'async': 'hash'}
+        response = self.store(data)
+        result   = asyncio.run(self.async_service.retrieve_by_hash(response.cache_hash, self.namespace))
+        assert result['data']                 == data
+        assert result['metadata']['cache_id'] == response.cache_id
+
+    def test_retrieve_by_ids(self):
+        cache_ids = [self.store({'item': i}).cache_id for i in range(20)]
+        results   = asyncio.run(self.async_service.retrieve_by_ids(cache_ids + [Random_Guid()], self.namespace))
+        assert [result['data'] for result in results[:-1]] == [{'item': i} for i in range(20)]
+        assert results[-1] is None
@@ -0,0 +1,154 @@
+from unittest                                                                                 import TestCase
+from memory_fs.storage_fs.providers.Storage_FS__Memory                                        import Storage_FS__Memory
+from osbot_utils.type_safe.Type_Safe                                                          import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                         import Random_Guid
+from osbot_utils.utils.Objects                                                                import base_classes
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode             import Enum__Cache__Storage_Mode
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy          import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache.service.cache.Cache__Config                                      import Cache__Config
+from mgraph_ai_service_cache.service.cache.Cache__Service                                     import Cache__Service
+from mgraph_ai_service_cache.service.cache.dedup.Cache__Content__Dedup                       import Cache__Content__Dedup, CACHE__CONTENT_DEDUP__PREFIX_PATH
+from mgraph_ai_service_cache.service.cache.update.Cache__Service__Update                      import Cache__Service__Update
+from mgraph_ai_service_cache.service.storage.Storage_FS__Compare_And_Swap                     import Storage_FS__Compare_And_Swap
+
+
+class test_Cache__Content__Dedup(TestCase):
+
+    def setUp(self):
+        self.storage_fs = Storage_FS__Memory()
+        self.refs_cas   = Storage_FS__Compare_And_Swap(storage_fs=self.storage_fs).setup()
+        self.dedup      = Cache__Content__Dedup(refs_cas=self.refs_cas, namespace='an-namespace')
+
+    def saver(self, path, content_bytes, saves):
+        def save_content():
+            saves.append(path)
+            self.storage_fs.file__save(path, content_bytes)
+        return save_content
+
+    def test__init__(self):
+        with self.dedup as _:
+            assert type(_)         is Cache__Content__Dedup
+            assert base_classes(_) == [Type_Safe, object]
+            assert _.prefix_path   == CACHE__CONTENT_DEDUP__PREFIX_PATH
+            digest = _.digest(b'abc')
+            assert len(digest)      == 64
+            assert _.index_path(digest) == f'an-namespace/refs/by-content/{digest[0:2]}/{digest[2:4]}/{digest}.json'
+            assert _.refcount(digest)   == 0
+
+    def test_acquire__release(self):
+        with self.dedup as _:
+            content = b'the same content'
+            digest  = _.digest(content)
+            saves   = []
+            assert _.acquire(digest, 'id-1', ['path-1'], self.saver('path-1', content, saves)) == ['path-1']
+            assert _.acquire(digest, 'id-2', ['path-2'], self.saver('path-2', content, saves)) == ['path-1']      # points to the first copy
+            assert _.acquire(digest, 'id-2', ['path-2'], self.saver('path-2', content, saves)) == ['path-1']      # acquiring again doesn't add a reference
+            assert saves                == ['path-1']                                                           # only one copy saved
+            assert _.refcount(digest)   == 2
+            assert _.release(digest, 'id-1') == []                                                              # id-2 still uses the copy
+            assert self.storage_fs.file__exists('path-1') is True
+            assert _.release(digest, 'id-1') == []                                                              # not in the index anymore
+            assert _.release(digest, 'id-2') == ['path-1']                                                      # last reference
+            assert _.refcount(digest)   == 0
+
+            assert _.acquire(digest, 'id-3', ['path-3'], self.saver('path-3', content, saves)) == ['path-3']      # released copies are never joined
+            assert saves                == ['path-1', 'path-3']
+
+
+class test_Cache__Content__Dedup__with_Cache__Service(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_service = Cache__Service(cache_config=Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY, content_dedup=True))
+        cls.storage_fs    = cls.cache_service.storage_fs()
+
+    def store(self, data, namespace, strategy=Enum__Cache__Store__Strategy.DIRECT):
+        return self.cache_service.store_with_strategy(storage_data = data                                   ,
+                                                      cache_hash   = self.cache_service.hash_from_json(data),
+                                                      cache_id     = Random_Guid()                          ,
+                                                      strategy     = strategy                               ,
+                                                      namespace    = namespace                              )
+
+    def test_store__retrieve__delete(self):
+        namespace  = 'test-content-dedup'
+        data       = {'a': 'repeated payload'}
+        response_1 = self.store(data, namespace)
+        response_2 = self.store(data, namespace)
+        response_3 = self.store(data, namespace)
+        refs_1     = self.cache_service.retrieve_by_id__refs(response_1.cache_id, namespace)
+        refs_2     = self.cache_service.retrieve_by_id__refs(response_2.cache_id, namespace)
+        dedup      = self.cache_service.get_or_create_handler(namespace).content_dedup_index()
+        shared     = refs_1.file_paths.content_files
+
+        assert len(response_1.paths.data)        == 1                                           # the first store saves the content (and no sidecars)
+        assert response_2.paths.data             == []                                          # the others don't save anything
+        assert refs_2.file_paths.content_files   == shared
+        assert refs_2.file_paths.data_folders    != refs_1.file_paths.data_folders              # child data is still per entry
+        assert refs_1.content_digest             == refs_2.content_digest
+        assert dedup.refcount(refs_1.content_digest) == 3
+        for response in (response_1, response_2, response_3):
+            assert self.cache_service.retrieve_by_id(response.cache_id, namespace)['data'] == data
+
+        assert self.cache_service.delete_by_id(response_1.cache_id, namespace)['status'] == 'success'
+        assert self.storage_fs.file__exists(shared[0])                                  is True     # still used by the other two
+        assert self.cache_service.retrieve_by_id(response_2.cache_id, namespace)['data'] == data
+        self.cache_service.delete_by_id(response_2.cache_id, namespace)
+        self.cache_service.delete_by_id(response_3.cache_id, namespace)
+        assert self.storage_fs.file__exists(shared[0])                                  is False    # deleted with the last reference
+        assert dedup.refcount(refs_1.content_digest)                                    == 0
+
+    def test_store__other_strategies(self):                                             # not deduped
+        namespace  = 'test-content-dedup'
+        data       = {'b': 'temporal payload'}
+        response_1 = self.store(data, namespace, Enum__Cache__Store__Strategy.TEMPORAL)
+        response_2 = self.store(data, namespace, Enum__Cache__Store__Strategy.TEMPORAL)
+        assert len(response_1.paths.data) == len(response_2.paths.data) > 0
+
+    def test_update__copy_on_write(self):
+        namespace    = 'test-content-dedup'
+        data         = {'c': 'shared payload'}
+        response_1   = self.store(data, namespace)
+        response_2   = self.store(data, namespace)
+        shared       = self.cache_service.retrieve_by_id__refs(response_1.cache_id, namespace).file_paths.content_files
+        update       = Cache__Service__Update(cache_service=self.cache_service).update_by_id(cache_id  = response_2.cache_id,
+                                                                                              namespace = namespace          ,
+                                                                                              data      = {'c': 'new value'} )
+        refs_2       = self.cache_service.retrieve_by_id__refs(response_2.cache_id, namespace)
+        assert update.paths                   != shared
+        assert refs_2.content_digest          is None
+        assert refs_2.file_paths.content_files == update.paths
+        assert self.cache_service.retrieve_by_id(response_1.cache_id, namespace)['data'] == data                   # the other entry is not changed
+        assert self.cache_service.retrieve_by_id(response_2.cache_id, namespace)['data'] == {'c': 'new value'}
+
+    def test_update__copy_on_write__first_storer(self):                                 # the shared copy is at the first entry's paths, so its update can't be saved there
+        namespace    = 'test-content-dedup'
+        data         = {'d': 'first storer payload'}
+        response_1   = self.store(data, namespace)
+        response_2   = self.store(data, namespace)
+        shared       = self.cache_service.retrieve_by_id__refs(response_1.cache_id, namespace).file_paths.content_files
+        update       = Cache__Service__Update(cache_service=self.cache_service).update_by_id(cache_id  = response_1.cache_id,
+                                                                                              namespace = namespace          ,
+                                                                                              data      = {'d': 'new value'} )
+        refs_1       = self.cache_service.retrieve_by_id__refs(response_1.cache_id, namespace)
+        assert update.paths                    != shared
+        assert refs_1.file_paths.content_files == update.paths
+        assert self.storage_fs.file__exists(shared[0])                                  is True
+        assert self.cache_service.retrieve_by_id(response_2.cache_id, namespace)['data'] == data                   # the other entry still has the original bytes
+        assert self.cache_service.retrieve_by_id(response_1.cache_id, namespace)['data'] == {'d': 'new value'}
+
+        self.cache_service.delete_by_id(response_1.cache_id, namespace)
+        assert self.storage_fs.file__exists(update.paths[0])                            is False    # the detached copy is deleted with its entry
+        assert self.cache_service.retrieve_by_id(response_2.cache_id, namespace)['data'] == data
+
+    def test_update__copy_on_write__last_reference(self):                               # no other entry uses the shared copy, so it is updated in place
+        namespace    = 'test-content-dedup'
+        data         = {'e': 'last reference payload'}
+        response_1   = self.store(data, namespace)
+        response_2   = self.store(data, namespace)
+        shared       = self.cache_service.retrieve_by_id__refs(response_1.cache_id, namespace).file_paths.content_files
+        self.cache_service.delete_by_id(response_1.cache_id, namespace)
+        update       = Cache__Service__Update(cache_service=self.cache_service).update_by_id(cache_id  = response_2.cache_id,
+                                                                                              namespace = namespace          ,
+                                                                                              data      = {'e': 'new value'} )
+        assert update.paths                                                             == shared
+        assert self.cache_service.retrieve_by_id(response_2.cache_id, namespace)['data'] == {'e': 'new value'}
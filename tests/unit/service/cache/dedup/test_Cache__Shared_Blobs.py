@@ -0,0 +1,131 @@
+from unittest                                                                                 import TestCase
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                         import Random_Guid
+from osbot_utils.utils.Misc                                                                   import timestamp_now
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode             import Enum__Cache__Storage_Mode
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy          import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache.service.cache.Cache__Config                                      import Cache__Config
+from mgraph_ai_service_cache.service.cache.Cache__Service                                     import Cache__Service
+from mgraph_ai_service_cache.service.cache.dedup.Cache__Content__Dedup                       import Cache__Content__Dedup
+from mgraph_ai_service_cache.service.cache.dedup.Cache__Shared_Blobs                         import Cache__Shared_Blobs, CACHE__SHARED_BLOBS__PREFIX_PATH
+from mgraph_ai_service_cache.service.storage.Storage_FS__Listing                              import Storage_FS__Listing
+
+
+class test_Cache__Shared_Blobs(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_service = Cache__Service(cache_config=Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY, shared_blobs_min_bytes=1024))
+        cls.storage_fs    = cls.cache_service.storage_fs()
+        cls.shared_blobs  = cls.cache_service.shared_blobs()
+
+    def store(self, data, namespace):
+        return self.cache_service.store_with_strategy(storage_data = data                                    ,
+                                                      cache_hash   = self.cache_service.hash_from_bytes(data),
+                                                      cache_id     = Random_Guid()                           ,
+                                                      strategy     = Enum__Cache__Store__Strategy.DIRECT     ,
+                                                      namespace    = namespace                               )
+
+    def test__init__(self):
+        with self.shared_blobs as _:
+            assert type(_)                 is Cache__Shared_Blobs
+            assert isinstance(_, Cache__Content__Dedup)
+            assert _.prefix_path           == CACHE__SHARED_BLOBS__PREFIX_PATH
+            digest = _.digest(b'abc')
+            assert _.index_path(digest)    == f'_blobs/{digest[0:2]}/{digest[2:4]}/{digest}.json'
+            assert _.entry_ref('ns', 'id') == 'ns/id'
+            copy_path = _.copy_path(digest, 'ns', 'id')
+            assert copy_path.startswith(f'_blobs/{digest[0:2]}/{digest[2:4]}/{digest}/')
+            assert copy_path.endswith('-ns-id')
+            assert _.copy_created_at(copy_path) > 0
+            assert self.cache_service.get_or_create_handler('ns').shared_blobs is _             # shared by all namespaces
+
+    def test_store__cross_namespace(self):
+        blob       = b'\x00\x01' * 2048                                                         # over the 1024 bytes threshold
+        small      = b'small blob'
+        response_1 = self.store(blob , 'tenant-a')
+        response_2 = self.store(blob , 'tenant-b')
+        response_3 = self.store(small, 'tenant-a')
+        refs_1     = self.cache_service.retrieve_by_id__refs(response_1.cache_id, 'tenant-a')
+        refs_2     = self.cache_service.retrieve_by_id__refs(response_2.cache_id, 'tenant-b')
+        refs_3     = self.cache_service.retrieve_by_id__refs(response_3.cache_id, 'tenant-a')
+        blob_path  = refs_1.file_paths.content_files[0]
+
+        assert refs_1.shared_blob                  is True
+        assert blob_path.startswith('_blobs/')
+        assert refs_2.file_paths.content_files     == [blob_path]                                # one copy for both namespaces
+        assert refs_3.shared_blob                  is False                                      # under the threshold
+        assert refs_3.file_paths.content_files[0].startswith('tenant-a/')
+        assert response_1.paths.data               == []                                         # the blobs are not the namespace's data files
+        assert self.shared_blobs.refcount(refs_1.content_digest) == 2
+        assert self.cache_service.retrieve_by_id(response_2.cache_id, 'tenant-b')['data'] == blob
+
+        self.cache_service.delete_by_id(response_1.cache_id, 'tenant-a')
+        assert self.storage_fs.file__exists(blob_path) is True
+        assert self.cache_service.retrieve_by_id(response_2.cache_id, 'tenant-b')['data'] == blob
+        self.cache_service.delete_by_id(response_2.cache_id, 'tenant-b')
+        assert self.storage_fs.file__exists(blob_path) is False                                  # deleted with the last reference
+
+    def test_gc(self):
+        self.cache_service = Cache__Service(cache_config=Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY, shared_blobs_min_bytes=1024))     # own storage (so that the other tests' blobs are not collected)
+        self.storage_fs    = self.cache_service.storage_fs()
+        self.shared_blobs  = self.cache_service.shared_blobs()
+        blob       = b'\x02' * 4096
+        response   = self.store(blob, 'tenant-gc')
+        refs       = self.cache_service.retrieve_by_id__refs(response.cache_id, 'tenant-gc')
+        digest     = refs.content_digest
+        live_copy  = refs.file_paths.content_files[0]
+        orphan     = f'{self.shared_blobs.shard_folder(digest)}/{digest}/{timestamp_now() - 7_200_000}-tenant-gc-orphan'     # i.e. left by an interrupted store, two hours ago
+        recent     = self.shared_blobs.copy_path(digest, 'tenant-gc', 'in-flight')                                              # i.e. a store that hasn't updated the index yet
+        self.storage_fs.file__save(orphan, blob)
+        self.storage_fs.file__save(recent, blob)
+
+        assert self.shared_blobs.gc() == dict(indexes_deleted=0, copies_deleted=1, bytes_deleted=len(blob))
+        assert self.storage_fs.file__exists(orphan   ) is False
+        assert self.storage_fs.file__exists(recent   ) is True                                  # inside the grace period
+        assert self.storage_fs.file__exists(live_copy) is True
+
+        self.cache_service.delete_by_id(response.cache_id, 'tenant-gc')
+        assert self.shared_blobs.gc()                == dict(indexes_deleted=0, copies_deleted=0, bytes_deleted=0)     # released just now
+        assert self.shared_blobs.gc(grace_seconds=0) == dict(indexes_deleted=1, copies_deleted=1, bytes_deleted=len(blob))
+        assert self.storage_fs.file__exists(self.shared_blobs.index_path(digest)) is False
+
+
+class test_Cache__Shared_Blobs__benchmark(TestCase):                                           # bytes on disk for a synthetic multi-namespace dataset (with and without the shared blobs)
+
+    NAMESPACES        = 8
+    ENTRIES_PER_NS    = 25
+    DISTINCT_BLOBS    = 5
+    BLOB_SIZE         = 64 * 1024
+
+    def bytes_on_disk(self, cache_service, namespaces):
+        storage_fs = cache_service.storage_fs()
+        listing    = Storage_FS__Listing(storage_fs=storage_fs)
+        total      = 0
+        for folder in list(namespaces) + [CACHE__SHARED_BLOBS__PREFIX_PATH]:
+            for path in listing.files(folder):
+                total += len(storage_fs.file__bytes(path) or b'')
+        return total
+
+    def load_dataset(self, cache_service):
+        blobs      = [bytes([index]) * self.BLOB_SIZE for index in range(self.DISTINCT_BLOBS)]
+        namespaces = [f'bench-tenant-{index}' for index in range(self.NAMESPACES)]
+        for ns_index, namespace in enumerate(namespaces):
+            for entry_index in range(self.ENTRIES_PER_NS):
+                blob = blobs[(ns_index + entry_index) % self.DISTINCT_BLOBS]                    # every tenant stores every blob several times
+                cache_service.store_with_strategy(storage_data = blob                                ,
+                                                  cache_hash   = cache_service.hash_from_bytes(blob) ,
+                                                  cache_id     = Random_Guid()                       ,
+                                                  strategy     = Enum__Cache__Store__Strategy.DIRECT ,
+                                                  namespace    = namespace                           )
+        return namespaces
+
+    def test_bytes_on_disk(self):
+        baseline      = Cache__Service(cache_config=Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY))
+        shared        = Cache__Service(cache_config=Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY, shared_blobs_min_bytes=1024))
+        bytes_before  = self.bytes_on_disk(baseline, self.load_dataset(baseline))
+        bytes_after   = self.bytes_on_disk(shared  , self.load_dataset(shared  ))
+        content_bytes = self.NAMESPACES * self.ENTRIES_PER_NS * self.BLOB_SIZE
+        reduction     = 1 - bytes_after / bytes_before
+        assert bytes_before >= content_bytes                                                    # one copy per entry (plus the refs)
+        assert bytes_after  <  self.DISTINCT_BLOBS * self.BLOB_SIZE + (bytes_before - content_bytes) * 2    # one copy per blob (plus the refs and the blob indexes)
+        assert reduction    >  0.9
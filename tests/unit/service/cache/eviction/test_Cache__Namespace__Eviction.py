@@ -0,0 +1,120 @@
+from unittest                                                                                 import TestCase
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                         import Random_Guid
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode             import Enum__Cache__Storage_Mode
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy          import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache.fast_api.routes.Routes__Namespace                                import Routes__Namespace
+from mgraph_ai_service_cache.service.cache.Cache__Config                                      import Cache__Config
+from mgraph_ai_service_cache.service.cache.Cache__Service                                     import Cache__Service
+from mgraph_ai_service_cache.service.cache.eviction.Cache__Namespace__Eviction               import Cache__Namespace__Eviction, CACHE__EVICTION__POLICY__LFU
+
+
+class test_Cache__Namespace__Eviction(TestCase):
+
+    def setUp(self):
+        self.cache_service = Cache__Service(cache_config=Cache__Config(storage_mode          = Enum__Cache__Storage_Mode.MEMORY ,
+                                                                       namespace_max_entries = {'bounded': 3}                  ,
+                                                                       namespace_max_bytes   = {'small'  : 100}                ))
+        self.eviction      = self.cache_service.namespace_eviction()
+
+    def store(self, data, namespace):
+        return self.cache_service.store_with_strategy(storage_data = data                                  ,
+                                                      cache_hash   = self.cache_service.hash_from_json(data),
+                                                      cache_id     = Random_Guid()                         ,
+                                                      strategy     = Enum__Cache__Store__Strategy.DIRECT   ,
+                                                      namespace    = namespace                             )
+
+    def exists(self, response, namespace):
+        return self.cache_service.retrieve_by_id__refs(response.cache_id, namespace) is not None
+
+    def test__init__(self):
+        with self.eviction as _:
+            assert type(_)        is Cache__Namespace__Eviction
+            assert _.sample_size  == 16
+            assert _.bounded(self.cache_service.get_or_create_handler('bounded'  )) is True
+            assert _.bounded(self.cache_service.get_or_create_handler('unbounded')) is False
+
+    def test_on_store__max_entries__lru(self):
+        namespace = 'bounded'
+        access    = self.cache_service.access_tracker()
+        responses = [self.store({'a': index}, namespace) for index in range(3)]
+        for index, response in enumerate(responses):
+            access.record_store(namespace, response.cache_id, now=1000 + index)                 # so that the stores are not in the same ms
+        access.record(namespace, responses[0].cache_id, now=5000)                               # the oldest entry is the most recently used now
+        response_4 = self.store({'a': 3}, namespace)
+
+        assert self.exists(responses[0], namespace) is True
+        assert self.exists(responses[1], namespace) is False                                   # least recently used
+        assert self.exists(responses[2], namespace) is True
+        assert self.exists(response_4  , namespace) is True
+        stats = self.cache_service.get_namespace__stats(namespace)
+        assert stats.entries   == 3
+        assert stats.evictions == 1
+
+    def test_on_store__max_entries__lfu(self):
+        namespace = 'bounded'
+        handler   = self.cache_service.get_or_create_handler(namespace)
+        handler.eviction_policy = CACHE__EVICTION__POLICY__LFU
+        responses = [self.store({'b': index}, namespace) for index in range(3)]
+        for _ in range(3):
+            self.cache_service.retrieve_by_id(responses[1].cache_id, namespace)
+            self.cache_service.retrieve_by_id(responses[2].cache_id, namespace)
+        self.cache_service.retrieve_by_id(responses[0].cache_id, namespace)                    # most recently used, but least frequently
+        self.store({'b': 3}, namespace)
+
+        assert self.exists(responses[0], namespace) is False
+        assert self.exists(responses[1], namespace) is True
+        assert self.exists(responses[2], namespace) is True
+
+    def test_on_store__max_bytes(self):
+        namespace = 'small'
+        responses = [self.store({'c': 'x' * 30, 'i': index}, namespace) for index in range(5)]
+        stats     = self.cache_service.get_namespace__stats(namespace)
+        assert stats.content_bytes  <= 100
+        assert stats.evictions      == 5 - stats.entries
+        assert self.exists(responses[-1], namespace) is True                                   # the new entry is never evicted
+
+        big = self.store({'c': 'x' * 200}, namespace)                                           # bigger than the quota (so everything else is evicted)
+        assert self.exists(big, namespace)                              is True
+        assert self.cache_service.get_namespace__stats(namespace).entries == 1
+
+    def test_on_store__unbounded(self):
+        namespace = 'unbounded'
+        for index in range(5):
+            self.store({'d': index}, namespace)
+        assert self.cache_service.get_namespace__stats(namespace).entries   == 5
+        assert self.cache_service.get_namespace__stats(namespace).evictions == 0
+        assert namespace not in self.eviction.candidates                                        # no candidates kept for the namespaces without a quota
+
+    def test_on_delete(self):
+        namespace = 'bounded'
+        response  = self.store({'e': 1}, namespace)
+        assert response.cache_id in self.eviction.positions[namespace]
+        self.cache_service.delete_by_id(response.cache_id, namespace)
+        assert response.cache_id not in self.eviction.positions[namespace]
+        assert self.eviction.candidates[namespace]                                 == []
+        assert self.cache_service.access_tracker().access(namespace, response.cache_id) is None
+        assert self.cache_service.get_namespace__stats(namespace).evictions       == 0         # deletes are not evictions
+
+    def test_add_candidate__remove_candidate(self):
+        with self.eviction as _:
+            _.candidates['ns'], _.positions['ns'] = [], {}
+            for cache_id in ['id-1', 'id-2', 'id-3']:
+                assert _.add_candidate('ns', cache_id) is True
+            assert _.add_candidate   ('ns', 'id-1') is False
+            assert _.remove_candidate('ns', 'id-1') is True                                     # swapped with the last one
+            assert _.candidates['ns']               == ['id-3', 'id-2']
+            assert _.positions ['ns']               == {'id-3': 0, 'id-2': 1}
+            assert _.remove_candidate('ns', 'id-1') is False
+            assert _.sample_candidates('ns', exclude='id-2') == ['id-3']
+            assert _.add_candidate('not-loaded', 'id-1') is False
+
+    def test_stats_route(self):
+        namespace = 'bounded'
+        for index in range(4):
+            self.store({'f': index}, namespace)
+        stats = Routes__Namespace(cache_service=self.cache_service).stats(namespace=namespace)
+        assert stats['entries'        ] == 3
+        assert stats['max_entries'    ] == 3
+        assert stats['max_bytes'      ] == 0
+        assert stats['eviction_policy'] == 'lru'
+        assert stats['evictions'      ] == 1
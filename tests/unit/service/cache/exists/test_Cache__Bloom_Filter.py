@@ -0,0 +1,49 @@
+from unittest                                                           import TestCase
+from osbot_utils.type_safe.Type_Safe                                    import Type_Safe
+from osbot_utils.utils.Objects                                          import base_classes
+from mgraph_ai_service_cache.service.cache.exists.Cache__Bloom_Filter   import Cache__Bloom_Filter
+
+
+class test_Cache__Bloom_Filter(TestCase):
+
+    def setUp(self):
+        self.bloom_filter = Cache__Bloom_Filter().setup(capacity=1000, false_positive_rate=0.01)
+
+    def test__init__(self):
+        with Cache__Bloom_Filter() as _:
+            assert type(_)         is Cache__Bloom_Filter
+            assert base_classes(_) == [Type_Safe, object]
+            assert _.size_bits     == 0
+        with self.bloom_filter as _:
+            assert _.size_bits     == 9585                                      # m = -n * ln(p) / ln(2)^2
+            assert _.hash_count    == 7                                         # k = m/n * ln(2)
+            assert _.size_bytes()  == 1199
+
+    def test_add__might_contain(self):
+        with self.bloom_filter as _:
+            assert _.might_contain('hash-1')     is False
+            _.add('hash-1')
+            assert _.might_contain('hash-1')     is True
+            assert _.might_contain('hash-2')     is False
+            assert _.items_added                 == 1
+
+    def test_false_positive_rate(self):
+        with self.bloom_filter as _:
+            for i in range(1000):
+                _.add(f'added-{i}')
+            assert all(_.might_contain(f'added-{i}') for i in range(1000))      # no false negatives
+            false_positives = sum(_.might_contain(f'missing-{i}') for i in range(10_000))
+            assert false_positives          < 300                               # ~1% expected at capacity
+            assert 0.005 < _.false_positive_rate() < 0.02
+
+    def test_to_bytes__from_bytes(self):
+        with self.bloom_filter as _:
+            _.add('hash-1')
+            snapshot = _.to_bytes()
+            restored = Cache__Bloom_Filter.from_bytes(snapshot)
+            assert restored.size_bits              == _.size_bits
+            assert restored.hash_count             == _.hash_count
+            assert restored.items_added            == 1
+            assert restored.might_contain('hash-1') is True
+            assert Cache__Bloom_Filter.from_bytes(None)           is None
+            assert Cache__Bloom_Filter.from_bytes(snapshot[:-1])  is None       # truncated snapshot
@@ -0,0 +1,137 @@
+from unittest                                                                                 import TestCase
+from memory_fs.storage_fs.providers.Storage_FS__Memory                                        import Storage_FS__Memory
+from osbot_utils.type_safe.Type_Safe                                                          import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                         import Random_Guid
+from osbot_utils.utils.Objects                                                                import base_classes
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode             import Enum__Cache__Storage_Mode
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy          import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache.schemas.cache.exists.Schema__Cache__Exists_Filter__Stats        import Schema__Cache__Exists_Filter__Stats
+from mgraph_ai_service_cache.service.cache.Cache__Config                                      import Cache__Config
+from mgraph_ai_service_cache.service.cache.Cache__Service                                     import Cache__Service
+from mgraph_ai_service_cache.service.cache.exists.Cache__Bloom_Filter                        import Cache__Bloom_Filter
+from mgraph_ai_service_cache.service.cache.exists.Cache__Exists__Filter                      import Cache__Exists__Filter
+
+
+class test_Cache__Exists__Filter(TestCase):
+
+    def setUp(self):
+        self.storage_fs    = Storage_FS__Memory()
+        self.exists_filter = Cache__Exists__Filter(storage_fs=self.storage_fs, capacity=1000, single_writer=True, negative_ttl_seconds=60).setup()
+        self.namespace     = 'an-namespace'
+
+    def test__init__(self):
+        with Cache__Exists__Filter().setup() as _:
+            assert type(_)         is Cache__Exists__Filter
+            assert base_classes(_) == [Type_Safe, object]
+            assert _.enabled()     is False                                                         # disabled by default
+            assert _.load_or_rebuild('ns', list) is False
+            assert _.definitely_missing('ns', 'abc') is False                                       # without a filter, storage must be checked
+        with Cache__Exists__Filter(capacity=1000).setup() as _:
+            assert _.enabled()     is False                                                         # only used by single writer deployments
+
+    def test_load_or_rebuild(self):
+        with self.exists_filter as _:
+            assert _.load_or_rebuild(self.namespace, lambda: ['hash-1', 'hash-2']) is True
+            assert self.storage_fs.file__exists(_.snapshot_path(self.namespace))     is True        # rebuilt filter is saved
+            assert _.snapshot_path(self.namespace) == 'an-namespace/index/exists/by-hash.bloom'
+            assert _.definitely_missing(self.namespace, 'hash-1') is False
+            assert _.definitely_missing(self.namespace, 'hash-3') is True
+
+        exists_filter = Cache__Exists__Filter(storage_fs=self.storage_fs, capacity=1000, single_writer=True).setup()
+        exists_filter.load_or_rebuild(self.namespace, lambda: self.fail('snapshot should be used'))   # second instance loads the snapshot
+        assert type(exists_filter.bloom_filters[self.namespace])             is Cache__Bloom_Filter
+        assert exists_filter.definitely_missing(self.namespace, 'hash-2')   is False
+
+    def test_load_or_rebuild__stale_snapshot(self):                                             # hashes stored after the last snapshot are not in it
+        with self.exists_filter as _:
+            _.load_or_rebuild(self.namespace, lambda: ['hash-1'])
+            assert _.before_store(self.namespace)                               is True             # writes the dirty file (once per snapshot)
+            _.add(self.namespace, 'hash-2')
+            assert _.before_store(self.namespace)                               is False
+            _.add(self.namespace, 'hash-3')
+            assert self.storage_fs.file__exists(_.dirty_path(self.namespace))   is True
+            assert _.dirty_path(self.namespace) == 'an-namespace/index/exists/by-hash.dirty'
+
+        exists_filter = Cache__Exists__Filter(storage_fs=self.storage_fs, capacity=1000, single_writer=True).setup()     # i.e. after a restart without a flush
+        exists_filter.load_or_rebuild(self.namespace, lambda: ['hash-1', 'hash-2', 'hash-3'])      # so it is rebuilt from storage
+        assert exists_filter.definitely_missing(self.namespace, 'hash-2')       is False
+        assert self.storage_fs.file__exists(_.dirty_path(self.namespace))       is False            # the rebuilt snapshot is up to date
+
+        self.exists_filter.before_store(self.namespace)
+        self.exists_filter.add(self.namespace, 'hash-4')
+        assert self.exists_filter.flush()                                       == 1                # saves the snapshot and deletes the dirty file
+        assert self.exists_filter.flush()                                       == 0
+        assert self.storage_fs.file__exists(_.dirty_path(self.namespace))       is False
+        exists_filter = Cache__Exists__Filter(storage_fs=self.storage_fs, capacity=1000, single_writer=True).setup()
+        exists_filter.load_or_rebuild(self.namespace, lambda: self.fail('snapshot should be used'))
+        assert exists_filter.definitely_missing(self.namespace, 'hash-4')       is False
+
+    def test_add__record_miss(self):
+        with self.exists_filter as _:
+            _.load_or_rebuild(self.namespace, list)
+            assert _.definitely_missing(self.namespace, 'hash-1') is True
+            _.add(self.namespace, 'hash-1')
+            assert _.definitely_missing(self.namespace, 'hash-1') is False
+            _.record_miss(self.namespace, 'hash-1')                                                 # i.e. hash was deleted
+            assert _.definitely_missing(self.namespace, 'hash-1') is True                           # answered by the negative cache
+            _.add(self.namespace, 'hash-1')                                                         # stored again
+            assert _.definitely_missing(self.namespace, 'hash-1') is False
+
+    def test_record_miss__expires(self):
+        with Cache__Exists__Filter(negative_ttl_seconds=1).setup() as _:
+            _.record_miss(self.namespace, 'hash-1')
+            assert _.definitely_missing(self.namespace, 'hash-1') is True
+            _.negative_cache[_.negative_key(self.namespace, 'hash-1')] = 0.0                        # force expiry
+            assert _.definitely_missing(self.namespace, 'hash-1') is False
+            assert _.negative_cache                               == {}
+
+    def test_stats(self):
+        with self.exists_filter as _:
+            _.load_or_rebuild(self.namespace, lambda: ['hash-1'])
+            _.definitely_missing(self.namespace, 'hash-1')
+            _.definitely_missing(self.namespace, 'hash-2')
+            stats = _.stats(self.namespace)
+            assert type(stats)           is Schema__Cache__Exists_Filter__Stats
+            assert stats.enabled         is True
+            assert stats.items_added     == 1
+            assert stats.definite_misses == 1
+            assert stats.storage_checks  == 1
+
+
+class test_Cache__Exists__Filter__with_Cache__Service(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_config  = Cache__Config(storage_mode               = Enum__Cache__Storage_Mode.MEMORY,
+                                          exists_filter_capacity     = 1000                            ,
+                                          exists_filter_single_writer= True                            ,
+                                          negative_cache_ttl_seconds = 60                              )
+        cls.cache_service = Cache__Service(cache_config=cls.cache_config)
+        cls.namespace     = 'test-exists-filter'
+
+    def store(self, data):
+        cache_hash = self.cache_service.hash_from_json(data)
+        return self.cache_service.store_with_strategy(storage_data = data                               ,
+                                                      cache_hash   = cache_hash                         ,
+                                                      cache_id     = Random_Guid()                      ,
+                                                      strategy     = Enum__Cache__Store__Strategy.DIRECT,
+                                                      namespace    = self.namespace                     )
+
+    def test_exists_by_hash(self):
+        with self.cache_service as _:
+            data       = {'exists': 'filter'}
+            cache_hash = _.hash_from_json(data)
+            assert _.exists_by_hash(cache_hash, self.namespace) is False                            # answered by the Bloom filter
+            response   = self.store(data)
+            assert _.exists_by_hash(cache_hash, self.namespace) is True
+            _.delete_by_id(response.cache_id, self.namespace)
+            assert _.exists_by_hash(cache_hash, self.namespace) is False                            # answered by the negative cache
+            stats = _.exists_filter().stats(self.namespace)
+            assert stats.definite_misses >= 2
+
+    def test_retrieve_by_hash__missing(self):
+        with self.cache_service as _:
+            cache_hash = _.hash_from_json({'never': 'stored'})
+            misses     = _.exists_filter().stats(self.namespace).definite_misses
+            assert _.retrieve_by_hash(cache_hash, self.namespace)                    is None
+            assert _.exists_filter().stats(self.namespace).definite_misses           == misses + 1
@@ -0,0 +1,139 @@
+from unittest                                                                        import TestCase
+from osbot_utils.testing.__                                                          import __
+from osbot_utils.type_safe.Type_Safe                                                 import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                import Random_Guid
+from osbot_utils.utils.Objects                                                       import base_classes
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode    import Enum__Cache__Storage_Mode
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache.schemas.cache.hot_cache.Schema__Cache__Hot_Cache__Stats import Schema__Cache__Hot_Cache__Stats
+from mgraph_ai_service_cache.service.cache.Cache__Config                             import Cache__Config
+from mgraph_ai_service_cache.service.cache.Cache__Service                            import Cache__Service
+from mgraph_ai_service_cache.service.cache.hot_cache.Cache__Hot_Cache                import Cache__Hot_Cache
+from mgraph_ai_service_cache.service.cache.update.Cache__Service__Update             import Cache__Service__Update
+
+
+class test_Cache__Hot_Cache(TestCase):
+
+    def setUp(self):
+        self.hot_cache = Cache__Hot_Cache(max_bytes=100, max_entries=3).setup()
+
+    def test__init__(self):
+        with Cache__Hot_Cache() as _:
+            assert type(_)         is Cache__Hot_Cache
+            assert base_classes(_) == [Type_Safe, object]
+            assert _.enabled()     is False                                     # disabled by default
+        with Cache__Hot_Cache().setup() as _:
+            assert _.get('aaa')          is None
+            assert _.set('aaa', b'abc')  is False
+            assert _.stats().obj()       == __(enabled=False, max_bytes=0, max_entries=0, total_bytes=0, total_entries=0,
+                                               hits=0, misses=0, evictions=0, invalidations=0)
+
+    def test_get__set(self):
+        with self.hot_cache as _:
+            assert _.get('a')            is None
+            assert _.set('a', b'12345')  is True
+            assert _.get('a')            == b'12345'
+            assert _.stats().obj()       == __(enabled=True, max_bytes=100, max_entries=3, total_bytes=5, total_entries=1,
+                                               hits=1, misses=1, evictions=0, invalidations=0)
+
+    def test_set__evicts_least_recently_used(self):
+        with self.hot_cache as _:
+            _.set('a', b'1')
+            _.set('b', b'2')
+            _.set('c', b'3')
+            assert _.get('a') == b'1'                                           # 'a' is now the most recently used
+            _.set('d', b'4')                                                    # max_entries is 3, so 'b' is evicted
+            assert list(_.entries) == ['c', 'a', 'd']
+            assert _.evictions     == 1
+
+    def test_set__respects_max_bytes(self):
+        with self.hot_cache as _:
+            assert _.set('big', b'x' * 101) is False                            # bigger than max_bytes is never cached
+            _.set('a', b'x' * 60)
+            _.set('b', b'x' * 60)                                               # 120 > 100, so 'a' is evicted
+            assert list(_.entries) == ['b']
+            assert _.total_bytes   == 60
+            _.set('b', b'x' * 10)                                               # replacing a value updates the size
+            assert _.total_bytes   == 10
+
+    def test_json__get__set(self):
+        with self.hot_cache as _:
+            data = {'an': 'value'}
+            _.refs_id__set('ns', 'an-id', data)
+            copy_1 = _.refs_id__get('ns', 'an-id')
+            copy_1['an'] = 'changed'                                            # changes to the returned value don't affect the cache
+            assert _.refs_id__get('ns', 'an-id' ) == data
+            assert _.refs_id__get('ns2', 'an-id') is None                       # keys are namespaced
+
+    def test_invalidate__cache_id(self):
+        with self.hot_cache as _:
+            _.refs_id__set  ('ns', 'an-id'  , {'a': 1})
+            _.content__set  ('ns', 'an-id'  , b'content')
+            _.refs_hash__set('ns', 'a-hash' , {'b': 2})
+            _.invalidate__cache_id('ns', 'an-id')
+            assert _.refs_id__get  ('ns', 'an-id' ) is None
+            assert _.content__get  ('ns', 'an-id' ) is None
+            assert _.refs_hash__get('ns', 'a-hash') == {'b': 2}
+            _.invalidate__cache_hash('ns', 'a-hash')
+            assert _.refs_hash__get('ns', 'a-hash') is None
+            assert _.invalidations == 3
+
+
+class test_Cache__Hot_Cache__with_Cache__Service(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_config   = Cache__Config(storage_mode          = Enum__Cache__Storage_Mode.MEMORY,
+                                           hot_cache_max_bytes   = 1024 * 1024                     ,
+                                           hot_cache_max_entries = 100                             )
+        cls.cache_service  = Cache__Service(cache_config=cls.cache_config)
+        cls.update_service = Cache__Service__Update(cache_service=cls.cache_service)
+        cls.namespace      = 'test-hot-cache'
+
+    def store(self, data, cache_id=None):
+        cache_hash = self.cache_service.hash_from_json(data)
+        return self.cache_service.store_with_strategy(storage_data = data                               ,
+                                                      cache_hash   = cache_hash                         ,
+                                                      cache_id     = cache_id or Random_Guid()          ,
+                                                      strategy     = Enum__Cache__Store__Strategy.DIRECT,
+                                                      namespace    = self.namespace                     )
+
+    def test_retrieve_by_id__served_from_memory(self):
+        with self.cache_service as _:
+            cache_id   = self.store({'hot': 'entry'}).cache_id
+            hot_cache  = _.hot_cache()
+            hits_start = hot_cache.hits
+            assert _.retrieve_by_id(cache_id, self.namespace)['data'] == {'hot': 'entry'}       # first read populates the cache
+            storage_fs = _.storage_fs()
+            refs       = _.retrieve_by_id__refs(cache_id, self.namespace)
+            for path in refs.file_paths.content_files + refs.all_paths.by_id:                   # remove the files from storage
+                storage_fs.file__delete(path)
+            assert _.retrieve_by_id(cache_id, self.namespace)['data'] == {'hot': 'entry'}       # still served from memory
+            assert hot_cache.hits > hits_start
+
+    def test_retrieve_by_hash__invalidated_on_store(self):
+        with self.cache_service as _:
+            data        = {'same': 'hash'}
+            cache_id_1  = self.store(data).cache_id
+            assert _.retrieve_by_hash(_.hash_from_json(data), self.namespace)['metadata']['cache_id'] == cache_id_1
+            cache_id_2  = self.store(data).cache_id                                             # new version of the same hash
+            assert _.retrieve_by_hash(_.hash_from_json(data), self.namespace)['metadata']['cache_id'] == cache_id_2
+
+    def test_update_by_id__invalidates(self):
+        with self.cache_service as _:
+            cache_id = self.store({'version': 1}).cache_id
+            assert _.retrieve_by_id(cache_id, self.namespace)['data'] == {'version': 1}
+            self.update_service.update_by_id(cache_id=cache_id, namespace=self.namespace, data={'version': 2})
+            assert _.retrieve_by_id(cache_id, self.namespace)['data'] == {'version': 2}
+
+    def test_delete_by_id__invalidates(self):
+        with self.cache_service as _:
+            cache_id = self.store({'to': 'delete'}).cache_id
+            assert _.retrieve_by_id(cache_id, self.namespace) is not None
+            assert _.delete_by_id  (cache_id, self.namespace).get('status') == 'success'
+            assert _.retrieve_by_id(cache_id, self.namespace) is None
+
+    def test_stats(self):
+        stats = self.cache_service.hot_cache().stats()
+        assert type(stats)   is Schema__Cache__Hot_Cache__Stats
+        assert stats.enabled is True
@@ -0,0 +1,126 @@
+from unittest                                                                                 import TestCase
+from memory_fs.storage_fs.providers.Storage_FS__Memory                                        import Storage_FS__Memory
+from osbot_utils.type_safe.Type_Safe                                                          import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                         import Random_Guid
+from osbot_utils.utils.Objects                                                                import base_classes
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode             import Enum__Cache__Storage_Mode
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy          import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache.service.cache.Cache__Config                                      import Cache__Config
+from mgraph_ai_service_cache.service.cache.Cache__Service                                     import Cache__Service
+from mgraph_ai_service_cache.service.cache.refs.Cache__Hash__Refs__History                   import (Cache__Hash__Refs__History     ,
+                                                                                                       CACHE__HASH_REFS__INLINE_MAX   ,
+                                                                                                       CACHE__HASH_REFS__SEGMENT_SIZE )
+
+
+class test_Cache__Hash__Refs__History(TestCase):
+
+    def setUp(self):
+        self.storage_fs   = Storage_FS__Memory()
+        self.refs_history = Cache__Hash__Refs__History(storage_fs=self.storage_fs, namespace='an-namespace', inline_max=4, segment_size=2)
+        self.cache_hash   = 'abcd1234abcd1234'
+
+    def refs(self, count):
+        cache_ids = [dict(cache_id=f'id-{i}', timestamp=1000 + i) for i in range(count)]
+        return dict(cache_hash=self.cache_hash, cache_ids=cache_ids, latest_id=f'id-{count - 1}', total_versions=count)
+
+    def test__init__(self):
+        with Cache__Hash__Refs__History() as _:
+            assert type(_)         is Cache__Hash__Refs__History
+            assert base_classes(_) == [Type_Safe, object]
+            assert _.inline_max    == CACHE__HASH_REFS__INLINE_MAX
+            assert _.segment_size  == CACHE__HASH_REFS__SEGMENT_SIZE
+
+    def test_history_folder__segment_path(self):
+        with self.refs_history as _:
+            assert _.history_folder(self.cache_hash)                                   == 'an-namespace/refs/by-hash-history/ab/cd/abcd1234abcd1234'
+            assert _.segment_path(self.cache_hash, dict(cache_id='id-0', timestamp=42)) == 'an-namespace/refs/by-hash-history/ab/cd/abcd1234abcd1234/000000000000042-id-0.json'
+
+    def test_archive(self):
+        with self.refs_history as _:
+            refs = self.refs(4)
+            assert _.archive(refs)              is None                                         # not over inline_max
+            refs = self.refs(5)
+            path = _.archive(refs)
+            assert path                         == _.segment_path(self.cache_hash, dict(cache_id='id-0', timestamp=1000))
+            assert _.segments(self.cache_hash)  == [path]
+            assert [entry['cache_id'] for entry in _.segment_entries(path)] == ['id-0', 'id-1']
+            assert [entry['cache_id'] for entry in refs['cache_ids']]       == ['id-2', 'id-3', 'id-4']
+            assert [entry['cache_id'] for entry in _.all_entries(refs)]     == [f'id-{i}' for i in range(5)]
+            assert refs['total_versions']       == 5                                            # the count and latest_id stay inline
+
+    def test_overflow__save_archived(self):
+        with self.refs_history as _:
+            refs = self.refs(5)
+            assert _.overflow(self.refs(4))                             == []
+            archived = _.overflow(refs)
+            assert [entry['cache_id'] for entry in archived]            == ['id-0', 'id-1']
+            assert [entry['cache_id'] for entry in refs['cache_ids']]   == ['id-2', 'id-3', 'id-4']
+            assert _.segments(self.cache_hash)                          == []                  # overflow doesn't write (it runs inside compare-and-swap callbacks)
+            assert _.save_archived(self.cache_hash, [])                 is None
+            path = _.save_archived(self.cache_hash, archived)
+            assert _.segments(self.cache_hash)                          == [path]
+            assert _.segment_entries(path)                              == archived
+
+    def test_remove__restore__delete_all(self):
+        with self.refs_history as _:
+            refs = self.refs(5)
+            _.archive(refs)
+            assert _.remove(self.cache_hash, 'id-0') is True
+            assert _.remove(self.cache_hash, 'id-0') is False
+            assert _.remove(self.cache_hash, 'id-1') is True
+            assert _.segments(self.cache_hash)       == []                                      # empty segments are deleted
+
+            refs = self.refs(5)
+            _.archive(refs)
+            refs['cache_ids'] = []
+            path              = _.restore(refs)
+            assert path                                                 == _.segments(self.cache_hash)[-1]
+            assert [entry['cache_id'] for entry in refs['cache_ids']]   == ['id-0', 'id-1']
+            assert _.restore(refs)                                      is None                 # only when the inline list is empty
+            self.storage_fs.file__delete(path)                                                  # the caller deletes the segment (after saving the refs)
+
+            _.archive(self.refs(5))
+            assert len(_.delete_all(self.cache_hash)) == 1
+            assert _.segments(self.cache_hash)        == []
+
+
+class test_Cache__Hash__Refs__History__with_Cache__Service(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_service = Cache__Service(cache_config=Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY))
+        cls.namespace     = 'test-hash-refs-history'
+        cls.refs_history  = cls.cache_service.get_or_create_handler(cls.namespace).hash_refs_history()
+        cls.refs_history.inline_max   = 4
+        cls.refs_history.segment_size = 2
+
+    def store(self, data):
+        return self.cache_service.store_with_strategy(storage_data = data                                ,
+                                                      cache_hash   = self.cache_service.hash_from_json(data),
+                                                      cache_id     = Random_Guid()                       ,
+                                                      strategy     = Enum__Cache__Store__Strategy.DIRECT ,
+                                                      namespace    = self.namespace                      )
+
+    def test_store__many_versions(self):
+        data      = {'same': 'prompt'}
+        responses = [self.store(data) for _ in range(11)]
+        cache_ids = [str(response.cache_id) for response in responses]
+        cache_hash = responses[0].cache_hash
+        with self.cache_service as _:
+            refs = _.retrieve_by_hash__refs_hash(cache_hash, self.namespace)
+            assert refs['total_versions']                       == 11
+            assert refs['latest_id']                            == cache_ids[-1]
+            assert len(refs['cache_ids'])                       <= self.refs_history.inline_max    # bounded by-hash refs file
+            assert [entry['cache_id'] for entry in _.retrieve_by_hash__versions(cache_hash, self.namespace)] == cache_ids
+
+            assert _.delete_by_id(responses[0].cache_id, self.namespace)['status'] == 'success'   # archived version
+            assert _.delete_by_id(responses[-1].cache_id, self.namespace)['status'] == 'success'  # inline (and latest) version
+            refs = _.retrieve_by_hash__refs_hash(cache_hash, self.namespace)
+            assert refs['total_versions']                       == 9
+            assert refs['latest_id']                            == cache_ids[-2]
+            assert [entry['cache_id'] for entry in _.retrieve_by_hash__versions(cache_hash, self.namespace)] == cache_ids[1:-1]
+
+            for cache_id in cache_ids[1:-1]:
+                _.delete_by_id(cache_id, self.namespace)
+            assert _.retrieve_by_hash__refs_hash(cache_hash, self.namespace) is None
+            assert self.refs_history.segments(cache_hash)                   == []                  # history deleted with the last version
@@ -0,0 +1,129 @@
+from unittest                                                                                 import TestCase
+from unittest.mock                                                                            import patch
+from osbot_utils.type_safe.Type_Safe                                                          import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                         import Random_Guid
+from osbot_utils.utils.Objects                                                                import base_classes
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode             import Enum__Cache__Storage_Mode
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy          import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache.service.cache.Cache__Config                                      import Cache__Config
+from mgraph_ai_service_cache.service.cache.Cache__Service                                     import Cache__Service
+from mgraph_ai_service_cache.service.cache.refs.Cache__Refs__Write_Behind                    import Cache__Refs__Write_Behind, CACHE__REFS_WRITE_BEHIND__MAX_PENDING
+
+
+class test_Cache__Refs__Write_Behind(TestCase):
+
+    def test__init__(self):
+        with Cache__Refs__Write_Behind().setup() as _:
+            assert type(_)           is Cache__Refs__Write_Behind
+            assert base_classes(_)   == [Type_Safe, object]
+            assert _.enabled()       is False
+            assert _.max_pending     == CACHE__REFS_WRITE_BEHIND__MAX_PENDING
+            assert _.start()         is False                                                   # no worker when disabled
+            assert _.flush()         == 0
+            assert _.pending_count() == 0
+
+    def test_merge_hash_entries(self):
+        with Cache__Refs__Write_Behind().setup() as _:
+            entries = [dict(cache_id='id-1', timestamp=1), dict(cache_id='id-2', timestamp=2)]
+            assert _.merge_hash_entries(None, 'an-hash', []) is None
+            assert _.merge_hash_entries(None, 'an-hash', entries) == dict(cache_hash='an-hash', cache_ids=entries, latest_id='id-2', total_versions=2)
+            saved  = dict(cache_hash='an-hash', cache_ids=[entries[0]], latest_id='id-1', total_versions=1)
+            merged = _.merge_hash_entries(saved, 'an-hash', entries)                            # entries already saved are skipped
+            assert merged == dict(cache_hash='an-hash', cache_ids=entries, latest_id='id-2', total_versions=2)
+            assert saved['total_versions'] == 1                                                 # the original is not changed
+
+    def test_background_flush__error(self):                                                     # a failed flush is logged and counted (and the worker keeps running)
+        with Cache__Refs__Write_Behind().setup() as _:
+            assert _.background_flush() == 0
+            with patch.object(Cache__Refs__Write_Behind, 'flush', side_effect=Exception('an flush error')):
+                with self.assertLogs(Cache__Refs__Write_Behind.__module__, level='ERROR') as logs:
+                    assert _.background_flush() is None
+            assert _.flush_errors == 1
+            assert 'failed to flush the queued refs writes' in logs.output[0]
+
+
+class test_Cache__Refs__Write_Behind__with_Cache__Service(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_config  = Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY, refs_write_behind_ms=60_000)     # long interval, so that the tests control the flushes
+        cls.cache_service = Cache__Service(cache_config=cls.cache_config)
+        cls.write_behind  = cls.cache_service.refs_write_behind()
+        cls.storage_fs    = cls.cache_service.storage_fs()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.write_behind.stop()
+
+    def store(self, data, namespace):
+        return self.cache_service.store_with_strategy(storage_data = data                                ,
+                                                      cache_hash   = self.cache_service.hash_from_json(data),
+                                                      cache_id     = Random_Guid()                       ,
+                                                      strategy     = Enum__Cache__Store__Strategy.DIRECT ,
+                                                      namespace    = namespace                           )
+
+    def test_store__read_your_writes__flush(self):
+        namespace = 'test-refs-write-behind'
+        with self.cache_service as _:
+            assert self.write_behind.enabled() is True
+            assert self.write_behind.worker    is not None
+            response_1 = self.store({'a': 'value'}, namespace)
+            response_2 = self.store({'a': 'value'}, namespace)                                  # same hash (coalesced into one by-hash write)
+            by_id_path   = response_1.paths.by_id  [0]
+            by_hash_path = response_1.paths.by_hash[0]
+
+            assert self.write_behind.pending_count()  == 2
+            assert self.storage_fs.file__exists(by_id_path  ) is False                          # refs not saved yet
+            assert self.storage_fs.file__exists(by_hash_path) is False
+            assert self.storage_fs.file__exists(response_1.paths.data[0]) is True               # (the content is saved on the store path)
+
+            assert _.retrieve_by_id(response_1.cache_id, namespace)['data']  == {'a': 'value'}  # served from the overlay
+            refs_hash = _.retrieve_by_hash__refs_hash(response_1.cache_hash, namespace)
+            assert refs_hash['total_versions']                               == 2
+            assert refs_hash['latest_id']                                    == str(response_2.cache_id)
+            assert _.exists_by_hash(response_1.cache_hash, namespace)        is True
+
+            assert _.flush_refs()                                            == 3               # 2 by-id + 1 by-hash
+            assert self.write_behind.pending_count()                         == 0
+            assert self.storage_fs.file__exists(by_id_path  )                is True
+            assert self.storage_fs.file__exists(by_hash_path)                is True
+            assert _.retrieve_by_hash__refs_hash(response_1.cache_hash, namespace) == refs_hash
+            assert _.get_namespace__stats(namespace).refs_hash_files         == 1               # counted when the flush created the by-hash file
+
+    def test_delete_by_id__flushes_first(self):
+        namespace = 'test-refs-write-behind-delete'
+        with self.cache_service as _:
+            response = self.store({'b': 'value'}, namespace)
+            result   = _.delete_by_id(response.cache_id, namespace)
+            assert result['status']                                          == 'success'
+            assert self.write_behind.pending_count()                         == 0
+            assert _.retrieve_by_id(response.cache_id, namespace)            is None
+            assert _.retrieve_by_hash__refs_hash(response.cache_hash, namespace) is None
+
+    def test_delete_by_id__flushes_only_its_entry(self):
+        namespace = 'test-refs-write-behind-delete-entry'
+        with self.cache_service as _:
+            response_1 = self.store({'d': 'value'}, namespace)
+            response_2 = self.store({'d': 'value'}, namespace)                                  # same hash (its refs are saved with the deleted entry's)
+            response_3 = self.store({'e': 'value'}, namespace)
+            result     = _.delete_by_id(response_1.cache_id, namespace)
+            assert result['status']                                          == 'success'
+            assert self.write_behind.pending_count()                         == 1               # the other hash's store is still queued
+            assert self.write_behind.refs_id(namespace, response_3.cache_id) is not None
+            assert self.storage_fs.file__exists(response_2.paths.by_id[0])   is True
+            refs_hash = _.retrieve_by_hash__refs_hash(response_1.cache_hash, namespace)
+            assert refs_hash['total_versions']                               == 1
+            assert refs_hash['latest_id']                                    == str(response_2.cache_id)
+            assert self.write_behind.flush_entry(namespace, response_1.cache_id) == 0           # not queued anymore
+            assert _.flush_refs()                                            == 2
+
+    def test_max_pending__back_pressure(self):
+        namespace = 'test-refs-write-behind-max-pending'
+        max_pending = self.write_behind.max_pending
+        try:
+            self.write_behind.max_pending = 3
+            for i in range(3):
+                self.store({'c': i}, namespace)
+            assert self.write_behind.pending_count() == 0                                       # the third store flushed the queue
+        finally:
+            self.write_behind.max_pending = max_pending
@@ -0,0 +1,76 @@
+import threading
+from unittest                                                                                import TestCase
+from unittest.mock                                                                           import patch
+from osbot_utils.type_safe.Type_Safe                                                         import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                        import Random_Guid
+from osbot_utils.utils.Objects                                                               import base_classes
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode            import Enum__Cache__Storage_Mode
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy         import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache.schemas.cache.retrieve.Schema__Cache__Retrieve__Batch__Request import Schema__Cache__Retrieve__Batch__Request
+from mgraph_ai_service_cache.service.cache.Cache__Config                                     import Cache__Config
+from mgraph_ai_service_cache.service.cache.Cache__Service                                    import Cache__Service
+from mgraph_ai_service_cache.service.cache.retrieve.Cache__Service__Retrieve                 import Cache__Service__Retrieve
+from mgraph_ai_service_cache.service.cache.retrieve.Cache__Service__Retrieve__Batch         import Cache__Service__Retrieve__Batch, CACHE__RETRIEVE_BATCH__MAX_KEYS
+
+
+class test_Cache__Service__Retrieve__Batch(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_service = Cache__Service(cache_config=Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY))
+        cls.batch_service = Cache__Service__Retrieve__Batch(cache_service=cls.cache_service)
+        cls.namespace     = 'test-retrieve-batch'
+        cls.cache_ids     = [cls.store({'item': i}).cache_id for i in range(20)]
+
+    @classmethod
+    def store(cls, data):
+        return cls.cache_service.store_with_strategy(storage_data = data                               ,
+                                                     cache_hash   = cls.cache_service.hash_from_json(data),
+                                                     strategy     = Enum__Cache__Store__Strategy.DIRECT,
+                                                     namespace    = cls.namespace                      )
+
+    def test__init__(self):
+        with self.batch_service as _:
+            assert type(_)         is Cache__Service__Retrieve__Batch
+            assert base_classes(_) == [Type_Safe, object]
+
+    def test_retrieve_batch(self):
+        request  = Schema__Cache__Retrieve__Batch__Request(cache_ids=self.cache_ids)
+        response = self.batch_service.retrieve_batch(request=request, namespace=self.namespace)
+        assert response.total_found                       == 20
+        assert [result.data for result in response.results] == [{'item': i} for i in range(20)]       # same order as the request
+
+    def test_retrieve_batch__dedupes(self):
+        cache_hash = self.cache_service.hash_from_json({'item': 0})
+        request    = Schema__Cache__Retrieve__Batch__Request(cache_ids    = [self.cache_ids[0], self.cache_ids[0], self.cache_ids[1]],
+                                                             cache_hashes = [cache_hash, cache_hash])
+        with patch.object(Cache__Service__Retrieve, 'retrieve_by_id', autospec=True, side_effect=Cache__Service__Retrieve.retrieve_by_id) as retrieve_by_id:
+            response = self.batch_service.retrieve_batch(request=request, namespace=self.namespace)
+        assert response.total_requested == 5
+        assert response.total_found     == 5
+        assert retrieve_by_id.call_count == 2                                                           # each entry is only read once
+
+    def test_retrieve_batch__hashes(self):                                                             # the hashes are resolved on the batch's thread pool (not one by one before the reads)
+        cache_hashes = [self.cache_service.hash_from_json({'item': i}) for i in range(20)]
+        threads      = set()
+        original     = Cache__Service.retrieve_by_hash__refs_hash
+        def refs_hash(cache_service, cache_hash, namespace):
+            threads.add(threading.get_ident())
+            return original(cache_service, cache_hash, namespace)
+        with patch.object(Cache__Service, 'retrieve_by_hash__refs_hash', autospec=True, side_effect=refs_hash):
+            response = self.batch_service.retrieve_batch(request=Schema__Cache__Retrieve__Batch__Request(cache_hashes=cache_hashes), namespace=self.namespace)
+        assert [result.data for result in response.results] == [{'item': i} for i in range(20)]
+        assert [result.cache_id for result in response.results] == self.cache_ids
+        assert threading.get_ident() not in threads
+
+    def test_retrieve_batch__not_found(self):
+        request  = Schema__Cache__Retrieve__Batch__Request(cache_ids    = [Random_Guid()],
+                                                           cache_hashes = [self.cache_service.hash_from_string('not stored')])
+        response = self.batch_service.retrieve_batch(request=request, namespace=self.namespace)
+        assert response.total_not_found                      == 2
+        assert [result.found for result in response.results] == [False, False]
+
+    def test_retrieve_batch__too_many_keys(self):
+        request = Schema__Cache__Retrieve__Batch__Request(cache_ids=[Random_Guid() for _ in range(CACHE__RETRIEVE_BATCH__MAX_KEYS + 1)])
+        with self.assertRaises(ValueError):
+            self.batch_service.retrieve_batch(request=request, namespace=self.namespace)
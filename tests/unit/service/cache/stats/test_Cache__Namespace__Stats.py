@@ -0,0 +1,211 @@
+from unittest                                                                                 import TestCase
+from memory_fs.storage_fs.providers.Storage_FS__Memory                                        import Storage_FS__Memory
+from osbot_utils.testing.__                                                                   import __, __SKIP__
+from osbot_utils.type_safe.Type_Safe                                                          import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                         import Random_Guid
+from osbot_utils.utils.Objects                                                                import base_classes
+from mgraph_ai_service_cache_client.schemas.cache.data.Schema__Cache__Data__Store__Request    import Schema__Cache__Data__Store__Request
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Data_Type                import Enum__Cache__Data_Type
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode             import Enum__Cache__Storage_Mode
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy          import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache.schemas.cache.stats.Schema__Cache__Namespace__Stats             import Schema__Cache__Namespace__Stats
+from mgraph_ai_service_cache.service.cache.Cache__Config                                      import Cache__Config
+from mgraph_ai_service_cache.service.cache.Cache__Service                                     import Cache__Service
+from mgraph_ai_service_cache.service.cache.data.Cache__Service__Data__Store                  import Cache__Service__Data__Store
+from mgraph_ai_service_cache.service.cache.stats.Cache__Namespace__Stats                     import Cache__Namespace__Stats, CACHE__NAMESPACE_STATS__SAVE_EVERY
+from mgraph_ai_service_cache.service.cache.update.Cache__Service__Update                     import Cache__Service__Update
+
+
+class test_Cache__Namespace__Stats(TestCase):
+
+    def setUp(self):
+        self.storage_fs      = Storage_FS__Memory()
+        self.namespace_stats = Cache__Namespace__Stats(storage_fs=self.storage_fs).setup()
+        self.namespace       = 'an-namespace'
+
+    def test__init__(self):
+        with Cache__Namespace__Stats().setup() as _:
+            assert type(_)                      is Cache__Namespace__Stats
+            assert base_classes(_)              == [Type_Safe, object]
+            assert _.reconcile_seconds          == 0                                                # background reconciliation is disabled by default
+            assert _.start_reconciler(list)     is False
+            assert _.get('ns').obj()            == Schema__Cache__Namespace__Stats().obj()          # unknown namespaces have zero counters
+
+    def test_stats_path(self):
+        assert self.namespace_stats.stats_path(self.namespace) == 'an-namespace/index/stats.json'
+
+    def test_record_store__record_delete(self):
+        with self.namespace_stats as _:
+            _.record_store(self.namespace, 'direct', data_files=3, content_bytes=100, refs_hash_files=1, refs_id_files=1)
+            _.record_store(self.namespace, 'direct', data_files=3, content_bytes= 50, refs_hash_files=0, refs_id_files=1)   # same hash (so no new by-hash file)
+            stats = _.get(self.namespace)
+            assert stats.obj()         == __(entries=2, content_bytes=150, direct_files=6, key_based_files=0, temporal_files=0,
+                                             temporal_latest_files=0, temporal_versioned_files=0, refs_hash_files=1,
+                                             refs_id_files=2, data_files=0, reconciled_at=0, evictions=0)
+            assert stats.file_counts() == dict(direct_files=6, key_based_files=0, temporal_files=0, temporal_latest_files=0,
+                                               temporal_versioned_files=0, refs_hash_files=1, refs_id_files=2, total_files=9)
+
+            _.record_delete(self.namespace, 'direct', data_files=3, content_bytes=50, refs_hash_files=0, refs_id_files=1)
+            _.record_update(self.namespace, content_bytes=-20)
+            _.record_data_files(self.namespace, 2)
+            assert _.get(self.namespace).obj() == __(entries=1, content_bytes=80, direct_files=3, key_based_files=0, temporal_files=0,
+                                                     temporal_latest_files=0, temporal_versioned_files=0, refs_hash_files=1,
+                                                     refs_id_files=1, data_files=2, reconciled_at=0, evictions=0)
+
+    def test_change__never_below_zero(self):
+        with self.namespace_stats as _:
+            _.record_delete(self.namespace, 'temporal', data_files=3, content_bytes=10, refs_hash_files=1, refs_id_files=1)
+            assert _.get(self.namespace).file_counts()['total_files'] == 0
+            assert _.get(self.namespace).entries                      == 0
+
+    def test_get__returns_copy(self):
+        with self.namespace_stats as _:
+            _.record_data_files(self.namespace, 1)
+            stats            = _.get(self.namespace)
+            stats.data_files = 100
+            assert _.get(self.namespace).data_files == 1
+
+    def test_save__load(self):
+        with self.namespace_stats as _:
+            for i in range(CACHE__NAMESPACE_STATS__SAVE_EVERY - 1):
+                _.record_data_files(self.namespace, 1)
+            assert self.storage_fs.file__exists(_.stats_path(self.namespace)) is False
+            _.record_data_files(self.namespace, 1)                                                      # saved every CACHE__NAMESPACE_STATS__SAVE_EVERY changes
+            assert self.storage_fs.file__exists(_.stats_path(self.namespace)) is True
+            _.record_data_files(self.namespace, 1)
+            assert _.save_all()                                                  == [self.namespace]
+            assert _.save_all()                                                  == []                  # nothing pending
+            assert _.load(self.namespace).data_files                             == CACHE__NAMESPACE_STATS__SAVE_EVERY + 1
+            assert _.load('another-namespace')                                   is None
+
+    def test_save__concurrent_instances(self):                                                          # each instance adds its deltas to the stats file (so no instance's changes are lost)
+        other_stats = Cache__Namespace__Stats(storage_fs=self.storage_fs).setup()
+        with self.namespace_stats as _:
+            _          .record_store(self.namespace, 'direct', data_files=1, content_bytes=10, refs_hash_files=1, refs_id_files=1)
+            other_stats.record_store(self.namespace, 'direct', data_files=1, content_bytes=20, refs_hash_files=1, refs_id_files=1)
+            other_stats.record_eviction(self.namespace)
+            assert _          .save_all() == [self.namespace]
+            assert other_stats.save_all() == [self.namespace]
+            saved = _.load(self.namespace)
+            assert saved.entries       == 2
+            assert saved.content_bytes == 30
+            assert saved.evictions     == 1
+            assert other_stats.get(self.namespace).entries == 2                                         # the save also picks up the other instances' changes
+            assert _          .get(self.namespace).entries == 1                                         # (until its next save)
+
+    def test_strategy_field(self):
+        with self.namespace_stats as _:
+            assert _.strategy_field('direct'            ) == 'direct_files'
+            assert _.strategy_field('key_based'         ) == 'key_based_files'
+            assert _.strategy_field('temporal_versioned') == 'temporal_versioned_files'
+            assert _.strategy_field('unknown'           ) is None
+            assert _.strategy_field(None                ) is None
+
+    def test_in_data_folder(self):
+        data_folders = {'ns/data/direct/ab/cd/an-id/data'}
+        with self.namespace_stats as _:
+            assert _.in_data_folder('ns/data/direct/ab/cd/an-id/data/logs/log.txt', data_folders) is True
+            assert _.in_data_folder('ns/data/direct/ab/cd/an-id.json'             , data_folders) is False
+            assert _.in_data_folder('ns/data/direct/ab/cd/an-id/data'             , data_folders) is False  # the folder itself is not a file in it
+
+
+class test_Cache__Namespace__Stats__with_Cache__Service(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_config   = Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY)
+        cls.cache_service  = Cache__Service(cache_config=cls.cache_config)
+        cls.update_service = Cache__Service__Update     (cache_service=cls.cache_service)
+        cls.data_service   = Cache__Service__Data__Store(cache_service=cls.cache_service)
+
+    def store(self, data, namespace, strategy=Enum__Cache__Store__Strategy.DIRECT):
+        cache_hash = self.cache_service.hash_from_json(data)
+        return self.cache_service.store_with_strategy(storage_data = data         ,
+                                                      cache_hash   = cache_hash   ,
+                                                      cache_id     = Random_Guid(),
+                                                      strategy     = strategy     ,
+                                                      namespace    = namespace    )
+
+    def test_store__delete(self):
+        namespace = 'test-namespace-stats-store'
+        with self.cache_service as _:
+            assert _.get_namespace__stats(namespace).entries == 0
+            response = self.store({'a': 'value'}, namespace)
+            self.store({'a': 'value'}, namespace)                                                       # same hash, so only one by-hash file
+            stats    = _.get_namespace__stats(namespace)
+            assert stats.obj() == __(entries                  = 2        ,
+                                     content_bytes            = __SKIP__ ,
+                                     direct_files             = 6        ,                              # 2 x (content, .config, .metadata)
+                                     key_based_files          = 0        ,
+                                     temporal_files           = 0        ,
+                                     temporal_latest_files    = 0        ,
+                                     temporal_versioned_files = 0        ,
+                                     refs_hash_files          = 1        ,
+                                     refs_id_files            = 2        ,
+                                     data_files               = 0        ,
+                                     reconciled_at            = __SKIP__ ,
+                                     evictions                = 0        )
+            assert stats.content_bytes == 2 * response.size
+
+            _.delete_by_id(response.cache_id, namespace)
+            stats = _.get_namespace__stats(namespace)
+            assert stats.entries         == 1
+            assert stats.direct_files    == 3
+            assert stats.refs_hash_files == 1                                                           # still used by the other entry
+            assert stats.refs_id_files   == 1
+            assert stats.content_bytes   == response.size
+
+    def test_update__data_files(self):
+        namespace = 'test-namespace-stats-update'
+        with self.cache_service as _:
+            response = self.store({'a': 'value'}, namespace)
+            self.update_service.update_by_id(cache_id=response.cache_id, namespace=namespace, data={'a': 'a longer value'})
+            assert _.get_namespace__stats(namespace).content_bytes > response.size
+
+            request = Schema__Cache__Data__Store__Request(cache_id  = response.cache_id            ,
+                                                          data      = 'child data'                 ,
+                                                          data_type = Enum__Cache__Data_Type.STRING,
+                                                          namespace = namespace                    )
+            self.data_service.store_data(request)
+            assert _.get_namespace__stats(namespace).data_files == 1
+
+    def test_update__content_size(self):                                                                # each update's delta is from the previous update's size
+        namespace = 'test-namespace-stats-update-size'
+        with self.cache_service as _:
+            assert _.get_namespace__stats(namespace).content_bytes == 0
+            response = self.store({'a': 'value'}, namespace)
+            for data in ({'a': 'a much longer value'}, {'a': 'v'}, {'a': 'a much longer value'}):
+                self.update_service.update_by_id(cache_id=response.cache_id, namespace=namespace, data=data)
+            refs = _.retrieve_by_id__refs(response.cache_id, namespace)
+            assert refs.content_size                               == len(b'{"a": "a much longer value"}')
+            assert _.get_namespace__stats(namespace).content_bytes == refs.content_size
+            assert _.reconcile_namespace__stats(namespace).content_bytes == refs.content_size
+
+    def test_reconcile_namespace__stats(self):
+        namespace = 'test-namespace-stats-reconcile'
+        with self.cache_service as _:
+            self.store({'b': 1}, namespace)
+            self.store({'b': 2}, namespace, Enum__Cache__Store__Strategy.TEMPORAL)
+            counters   = _.get_namespace__stats(namespace)
+            reconciled = _.reconcile_namespace__stats(namespace)
+            assert reconciled.reconciled_at > 0
+            assert reconciled.file_counts() == counters.file_counts()                                   # incremental counters match a full scan
+            assert reconciled.entries       == counters.entries       == 2
+            assert reconciled.content_bytes == counters.content_bytes
+
+            storage_fs = _.storage_fs()
+            assert storage_fs.file__exists(_.namespace_stats().stats_path(namespace)) is True           # reconcile saves the stats file
+
+    def test_load_or_scan__existing_namespace(self):                                                    # a new instance (i.e. cold start) loads the saved counters
+        namespace = 'test-namespace-stats-load'
+        self.store({'c': 1}, namespace)
+        handler         = self.cache_service.get_or_create_handler(namespace)
+        storage_fs      = self.cache_service.storage_fs()
+        namespace_stats = Cache__Namespace__Stats(storage_fs=storage_fs).setup()
+        assert namespace_stats.load(namespace)                   is None                                # not saved yet
+        assert namespace_stats.load_or_scan(handler)             is True                                # so the namespace is scanned (on the first get, not here)
+        assert namespace_stats.load_or_scan(handler)             is False                               # only once
+        assert list(namespace_stats.unscanned)                   == [namespace]
+        assert namespace_stats.stats                             == {}
+        assert namespace_stats.get(namespace).entries            == 1
+        assert namespace_stats.load(namespace).entries           == 1                                   # and the scan result is saved
@@ -0,0 +1,87 @@
+import base64
+from unittest                                                                              import TestCase
+from osbot_utils.type_safe.Type_Safe                                                       import Type_Safe
+from osbot_utils.utils.Objects                                                             import base_classes
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Data_Type             import Enum__Cache__Data_Type
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode          import Enum__Cache__Storage_Mode
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy       import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache_client.schemas.cache.Schema__Cache__Store__Response           import Schema__Cache__Store__Response
+from mgraph_ai_service_cache.schemas.cache.store.Schema__Cache__Store__Batch__Item        import Schema__Cache__Store__Batch__Item
+from mgraph_ai_service_cache.schemas.cache.store.Schema__Cache__Store__Batch__Request     import Schema__Cache__Store__Batch__Request
+from mgraph_ai_service_cache.schemas.cache.store.Schema__Cache__Store__Batch__Response    import Schema__Cache__Store__Batch__Response
+from mgraph_ai_service_cache.service.cache.Cache__Config                                   import Cache__Config
+from mgraph_ai_service_cache.service.cache.Cache__Service                                  import Cache__Service
+from mgraph_ai_service_cache.service.cache.store.Cache__Service__Store__Batch             import Cache__Service__Store__Batch, CACHE__STORE_BATCH__MAX_WORKERS
+
+
+class test_Cache__Service__Store__Batch(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_service = Cache__Service(cache_config=Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY))
+        cls.batch_service = Cache__Service__Store__Batch(cache_service=cls.cache_service)
+        cls.namespace     = 'test-store-batch'
+
+    def store_batch(self, *items):
+        request = Schema__Cache__Store__Batch__Request(items=list(items))
+        return self.batch_service.store_batch(request   = request                            ,
+                                              strategy  = Enum__Cache__Store__Strategy.DIRECT,
+                                              namespace = self.namespace                     )
+
+    def test__init__(self):
+        with self.batch_service as _:
+            assert type(_)         is Cache__Service__Store__Batch
+            assert base_classes(_) == [Type_Safe, object]
+            assert _.max_workers   == CACHE__STORE_BATCH__MAX_WORKERS
+
+    def test_store_batch(self):
+        binary_data = b'\x00\x01\x02 binary'
+        response    = self.store_batch(Schema__Cache__Store__Batch__Item(data_type=Enum__Cache__Data_Type.STRING, data='a string'             ),
+                                       Schema__Cache__Store__Batch__Item(data_type=Enum__Cache__Data_Type.JSON  , data={'a': 'json'}          ),
+                                       Schema__Cache__Store__Batch__Item(data_type=Enum__Cache__Data_Type.BINARY, data=base64.b64encode(binary_data).decode()))
+        assert type(response)         is Schema__Cache__Store__Batch__Response
+        assert response.total_items   == 3
+        assert response.total_stored  == 3
+        assert response.total_failed  == 0
+        assert [result.index for result in response.results] == [0, 1, 2]                      # same order as the request
+        with self.cache_service as _:
+            results = response.results
+            assert type(results[0].response)                                  is Schema__Cache__Store__Response
+            assert _.retrieve_by_id(results[0].response.cache_id, self.namespace)['data'] == 'a string'
+            assert _.retrieve_by_id(results[1].response.cache_id, self.namespace)['data'] == {'a': 'json'}
+            assert _.retrieve_by_id(results[2].response.cache_id, self.namespace)['data'] == binary_data
+            assert results[1].response.cache_hash == _.hash_from_json({'a': 'json'})             # same hash as the single store endpoints
+
+    def test_store_batch__same_hash(self):                                                      # items with the same hash must all be recorded in the by-hash refs
+        items    = [Schema__Cache__Store__Batch__Item(data_type=Enum__Cache__Data_Type.JSON, data={'same': 'hash'}) for _ in range(10)]
+        response = self.store_batch(*items)
+        assert response.total_stored == 10
+        cache_hash = self.cache_service.hash_from_json({'same': 'hash'})
+        refs_hash  = self.cache_service.retrieve_by_hash__refs_hash(cache_hash, self.namespace)
+        assert refs_hash['total_versions'] == 10
+        assert refs_hash['latest_id']      == str(response.results[-1].response.cache_id)
+
+    def test_store_batch__ttl_hours(self):                                                      # per-item TTLs (the namespace's TTL when not set)
+        response = self.store_batch(Schema__Cache__Store__Batch__Item(data_type=Enum__Cache__Data_Type.STRING, data='ttl 2h', ttl_hours=2),
+                                    Schema__Cache__Store__Batch__Item(data_type=Enum__Cache__Data_Type.STRING, data='no ttl'             ))
+        assert response.total_stored == 2
+        refs_1 = self.cache_service.retrieve_by_id__refs(response.results[0].response.cache_id, self.namespace)
+        refs_2 = self.cache_service.retrieve_by_id__refs(response.results[1].response.cache_id, self.namespace)
+        assert refs_1.expires_at == refs_1.timestamp + 2 * 3_600_000
+        assert refs_2.expires_at == 0                                                           # ttl_enabled is False (so the default TTL is not applied)
+
+    def test_store_batch__invalid_items(self):
+        response = self.store_batch(Schema__Cache__Store__Batch__Item(data_type=Enum__Cache__Data_Type.STRING, data=''          ),
+                                    Schema__Cache__Store__Batch__Item(data_type=Enum__Cache__Data_Type.BINARY, data='not base64!'),
+                                    Schema__Cache__Store__Batch__Item(                                       data='no type'    ),
+                                    Schema__Cache__Store__Batch__Item(data_type=Enum__Cache__Data_Type.STRING, data='valid'     ))
+        assert response.total_stored == 1
+        assert response.total_failed == 3
+        assert [result.success for result in response.results] == [False, False, False, True]
+        assert response.results[0].error == 'String data cannot be empty'
+
+    def test_store_batch__many_items(self):
+        items    = [Schema__Cache__Store__Batch__Item(data_type=Enum__Cache__Data_Type.JSON, data={'item': i}) for i in range(200)]
+        response = self.store_batch(*items)
+        assert response.total_stored == 200
+        assert len({str(result.response.cache_id) for result in response.results}) == 200
@@ -0,0 +1,75 @@
+from unittest                                                                                 import TestCase
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                         import Random_Guid
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode             import Enum__Cache__Storage_Mode
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy          import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache.service.cache.Cache__Config                                      import Cache__Config
+from mgraph_ai_service_cache.service.cache.Cache__Service                                     import Cache__Service
+from mgraph_ai_service_cache.service.cache.store.Cache__Service__Store__Lean__Migration       import Cache__Service__Store__Lean__Migration
+
+
+class test_Cache__Service__Store__Lean__Migration(TestCase):
+
+    def store(self, cache_service, data, namespace, strategy=Enum__Cache__Store__Strategy.DIRECT):
+        return cache_service.store_with_strategy(storage_data = data                              ,
+                                                 cache_hash   = cache_service.hash_from_json(data),
+                                                 cache_id     = Random_Guid()                     ,
+                                                 strategy     = strategy                          ,
+                                                 namespace    = namespace                         )
+
+    def test_store__lean_data_files(self):
+        cache_service = Cache__Service(cache_config=Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY, lean_data_files=True))
+        namespace     = 'test-lean'
+        data          = {'a': 'lean value'}
+        response      = self.store(cache_service, data, namespace)
+        cache_id      = response.cache_id
+        storage_fs    = cache_service.storage_fs()
+        data_paths    = response.paths.data
+
+        assert len(data_paths) == 1                                                             # only the content file
+        assert str(data_paths[0]).endswith('.json')
+        assert storage_fs.file__exists(str(data_paths[0]) + '.config'  ) is False
+        assert storage_fs.file__exists(str(data_paths[0]) + '.metadata') is False
+
+        result = cache_service.retrieve_by_id(cache_id, namespace)
+        assert result['data']                 == data
+        assert result['metadata']['cache_id'] == str(cache_id)
+
+        metadata = cache_service.retrieve_by_id__metadata(cache_id, namespace)                  # rebuilt from the refs
+        assert metadata.content__size         == response.size
+        assert str(metadata.data.cache_id)    == str(cache_id)
+        assert cache_service.retrieve_by_id__config(cache_id, namespace) is None
+
+        assert cache_service.delete_by_id(cache_id, namespace)['status'] == 'success'
+        assert storage_fs.file__exists(str(data_paths[0])) is False
+
+    def test_store__lean_data_files__temporal_versioned(self):                                  # keeps its sidecars
+        cache_service = Cache__Service(cache_config=Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY, lean_data_files=True))
+        response      = self.store(cache_service, {'a': 'versioned'}, 'test-lean', Enum__Cache__Store__Strategy.TEMPORAL_VERSIONED)
+        assert any(str(path).endswith('.metadata') for path in response.paths.data)
+
+    def test_migrate_namespace(self):
+        cache_service = Cache__Service(cache_config=Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY))
+        namespace     = 'test-lean-migration'
+        data_1        = {'a': 'value 1'}
+        data_2        = {'b': 'value 2'}
+        response_1    = self.store(cache_service, data_1, namespace)
+        response_2    = self.store(cache_service, data_2, namespace, Enum__Cache__Store__Strategy.TEMPORAL_VERSIONED)
+        storage_fs    = cache_service.storage_fs()
+        sidecars      = [path for path in response_1.paths.data if str(path).endswith(('.config', '.metadata'))]
+        files_before  = cache_service.get_namespace__stats(namespace).direct_files
+
+        assert len(sidecars) == 2
+        with Cache__Service__Store__Lean__Migration(cache_service=cache_service) as _:
+            result = _.migrate_namespace(namespace)
+            assert result == dict(namespace     = namespace                         ,
+                                  statuses      = dict(migrated=1, skipped=1)       ,
+                                  deleted_files = 2                                 )
+            assert _.migrate_entry(response_1.cache_id, namespace)['status'] == 'already_lean'
+            assert _.migrate_entry(Random_Guid()      , namespace)['status'] == 'not_found'
+
+        for path in sidecars:
+            assert storage_fs.file__exists(str(path)) is False
+        assert cache_service.get_namespace__stats(namespace).direct_files == files_before - 2
+        assert cache_service.retrieve_by_id(response_1.cache_id, namespace)['data'] == data_1
+        assert cache_service.retrieve_by_id(response_2.cache_id, namespace)['data'] == data_2
+        assert cache_service.retrieve_by_id__metadata(response_1.cache_id, namespace).content__size == response_1.size
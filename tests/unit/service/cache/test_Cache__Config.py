@@ -242,7 +242,141 @@ class test_Cache__Config(TestCase):
                                 default_ttl_hours = 24                                ,
                                 local_disk_path   = None                              ,
                                 sqlite_path       = None                              ,
-                                zip_path          = None                              )
+                                zip_path          = None                              ,
+                                hot_cache_max_bytes   = 0                             ,
+                                hot_cache_max_entries = 10_000                        ,
+                                exists_filter_capacity     = 0                        ,
+                                exists_filter_single_writer= False                    ,
+                                negative_cache_ttl_seconds = 0                        ,
+                                namespace_stats_reconcile_seconds = 0                 ,
+                                refs_write_behind_ms              = 0                 ,
+                                lean_data_files                   = False             ,
+                                content_dedup                     = False             ,
+                                shared_blobs_min_bytes            = 0                 ,
+                                ttl_enabled                       = False             ,
+                                namespace_ttl_hours               = __()              ,
+                                ttl_sweep_seconds                 = 0                 ,
+                                namespace_max_entries             = __()              ,
+                                namespace_max_bytes               = __()              ,
+                                eviction_policy                   = 'lru'             ,
+                                access_sample_rate                = 1                 ,
+                                access_flush_seconds              = 0                 )
+
+    def test_configure_for_storage_mode__hot_cache(self):                  # Test hot cache limits from env vars
+        set_env('CACHE__SERVICE__HOT_CACHE__MAX_BYTES'  , '1048576')
+        set_env('CACHE__SERVICE__HOT_CACHE__MAX_ENTRIES', '500'    )
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.hot_cache_max_bytes   == 1048576
+            assert _.hot_cache_max_entries == 500
+        del_env('CACHE__SERVICE__HOT_CACHE__MAX_BYTES'  )
+        del_env('CACHE__SERVICE__HOT_CACHE__MAX_ENTRIES')
+
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY, hot_cache_max_bytes=1024) as _:
+            assert _.hot_cache_max_bytes   == 1024                                                  # explicit values are not overwritten
+
+    def test_configure_for_storage_mode__exists_filter(self):              # Test Bloom filter capacity and negative cache TTL from env vars
+        set_env('CACHE__SERVICE__EXISTS_FILTER__CAPACITY'    , '50000')
+        set_env('CACHE__SERVICE__NEGATIVE_CACHE__TTL_SECONDS', '30'   )
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.exists_filter_capacity     == 50000
+            assert _.exists_filter_single_writer is False                    # the Bloom filters also need the single writer guard
+            assert _.negative_cache_ttl_seconds == 30
+        set_env('CACHE__SERVICE__EXISTS_FILTER__SINGLE_WRITER', 'true')
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.exists_filter_single_writer is True
+        del_env('CACHE__SERVICE__EXISTS_FILTER__SINGLE_WRITER')
+        del_env('CACHE__SERVICE__EXISTS_FILTER__CAPACITY'    )
+        del_env('CACHE__SERVICE__NEGATIVE_CACHE__TTL_SECONDS')
+
+    def test_configure_for_storage_mode__namespace_stats(self):            # Test namespace stats reconciliation interval from env vars
+        set_env('CACHE__SERVICE__NAMESPACE_STATS__RECONCILE_SECONDS', '3600')
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.namespace_stats_reconcile_seconds == 3600
+        del_env('CACHE__SERVICE__NAMESPACE_STATS__RECONCILE_SECONDS')
+
+    def test_configure_for_storage_mode__refs_write_behind(self):          # Test refs write-behind flush interval from env vars
+        set_env('CACHE__SERVICE__REFS_WRITE_BEHIND_MS', '50')
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.refs_write_behind_ms == 50
+        del_env('CACHE__SERVICE__REFS_WRITE_BEHIND_MS')
+
+    def test_configure_for_storage_mode__lean_data_files(self):            # Test lean data files profile from env vars
+        set_env('CACHE__SERVICE__LEAN_DATA_FILES', 'true')
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.lean_data_files is True
+        del_env('CACHE__SERVICE__LEAN_DATA_FILES')
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.lean_data_files is False
+
+    def test_configure_for_storage_mode__content_dedup(self):              # Test content dedup from env vars
+        set_env('CACHE__SERVICE__CONTENT_DEDUP', '1')
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.content_dedup is True
+        del_env('CACHE__SERVICE__CONTENT_DEDUP')
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.content_dedup is False
+
+    def test_configure_for_storage_mode__shared_blobs_min_bytes(self):     # Test shared blobs threshold from env vars
+        set_env('CACHE__SERVICE__SHARED_BLOBS__MIN_BYTES', '4096')
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.shared_blobs_min_bytes == 4096
+        del_env('CACHE__SERVICE__SHARED_BLOBS__MIN_BYTES')
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.shared_blobs_min_bytes == 0
+
+    def test_configure_for_storage_mode__ttl(self):                        # Test TTL expiry, namespace overrides and sweep interval from env vars
+        set_env('CACHE__SERVICE__TTL_ENABLED'        , 'true'                     )
+        set_env('CACHE__SERVICE__NAMESPACE_TTL_HOURS', 'short=1, forever=0,bad=x' )
+        set_env('CACHE__SERVICE__TTL_SWEEP_SECONDS'  , '300'                      )
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY, default_ttl_hours=24) as _:
+            assert _.ttl_enabled                   is True
+            assert _.namespace_ttl_hours           == {'short': 1, 'forever': 0}
+            assert _.ttl_sweep_seconds             == 300
+            assert _.ttl_hours_for('short'  )      == 1
+            assert _.ttl_hours_for('forever')      == 0
+            assert _.ttl_hours_for('other'  )      == 24
+        del_env('CACHE__SERVICE__TTL_ENABLED'        )
+        del_env('CACHE__SERVICE__NAMESPACE_TTL_HOURS')
+        del_env('CACHE__SERVICE__TTL_SWEEP_SECONDS'  )
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY, namespace_ttl_hours={'short': 1}) as _:
+            assert _.ttl_enabled                   is False
+            assert _.ttl_sweep_seconds             == 0
+            assert _.ttl_enabled_for('short')      is True                       # namespace overrides are always applied
+            assert _.ttl_enabled_for('other')      is False
+
+    def test_configure_for_storage_mode__quotas(self):                     # Test the size-bounded namespaces and eviction policy from env vars
+        set_env('CACHE__SERVICE__NAMESPACE_MAX_ENTRIES', 'small=100,bad=-1'      )
+        set_env('CACHE__SERVICE__NAMESPACE_MAX_BYTES'  , 'small=1024, big=1048576')
+        set_env('CACHE__SERVICE__EVICTION_POLICY'      , 'LFU'                    )
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.namespace_max_entries         == {'small': 100}
+            assert _.namespace_max_bytes           == {'small': 1024, 'big': 1048576}
+            assert _.eviction_policy               == 'lfu'
+            assert _.max_entries_for('small')      == 100
+            assert _.max_entries_for('big'  )      == 0                          # unbounded
+            assert _.max_bytes_for  ('big'  )      == 1048576
+        set_env('CACHE__SERVICE__EVICTION_POLICY'      , 'random'                 )
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.eviction_policy               == 'lru'                      # unknown policies use the default
+        del_env('CACHE__SERVICE__NAMESPACE_MAX_ENTRIES')
+        del_env('CACHE__SERVICE__NAMESPACE_MAX_BYTES'  )
+        del_env('CACHE__SERVICE__EVICTION_POLICY'      )
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.namespace_max_entries         == {}
+            assert _.namespace_max_bytes           == {}
+            assert _.eviction_policy               == 'lru'
+
+    def test_configure_for_storage_mode__access(self):                     # Test the access tracking sample rate and flush interval from env vars
+        set_env('CACHE__SERVICE__ACCESS__SAMPLE_RATE'  , '10')
+        set_env('CACHE__SERVICE__ACCESS__FLUSH_SECONDS', '60')
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.access_sample_rate            == 10
+            assert _.access_flush_seconds          == 60
+        del_env('CACHE__SERVICE__ACCESS__SAMPLE_RATE'  )
+        del_env('CACHE__SERVICE__ACCESS__FLUSH_SECONDS')
+        with Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY) as _:
+            assert _.access_sample_rate            == 1
+            assert _.access_flush_seconds          == 0
 
     def test_explicit_initialization(self):                                # Test explicit parameter setting
         config = Cache__Config(storage_mode      = Enum__Cache__Storage_Mode.S3,
@@ -7,9 +7,11 @@ from memory_fs.schemas.Schema__Memory_FS__File__Config
 from memory_fs.storage_fs.providers.Storage_FS__Memory                               import Storage_FS__Memory
 from osbot_utils.type_safe.Type_Safe                                                 import Type_Safe
 from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                import Random_Guid
+from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id      import Safe_Str__Id
 from osbot_utils.utils.Objects                                                       import base_classes
 from osbot_utils.testing.__helpers                                                   import obj
 from mgraph_ai_service_cache_client.schemas.cache.file.Schema__Cache__File__Refs     import Schema__Cache__File__Refs
+from mgraph_ai_service_cache.schemas.cache.file.Schema__Cache__File__Refs__Extended import Schema__Cache__File__Refs__Extended
 from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode    import Enum__Cache__Storage_Mode
 from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy import Enum__Cache__Store__Strategy
 from mgraph_ai_service_cache.service.cache.Cache__Config                             import Cache__Config
@@ -248,6 +250,28 @@ class test_Cache__Service(TestCase):
             assert 'file_counts' in counts
             assert 'direct_files' in counts['file_counts']
 
+    def test_get_namespace__file_counts__namespace_scoped(self):           # Counts only include the files in the namespace
+        with self.cache_service as _:
+            namespace = Safe_Str__Id('test-file-counts-scoped')
+            assert _.get_namespace__file_counts(namespace)['total_files'] == 0
+            for i in range(2):
+                data = {"scoped": i}
+                _.store_with_strategy(storage_data = data                               ,
+                                      cache_hash   = _.hash_from_json(data)             ,
+                                      cache_id     = Random_Guid()                      ,
+                                      strategy     = Enum__Cache__Store__Strategy.DIRECT,
+                                      namespace    = namespace                          )
+            file_counts = _.get_namespace__file_counts(namespace)['file_counts']
+            assert file_counts == dict(direct_files             = 6 ,                  # 2 x (content, .config, .metadata)
+                                       key_based_files          = 0 ,
+                                       temporal_files           = 0 ,
+                                       temporal_latest_files    = 0 ,
+                                       temporal_versioned_files = 0 ,
+                                       refs_hash_files          = 2 ,
+                                       refs_id_files            = 2 ,
+                                       total_files              = 10)
+            assert file_counts == _.get_namespace__stats(namespace).file_counts()    # full scan matches the incremental counters
+
     def test_retrieve_by_id__refs(self):                                 # Test retrieving configuration
         with self.cache_service as _:
             # Store test data
@@ -266,9 +290,15 @@ class test_Cache__Service(TestCase):
             # Get id refs
             refs = _.retrieve_by_id__refs(cache_id, self.test_namespace)
 
-            assert type(refs) is Schema__Cache__File__Refs
+            assert type(refs) is Schema__Cache__File__Refs__Extended
+            assert isinstance(refs, Schema__Cache__File__Refs)
             assert refs.obj() == __(cache_id        = cache_id      ,
                                     cache_hash      = cache_hash    ,
+                                    content_size    = __SKIP__      ,
+                                    metadata        = __SKIP__      ,
+                                    content_digest  = None          ,
+                                    shared_blob     = False         ,
+                                    expires_at      = 0             ,
                                     namespace       = 'test-service',
                                     strategy        = 'temporal',
                                     all_paths       =__(data    = [f'test-service/data/temporal/{self.path_now}/{cache_id}.json'            ,
@@ -280,6 +310,52 @@ class test_Cache__Service(TestCase):
                                                           data_folders  = [f'test-service/data/temporal/{self.path_now}/{cache_id}/data']),
                                    file_type        = 'json',
                                    timestamp        = __SKIP__)
+            assert refs.content_size      > 0
+            assert refs.metadata.cache_id == cache_id
+            assert refs.metadata.strategy == 'temporal'
+
+    def test_retrieve_by_id__single_read(self):                            # Test that retrieve only needs the refs and content files
+        with self.cache_service as _:
+            test_data = {"single": "read"}
+            cache_hash = _.hash_from_json(test_data)
+            cache_id   = Random_Guid()
+            _.store_with_strategy(storage_data = test_data                          ,
+                                  cache_hash   = cache_hash                         ,
+                                  cache_id     = cache_id                           ,
+                                  strategy     = Enum__Cache__Store__Strategy.DIRECT,
+                                  namespace    = self.test_namespace                )
+            refs         = _.retrieve_by_id__refs(cache_id, self.test_namespace)
+            content_path = refs.file_paths.content_files[0]
+            storage_fs   = _.storage_fs()
+
+            assert storage_fs.file__delete(content_path + '.metadata') is True      # .metadata file is not used on retrieve
+            result = _.retrieve_by_id(cache_id, self.test_namespace)
+            assert result['data'                ] == test_data
+            assert result['data_type'           ] == 'json'
+            assert result['metadata']['cache_id'] == cache_id
+
+    def test_retrieve_by_id__legacy_refs(self):                            # Test refs files created without the embedded metadata
+        with self.cache_service as _:
+            test_data = {"legacy": "refs"}
+            cache_hash = _.hash_from_json(test_data)
+            cache_id   = Random_Guid()
+            _.store_with_strategy(storage_data = test_data                          ,
+                                  cache_hash   = cache_hash                         ,
+                                  cache_id     = cache_id                           ,
+                                  strategy     = Enum__Cache__Store__Strategy.DIRECT,
+                                  namespace    = self.test_namespace                )
+            handler = _.get_or_create_handler(self.test_namespace)
+            with handler.fs__refs_id.file__json__single(Safe_Str__Id(cache_id)) as ref_fs:
+                refs_data = ref_fs.content()
+                del refs_data['metadata']
+                del refs_data['content_size']
+                ref_fs.update(file_data=refs_data)
+
+            refs   = _.retrieve_by_id__refs(cache_id, self.test_namespace)
+            result = _.retrieve_by_id(cache_id, self.test_namespace)
+            assert refs.metadata                  is None
+            assert result['data'                ] == test_data
+            assert result['metadata']['cache_id'] == cache_id
 
     def test_multiple_versions_same_hash(self):                            # Test multiple versions with same hash
         with self.cache_service as _:
@@ -1,7 +1,7 @@
 from typing                                                                              import Dict, List
 from unittest                                                                            import TestCase
 from osbot_utils.type_safe.primitives.domains.identifiers.Cache_Id                       import Cache_Id
-from mgraph_ai_service_cache_client.schemas.cache.file.Schema__Cache__File__Refs         import Schema__Cache__File__Refs
+from mgraph_ai_service_cache.schemas.cache.file.Schema__Cache__File__Refs__Extended     import Schema__Cache__File__Refs__Extended
 from osbot_utils.testing.__                                                              import __, __SKIP__
 from osbot_utils.type_safe.Type_Safe                                                     import Type_Safe
 from osbot_utils.type_safe.primitives.domains.cryptography.safe_str.Safe_Str__Cache_Hash import Safe_Str__Cache_Hash
@@ -9,7 +9,7 @@ from osbot_utils.type_safe.primitives.domains.files.safe_str.Safe_Str__File__Pat
 from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                    import Random_Guid
 from osbot_utils.type_safe.primitives.domains.identifiers.safe_int.Timestamp_Now         import Timestamp_Now
 from osbot_utils.type_safe.primitives.domains.identifiers.safe_str.Safe_Str__Id          import Safe_Str__Id
-from osbot_utils.utils.Misc                                                              import list_set
+from osbot_utils.utils.Misc                                                              import list_set, timestamp_now
 from osbot_utils.utils.Objects                                                           import base_classes
 from osbot_utils.testing.__helpers                                                       import obj
 from mgraph_ai_service_cache_client.schemas.cache.Schema__Cache__Metadata                import Schema__Cache__Metadata
@@ -51,7 +51,24 @@ class test_Cache__Service__Retrieve(TestCase):
                                                    default_ttl_hours = 24   ,
                                                    local_disk_path   = None ,
                                                    sqlite_path       = None ,
-                                                   zip_path          = None ),
+                                                   zip_path          = None ,
+                                                   hot_cache_max_bytes   = 0    ,
+                                                   hot_cache_max_entries = 10000 ,
+                                                   exists_filter_capacity     = 0     ,
+                                                   negative_cache_ttl_seconds = 0     ,
+                                                   namespace_stats_reconcile_seconds = 0     ,
+                                                   refs_write_behind_ms              = 0     ,
+                                                   lean_data_files                   = False     ,
+                                                   content_dedup                     = False     ,
+                                                   shared_blobs_min_bytes            = 0         ,
+                                                   ttl_enabled                       = False         ,
+                                                   namespace_ttl_hours               = __()         ,
+                                                   ttl_sweep_seconds                 = 0         ,
+                                                   namespace_max_entries             = __()         ,
+                                                   namespace_max_bytes               = __()         ,
+                                                   eviction_policy                   = 'lru'         ,
+                                                   access_sample_rate                = 1             ,
+                                                   access_flush_seconds              = 0             ),
                                   cache_handlers    = __()                      ,
                                   hash_config       = __(algorithm = 'sha256', length=16),
                                   hash_generator    = __(config    = __(algorithm='sha256', length=16))))
@@ -153,8 +170,8 @@ class test_Cache__Service__Retrieve(TestCase):
 
         cache_service__entry    = self.cache_service.retrieve_by_id__refs(cache_id=cache_id, namespace=self.namespace)
         retrieve_service__entry = self.retrieve_service.retrieve_by_id__refs(cache_id, self.namespace)
-        assert type(cache_service__entry   ) is Schema__Cache__File__Refs
-        assert type(retrieve_service__entry) is Schema__Cache__File__Refs
+        assert type(cache_service__entry   ) is Schema__Cache__File__Refs__Extended
+        assert type(retrieve_service__entry) is Schema__Cache__File__Refs__Extended
         assert cache_service__entry.obj()    == retrieve_service__entry.obj()
 
     def test_get_entry_details__all(self):
@@ -250,10 +267,38 @@ class test_Cache__Service__Retrieve(TestCase):
 
     def test__is_expired(self):                                                      # Test expiration check
         with self.retrieve_service as _:
-            # Currently always returns False (TODO implementation)
-            id_ref = {"ttl_expiry": "2020-01-01T00:00:00Z"}                        # Old date
+            now    = timestamp_now()
+            id_ref = {"ttl_expiry": "2020-01-01T00:00:00Z"}                        # Old date (but not the expires_at field)
 
-            assert _._is_expired(id_ref) is False                                   # Not implemented yet
+            assert _._is_expired(id_ref                       ) is False
+            assert _._is_expired({}                           ) is False
+            assert _._is_expired({"expires_at": 0            }) is False           # never expires
+            assert _._is_expired({"expires_at": now + 60_000 }) is False
+            assert _._is_expired({"expires_at": now - 1      }) is True
+
+    def test_retrieve_by_id__expired(self):                                          # Test lazy expiry check on retrieve
+        with self.retrieve_service as _:
+            response = self.store_service.store_string(data      = "expiring string" ,
+                                                       namespace = self.namespace    ,
+                                                       ttl_hours = 1                 )
+            cache_id = response.cache_id
+            refs     = self.cache_service.retrieve_by_id__refs(cache_id, self.namespace)
+            assert refs.expires_at                                   == refs.timestamp + 3_600_000
+            assert _.retrieve_by_id        (cache_id, self.namespace) is not None
+            assert _.retrieve_by_id__expired(cache_id, self.namespace) is None
+
+            refs.expires_at = timestamp_now() - 1                                   # i.e. an hour later
+            with self.cache_service.get_or_create_handler(self.namespace).fs__refs_id.file__json__single(Safe_Str__Id(str(cache_id))) as ref_fs:
+                ref_fs.create(refs.json())
+            self.cache_service.hot_cache().invalidate__cache_id(self.namespace, cache_id)
+
+            error = _.retrieve_by_id__expired(cache_id, self.namespace)
+            assert _.retrieve_by_id(cache_id, self.namespace) is None
+            assert type(error)      is Schema__Cache__Error__Gone
+            assert error.error_type == "EXPIRED"
+            assert error.expired_at == refs.expires_at
+            assert error.ttl_hours  == 0                                            # (the expires_at was moved back)
+            self.cache_service.delete_by_id(cache_id, self.namespace)
 
     def test_retrieve_workflow_with_real_data(self):                                 # Test with actual cache service
         with self.retrieve_service as _:
@@ -0,0 +1,67 @@
+from unittest                                                                                 import TestCase
+from memory_fs.storage_fs.providers.Storage_FS__Memory                                        import Storage_FS__Memory
+from osbot_utils.type_safe.Type_Safe                                                          import Type_Safe
+from osbot_utils.utils.Objects                                                                import base_classes
+from mgraph_ai_service_cache.service.cache.ttl.Cache__TTL__Expiry_Index                      import Cache__TTL__Expiry_Index, CACHE__TTL__EXPIRY_INDEX__BUCKET_MS
+
+HOUR_MS       = 3_600_000
+A_TIMESTAMP   = 1_760_000_000_000                                                               # 2025-10-09 08:53:20 UTC
+
+
+class test_Cache__TTL__Expiry_Index(TestCase):
+
+    def setUp(self):
+        self.storage_fs   = Storage_FS__Memory()
+        self.expiry_index = Cache__TTL__Expiry_Index(storage_fs=self.storage_fs, namespace='an-namespace')
+
+    def test__init__(self):
+        with self.expiry_index as _:
+            assert type(_)         is Cache__TTL__Expiry_Index
+            assert base_classes(_) == [Type_Safe, object]
+            assert _.index_folder()                   == 'an-namespace/index/expiry'
+            assert _.bucket_folder(A_TIMESTAMP)       == 'an-namespace/index/expiry/2025/10/09/08'
+            assert _.marker_path('id-1', A_TIMESTAMP) == 'an-namespace/index/expiry/2025/10/09/08/id-1.json'
+            assert _.bucket_start(A_TIMESTAMP)        == A_TIMESTAMP - 53 * 60_000 - 20_000
+            assert CACHE__TTL__EXPIRY_INDEX__BUCKET_MS == HOUR_MS
+
+    def test_parse_marker(self):
+        with self.expiry_index as _:
+            marker_path = _.add('id-1', A_TIMESTAMP)
+            assert self.storage_fs.file__json(marker_path)     == dict(cache_id='id-1', expires_at=A_TIMESTAMP)
+            assert _.parse_marker(marker_path)                  == ('id-1', _.bucket_start(A_TIMESTAMP))
+            assert _.parse_marker(_.index_folder() + '/a.json') == ('', 0)
+            assert _.parse_marker(_.index_folder() + '/2025/13/01/00/id-1.json') == ('', 0)
+
+    def test_due(self):
+        with self.expiry_index as _:
+            marker_1 = _.add('id-1', A_TIMESTAMP               )
+            marker_2 = _.add('id-2', A_TIMESTAMP + 2 * HOUR_MS )
+            marker_3 = _.add('id-3', A_TIMESTAMP - 30 * 24 * HOUR_MS)
+            assert list(_.due(A_TIMESTAMP                )) == [(marker_3, 'id-3')]                # id-1's bucket hasn't ended
+            assert list(_.due(A_TIMESTAMP + HOUR_MS      )) == [(marker_3, 'id-3'), (marker_1, 'id-1')]
+            assert list(_.due(A_TIMESTAMP + 3 * HOUR_MS  )) == [(marker_3, 'id-3'), (marker_1, 'id-1'), (marker_2, 'id-2')]
+            assert _.remove(marker_3) is True
+            assert list(_.due(A_TIMESTAMP + HOUR_MS      )) == [(marker_1, 'id-1')]
+
+    def test_due__with_cursor(self):                                                            # only the past-due buckets after the cursor are listed
+        with self.expiry_index as _:
+            marker_1 = _.add('id-1', A_TIMESTAMP                  )
+            marker_2 = _.add('id-2', A_TIMESTAMP + 2 * HOUR_MS    )
+            assert _.swept_to()                                  is None
+            assert list(_.due_buckets(A_TIMESTAMP + 3 * HOUR_MS)) == [_.bucket_start(A_TIMESTAMP), _.bucket_start(A_TIMESTAMP) + 2 * HOUR_MS]   # from one listing of the index
+            _.save_swept_to(_.bucket_start(A_TIMESTAMP) + HOUR_MS)
+            assert _.swept_to()                                  == _.bucket_start(A_TIMESTAMP) + HOUR_MS
+            assert list(_.due_buckets(A_TIMESTAMP + 3 * HOUR_MS, _.swept_to())) == [_.bucket_start(A_TIMESTAMP) + HOUR_MS, _.bucket_start(A_TIMESTAMP) + 2 * HOUR_MS]
+            assert list(_.due(A_TIMESTAMP + 3 * HOUR_MS))        == [(marker_2, 'id-2')]                        # id-1's bucket was already swept
+            assert _.parse_marker(_.cursor_path())               == ('', 0)
+
+    def test_remove_entry__move_entry(self):
+        with self.expiry_index as _:
+            marker_1 = _.add('id-1', A_TIMESTAMP)
+            assert _.remove_entry('id-1', 0          ) is False
+            marker_2 = _.move_entry('id-1', A_TIMESTAMP, A_TIMESTAMP + 5 * HOUR_MS)
+            assert self.storage_fs.file__exists(marker_1) is False
+            assert self.storage_fs.file__exists(marker_2) is True
+            assert _.move_entry('id-1', A_TIMESTAMP + 5 * HOUR_MS, 0) == ''
+            assert self.storage_fs.file__exists(marker_2) is False
+            assert _.remove_entry('id-1', A_TIMESTAMP + 5 * HOUR_MS)  is False
@@ -0,0 +1,129 @@
+from unittest                                                                                 import TestCase
+from unittest.mock                                                                            import patch
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                         import Random_Guid
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode             import Enum__Cache__Storage_Mode
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy          import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache.service.cache.Cache__Config                                      import Cache__Config
+from mgraph_ai_service_cache.service.cache.Cache__Service                                     import Cache__Service
+from mgraph_ai_service_cache.service.cache.ttl.Cache__TTL__Sweeper                           import Cache__TTL__Sweeper
+from mgraph_ai_service_cache.service.cache.update.Cache__Service__Update                      import Cache__Service__Update
+
+HOUR_MS = 3_600_000
+
+
+class test_Cache__TTL__Sweeper(TestCase):
+
+    def setUp(self):
+        self.cache_service = Cache__Service(cache_config=Cache__Config(storage_mode        = Enum__Cache__Storage_Mode.MEMORY,
+                                                                       default_ttl_hours   = 24                              ,
+                                                                       namespace_ttl_hours = {'short-lived': 1, 'forever': 0}))
+        self.storage_fs    = self.cache_service.storage_fs()
+
+    def store(self, data, namespace, ttl_hours=None):
+        return self.cache_service.store_with_strategy(storage_data = data                              ,
+                                                      cache_hash   = self.cache_service.hash_from_json(data),
+                                                      cache_id     = Random_Guid()                     ,
+                                                      strategy     = Enum__Cache__Store__Strategy.DIRECT,
+                                                      namespace    = namespace                         ,
+                                                      ttl_hours    = ttl_hours                         )
+
+    def refs(self, response, namespace):
+        return self.cache_service.retrieve_by_id__refs(response.cache_id, namespace)
+
+    def test__init__(self):
+        with self.cache_service.ttl_sweeper() as _:
+            assert type(_)          is Cache__TTL__Sweeper
+            assert _.sweep_seconds  == 0
+            assert _.sweeper        is None                                                     # background sweep is disabled
+            assert _.start(lambda: []) is False
+
+    def test_expires_at(self):                                                                  # namespace overrides, per-store TTL and the (disabled) default TTL
+        response_1 = self.store({'a': 1}, 'short-lived'         )
+        response_2 = self.store({'a': 2}, 'forever'             )
+        response_3 = self.store({'a': 3}, 'other'               )
+        response_4 = self.store({'a': 4}, 'other'  , ttl_hours=2)
+        response_5 = self.store({'a': 5}, 'forever', ttl_hours=3)
+        refs_1     = self.refs(response_1, 'short-lived')
+        assert refs_1.expires_at                           == refs_1.timestamp + HOUR_MS
+        assert self.refs(response_2, 'forever').expires_at == 0
+        assert self.refs(response_3, 'other'  ).expires_at == 0                                 # ttl_enabled is False (so the default TTL is not applied)
+        assert self.refs(response_4, 'other'  ).expires_at == self.refs(response_4, 'other'  ).timestamp + 2 * HOUR_MS
+        assert self.refs(response_5, 'forever').expires_at == self.refs(response_5, 'forever').timestamp + 3 * HOUR_MS
+        expiry_index = self.cache_service.get_or_create_handler('short-lived').expiry_index()
+        assert self.storage_fs.file__exists(expiry_index.marker_path(response_1.cache_id, refs_1.expires_at)) is True
+
+    def test_sweep_namespace(self):
+        namespace  = 'short-lived'
+        handler    = self.cache_service.get_or_create_handler(namespace)
+        responses  = [self.store({'b': index}, namespace) for index in range(5)]
+        kept       = self.store({'b': 'kept'}, namespace, ttl_hours=48)
+        deleted    = self.store({'b': 'deleted'}, namespace)
+        refs       = self.refs(responses[0], namespace)
+        sweeper    = self.cache_service.ttl_sweeper()
+        expiry_index = handler.expiry_index()
+        self.cache_service.delete_by_id(deleted.cache_id, namespace)                            # also removes its marker
+        assert self.storage_fs.file__exists(expiry_index.marker_path(deleted.cache_id, self.refs(responses[0], namespace).expires_at)) is False
+
+        assert sweeper.sweep_namespace(handler, now=refs.timestamp) == dict(checked=0, expired=0, stale=0)     # nothing has expired yet
+        for response in responses:
+            assert self.cache_service.retrieve_by_id(response.cache_id, namespace)['data'] is not None
+
+        later = refs.timestamp + 3 * HOUR_MS
+        assert sweeper.sweep_namespace(handler, now=later, batch_size=4) == dict(checked=4, expired=4, stale=0)  # in batches
+        assert expiry_index.swept_to() == expiry_index.bucket_start(refs.expires_at)                            # the bucket is not done
+        assert sweeper.sweep_namespace(handler, now=later              ) == dict(checked=1, expired=1, stale=0)
+        assert expiry_index.swept_to() == expiry_index.bucket_start(later)                                      # the next sweeps start from here
+        assert sweeper.sweep_namespace(handler, now=later              ) == dict(checked=0, expired=0, stale=0)
+        for response in responses:
+            assert self.cache_service.retrieve_by_id__refs(response.cache_id, namespace) is None
+        assert self.cache_service.retrieve_by_id(kept.cache_id, namespace)['data'] == {'b': 'kept'}
+        assert self.cache_service.get_namespace__stats(namespace).entries == 1
+
+    def test_update_by_id__ttl_refresh(self):
+        namespace    = 'short-lived'
+        handler      = self.cache_service.get_or_create_handler(namespace)
+        expiry_index = handler.expiry_index()
+        response     = self.store({'d': 1}, namespace)
+        refs         = self.refs(response, namespace)
+        update       = Cache__Service__Update(cache_service=self.cache_service)
+
+        result       = update.update_by_id(cache_id=response.cache_id, namespace=namespace, data={'d': 2}, ttl_hours=5)
+        refreshed    = self.refs(response, namespace)
+        assert result.updated_id_ref                                                                is True
+        assert refreshed.expires_at                                                                 >= refs.expires_at + 4 * HOUR_MS
+        assert self.storage_fs.file__exists(expiry_index.marker_path(response.cache_id, refs.expires_at     )) is False   # moved to the new bucket
+        assert self.storage_fs.file__exists(expiry_index.marker_path(response.cache_id, refreshed.expires_at)) is True
+        assert self.cache_service.ttl_sweeper().sweep_namespace(handler, now=refs.expires_at + HOUR_MS) == dict(checked=0, expired=0, stale=0)
+
+        assert update.update_by_id(cache_id=response.cache_id, namespace=namespace, data={'d': 3}).updated_id_ref is False   # no TTL refresh
+        assert update.update_by_id(cache_id=response.cache_id, namespace=namespace, data={'d': 4}, ttl_hours=0).updated_id_ref is True
+        assert self.refs(response, namespace).expires_at                                            == 0            # never expires
+        assert self.storage_fs.file__exists(expiry_index.marker_path(response.cache_id, refreshed.expires_at)) is False
+
+    def test_sweep_expired(self):
+        response = self.store({'c': 1}, 'other', ttl_hours=1)
+        assert self.cache_service.sweep_expired()        == {'other': dict(checked=0, expired=0, stale=0)}
+        assert self.cache_service.sweep_expired('other') == {'other': dict(checked=0, expired=0, stale=0)}
+        assert self.cache_service.retrieve_by_id(response.cache_id, 'other') is not None
+
+    def test_sweep_expired__namespaces_in_storage(self):                                        # namespaces stored by other processes (without a handler in this one) are swept too
+        response = self.store({'e': 1}, 'short-lived')
+        refs     = self.refs(response, 'short-lived')
+        self.cache_service.cache_handlers.clear()
+        assert self.cache_service.namespaces() == ['short-lived']
+        with self.cache_service.ttl_sweeper() as _:
+            assert _.sweep(self.cache_service.namespaces__handlers(), now=refs.expires_at + HOUR_MS) == {'short-lived': dict(checked=1, expired=1, stale=0)}
+        assert self.cache_service.retrieve_by_id__refs(response.cache_id, 'short-lived') is None
+
+    def test_background_sweep__error(self):                                                     # a failed sweep is logged and counted (and the other namespaces are still swept)
+        self.store({'f': 1}, 'short-lived')
+        self.store({'f': 2}, 'forever'    )
+        handlers = self.cache_service.namespaces__handlers
+        with self.cache_service.ttl_sweeper() as _:
+            assert _.background_sweep(handlers) == 0
+            with patch.object(Cache__TTL__Sweeper, 'sweep_namespace', side_effect=[Exception('an sweep error'), {}]) as sweep_namespace:
+                with self.assertLogs(Cache__TTL__Sweeper.__module__, level='ERROR') as logs:
+                    assert _.background_sweep(handlers) == 1
+            assert sweep_namespace.call_count == 2
+            assert _.sweep_errors             == 1
+            assert 'failed to sweep the expired entries of namespace' in logs.output[0]
@@ -0,0 +1,65 @@
+import zipfile
+from unittest                                                                                import TestCase
+from osbot_utils.type_safe.Type_Safe                                                         import Type_Safe
+from osbot_utils.utils.Objects                                                               import base_classes
+from osbot_utils.utils.Zip                                                                   import zip_bytes_empty, zip_bytes__add_file, zip_bytes__file_list, zip_bytes__files
+from mgraph_ai_service_cache_client.schemas.cache.zip.Schema__Cache__Zip__Batch__Request     import Schema__Zip__Batch__Operation
+from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Batch__Plan              import Cache__Service__Zip__Batch__Plan
+from mgraph_ai_service_cache.utils.for_osbot_utils.Zip                                       import zip_bytes__content_hash, zip_bytes__index, zip_member__content_hash
+
+
+class test_Cache__Service__Zip__Batch__Plan(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.test_zip = zip_bytes_empty()
+        for file_name in ['file1.txt', 'file2.txt', 'temp.tmp', 'dir/nested.txt']:
+            cls.test_zip = zip_bytes__add_file(cls.test_zip, file_name, f'content of {file_name}'.encode())
+
+    def setUp(self):
+        self.plan = Cache__Service__Zip__Batch__Plan(zip_bytes=self.test_zip).setup()
+
+    def test__init__(self):
+        with self.plan as _:
+            assert type(_)                         is Cache__Service__Zip__Batch__Plan
+            assert base_classes(_)                 == [Type_Safe, object]
+            assert _.file_list()                   == zip_bytes__file_list(self.test_zip)
+            assert type(_.members[0][1])           is zipfile.ZipInfo                             # original members (nothing read yet)
+            assert _.write()                       == self.test_zip                               # nothing changed (same bytes)
+
+    def test_apply(self):
+        with self.plan as _:
+            assert _.apply(Schema__Zip__Batch__Operation(action='add'    , path='added.txt', content=b'added'   )) == (True , ['added.txt'])
+            assert _.apply(Schema__Zip__Batch__Operation(action='remove' , path='temp.tmp'                      )) == (True , ['temp.tmp' ])
+            assert _.apply(Schema__Zip__Batch__Operation(action='remove' , path='temp.tmp'                      )) == (False, ['temp.tmp' ])   # already removed
+            assert _.apply(Schema__Zip__Batch__Operation(action='replace', path='file1.txt', content=b'replaced')) == (True , ['file1.txt'])
+            assert _.apply(Schema__Zip__Batch__Operation(action='rename' , path='file2.txt', new_path='renamed.txt')) == (True, ['file2.txt', 'renamed.txt'])
+            assert _.apply(Schema__Zip__Batch__Operation(action='remove' , pattern='dir/*'                      )) == (True , ['dir/nested.txt'])
+            assert _.apply(Schema__Zip__Batch__Operation(action='add'    , path='file1.txt', content=b'skipped', condition='if_not_exists')) == (True, [])
+            assert _.file_list() == ['added.txt', 'file1.txt', 'renamed.txt']
+
+            new_zip = _.write()                                                                   # one rewrite for all the operations
+            assert zip_bytes__files(new_zip) == {'added.txt'  : b'added'                  ,
+                                                 'file1.txt'  : b'replaced'               ,
+                                                 'renamed.txt': b'content of file2.txt'   }       # renamed without recompression
+
+    def test_apply__errors(self):
+        with self.plan as _:
+            with self.assertRaises(ValueError):
+                _.apply(Schema__Zip__Batch__Operation(action='add'   , path='a.txt'))                # no content
+            with self.assertRaises(ValueError):
+                _.apply(Schema__Zip__Batch__Operation(action='rename', path='file1.txt'))            # no new_path
+            with self.assertRaises(KeyError):
+                _.apply(Schema__Zip__Batch__Operation(action='rename', path='missing.txt', new_path='b.txt'))
+            assert _.file_list() == zip_bytes__file_list(self.test_zip)                           # failed operations don't change the plan
+
+    def test_member_hashes(self):                                                                 # the copied members reuse the original hashes (only the new content is hashed)
+        source_hashes = {entry['header_offset']: f'hash-{index}' for index, entry in enumerate(zip_bytes__index(self.test_zip))}
+        with self.plan as _:
+            _.apply(Schema__Zip__Batch__Operation(action='replace', path='file1.txt', content=b'replaced'))
+            _.apply(Schema__Zip__Batch__Operation(action='rename' , path='file2.txt', new_path='renamed.txt'))
+            assert _.member_hashes(source_hashes) == [('temp.tmp'      , 'hash-2'                               ),
+                                                      ('dir/nested.txt', 'hash-3'                               ),
+                                                      ('file1.txt'     , zip_member__content_hash(b'replaced')  ),
+                                                      ('renamed.txt'   , 'hash-1'                               )]
+            assert _.content_hash({}, 16) == zip_bytes__content_hash(_.write(), 16)               # without source hashes, the copied members are read
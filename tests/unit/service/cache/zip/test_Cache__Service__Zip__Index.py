@@ -0,0 +1,111 @@
+import io
+import zipfile
+from unittest                                                                                import TestCase
+from osbot_utils.type_safe.Type_Safe                                                         import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Cache_Id                           import Cache_Id
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                        import Random_Guid
+from osbot_utils.utils.Objects                                                               import base_classes
+from osbot_utils.utils.Zip                                                                   import zip_bytes_empty, zip_bytes__add_file, zip_bytes__file_list
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy         import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache_client.schemas.cache.zip.Schema__Cache__Zip__Store__Request     import Schema__Cache__Zip__Store__Request
+from mgraph_ai_service_cache.schemas.cache.zip.Schema__Cache__Zip__Index                    import Schema__Cache__Zip__Index
+from mgraph_ai_service_cache.service.cache.Cache__Service                                    import Cache__Service
+from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Index                    import Cache__Service__Zip__Index
+from mgraph_ai_service_cache.service.cache.update.Cache__Service__Update                     import Cache__Service__Update
+from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Store                    import Cache__Service__Zip__Store
+from mgraph_ai_service_cache.utils.for_osbot_utils.Zip                                       import zip_bytes__content_hash, zip_member__content_hash
+
+
+class test_Cache__Service__Zip__Index(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_service = Cache__Service()
+        cls.zip_index     = Cache__Service__Zip__Index(cache_service=cls.cache_service)
+        cls.zip_store     = Cache__Service__Zip__Store(cache_service=cls.cache_service)
+        cls.namespace     = 'test-zip-index'
+        buffer            = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zf:
+            zf.writestr('stored.txt'   , b'stored content' , compress_type=zipfile.ZIP_STORED  )
+            zf.writestr('dir/deflated' , b'deflated ' * 50 , compress_type=zipfile.ZIP_DEFLATED)
+        cls.test_zip      = zip_bytes__add_file(buffer.getvalue(), 'stored.txt', b'newer content')    # 'stored.txt' is now in the zip twice
+
+    def store_zip(self, zip_bytes):
+        request = Schema__Cache__Zip__Store__Request(zip_bytes=zip_bytes, namespace=self.namespace)
+        return self.zip_store.store_zip(request).cache_id
+
+    def test__init__(self):
+        with Cache__Service__Zip__Index() as _:
+            assert type(_)               is Cache__Service__Zip__Index
+            assert base_classes(_)       == [Type_Safe, object]
+            assert type(_.cache_service) is Cache__Service
+
+    def test_build(self):
+        with self.zip_index.build(self.test_zip) as _:
+            assert type(_)                   is Schema__Cache__Zip__Index
+            assert _.zip_size                == len(self.test_zip)
+            assert _.file_list()             == zip_bytes__file_list(self.test_zip) == ['dir/deflated', 'stored.txt', 'stored.txt']
+            assert _.entry('stored.txt')     == _.entries[2]                                    # the last one (like zipfile)
+            assert _.entry('missing.txt')    is None
+            assert _.member_hashes()[0]      == ('stored.txt', zip_member__content_hash(b'stored content'))
+            assert self.zip_index.content_hash(_, 16) == zip_bytes__content_hash(self.test_zip, 16)
+        with self.assertRaises(zipfile.BadZipFile):
+            self.zip_index.build(b'not a zip')
+
+    def test_load(self):                                                                        # saved by store_zip (as the entry's zip/index.json data file)
+        cache_id = self.store_zip(self.test_zip)
+        index    = self.zip_index.load(cache_id, self.namespace)
+        assert index.json()                                        == self.zip_index.build(self.test_zip).json()
+        assert self.zip_index.load(Cache_Id(Random_Guid()), self.namespace) is None
+
+    def test_load__backfill(self):                                                              # zips stored before the index get one on first use
+        response = self.cache_service.store_with_strategy(storage_data = self.test_zip                          ,
+                                                          cache_hash   = self.cache_service.hash_from_bytes(self.test_zip),
+                                                          cache_id     = Cache_Id(Random_Guid())                 ,
+                                                          strategy     = Enum__Cache__Store__Strategy.DIRECT     ,
+                                                          namespace    = self.namespace                          )
+        ref_data   = self.zip_index.refs_data(response.cache_id, self.namespace)
+        storage_fs = self.cache_service.get_or_create_handler(self.namespace).storage_backend
+        index_path = self.zip_index.index_path(ref_data)
+        assert index_path.endswith('/zip/index.json')
+        assert storage_fs.file__exists(index_path)                                  is False
+        assert self.zip_index.load(response.cache_id, self.namespace).file_list()   == ['dir/deflated', 'stored.txt', 'stored.txt']
+        assert storage_fs.file__exists(index_path)                                  is True
+
+    def test_source_hashes(self):                                                               # the member hashes saved with the zip (by header_offset)
+        cache_id = self.store_zip(self.test_zip)
+        index    = self.zip_index.build(self.test_zip)
+        assert self.zip_index.source_hashes(cache_id, self.namespace, self.test_zip       ) == {entry['header_offset']: entry['content_hash'] for entry in index.entries}
+        assert self.zip_index.source_hashes(cache_id, self.namespace, self.test_zip + b'x') == {}          # index is for another zip
+
+    def test_load__after_update(self):                                                          # update_by_id deletes the saved index (even when the new zip has the same size)
+        def stored_zip(content):
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w') as zf:
+                zf.writestr('a.txt', content, compress_type=zipfile.ZIP_STORED)
+            return buffer.getvalue()
+        zip_bytes_1, zip_bytes_2 = stored_zip(b'content 1'), stored_zip(b'content 2')
+        assert len(zip_bytes_1) == len(zip_bytes_2)
+        cache_id = self.store_zip(zip_bytes_1)
+        index    = self.zip_index.load(cache_id, self.namespace)
+        assert self.zip_index.read_member(cache_id, self.namespace, index, 'a.txt') == b'content 1'
+
+        Cache__Service__Update(cache_service=self.cache_service).update_by_id(cache_id=cache_id, namespace=self.namespace, data=zip_bytes_2)
+        index    = self.zip_index.load(cache_id, self.namespace)                                # rebuilt from the new content
+        assert index.json()                                                         == self.zip_index.build(zip_bytes_2).json()
+        assert self.zip_index.read_member(cache_id, self.namespace, index, 'a.txt') == b'content 2'
+        assert self.zip_index.source_hashes(cache_id, self.namespace, zip_bytes_2)  == index.source_hashes()
+
+    def test_read_member(self):
+        cache_id = self.store_zip(self.test_zip)
+        index    = self.zip_index.load(cache_id, self.namespace)
+        assert self.zip_index.read_member(cache_id, self.namespace, index, 'dir/deflated') == b'deflated ' * 50
+        assert self.zip_index.read_member(cache_id, self.namespace, index, 'stored.txt'  ) == b'newer content'
+        assert self.zip_index.read_member(cache_id, self.namespace, index, 'missing'     ) is None
+
+    def test_read_member__stale_index(self):                                                    # offsets that don't match the content fall back to the full read
+        zip_bytes = zip_bytes__add_file(zip_bytes_empty(), 'a.txt', b'a content')
+        cache_id  = self.store_zip(zip_bytes)
+        index     = self.zip_index.load(cache_id, self.namespace)
+        index.entries[0]['data_offset'] += 1
+        assert self.zip_index.read_member(cache_id, self.namespace, index, 'a.txt') == b'a content'
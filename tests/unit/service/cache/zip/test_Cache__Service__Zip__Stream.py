@@ -0,0 +1,89 @@
+import io
+import zipfile
+from unittest                                                                                import TestCase
+from osbot_utils.type_safe.Type_Safe                                                         import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Cache_Id                           import Cache_Id
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                        import Random_Guid
+from osbot_utils.utils.Objects                                                               import base_classes
+from mgraph_ai_service_cache_client.schemas.cache.zip.Schema__Cache__Zip__Store__Request     import Schema__Cache__Zip__Store__Request
+from mgraph_ai_service_cache.schemas.cache.zip.Schema__Cache__Zip__Stream                   import Schema__Cache__Zip__Stream
+from mgraph_ai_service_cache.service.cache.Cache__Service                                    import Cache__Service
+from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Store                    import Cache__Service__Zip__Store
+from mgraph_ai_service_cache.service.cache.zip.Cache__Service__Zip__Stream                   import Cache__Service__Zip__Stream, CACHE__ZIP__STREAM__CHUNK_SIZE, CACHE__ZIP__STREAM__ERROR__NOT_FOUND, CACHE__ZIP__STREAM__ERROR__RANGE
+
+
+class test_Cache__Service__Zip__Stream(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_service = Cache__Service()
+        cls.zip_stream    = Cache__Service__Zip__Stream(cache_service=cls.cache_service, chunk_size=64)     # small chunks (so that the test files are streamed)
+        cls.namespace     = 'test-zip-stream'
+        cls.deflated      = b''.join(f'line {index}\n'.encode() for index in range(500))
+        cls.stored        = bytes(range(256)) * 2
+        buffer            = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zf:
+            zf.writestr('deflated.txt', cls.deflated, compress_type=zipfile.ZIP_DEFLATED)
+            zf.writestr('stored.bin'  , cls.stored  , compress_type=zipfile.ZIP_STORED  )
+            zf.writestr('small.txt'   , b'small'    , compress_type=zipfile.ZIP_DEFLATED)
+        cls.test_zip      = buffer.getvalue()
+        request           = Schema__Cache__Zip__Store__Request(zip_bytes=cls.test_zip, namespace=cls.namespace)
+        cls.cache_id      = Cache__Service__Zip__Store(cache_service=cls.cache_service).store_zip(request).cache_id
+
+    def read(self, stream: Schema__Cache__Zip__Stream) -> bytes:
+        chunks = list(stream.chunks)
+        assert max([len(chunk) for chunk in chunks] or [0]) <= self.zip_stream.chunk_size      # never more than one chunk at a time
+        return b''.join(chunks)
+
+    def test__init__(self):
+        with Cache__Service__Zip__Stream() as _:
+            assert type(_)         is Cache__Service__Zip__Stream
+            assert base_classes(_) == [Type_Safe, object]
+            assert _.chunk_size    == CACHE__ZIP__STREAM__CHUNK_SIZE
+
+    def test_parse_range(self):
+        with self.zip_stream as _:
+            assert _.parse_range(None            , 100) is None
+            assert _.parse_range('bytes=10-19'   , 100) == (10, 19)
+            assert _.parse_range('bytes=90-'     , 100) == (90, 99)
+            assert _.parse_range('bytes=90-200'  , 100) == (90, 99)
+            assert _.parse_range('bytes=-10'     , 100) == (90, 99)
+            assert _.parse_range('bytes=-200'    , 100) == (0 , 99)
+            assert _.parse_range('bytes=0-1,5-6' , 100) is None                             # multiple ranges get everything
+            assert _.parse_range('items=0-1'     , 100) is None
+            for range_header in ['bytes=100-', 'bytes=20-10', 'bytes=-0']:
+                with self.assertRaises(ValueError):
+                    _.parse_range(range_header, 100)
+
+    def test_zip_stream(self):
+        with self.zip_stream as _:
+            stream = _.zip_stream(self.cache_id, self.namespace)
+            assert stream.success  is True
+            assert stream.partial  is False
+            assert stream.size     == len(self.test_zip)
+            assert stream.length() == len(self.test_zip)
+            assert self.read(stream) == self.test_zip
+
+            stream = _.zip_stream(self.cache_id, self.namespace, 'bytes=100-299')
+            assert (stream.partial, stream.start, stream.end) == (True, 100, 299)
+            assert self.read(stream)                          == self.test_zip[100:300]
+
+            stream = _.zip_stream(self.cache_id, self.namespace, f'bytes={len(self.test_zip)}-')
+            assert (stream.success, stream.error_type)        == (False, CACHE__ZIP__STREAM__ERROR__RANGE)
+
+            stream = _.zip_stream(Cache_Id(Random_Guid()), self.namespace)
+            assert (stream.success, stream.error_type, stream.error_message) == (False, CACHE__ZIP__STREAM__ERROR__NOT_FOUND, 'Zip file not found')
+
+    def test_member_stream(self):
+        with self.zip_stream as _:
+            assert self.read(_.member_stream(self.cache_id, self.namespace, 'deflated.txt')) == self.deflated        # decompressed while read
+            assert self.read(_.member_stream(self.cache_id, self.namespace, 'stored.bin'  )) == self.stored
+            assert self.read(_.member_stream(self.cache_id, self.namespace, 'small.txt'   )) == b'small'
+
+            stream = _.member_stream(self.cache_id, self.namespace, 'deflated.txt', 'bytes=1000-1099')
+            assert (stream.size, stream.start, stream.end) == (len(self.deflated), 1000, 1099)
+            assert self.read(stream)                       == self.deflated[1000:1100]
+            assert self.read(_.member_stream(self.cache_id, self.namespace, 'stored.bin', 'bytes=-10')) == self.stored[-10:]
+
+            assert _.member_stream(self.cache_id         , self.namespace, 'missing.txt' ).error_message == "File 'missing.txt' not found in zip"
+            assert _.member_stream(Cache_Id(Random_Guid()), self.namespace, 'deflated.txt').error_message == "Zip file not found in cache"
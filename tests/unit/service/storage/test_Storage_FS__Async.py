@@ -0,0 +1,43 @@
+import asyncio
+from unittest                                                                   import TestCase
+from memory_fs.storage_fs.providers.Storage_FS__Memory                          import Storage_FS__Memory
+from osbot_utils.type_safe.Type_Safe                                            import Type_Safe
+from osbot_utils.utils.Objects                                                  import base_classes
+from mgraph_ai_service_cache.service.storage.Storage_FS__Async                 import Storage_FS__Async, STORAGE_FS__ASYNC__MAX_WORKERS
+
+
+class test_Storage_FS__Async(TestCase):
+
+    def setUp(self):
+        self.storage_fs    = Storage_FS__Memory()
+        self.storage_async = Storage_FS__Async(storage_fs=self.storage_fs).setup()
+
+    def tearDown(self):
+        self.storage_async.shutdown()
+
+    def test__init__(self):
+        with self.storage_async as _:
+            assert type(_)         is Storage_FS__Async
+            assert base_classes(_) == [Type_Safe, object]
+            assert _.max_workers   == STORAGE_FS__ASYNC__MAX_WORKERS
+
+    def test_file__save__bytes__exists__delete(self):
+        async def run():
+            with self.storage_async as _:
+                assert await _.file__exists('an/file.json')                 is False
+                assert await _.file__bytes ('an/file.json')                 is None
+                assert await _.file__save  ('an/file.json', b'{"a": 42}')   is True
+                assert await _.file__exists('an/file.json')                 is True
+                assert await _.file__json  ('an/file.json')                 == {'a': 42}
+                assert await _.folder__files__all('an')                     == ['an/file.json']
+                assert await _.file__delete('an/file.json')                 is True
+                assert await _.file__exists('an/file.json')                 is False
+        asyncio.run(run())
+        assert self.storage_fs.file__exists('an/file.json') is False                 # all calls went to the wrapped (sync) backend
+
+    def test_files__bytes(self):
+        for i in range(10):
+            self.storage_fs.file__save(f'file-{i}', f'{i}'.encode())
+        paths  = [f'file-{i}' for i in range(10)] + ['missing']
+        result = asyncio.run(self.storage_async.files__bytes(paths))
+        assert result == [f'{i}'.encode() for i in range(10)] + [None]
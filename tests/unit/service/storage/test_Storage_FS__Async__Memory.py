@@ -0,0 +1,42 @@
+import asyncio
+import time
+from unittest                                                                   import TestCase
+from mgraph_ai_service_cache.service.storage.Storage_FS__Async                 import Storage_FS__Async
+from mgraph_ai_service_cache.service.storage.Storage_FS__Async__Memory         import Storage_FS__Async__Memory
+
+
+class test_Storage_FS__Async__Memory(TestCase):
+
+    def test__init__(self):
+        with Storage_FS__Async__Memory().setup() as _:
+            assert type(_)         is Storage_FS__Async__Memory
+            assert isinstance(_, Storage_FS__Async)
+            assert _.files         == {}
+            assert _.executor      is None                                          # no threads are used
+
+    def test_file_operations(self):
+        async def run():
+            with Storage_FS__Async__Memory().setup() as _:
+                assert await _.file__save  ('ns/a/1.json', b'{}') is True
+                assert await _.file__save  ('ns/b/2.json', b'[]') is True
+                assert await _.file__save  ('other/3.json', b'') is True
+                assert await _.file__exists('ns/a/1.json')        is True
+                assert await _.file__json  ('ns/a/1.json')        == {}             # (same as Storage_FS__Async)
+                assert await _.file__json  ('other/3.json')       is None           # empty file
+                assert await _.file__json  ('ns/missing.json')    is None
+                assert await _.folder__files__all('ns')           == ['ns/a/1.json', 'ns/b/2.json']
+                assert await _.file__delete('ns/a/1.json')        is True
+                assert await _.file__delete('ns/a/1.json')        is False
+        asyncio.run(run())
+
+    def test_concurrent_requests(self):                                             # many requests in flight at the same time
+        storage = Storage_FS__Async__Memory(call_latency=0.05).setup()
+        paths   = [f'file-{i}' for i in range(200)]
+        async def run():
+            await asyncio.gather(*[storage.file__save(path, b'data') for path in paths])
+            return await storage.files__bytes(paths)
+        start    = time.time()
+        result   = asyncio.run(run())
+        duration = time.time() - start
+        assert result   == [b'data'] * 200
+        assert duration < 2                                                         # sequentially this would take 400 x 0.05 = 20 seconds
@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures                                                                       import ThreadPoolExecutor
+from unittest                                                                                 import TestCase
+from memory_fs.storage_fs.providers.Storage_FS__Local_Disk                                    import Storage_FS__Local_Disk
+from memory_fs.storage_fs.providers.Storage_FS__Memory                                        import Storage_FS__Memory
+from osbot_utils.type_safe.Type_Safe                                                          import Type_Safe
+from osbot_utils.type_safe.primitives.domains.identifiers.Random_Guid                         import Random_Guid
+from osbot_utils.utils.Objects                                                                import base_classes
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Storage_Mode             import Enum__Cache__Storage_Mode
+from mgraph_ai_service_cache_client.schemas.cache.enums.Enum__Cache__Store__Strategy          import Enum__Cache__Store__Strategy
+from mgraph_ai_service_cache.service.cache.Cache__Config                                      import Cache__Config
+from mgraph_ai_service_cache.service.cache.Cache__Service                                     import Cache__Service
+from mgraph_ai_service_cache.service.storage.Storage_FS__Compare_And_Swap                    import Storage_FS__Compare_And_Swap, STORAGE_FS__CAS__MAX_ATTEMPTS
+
+
+class test_Storage_FS__Compare_And_Swap(TestCase):
+
+    def setUp(self):
+        self.storage_fs = Storage_FS__Memory()
+        self.cas        = Storage_FS__Compare_And_Swap(storage_fs=self.storage_fs).setup()
+        self.path       = 'ns/refs/by-hash/ab/cd/abcd.json'
+
+    def test__init__(self):
+        with self.cas as _:
+            assert type(_)          is Storage_FS__Compare_And_Swap
+            assert base_classes(_)  == [Type_Safe, object]
+            assert _.max_attempts   == STORAGE_FS__CAS__MAX_ATTEMPTS
+            assert _.is_s3()        is False
+            assert _.lock_file_path() is None                                                   # memory mode only needs the in-process mutex
+
+    def test_read__write(self):
+        with self.cas as _:
+            assert _.read(self.path)                      == (None, None)
+            assert _.write(self.path, b'{"a": 1}', None)  is True                               # version None: the file must not exist
+            assert _.write(self.path, b'{"a": 2}', None)  is False
+            data, version = _.read(self.path)
+            assert data                                   == b'{"a": 1}'
+            assert _.write(self.path, b'{"a": 2}', 'old') is False                              # changed since it was read
+            assert _.write(self.path, b'{"a": 2}', version) is True
+            assert _.write(self.path, b'{"a": 3}', version) is False                            # version is now stale
+            assert _.conflicts                            == 3
+
+    def test_delete(self):
+        with self.cas as _:
+            _.write(self.path, b'{"a": 1}', None)
+            data, version = _.read(self.path)
+            _.write(self.path, b'{"a": 2}', version)
+            assert _.delete(self.path, version)           is False                              # changed since it was read
+            assert self.storage_fs.file__exists(self.path) is True
+            data, version = _.read(self.path)
+            assert _.delete(self.path, version)           is True
+            assert _.read(self.path)                      == (None, None)
+
+    def test_update_json(self):
+        with self.cas as _:
+            assert _.update_json(self.path, lambda data: None)                      is None     # nothing to write
+            assert _.update_json(self.path, lambda data: dict(count=1))             == dict(count=1)
+            assert _.update_json(self.path, lambda data: dict(count=data['count'] + 1)) == dict(count=2)
+
+    def test_update_json__retries_on_conflict(self):
+        with self.cas as _:
+            _.update_json(self.path, lambda data: dict(count=0))
+            calls = []
+            def mutate(data):                                                                   # another writer changes the file during the first attempt
+                calls.append(data['count'])
+                if len(calls) == 1:
+                    self.storage_fs.file__save(self.path, b'{"count": 10}')
+                return dict(count=data['count'] + 1)
+            assert _.update_json(self.path, mutate) == dict(count=11)
+            assert calls                            == [0, 10]
+
+    def test_update_json__gives_up(self):
+        with Storage_FS__Compare_And_Swap(storage_fs=self.storage_fs, max_attempts=2, backoff_base_ms=0).setup() as _:
+            def mutate(data):                                                                   # always loses the race
+                self.storage_fs.file__save(self.path, Random_Guid().encode())
+                return dict(a=1)
+            with self.assertRaises(Exception) as context:
+                _.update_json(self.path, mutate)
+            assert 'was changed by other writers in all 2 attempts' in str(context.exception)
+
+    def test_update_json__concurrent(self):
+        with self.cas as _:
+            def increment(_index):
+                return _.update_json(self.path, lambda data: dict(count=(data or {}).get('count', 0) + 1))
+            with ThreadPoolExecutor(max_workers=20) as executor:
+                list(executor.map(increment, range(200)))
+            assert _.update_json(self.path, lambda data: data) == dict(count=200)              # no lost updates
+
+    def test_local_disk__file_lock(self):
+        root_path = tempfile.mkdtemp()
+        try:
+            with Storage_FS__Compare_And_Swap(storage_fs=Storage_FS__Local_Disk(root_path=root_path)).setup() as _:
+                assert _.lock_file_path() == f'{root_path}.lock'
+                with ThreadPoolExecutor(max_workers=10) as executor:
+                    list(executor.map(lambda i: _.update_json('counter.json', lambda data: dict(count=(data or {}).get('count', 0) + 1)), range(50)))
+                assert _.update_json('counter.json', lambda data: data) == dict(count=50)
+        finally:
+            shutil.rmtree(root_path, ignore_errors=True)
+            if os.path.exists(f'{root_path}.lock'):
+                os.remove(f'{root_path}.lock')
+
+
+class test_Storage_FS__Compare_And_Swap__stress(TestCase):                                      # many concurrent stores of the same hash must not lose versions
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_service = Cache__Service(cache_config=Cache__Config(storage_mode=Enum__Cache__Storage_Mode.MEMORY))
+        cls.namespace     = 'test-refs-compare-and-swap'
+
+    def test_concurrent_stores__same_hash(self):
+        data       = {'identical': 'prompt'}
+        cache_hash = self.cache_service.hash_from_json(data)
+        stores     = 250                                                                        # more than CACHE__HASH_REFS__INLINE_MAX (so some stores also archive versions)
+
+        def store(_index):
+            return self.cache_service.store_with_strategy(storage_data = data                                ,
+                                                          cache_hash   = cache_hash                          ,
+                                                          cache_id     = Random_Guid()                       ,
+                                                          strategy     = Enum__Cache__Store__Strategy.DIRECT ,
+                                                          namespace    = self.namespace                      )
+        with ThreadPoolExecutor(max_workers=25) as executor:
+            responses = list(executor.map(store, range(stores)))
+
+        stored_ids   = sorted(str(response.cache_id) for response in responses)
+        refs         = self.cache_service.retrieve_by_hash__refs_hash(cache_hash, self.namespace)
+        versions     = self.cache_service.retrieve_by_hash__versions (cache_hash, self.namespace)
+        assert refs['total_versions']                                   == stores
+        assert sorted(entry['cache_id'] for entry in versions)          == stored_ids           # no version was lost (or duplicated)
+        assert refs['latest_id']                                        in stored_ids
+        assert self.cache_service.get_namespace__stats(self.namespace).refs_hash_files == 1    # only one store created the by-hash file
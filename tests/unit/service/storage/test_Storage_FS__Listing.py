@@ -0,0 +1,65 @@
+from unittest                                                                   import TestCase
+from memory_fs.storage_fs.providers.Storage_FS__Memory                          import Storage_FS__Memory
+from osbot_utils.type_safe.Type_Safe                                            import Type_Safe
+from osbot_utils.utils.Objects                                                  import base_classes
+from mgraph_ai_service_cache.service.storage.Storage_FS__Listing               import Storage_FS__Listing, STORAGE_FS__LISTING__PAGE_SIZE
+
+
+class test_Storage_FS__Listing(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.storage_fs = Storage_FS__Memory()
+        for path in ['ns-1/data/temporal/a.json'        ,
+                     'ns-1/data/temporal/b.json'        ,
+                     'ns-1/data/temporal/c/d.json'      ,
+                     'ns-1/data/temporal-latest/e.json' ,                                   # shares the 'ns-1/data/temporal' prefix
+                     'ns-2/data/temporal/f.json'        ]:
+            cls.storage_fs.file__save(path, b'{}')
+        cls.listing = Storage_FS__Listing(storage_fs=cls.storage_fs, page_size=2)
+
+    def test__init__(self):
+        with Storage_FS__Listing() as _:
+            assert type(_)         is Storage_FS__Listing
+            assert base_classes(_) == [Type_Safe, object]
+            assert _.page_size     == STORAGE_FS__LISTING__PAGE_SIZE
+
+    def test_pages(self):
+        with self.listing as _:
+            pages = list(_.pages('ns-1/data/temporal'))
+            assert len(pages)                            == 2                               # page_size is 2
+            assert sorted(sum(pages, []))                == ['ns-1/data/temporal/a.json'  ,
+                                                             'ns-1/data/temporal/b.json'  ,
+                                                             'ns-1/data/temporal/c/d.json']
+            assert list(_.pages('ns-3/data/temporal'))   == []
+
+    def test_files__count(self):
+        with self.listing as _:
+            assert sorted(_.files('ns-1/data/temporal-latest')) == ['ns-1/data/temporal-latest/e.json']
+            assert _.count('ns-1/data/temporal' )               == 3
+            assert _.count('ns-1/data/temporal/')               == 3                        # trailing '/' is optional
+            assert _.count('ns-1'               )               == 4
+            assert _.count('ns-2'               )               == 1
+            assert _.count('ns-3'               )               == 0
+
+    def test_page(self):
+        with self.listing as _:
+            paths, cursor = _.page('ns-1/data/temporal', limit=2)
+            assert paths  == ['ns-1/data/temporal/a.json', 'ns-1/data/temporal/b.json']
+            assert cursor == 'ns-1/data/temporal/b.json'                                    # for non S3 providers, the cursor is the last path returned
+            paths, cursor = _.page('ns-1/data/temporal', limit=2, cursor=cursor)
+            assert paths  == ['ns-1/data/temporal/c/d.json']
+            assert cursor is None                                                           # no more pages
+            assert _.page('ns-3') == ([], None)
+
+    def test_page__suffix(self):                                                            # filtered before the page is cut (so that pages are full)
+        storage_fs = Storage_FS__Memory()
+        for name in ['a', 'b', 'c']:
+            storage_fs.file__save(f'ns-1/refs/{name}.json'    , b'{}')
+            storage_fs.file__save(f'ns-1/refs/{name}.json.config', b'{}')
+        with Storage_FS__Listing(storage_fs=storage_fs) as _:
+            paths, cursor = _.page('ns-1/refs', limit=2, suffix='.json')
+            assert paths  == ['ns-1/refs/a.json', 'ns-1/refs/b.json']
+            paths, cursor = _.page('ns-1/refs', limit=2, cursor=cursor, suffix='.json')
+            assert paths  == ['ns-1/refs/c.json']
+            assert cursor is None
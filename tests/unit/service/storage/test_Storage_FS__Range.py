@@ -0,0 +1,53 @@
+import tempfile
+from unittest                                                                   import TestCase
+from unittest.mock                                                              import patch
+from memory_fs.storage_fs.providers.Storage_FS__Local_Disk                      import Storage_FS__Local_Disk
+from memory_fs.storage_fs.providers.Storage_FS__Memory                          import Storage_FS__Memory
+from osbot_utils.type_safe.Type_Safe                                            import Type_Safe
+from osbot_utils.utils.Objects                                                  import base_classes
+from mgraph_ai_service_cache.service.storage.Storage_FS__Range                 import Storage_FS__Range
+
+
+class test_Storage_FS__Range(TestCase):
+
+    def test__init__(self):
+        with Storage_FS__Range() as _:
+            assert type(_)         is Storage_FS__Range
+            assert base_classes(_) == [Type_Safe, object]
+            assert _.storage_fs    is None
+
+    def test_read__memory(self):
+        storage_fs = Storage_FS__Memory()
+        storage_fs.file__save('a/file.bin', b'0123456789')
+        with Storage_FS__Range(storage_fs=storage_fs) as _:
+            assert _.local_path('a/file.bin')     is None
+            assert _.read('a/file.bin', 2, 3 )    == b'234'
+            assert _.read('a/file.bin', 8, 10)    == b'89'
+            assert _.read('a/file.bin', 0, 0 )    == b''
+            assert _.read('a/missing.bin', 0, 3)  is None
+
+    def test_read__local_disk(self):
+        with tempfile.TemporaryDirectory() as root_path:
+            storage_fs = Storage_FS__Local_Disk(root_path=root_path)
+            storage_fs.file__save('a/file.bin', b'0123456789')
+            with Storage_FS__Range(storage_fs=storage_fs) as _:
+                assert _.local_path('a/file.bin').startswith(root_path)
+                assert _.read('a/file.bin', 5, 2)   == b'56'                                    # seek (the rest of the file is not read)
+                assert _.read('a/missing.bin', 0, 3) is None
+
+    def test_chunks__memory(self):                                                              # read once and sliced (no range reads on these providers)
+        storage_fs = Storage_FS__Memory()
+        storage_fs.file__save('a/file.bin', b'0123456789')
+        with Storage_FS__Range(storage_fs=storage_fs) as _:
+            with patch.object(Storage_FS__Memory, 'file__bytes', autospec=True, side_effect=Storage_FS__Memory.file__bytes) as file__bytes:
+                assert list(_.chunks('a/file.bin', 1, 8, 3)) == [b'123', b'456', b'78']
+                assert file__bytes.call_count               == 1
+            assert list(_.chunks('a/file.bin'   , 8, 10, 3)) == [b'89']
+            assert list(_.chunks('a/missing.bin', 0, 3 , 3)) == []
+
+    def test_chunks__local_disk(self):
+        with tempfile.TemporaryDirectory() as root_path:
+            storage_fs = Storage_FS__Local_Disk(root_path=root_path)
+            storage_fs.file__save('a/file.bin', b'0123456789')
+            with Storage_FS__Range(storage_fs=storage_fs) as _:
+                assert list(_.chunks('a/file.bin', 2, 5, 2)) == [b'23', b'45', b'6']
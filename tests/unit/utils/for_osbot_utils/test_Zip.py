@@ -0,0 +1,153 @@
+import io
+import zipfile
+from unittest                                                                     import TestCase
+from osbot_utils.utils.Zip                                                        import (zip_bytes_empty, zip_bytes__add_file, zip_bytes__file_list, zip_bytes__files,
+                                                                                         zip_bytes__remove_file, zip_bytes__replace_file)
+from mgraph_ai_service_cache.utils.for_osbot_utils.Zip                            import (zip_bytes__index, zip_bytes__data_offset, zip_member__decompress, zip_bytes__rewrite,
+                                                                                         zip_bytes__members, zip_bytes__add_file__raw_copy, zip_bytes__remove_file__raw_copy,
+                                                                                         zip_bytes__replace_file__raw_copy, zip_bytes__content_hash, zip_bytes__member_hashes,
+                                                                                         zip_member__content_hash, zip_members__content_hash, zip_bytes__central_directory,
+                                                                                         zip_bytes__member_records, zip_extra__strip)
+
+
+class test_Zip(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zf:
+            zf.writestr('stored.txt'  , b'stored content'    , compress_type=zipfile.ZIP_STORED  )
+            zf.writestr('deflated.txt', b'deflated ' * 100   , compress_type=zipfile.ZIP_DEFLATED)
+            zf.writestr('dir/bz2.txt' , b'bzip2 content ' * 5, compress_type=zipfile.ZIP_BZIP2  )
+        cls.zip_bytes = buffer.getvalue()
+
+    def read_member(self, entry, zip_bytes=None):
+        zip_bytes  = zip_bytes or self.zip_bytes
+        compressed = zip_bytes[entry['data_offset']:entry['data_offset'] + entry['compress_size']]
+        return zip_member__decompress(compressed, entry['compress_type'], entry['crc'])
+
+    def test_zip_bytes__index(self):
+        entries = zip_bytes__index(self.zip_bytes)
+        assert [entry['file_name'] for entry in entries] == ['stored.txt', 'deflated.txt', 'dir/bz2.txt']       # archive order
+        assert entries[0]['header_offset']               == 0
+        assert entries[0]['data_offset']                 == 30 + len('stored.txt')
+        assert entries[1]['compress_size']               <  entries[1]['file_size']                             # deflated
+        assert [self.read_member(entry) for entry in entries] == [b'stored content', b'deflated ' * 100, b'bzip2 content ' * 5]
+        assert zip_bytes__index(zip_bytes_empty())       == []
+
+    def test_zip_bytes__index__duplicated_names(self):                                          # zip_bytes__add_file appends (so a name can be in the zip twice)
+        zip_bytes = zip_bytes__add_file(zip_bytes_empty(), 'a.txt', b'first' )
+        zip_bytes = zip_bytes__add_file(zip_bytes        , 'a.txt', b'second')
+        entries   = zip_bytes__index(zip_bytes)
+        assert [entry['file_name'] for entry in entries] == zip_bytes__file_list(zip_bytes) == ['a.txt', 'a.txt']
+        assert self.read_member(entries[-1], zip_bytes)  == b'second'
+
+    def test_zip_bytes__data_offset(self):
+        with self.assertRaises(ValueError):
+            zip_bytes__data_offset(self.zip_bytes, 1)                                           # not a local header
+
+    def test_zip_member__decompress(self):
+        entry      = zip_bytes__index(self.zip_bytes)[1]
+        compressed = self.zip_bytes[entry['data_offset']:entry['data_offset'] + entry['compress_size']]
+        assert zip_member__decompress(compressed, entry['compress_type']) == b'deflated ' * 100   # no CRC check
+        with self.assertRaises(ValueError):
+            zip_member__decompress(compressed, entry['compress_type'], crc=entry['crc'] + 1)
+        with self.assertRaises(ValueError):
+            zip_member__decompress(compressed, 99)                                              # unsupported method
+
+    def test_zip_bytes__rewrite(self):
+        infos    = zipfile.ZipFile(io.BytesIO(self.zip_bytes)).infolist()
+        new_zip  = zip_bytes__rewrite(self.zip_bytes, [('renamed.txt', infos[0]), (infos[1].filename, infos[1]), ('new.txt', b'new content')])
+        entries  = zip_bytes__index(new_zip)
+        assert zip_bytes__files(new_zip)      == {'renamed.txt': b'stored content', 'deflated.txt': b'deflated ' * 100, 'new.txt': b'new content'}
+        assert entries[1]['compress_size']    == infos[1].compress_size                                 # copied (not recompressed)
+        assert new_zip[entries[1]['header_offset']:entries[1]['data_offset'] + entries[1]['compress_size']] == \
+               self.zip_bytes[infos[1].header_offset:zip_bytes__data_offset(self.zip_bytes, infos[1].header_offset) + infos[1].compress_size]
+        assert zip_bytes__file_list(zip_bytes__rewrite(self.zip_bytes, [])) == []
+        assert zip_bytes__rewrite(self.zip_bytes, [(info.filename, info) for info in infos]) == self.zip_bytes
+
+    def test_zip_bytes__rewrite__same_as_add_file(self):                                        # the new members are written like zip_bytes__add_file does
+        infos   = zipfile.ZipFile(io.BytesIO(self.zip_bytes)).infolist()
+        new_zip = zip_bytes__rewrite(self.zip_bytes, [(info.filename, info) for info in infos] + [('added.txt', b'added')])
+        assert len(new_zip)                  == len(zip_bytes__add_file(self.zip_bytes, 'added.txt', b'added'))
+        assert zip_bytes__file_list(new_zip) == zip_bytes__file_list(zip_bytes__add_file(self.zip_bytes, 'added.txt', b'added'))
+
+    def test_zip_bytes__rewrite__same_as_zipfile(self):                                       # the local headers, central directory and end record are the bytes zipfile writes
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr('ascii.txt', b'ascii')
+            zf.writestr('ünïcode.txt', b'unicode')                                              # utf-8 name (and flag)
+            zf.comment = b'a comment'
+        zip_bytes = buffer.getvalue()
+        infos     = zipfile.ZipFile(io.BytesIO(zip_bytes)).infolist()
+        assert zip_bytes__rewrite(zip_bytes, [(info.filename, info) for info in infos]) == zip_bytes
+
+        new_zip = zip_bytes__rewrite(zip_bytes, [('rénamed.txt', infos[0]), ('new.txt', b'new')])
+        with zipfile.ZipFile(io.BytesIO(new_zip)) as zf:
+            assert zf.testzip()  is None                                                        # headers, sizes and CRCs are valid
+            assert zf.comment    == b'a comment'
+            assert zf.namelist() == ['rénamed.txt', 'new.txt']
+            assert zf.read('rénamed.txt') == b'ascii'
+
+    def test_zip_bytes__rewrite__data_descriptor(self):                                         # members written to a stream have their CRC and sizes after the data
+        class Stream(io.RawIOBase):                                                             # not seekable (so zipfile writes data descriptors)
+            def __init__(self):
+                self.buffer = io.BytesIO()
+            def writable(self):
+                return True
+            def write(self, data):
+                return self.buffer.write(data)
+        stream = Stream()
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr('first.txt' , b'first ' * 10)
+            zf.writestr('second.txt', b'second')
+        zip_bytes = stream.buffer.getvalue()
+        infos     = zipfile.ZipFile(io.BytesIO(zip_bytes)).infolist()
+        assert infos[0].flag_bits & 0x08
+        assert zip_bytes__member_records(zip_bytes)[infos[0].header_offset] == infos[1].header_offset                      # up to the next record (i.e. including the descriptor)
+        assert zip_bytes__rewrite(zip_bytes, [(info.filename, info) for info in infos]) == zip_bytes
+        assert zip_bytes__files(zip_bytes__rewrite(zip_bytes, [('renamed.txt', infos[0])])) == {'renamed.txt': b'first ' * 10}
+
+    def test_zip_bytes__central_directory(self):
+        offset, size = zip_bytes__central_directory(self.zip_bytes)
+        assert offset + size == len(self.zip_bytes) - 22                                       # followed by the end record (and no comment)
+        assert self.zip_bytes[offset:offset + 4] == b'PK\x01\x02'
+        assert zip_bytes__central_directory(zip_bytes_empty()) == (0, 0)
+        with self.assertRaises(ValueError):
+            zip_bytes__central_directory(b'not a zip')
+
+    def test_zip_extra__strip(self):
+        zip64 = b'\x01\x00\x08\x00' + b'\x00' * 8
+        other = b'\x0a\x00\x02\x00ab'
+        assert zip_extra__strip(zip64 + other, (1,)) == other
+        assert zip_extra__strip(other + zip64, (1,)) == other
+        assert zip_extra__strip(b''           , (1,)) == b''
+
+    def test_zip_bytes__members(self):
+        assert [file_name for file_name, _ in zip_bytes__members(self.zip_bytes)] == ['stored.txt', 'deflated.txt', 'dir/bz2.txt']
+        assert zip_bytes__members(b'') == []
+
+    def test_zip_bytes__raw_copy(self):                                                         # same files as the osbot_utils functions (that recompress every member)
+        assert zip_bytes__files(zip_bytes__add_file__raw_copy    (self.zip_bytes, '/new.txt'  , 'new'    )) == zip_bytes__files(zip_bytes__add_file    (self.zip_bytes, '/new.txt'  , 'new'    ))
+        assert zip_bytes__files(zip_bytes__remove_file__raw_copy (self.zip_bytes, 'stored.txt'           )) == zip_bytes__files(zip_bytes__remove_file (self.zip_bytes, 'stored.txt'           ))
+        assert zip_bytes__files(zip_bytes__replace_file__raw_copy(self.zip_bytes, 'stored.txt', b'other' )) == zip_bytes__files(zip_bytes__replace_file(self.zip_bytes, 'stored.txt', b'other' ))
+        assert zip_bytes__add_file__raw_copy(self.zip_bytes, 'a.txt', None)                        == self.zip_bytes        # not str or bytes (skipped)
+
+        new_zip = zip_bytes__remove_file__raw_copy(self.zip_bytes, 'stored.txt')
+        entry   = zip_bytes__index(new_zip)[0]                                                  # 'deflated.txt' (now the first member)
+        assert entry['compress_type'] == zipfile.ZIP_DEFLATED
+        assert new_zip[entry['data_offset']:entry['data_offset'] + entry['compress_size']] in self.zip_bytes                # the compressed bytes were copied
+        assert zip_bytes__index(zip_bytes__remove_file__raw_copy(self.zip_bytes, 'deflated.txt'))[1]['compress_type'] == zipfile.ZIP_BZIP2   # not recompressed
+
+    def test_zip_bytes__content_hash(self):
+        assert zip_bytes__content_hash(zip_bytes_empty(), 16) == 'e3b0c44298fc1c14'                     # sha256 of nothing
+        assert zip_bytes__content_hash(self.zip_bytes   , 16) == zip_bytes__content_hash(zip_bytes__rewrite(self.zip_bytes, zip_bytes__members(self.zip_bytes)), 16)
+        assert zip_bytes__content_hash(zip_bytes__add_file(self.zip_bytes, 'stored.txt', b'other'), 16) == \
+               zip_bytes__content_hash(zip_bytes__replace_file(self.zip_bytes, 'stored.txt', b'other'), 16)        # the last duplicated member is the one that counts
+
+    def test_zip_members__content_hash(self):                                                   # same hash from the member hashes (without reading the zip)
+        member_hashes = zip_bytes__member_hashes(self.zip_bytes)
+        assert member_hashes[0] == zip_member__content_hash(b'stored content')
+        file_names    = [file_name for file_name, _ in zip_bytes__members(self.zip_bytes)]
+        assert zip_members__content_hash(zip(file_names, member_hashes), 16)           == zip_bytes__content_hash(self.zip_bytes, 16)
+        assert zip_members__content_hash(reversed(list(zip(file_names, member_hashes))), 16) == zip_bytes__content_hash(self.zip_bytes, 16)   # order doesn't matter (for unique names)